@@ -1,6 +1,6 @@
 import os
 import json
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 
 class Settings:
@@ -52,6 +52,385 @@ class Settings:
         """OpenAI 모델명"""
         return os.environ.get("OpenAIModel", "gpt-4o-mini")
 
+    @property
+    def openai_deployments(self) -> List[Dict[str, Any]]:
+        """OpenAI 배포 목록 (OpenAIDeployments JSON, 없으면 단일 배포 설정 사용)"""
+        raw = os.environ.get("OpenAIDeployments", "")
+        if raw:
+            deployments = json.loads(raw)
+            for deployment in deployments:
+                deployment.setdefault("name", f"{deployment.get('endpoint', '')}#{deployment.get('model', '')}")
+                deployment.setdefault("api_key", self.openai_api_key)
+                deployment.setdefault("api_version", self.openai_api_version)
+                deployment.setdefault("model", self.openai_model)
+                deployment.setdefault("weight", 1.0)
+                deployment.setdefault("rpm", self.llm_rate_limit_rpm)
+                deployment.setdefault("tpm", self.llm_rate_limit_tpm)
+            return deployments
+
+        return [{
+            "name": "default",
+            "endpoint": self.openai_endpoint,
+            "api_key": self.openai_api_key,
+            "api_version": self.openai_api_version,
+            "model": self.openai_model,
+            "weight": 1.0,
+            "rpm": self.llm_rate_limit_rpm,
+            "tpm": self.llm_rate_limit_tpm
+        }]
+
+    @property
+    def llm_request_timeout(self) -> float:
+        """LLM 호출 기본 타임아웃 (초) - 클라이언트 타임아웃이 없을 때의 요청 예산"""
+        return float(os.environ.get("LLMRequestTimeoutSeconds", "30"))
+
+    @property
+    def llm_template_timeouts(self) -> Dict[str, float]:
+        """템플릿별 LLM 호출 타임아웃 (예: "intent=5,hint=10")"""
+        return {
+            key: float(value)
+            for key, value in self._parse_key_values(os.environ.get("LLMTemplateTimeouts", "")).items()
+        }
+
+    @property
+    def llm_max_retries(self) -> int:
+        """429/5xx 발생 시 최대 재시도 횟수"""
+        return int(os.environ.get("LLMMaxRetries", "2"))
+
+    @property
+    def llm_hedge_templates(self) -> List[str]:
+        """헤지 요청(p95 지연 후 중복 요청)을 허용할 템플릿 목록"""
+        return self._parse_list(os.environ.get("LLMHedgeTemplates", ""))
+
+    @property
+    def llm_circuit_failure_threshold(self) -> int:
+        """서킷 브레이커가 열리는 연속 실패 횟수"""
+        return int(os.environ.get("LLMCircuitFailureThreshold", "5"))
+
+    @property
+    def llm_circuit_reset_seconds(self) -> float:
+        """서킷 브레이커가 열린 뒤 재시도(half-open)까지 대기 시간 (초)"""
+        return float(os.environ.get("LLMCircuitResetSeconds", "30"))
+
+    @property
+    def llm_template_routes(self) -> str:
+        """템플릿별 라우팅 덮어쓰기 JSON (예: {"hint": {"model": "tutor-ft-mini", "max_tokens": 150}})"""
+        return os.environ.get("LLMTemplateRoutes", "")
+
+    @property
+    def llm_auto_tune_output_budgets(self) -> bool:
+        """관측된 출력 길이로 템플릿별 max_tokens 자동 조정 여부"""
+        return os.environ.get("LLMAutoTuneOutputBudgets", "true").lower() == "true"
+
+    @property
+    def llm_routing_control_ratio(self) -> float:
+        """라우팅 효과 측정용 대조군 비율 (기본 모델·출력 제한 없음으로 호출)"""
+        return float(os.environ.get("LLMRoutingControlRatio", "0"))
+
+    @property
+    def llm_rate_limit_rpm(self) -> int:
+        """배포별 기본 분당 요청 한도 (0이면 제한 없음)"""
+        return int(os.environ.get("LLMRateLimitRPM", "0"))
+
+    @property
+    def llm_rate_limit_tpm(self) -> int:
+        """배포별 기본 분당 토큰 한도 (0이면 제한 없음)"""
+        return int(os.environ.get("LLMRateLimitTPM", "0"))
+
+    @property
+    def llm_rate_limit_mode(self) -> str:
+        """레이트 리미터 모드 (local: 워커별, redis: 전체 워커 공유)"""
+        return os.environ.get("LLMRateLimitMode", "local")
+
+    @property
+    def llm_rate_limit_max_wait(self) -> float:
+        """요청 예산이 없을 때 레이트 리미터 대기 허용 시간 (초)"""
+        return float(os.environ.get("LLMRateLimitMaxWaitSeconds", "5"))
+
+    @property
+    def llm_single_flight_templates(self) -> List[str]:
+        """동시에 들어온 동일 요청을 한 번만 호출할 템플릿 목록"""
+        return self._parse_list(os.environ.get("LLMSingleFlightTemplates", "concept_explanation,similar_item,similar_item_variants"))
+
+    @property
+    def llm_single_flight_mode(self) -> str:
+        """single-flight 모드 (local: 워커 내부, redis: 워커 간 공유)"""
+        return os.environ.get("LLMSingleFlightMode", "local")
+
+    @property
+    def redis_connection_string(self) -> str:
+        """Redis 연결 문자열 (예: rediss://:password@host:6380/0)"""
+        return os.environ.get("RedisConnectionString", "")
+
+    @property
+    def prefetch_max_per_response(self) -> int:
+        """응답당 미리 생성할 다음 액션 수 (0이면 비활성화)"""
+        return int(os.environ.get("PrefetchMaxPerResponse", "2"))
+
+    @property
+    def prefetch_session_token_budget(self) -> int:
+        """세션당 미리 생성에 쓸 수 있는 추정 토큰 예산"""
+        return int(os.environ.get("PrefetchSessionTokenBudget", "4000"))
+
+    @property
+    def prefetch_ttl_seconds(self) -> float:
+        """미리 생성한 응답의 유효 시간 (초)"""
+        return float(os.environ.get("PrefetchTTLSeconds", "600"))
+
+    @property
+    def accuracy_index_refresh_seconds(self) -> float:
+        """학습자×개념 정확도 인덱스 증분 갱신 주기 (초, 0이면 인덱스 미사용)"""
+        return float(os.environ.get("AccuracyIndexRefreshSeconds", "300"))
+
+    @property
+    def accuracy_index_mode(self) -> str:
+        """정확도 인덱스 공유 방식 (local: 워커별 적재, redis: 스냅샷 공유)"""
+        return os.environ.get("AccuracyIndexMode", "local")
+
+    @property
+    def view_snapshot_path(self) -> str:
+        """학습 뷰 컬럼 스냅샷 디렉터리 (워커 공유 스토리지, 비어 있으면 SQL만 사용)"""
+        return os.environ.get("ViewSnapshotPath", "")
+
+    @property
+    def view_snapshot_max_age_seconds(self) -> float:
+        """스냅샷을 신뢰하는 최대 경과 시간 (초, 넘으면 SQL 조회)"""
+        return float(os.environ.get("ViewSnapshotMaxAgeSeconds", "3600"))
+
+    @property
+    def view_snapshot_schedule(self) -> str:
+        """스냅샷 내보내기 타이머 (NCRONTAB)"""
+        return os.environ.get("ViewSnapshotSchedule", "0 */30 * * * *")
+
+    @property
+    def response_compression_min_bytes(self) -> int:
+        """이 크기(바이트) 이상인 응답만 gzip/br 압축 (0이면 압축 안 함)"""
+        return int(os.environ.get("ResponseCompressionMinBytes", "1024"))
+
+    @property
+    def idempotency_ttl_seconds(self) -> float:
+        """Idempotency-Key별 첫 응답 보관 시간 (초, 0이면 헤더 무시)"""
+        return float(os.environ.get("IdempotencyTTLSeconds", "300"))
+
+    @property
+    def idempotency_mode(self) -> str:
+        """Idempotency-Key 캐시 모드 (local: 워커 내부, redis: 워커 간 공유)"""
+        return os.environ.get("IdempotencyMode", "local")
+
+    @property
+    def idempotency_wait_seconds(self) -> float:
+        """같은 키의 원 요청이 진행 중일 때 재시도가 기다릴 최대 시간 (초)"""
+        return float(os.environ.get("IdempotencyWaitSeconds", "60"))
+
+    @property
+    def semantic_cache_templates(self) -> List[str]:
+        """비슷한 자유 질문에 캐시된 답변을 재사용할 템플릿 목록 (비우면 비활성화, 대화 기록을 보는 general_chat은 넣지 않음)"""
+        return self._parse_list(os.environ.get("SemanticCacheTemplates", ""))
+
+    @property
+    def semantic_cache_threshold(self) -> float:
+        """캐시 적중으로 볼 최소 코사인 유사도"""
+        return float(os.environ.get("SemanticCacheThreshold", "0.9"))
+
+    @property
+    def semantic_cache_backend(self) -> str:
+        """시맨틱 캐시 벡터 인덱스 (numpy: 워커 내부 브루트포스, azure_search: Azure AI Search)"""
+        return os.environ.get("SemanticCacheBackend", "numpy")
+
+    @property
+    def semantic_cache_max_entries(self) -> int:
+        """워커 내부 인덱스 최대 항목 수"""
+        return int(os.environ.get("SemanticCacheMaxEntries", "5000"))
+
+    @property
+    def semantic_cache_ttl_seconds(self) -> float:
+        """캐시된 답변 유효 시간 (초)"""
+        return float(os.environ.get("SemanticCacheTTLSeconds", "86400"))
+
+    @property
+    def semantic_cache_embedding_deployment(self) -> str:
+        """Azure OpenAI 임베딩 배포 이름 (비어 있으면 결정적 로컬 해싱 임베딩)"""
+        return os.environ.get("SemanticCacheEmbeddingDeployment", "")
+
+    @property
+    def semantic_cache_embedding_timeout(self) -> float:
+        """임베딩 호출 타임아웃 (초, 실패하면 캐시 없이 LLM 호출)"""
+        return float(os.environ.get("SemanticCacheEmbeddingTimeoutSeconds", "2"))
+
+    @property
+    def semantic_cache_audit_ratio(self) -> float:
+        """오적중 감사용으로 기록할 캐시 적중 비율"""
+        return float(os.environ.get("SemanticCacheAuditRatio", "0.05"))
+
+    @property
+    def semantic_cache_index_name(self) -> str:
+        """Azure AI Search 시맨틱 캐시 인덱스 이름"""
+        return os.environ.get("SemanticCacheIndexName", "tutor-semantic-cache")
+
+    @property
+    def azure_search_endpoint(self) -> str:
+        """Azure AI Search 엔드포인트"""
+        return os.environ.get("AzureSearchEndpoint", "")
+
+    @property
+    def azure_search_key(self) -> str:
+        """Azure AI Search 관리 키"""
+        return os.environ.get("AzureSearchKey", "")
+
+    @property
+    def concept_explanation_store_path(self) -> str:
+        """미리 생성한 개념 설명 저장소 (precompute_concept_explanations.py 결과, 워커가 함께 쓰는 경로, 비우면 항상 즉시 생성)"""
+        return os.environ.get("ConceptExplanationStorePath", "")
+
+    @property
+    def item_verification_max_retries(self) -> int:
+        """해설 계산 검증에 실패한 유사 문항을 다시 생성하는 최대 횟수 (0이면 재생성 없이 정답만 보정)"""
+        return int(os.environ.get("ItemVerificationMaxRetries", "1"))
+
+    @property
+    def similar_item_variants(self) -> bool:
+        """연속 학습 유사 문항을 쉬운/같은/어려운 난이도로 한 번에 생성 (출력 토큰 약 3배, 난이도 변경이 잦을 때만 켬)"""
+        return os.environ.get("SimilarItemVariants", "false").lower() == "true"
+
+    @property
+    def degrade_templates(self) -> List[str]:
+        """LLM 부하 시 로컬 대체 응답으로 바꿀 템플릿 목록 (비우면 항상 LLM 호출)"""
+        return self._parse_list(os.environ.get(
+            "DegradeTemplates",
+            "session_summary,intent,hint,feedback,personalized_hint,guided_hint,similar_item,similar_item_variants"
+        ))
+
+    @property
+    def degrade_max_in_flight(self) -> int:
+        """진행 중인 LLM 호출이 이 수 이상이면 로컬 대체 응답으로 전환"""
+        return int(os.environ.get("DegradeMaxInFlight", "16"))
+
+    @property
+    def shed_max_in_flight(self) -> int:
+        """진행 중인 LLM 호출이 이 수 이상이면 새 호출을 대기시키지 않고 바로 503 + Retry-After"""
+        return int(os.environ.get("ShedMaxInFlight", "32"))
+
+    @property
+    def degrade_latency_ratio(self) -> float:
+        """최근 LLM 지연 p90이 템플릿 타임아웃의 이 비율 이상이면 로컬 대체 응답으로 전환"""
+        return float(os.environ.get("DegradeLatencyRatio", "0.6"))
+
+    @property
+    def degrade_pressure_events(self) -> int:
+        """최근 구간에 429/타임아웃/서킷 오픈이 이 수 이상이면 로컬 대체 응답으로 전환"""
+        return int(os.environ.get("DegradePressureEvents", "3"))
+
+    @property
+    def degrade_window_seconds(self) -> float:
+        """지연·부하 신호를 보는 최근 구간 (초)"""
+        return float(os.environ.get("DegradeWindowSeconds", "30"))
+
+    @property
+    def degrade_cooldown_seconds(self) -> float:
+        """마지막 부하 신호 후 로컬 대체 응답을 유지하는 시간 (초)"""
+        return float(os.environ.get("DegradeCooldownSeconds", "20"))
+
+    @property
+    def item_bank_path(self) -> str:
+        """부하 시 유사 문항 대신 제공할 문항 은행 초기 파일 (개념별 문항 JSON, 비우면 실행 중 검증된 문항만 보관)"""
+        return os.environ.get("ItemBankPath", "")
+
+    @property
+    def item_bank_per_concept(self) -> int:
+        """문항 은행에 개념별로 보관할 최대 문항 수"""
+        return int(os.environ.get("ItemBankPerConcept", "20"))
+
+    @property
+    def job_queue_mode(self) -> str:
+        """비동기 작업 모드 (storage: Azure Storage Queue + Blob, local: 워커 내부 스레드 풀 - 개발용, off: 항상 동기 처리)"""
+        # 인스턴스가 여러 개면 local 작업은 다른 인스턴스의 폴링에서 보이지 않으므로 Storage가 있으면 storage가 기본
+        return os.environ.get("JobQueueMode", "storage" if self.job_storage_connection_string else "local")
+
+    @property
+    def job_storage_connection_string(self) -> str:
+        """작업 큐·결과 저장용 Storage 연결 문자열 (큐 트리거와 같은 AzureWebJobsStorage, 로컬 Azurite는 UseDevelopmentStorage=true)"""
+        return os.environ.get("AzureWebJobsStorage", "")
+
+    @property
+    def job_local_max_workers(self) -> int:
+        """local 모드에서 동시에 실행할 작업 수 (storage 모드는 host.json의 queues.batchSize로 조절)"""
+        return int(os.environ.get("JobLocalMaxWorkers", "2"))
+
+    @property
+    def job_max_wait_seconds(self) -> float:
+        """작업 상태 조회의 롱 폴링 최대 대기 시간 (초)"""
+        return float(os.environ.get("JobMaxWaitSeconds", "25"))
+
+    @property
+    def job_result_ttl_seconds(self) -> float:
+        """local 모드에서 끝난 작업 결과를 보관하는 시간 (초, storage 모드는 컨테이너 수명 주기 정책으로 정리)"""
+        return float(os.environ.get("JobResultTTLSeconds", "3600"))
+
+    @property
+    def precompute_state_path(self) -> str:
+        """미리 계산 작업의 실행 기록 파일 (워커가 함께 쓰는 쓰기 가능한 경로, 비우면 타이머 함수를 등록하지 않음)"""
+        return os.environ.get("PrecomputeStatePath", "")
+
+    @property
+    def precompute_patterns_path(self) -> str:
+        """real_patterns 작업의 학습 패턴 출력 파일 (워커가 함께 쓰는 쓰기 가능한 경로, 비우면 작업 꺼짐)"""
+        return os.environ.get("PrecomputePatternsPath", "")
+
+    @property
+    def precompute_token_budgets(self) -> Dict[str, int]:
+        """미리 계산 작업별 한 번 실행의 LLM 토큰 예산 (레이트 리미터와 같은 추정치, 0이면 무제한)"""
+        return {
+            key: int(value)
+            for key, value in self._parse_key_values(
+                os.environ.get("PrecomputeTokenBudgets", "concept_explanations=300000,item_bank=300000")
+            ).items()
+        }
+
+    @property
+    def precompute_patterns_schedule(self) -> str:
+        """학습 패턴 파일 갱신 타이머 (NCRONTAB, UTC)"""
+        return os.environ.get("PrecomputePatternsSchedule", "0 0 18 * * *")
+
+    @property
+    def precompute_explanations_schedule(self) -> str:
+        """개념 설명 저장소 갱신 타이머 (NCRONTAB, UTC)"""
+        return os.environ.get("PrecomputeExplanationsSchedule", "0 30 18 * * *")
+
+    @property
+    def precompute_item_bank_schedule(self) -> str:
+        """문항 은행 초기 파일 갱신 타이머 (NCRONTAB, UTC)"""
+        return os.environ.get("PrecomputeItemBankSchedule", "0 0 19 * * *")
+
+    @property
+    def precompute_accuracy_index_schedule(self) -> str:
+        """정확도 인덱스 Redis 스냅샷 갱신 타이머 (NCRONTAB, AccuracyIndexMode=redis일 때만)"""
+        return os.environ.get("PrecomputeAccuracyIndexSchedule", "0 */10 * * * *")
+
+    @property
+    def precompute_items_per_concept(self) -> int:
+        """문항 은행 초기 파일에 개념별로 미리 만들어 둘 검증된 문항 수"""
+        return int(os.environ.get("PrecomputeItemsPerConcept", "5"))
+
+    @property
+    def cold_start_warmup(self) -> bool:
+        """함수 앱 로드 직후 백그라운드 스레드에서 핸들러·LLM 클라이언트를 미리 import/생성할지"""
+        return os.environ.get("ColdStartWarmup", "true").lower() == "true"
+
+    @staticmethod
+    def _parse_list(raw: str) -> List[str]:
+        """쉼표 구분 문자열을 리스트로 변환"""
+        return [item.strip() for item in raw.split(",") if item.strip()]
+
+    @staticmethod
+    def _parse_key_values(raw: str) -> Dict[str, str]:
+        """a=1,b=2 형식 문자열을 딕셔너리로 변환"""
+        pairs = {}
+        for item in Settings._parse_list(raw):
+            if "=" in item:
+                key, value = item.split("=", 1)
+                pairs[key.strip()] = value.strip()
+        return pairs
+
     def _validate_required_env_vars(self) -> None:
         """필수 환경변수 검증"""
         required_vars = [
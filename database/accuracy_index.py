@@ -0,0 +1,279 @@
+import json
+import time
+import zlib
+import logging
+import threading
+from array import array
+from typing import Any, Dict, Iterable, Optional, Tuple
+import numpy as np
+from config.settings import settings
+
+# Redis 스냅샷 필드 (meta: 학습자/개념 목록과 적재 시각, 나머지는 압축된 배열)
+_SNAPSHOT_FIELDS = ("meta", "accuracy", "attempts")
+
+
+class AccuracyIndex:
+    """학습자×개념별 최신 tag_accuracy와 문항 수를 메모리에 유지하는 인덱스
+
+    학습자/개념 이름을 정수 번호로 바꿔 float32·uint32 행렬 한 칸에 저장하므로
+    조회는 딕셔너리 두 번 + 배열 인덱싱(O(1))입니다. session_id는 학습자 ID를 포함해 시간순으로 늘어나지 않고
+    뷰에는 항상 증가하는 변경 컬럼이 없으므로, 갱신 주기마다 뷰 전체를 다시 적재해 새 행렬로 교체합니다.
+    redis 모드에서는 한 워커(또는 타이머)가 적재한 스냅샷이 주기 안이면 다른 워커는 SQL 대신 스냅샷을 씁니다.
+    """
+
+    def __init__(self, refresh_seconds: float = 300, mode: str = "local", redis_url: str = "",
+                 key_prefix: str = "llm-tutor:accuracy-index", db_service=None):
+        self.refresh_seconds = refresh_seconds
+        self.mode = mode
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self._db_service = db_service
+        self._learners: Dict[str, int] = {}
+        self._concepts: Dict[str, int] = {}
+        self._accuracy = np.full((0, 0), np.nan, dtype=np.float32)
+        self._attempts = np.zeros((0, 0), dtype=np.uint32)
+        self._item_concepts: Dict[str, Optional[str]] = {}
+        # 현재 행렬을 뷰에서 적재한 시각 (time.time(), 공유 스냅샷끼리 최신 비교)
+        self.loaded_at = 0.0
+        self.loaded = False
+        self._refreshed_at: Optional[float] = None
+        self._refreshing = False
+        self._redis = None
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "refreshes": 0, "rows_applied": 0, "snapshot_loads": 0}
+
+    @classmethod
+    def from_settings(cls) -> "AccuracyIndex":
+        """환경변수 설정으로 생성"""
+        return cls(settings.accuracy_index_refresh_seconds, settings.accuracy_index_mode,
+                   settings.redis_connection_string)
+
+    @property
+    def enabled(self) -> bool:
+        """인덱스 사용 여부"""
+        return self.refresh_seconds > 0
+
+    def get(self, learner_id: str, concept_name: str) -> Optional[Tuple[float, int]]:
+        """(최신 정확도, 문항 수) 조회 - 인덱스에 없으면 None (호출자가 DB 조회)"""
+        if not self.enabled:
+            return None
+        self._maybe_refresh()
+
+        with self._lock:
+            row = self._learners.get(learner_id)
+            col = self._concepts.get(concept_name)
+            if row is not None and col is not None:
+                accuracy = self._accuracy[row, col]
+                if not np.isnan(accuracy):
+                    self.stats["hits"] += 1
+                    return float(accuracy), int(self._attempts[row, col])
+            self.stats["misses"] += 1
+        return None
+
+    def get_accuracy(self, learner_id: str, concept_name: str) -> Optional[float]:
+        """최신 정확도만 조회"""
+        entry = self.get(learner_id, concept_name)
+        return entry[0] if entry else None
+
+    def get_item_concept(self, assessment_item_id: str) -> Optional[str]:
+        """평가 아이템의 개념 (여러 개념에 걸친 아이템이면 None)"""
+        with self._lock:
+            return self._item_concepts.get(assessment_item_id)
+
+    def put(self, learner_id: str, concept_name: str, accuracy: float, attempts: Optional[int] = None):
+        """DB에서 직접 조회한 값을 인덱스에 반영 (다음 전체 적재 전까지 재조회 방지)"""
+        if not self.enabled or accuracy is None:
+            return
+        with self._lock:
+            row, col = self._slot(learner_id, concept_name)
+            self._accuracy[row, col] = accuracy
+            if attempts is not None:
+                self._attempts[row, col] = attempts
+
+    def apply_rows(self, rows: Iterable[Tuple], loaded_at: Optional[float] = None) -> int:
+        """(learnerID, concept_name, tag_accuracy, attempts) 행으로 새 행렬을 만들어 통째로 교체
+
+        조회는 교체 전까지 이전 행렬을 그대로 씁니다 (락은 교체할 때만 잡음).
+        """
+        learners: Dict[str, int] = {}
+        concepts: Dict[str, int] = {}
+        rows_index, cols_index = array("I"), array("I")
+        accuracies, attempts = array("f"), array("I")
+        for learner_id, concept_name, accuracy, attempt_count in rows:
+            rows_index.append(learners.setdefault(learner_id, len(learners)))
+            cols_index.append(concepts.setdefault(concept_name, len(concepts)))
+            accuracies.append(np.nan if accuracy is None else accuracy)
+            attempts.append(attempt_count or 0)
+
+        shape = (max(len(learners), 1), max(len(concepts), 1))
+        accuracy_matrix = np.full(shape, np.nan, dtype=np.float32)
+        attempts_matrix = np.zeros(shape, dtype=np.uint32)
+        index = (np.frombuffer(rows_index, dtype=np.uint32), np.frombuffer(cols_index, dtype=np.uint32))
+        accuracy_matrix[index] = np.frombuffer(accuracies, dtype=np.float32)
+        attempts_matrix[index] = np.frombuffer(attempts, dtype=np.uint32)
+
+        with self._lock:
+            self._learners, self._concepts = learners, concepts
+            self._accuracy, self._attempts = accuracy_matrix, attempts_matrix
+            self.loaded_at = time.time() if loaded_at is None else loaded_at
+            self.stats["rows_applied"] += len(rows_index)
+        return len(rows_index)
+
+    def set_item_concepts(self, rows: Iterable[Tuple]):
+        """아이템→개념 매핑 적재"""
+        item_concepts: Dict[str, Optional[str]] = {}
+        for item_id, concept_name in rows:
+            # 한 아이템이 여러 개념에 걸쳐 있으면 인덱스로 판단하지 않음
+            item_concepts[item_id] = concept_name if item_concepts.get(item_id, concept_name) == concept_name else None
+        with self._lock:
+            self._item_concepts = item_concepts
+
+    def _slot(self, learner_id: str, concept_name: str) -> Tuple[int, int]:
+        """학습자/개념 번호 할당 (필요하면 행렬 확장, 락 안에서 호출)"""
+        row = self._learners.get(learner_id)
+        if row is None:
+            row = len(self._learners)
+            self._ensure_shape(row + 1, len(self._concepts))
+            self._learners[learner_id] = row
+        col = self._concepts.get(concept_name)
+        if col is None:
+            col = len(self._concepts)
+            self._ensure_shape(len(self._learners), col + 1)
+            self._concepts[concept_name] = col
+        return row, col
+
+    def _ensure_shape(self, rows: int, cols: int):
+        """행렬 크기 확장 (행은 2배씩 늘려 재할당 횟수를 줄임)"""
+        current_rows, current_cols = self._accuracy.shape
+        if rows <= current_rows and cols <= current_cols:
+            return
+        new_rows = max(rows, current_rows * 2 if rows > current_rows else current_rows, 1024)
+        new_cols = max(cols, current_cols + 8 if cols > current_cols else current_cols)
+        accuracy = np.full((new_rows, new_cols), np.nan, dtype=np.float32)
+        attempts = np.zeros((new_rows, new_cols), dtype=np.uint32)
+        accuracy[:current_rows, :current_cols] = self._accuracy
+        attempts[:current_rows, :current_cols] = self._attempts
+        self._accuracy, self._attempts = accuracy, attempts
+
+    def _maybe_refresh(self):
+        """갱신 주기가 지났으면 백그라운드에서 갱신 (조회는 기다리지 않음)"""
+        if self._refreshed_at is not None and time.monotonic() - self._refreshed_at < self.refresh_seconds:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            self._refreshed_at = time.monotonic()
+        threading.Thread(target=self._refresh_in_background, name="accuracy-index-refresh", daemon=True).start()
+
+    def _refresh_in_background(self):
+        """백그라운드 갱신 (실패해도 다음 주기에 재시도)"""
+        try:
+            self.refresh()
+        except Exception as e:
+            logging.warning(f"Accuracy index refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def refresh(self, force: bool = False):
+        """redis 스냅샷이 주기 안이면 그대로 사용, 아니면(또는 force) 뷰 전체를 다시 적재해 교체하고 스냅샷 공유"""
+        client = self._get_redis() if self.mode == "redis" else None
+        if client is not None and not force:
+            self._load_snapshot(client)
+            if self.loaded and time.time() - self.loaded_at < self.refresh_seconds:
+                return
+
+        db_service = self._get_db_service()
+        applied = self.apply_rows(db_service.get_latest_concept_accuracies())
+        self.set_item_concepts(db_service.get_item_concepts())
+        self.loaded = True
+        self.stats["refreshes"] += 1
+        logging.info(f"Accuracy index reloaded: {applied} rows")
+
+        if client is not None:
+            self._publish_snapshot(client)
+
+    def _load_snapshot(self, client):
+        """다른 워커가 공유한 스냅샷이 더 최신이면 교체"""
+        try:
+            values = client.hmget(self.key_prefix, *_SNAPSHOT_FIELDS)
+        except Exception as e:
+            logging.warning(f"Could not read accuracy index snapshot: {e}")
+            return
+        if values[0] is None:
+            return
+
+        meta = json.loads(zlib.decompress(values[0]))
+        if meta.get("loaded_at", 0.0) <= self.loaded_at:
+            return
+        shape = tuple(meta["shape"])
+        accuracy = np.frombuffer(zlib.decompress(values[1]), dtype=np.float32).reshape(shape).copy()
+        attempts = np.frombuffer(zlib.decompress(values[2]), dtype=np.uint32).reshape(shape).copy()
+        with self._lock:
+            self._learners = {learner_id: i for i, learner_id in enumerate(meta["learners"])}
+            self._concepts = {concept: i for i, concept in enumerate(meta["concepts"])}
+            self._accuracy, self._attempts = accuracy, attempts
+            self._item_concepts = meta["item_concepts"]
+            self.loaded_at = meta["loaded_at"]
+            self.stats["snapshot_loads"] += 1
+        self.loaded = True
+
+    def _publish_snapshot(self, client):
+        """현재 인덱스를 Redis에 공유"""
+        with self._lock:
+            rows, cols = len(self._learners), len(self._concepts)
+            meta = {
+                "learners": list(self._learners),
+                "concepts": list(self._concepts),
+                "item_concepts": self._item_concepts,
+                "loaded_at": self.loaded_at,
+                "shape": [rows, cols]
+            }
+            accuracy = self._accuracy[:rows, :cols].tobytes()
+            attempts = self._attempts[:rows, :cols].tobytes()
+        try:
+            client.hset(self.key_prefix, mapping={
+                "meta": zlib.compress(json.dumps(meta, ensure_ascii=False).encode("utf-8")),
+                "accuracy": zlib.compress(accuracy),
+                "attempts": zlib.compress(attempts)
+            })
+        except Exception as e:
+            logging.warning(f"Could not publish accuracy index snapshot: {e}")
+
+    def _get_db_service(self):
+        """DB 서비스 지연 생성"""
+        if self._db_service is None:
+            from database.db_service import DatabaseService
+            self._db_service = DatabaseService()
+        return self._db_service
+
+    def _get_redis(self):
+        """Redis 클라이언트 지연 생성"""
+        if self._redis is None and self.redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(self.redis_url, socket_timeout=5.0)
+            except Exception as e:
+                logging.warning(f"Redis accuracy index sharing disabled: {e}")
+                self.redis_url = ""
+        return self._redis
+
+    def get_stats(self) -> Dict[str, Any]:
+        """인덱스 크기와 적중률"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats.update({
+                "learners": len(self._learners),
+                "concepts": len(self._concepts),
+                "memory_bytes": int(self._accuracy.nbytes + self._attempts.nbytes),
+                "loaded_at": self.loaded_at,
+                "loaded": self.loaded
+            })
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+# 프로세스 전역 정확도 인덱스 인스턴스
+accuracy_index = AccuracyIndex.from_settings()
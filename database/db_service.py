@@ -1,8 +1,10 @@
-import pyodbc
 import logging
-from typing import List, Tuple, Optional
+from typing import TYPE_CHECKING, List, Tuple, Optional
 from config.settings import settings
 
+if TYPE_CHECKING:
+    import pyodbc
+
 
 class DatabaseService:
     """데이터베이스 연결 및 쿼리 서비스"""
@@ -10,8 +12,10 @@ class DatabaseService:
     def __init__(self):
         self.connection_string = settings.sql_connection_string
 
-    def get_connection(self) -> pyodbc.Connection:
-        """데이터베이스 연결 생성"""
+    def get_connection(self) -> "pyodbc.Connection":
+        """데이터베이스 연결 생성 (pyodbc는 첫 연결 때 import)"""
+        import pyodbc
+
         try:
             return pyodbc.connect(self.connection_string)
         except Exception as e:
@@ -19,7 +23,13 @@ class DatabaseService:
             raise
 
     def get_session_results(self, learner_id: str, session_id: str) -> List[Tuple]:
-        """세션 결과 조회"""
+        """세션 결과 조회 (컬럼 스냅샷 우선, 없거나 오래됐으면 SQL)"""
+        from database.view_snapshot import view_snapshot
+
+        rows = view_snapshot.get_session_results(learner_id, session_id)
+        if rows is not None:
+            return rows
+
         query = """
         SELECT seq_in_session, assessmentItemID, concept_name, is_correct,
                tag_accuracy, global_accuracy, personal_vs_global_delta
@@ -34,7 +44,13 @@ class DatabaseService:
             return cursor.fetchall()
 
     def get_assessment_item_id(self, learner_id: str, session_id: str, question_number: int) -> Optional[str]:
-        """문제 번호로 평가 아이템 ID 조회"""
+        """문제 번호로 평가 아이템 ID 조회 (컬럼 스냅샷 우선)"""
+        from database.view_snapshot import view_snapshot
+
+        item_id = view_snapshot.get_assessment_item_id(learner_id, session_id, question_number)
+        if item_id is not None:
+            return item_id
+
         query = """
         SELECT assessmentItemID
         FROM gold.vw_personal_item_enriched
@@ -48,7 +64,13 @@ class DatabaseService:
             return row[0] if row else None
 
     def get_personal_info(self, learner_id: str, assessment_item_id: str) -> Optional[Tuple[str, float]]:
-        """개인 학습 정보 조회"""
+        """개인 학습 정보 조회 (컬럼 스냅샷 우선)"""
+        from database.view_snapshot import view_snapshot
+
+        personal_info = view_snapshot.get_personal_info(learner_id, assessment_item_id)
+        if personal_info is not None:
+            return personal_info
+
         query = """
         SELECT concept_name, tag_accuracy
         FROM gold.vw_personal_item_enriched
@@ -61,6 +83,65 @@ class DatabaseService:
             row = cursor.fetchone()
             return (row[0], row[1]) if row else None
 
+    def get_concept_accuracy(self, learner_id: str, concept_name: str) -> Optional[float]:
+        """개념별 개인 정확도 조회 (가장 최근 세션 기준)"""
+        query = """
+        SELECT TOP 1 tag_accuracy
+        FROM gold.vw_personal_item_enriched
+        WHERE learnerID = ? AND concept_name = ?
+        ORDER BY session_id DESC
+        """
+
+        with self.get_connection() as cnxn:
+            cursor = cnxn.cursor()
+            cursor.execute(query, learner_id, concept_name)
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    def get_latest_concept_accuracies(self) -> List[Tuple]:
+        """학습자×개념별 최신 정확도와 문항 수 조회 (뷰 전체 - learnerID, concept_name, tag_accuracy, attempts)"""
+        query = """
+        SELECT learnerID, concept_name, tag_accuracy, attempts
+        FROM (
+            SELECT learnerID, concept_name, tag_accuracy,
+                   COUNT(*) OVER (PARTITION BY learnerID, concept_name) AS attempts,
+                   ROW_NUMBER() OVER (PARTITION BY learnerID, concept_name ORDER BY session_id DESC) AS rn
+            FROM gold.vw_personal_item_enriched
+        ) latest
+        WHERE rn = 1
+        """
+
+        with self.get_connection() as cnxn:
+            cursor = cnxn.cursor()
+            cursor.arraysize = 10000
+            cursor.execute(query)
+            return cursor.fetchall()
+
+    def get_view_version(self) -> str:
+        """학습 뷰 변경 표시 (마지막 session_id와 행 수 - 미리 계산 작업의 입력 지문)"""
+        query = """
+        SELECT MAX(session_id), COUNT(*)
+        FROM gold.vw_personal_item_enriched
+        """
+
+        with self.get_connection() as cnxn:
+            cursor = cnxn.cursor()
+            cursor.execute(query)
+            row = cursor.fetchone()
+            return f"{row[0] or ''}:{row[1]}"
+
+    def get_item_concepts(self) -> List[Tuple]:
+        """평가 아이템별 개념 조회"""
+        query = """
+        SELECT DISTINCT assessmentItemID, concept_name
+        FROM gold.vw_personal_item_enriched
+        """
+
+        with self.get_connection() as cnxn:
+            cursor = cnxn.cursor()
+            cursor.execute(query)
+            return cursor.fetchall()
+
     @staticmethod
     def format_session_results_for_llm(rows: List[Tuple]) -> str:
         """DB 조회 결과를 LLM이 읽기 쉬운 텍스트로 변환"""
@@ -0,0 +1,328 @@
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from config.settings import settings
+
+# 스냅샷으로 내보내는 뷰 컬럼 (get_session_results 순서 + 정렬 키)
+VIEW_COLUMNS = [
+    "learnerID", "session_id", "seq_in_session", "assessmentItemID", "concept_name",
+    "is_correct", "tag_accuracy", "global_accuracy", "personal_vs_global_delta"
+]
+
+# 딕셔너리 인코딩하는 문자열 컬럼 → 파일 이름
+_DICTIONARY_COLUMNS = {
+    "learnerID": "learners",
+    "session_id": "sessions",
+    "assessmentItemID": "items",
+    "concept_name": "concepts"
+}
+
+# 현재 스냅샷 디렉터리 이름을 담는 포인터 파일
+CURRENT_FILE = "CURRENT"
+
+# 교체 후에도 남겨둘 이전 스냅샷 수 (읽고 있는 워커 보호)
+KEEP_SNAPSHOTS = 2
+
+# is_correct가 NULL인 행의 저장 값 (int8 컬럼, 읽을 때 None으로 되돌림)
+NULL_IS_CORRECT = -1
+
+
+def export_view_snapshot(root: str, db_service=None, batch_size: int = 50000) -> str:
+    """gold.vw_personal_item_enriched를 컬럼 파일(.npy)로 내보내고 CURRENT를 새 스냅샷으로 교체"""
+    if db_service is None:
+        from database.db_service import DatabaseService
+        db_service = DatabaseService()
+
+    # fetchmany 청크마다 바로 타입 배열로 바꿔 뷰 전체를 파이썬 튜플로 들고 있지 않음
+    builder = _ColumnBuilder()
+    query = f"SELECT {', '.join(VIEW_COLUMNS)} FROM gold.vw_personal_item_enriched"
+    with db_service.get_connection() as cnxn:
+        cursor = cnxn.cursor()
+        cursor.arraysize = batch_size
+        cursor.execute(query)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            builder.add(batch)
+
+    return _write_snapshot(root, builder)
+
+
+def write_view_snapshot(root: str, rows: List[Tuple]) -> str:
+    """뷰 행을 딕셔너리 인코딩 + (learnerID, session_id, seq) 정렬된 컬럼 파일로 저장"""
+    builder = _ColumnBuilder()
+    if rows:
+        builder.add(rows)
+    return _write_snapshot(root, builder)
+
+
+class _ColumnBuilder:
+    """뷰 행 청크를 컬럼별 타입 배열로 쌓음 (문자열은 처음 본 순서의 임시 코드, 끝에서 정렬 순서로 재번호)"""
+
+    def __init__(self):
+        self.lookups: Dict[str, Dict[str, int]] = {column: {} for column in _DICTIONARY_COLUMNS}
+        self.chunks: Dict[str, List[np.ndarray]] = {column: [] for column in VIEW_COLUMNS}
+        self.rows = 0
+
+    def add(self, batch: List[Tuple]):
+        """청크 하나 변환 (NULL: is_correct는 NULL_IS_CORRECT, 실수 컬럼은 NaN)"""
+        count = len(batch)
+        for column, values in zip(VIEW_COLUMNS, zip(*batch)):
+            if column in _DICTIONARY_COLUMNS:
+                lookup = self.lookups[column]
+                array = np.fromiter((lookup.setdefault(str(v), len(lookup)) for v in values), np.int32, count)
+            elif column == "is_correct":
+                array = np.fromiter((NULL_IS_CORRECT if v is None else int(v) for v in values), np.int8, count)
+            elif column == "seq_in_session":
+                array = np.fromiter((int(v) for v in values), np.int32, count)
+            else:
+                array = np.fromiter((np.nan if v is None else float(v) for v in values), np.float32, count)
+            self.chunks[column].append(array)
+        self.rows += count
+
+    def column(self, column: str, dtype) -> np.ndarray:
+        """쌓은 청크를 한 배열로"""
+        chunks = self.chunks[column]
+        return np.concatenate(chunks) if chunks else np.zeros(0, dtype=dtype)
+
+    def dictionary(self, column: str) -> Tuple[np.ndarray, np.ndarray]:
+        """정렬된 고유값 배열과 그 순서의 코드 (코드 순서 = 문자열 순서)"""
+        values = np.array(list(self.lookups[column]), dtype=str)
+        order = np.argsort(values, kind="stable")
+        remap = np.empty(len(values), dtype=np.int32)
+        remap[order] = np.arange(len(values), dtype=np.int32)
+        return values[order], remap[self.column(column, np.int32)]
+
+
+def _write_snapshot(root: str, builder: "_ColumnBuilder") -> str:
+    """쌓은 컬럼을 정렬해 새 스냅샷 디렉터리에 저장"""
+    dictionaries: Dict[str, np.ndarray] = {}
+    codes: Dict[str, np.ndarray] = {}
+    for column, name in _DICTIONARY_COLUMNS.items():
+        dictionaries[name], codes[column] = builder.dictionary(column)
+
+    seq = builder.column("seq_in_session", np.int32)
+    order = np.lexsort((seq, codes["session_id"], codes["learnerID"]))
+    session_count = max(len(dictionaries["sessions"]), 1)
+
+    arrays = {
+        "key": (codes["learnerID"].astype(np.int64) * session_count + codes["session_id"])[order],
+        "seq": seq[order],
+        "item": codes["assessmentItemID"][order],
+        "concept": codes["concept_name"][order].astype(np.int16 if len(dictionaries["concepts"]) < 2**15 else np.int32),
+        "is_correct": builder.column("is_correct", np.int8)[order],
+        "tag_accuracy": builder.column("tag_accuracy", np.float32)[order],
+        "global_accuracy": builder.column("global_accuracy", np.float32)[order],
+        "delta": builder.column("personal_vs_global_delta", np.float32)[order]
+    }
+    arrays.update(dictionaries)
+    rows = builder.rows
+
+    # 새 디렉터리에 쓴 뒤 CURRENT 포인터만 원자적으로 교체
+    os.makedirs(root, exist_ok=True)
+    name = f"snapshot-{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    target = os.path.join(root, name)
+    os.makedirs(target)
+    for array_name, array in arrays.items():
+        np.save(os.path.join(target, f"{array_name}.npy"), array)
+    with open(os.path.join(target, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"exported_at": time.time(), "rows": rows, "session_count": session_count}, f)
+
+    pointer = os.path.join(root, f"{CURRENT_FILE}.tmp")
+    with open(pointer, "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(pointer, os.path.join(root, CURRENT_FILE))
+
+    _remove_old_snapshots(root, name)
+    logging.info(f"View snapshot exported: {rows} rows → {target}")
+    return target
+
+
+def _to_correct(value: np.int8) -> Optional[int]:
+    """is_correct 값을 SQL 결과와 같은 형태로 변환 (NULL은 None)"""
+    return None if value == NULL_IS_CORRECT else int(value)
+
+
+def _to_float(value: np.float32) -> Optional[float]:
+    """float32 값을 SQL 결과와 같은 형태로 변환 (NULL은 None, 저장 오차는 반올림)"""
+    return None if np.isnan(value) else round(float(value), 6)
+
+
+def _remove_old_snapshots(root: str, current: str):
+    """오래된 스냅샷 정리 (최근 KEEP_SNAPSHOTS개 유지)"""
+    snapshots = sorted(d for d in os.listdir(root) if d.startswith("snapshot-") and d != current)
+    for name in snapshots[:max(0, len(snapshots) - (KEEP_SNAPSHOTS - 1))]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+class _SnapshotFiles:
+    """메모리 매핑된 스냅샷 한 벌"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.exported_at = meta["exported_at"]
+        self.session_count = meta["session_count"]
+        self.arrays = {
+            file_name[:-4]: np.load(os.path.join(path, file_name), mmap_mode="r")
+            for file_name in os.listdir(path) if file_name.endswith(".npy")
+        }
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        try:
+            return self.arrays[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    @staticmethod
+    def code_of(dictionary: np.ndarray, value: str) -> Optional[int]:
+        """정렬된 딕셔너리에서 이진 탐색으로 코드 찾기"""
+        index = int(np.searchsorted(dictionary, value))
+        if index < len(dictionary) and dictionary[index] == value:
+            return index
+        return None
+
+    def key_range(self, low: int, high: int) -> Tuple[int, int]:
+        """정렬 키가 [low, high)인 행 범위"""
+        return int(np.searchsorted(self.key, low, "left")), int(np.searchsorted(self.key, high, "left"))
+
+    def session_range(self, learner_id: str, session_id: str) -> Optional[Tuple[int, int]]:
+        """학습자·세션의 행 범위"""
+        learner = self.code_of(self.learners, learner_id)
+        session = self.code_of(self.sessions, session_id)
+        if learner is None or session is None:
+            return None
+        key = learner * self.session_count + session
+        start, end = self.key_range(key, key + 1)
+        return (start, end) if start < end else None
+
+    def learner_range(self, learner_id: str) -> Optional[Tuple[int, int]]:
+        """학습자의 전체 행 범위"""
+        learner = self.code_of(self.learners, learner_id)
+        if learner is None:
+            return None
+        start, end = self.key_range(learner * self.session_count, (learner + 1) * self.session_count)
+        return (start, end) if start < end else None
+
+
+class ViewSnapshot:
+    """워커가 메모리 매핑해서 쓰는 학습 뷰 스냅샷 (오래됐거나 데이터가 없으면 None → SQL 조회)"""
+
+    def __init__(self, root: str = "", max_age_seconds: float = 3600, check_interval: float = 60):
+        self.root = root
+        self.max_age_seconds = max_age_seconds
+        self.check_interval = check_interval
+        self._files: Optional[_SnapshotFiles] = None
+        self._current_name: Optional[str] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "fallbacks": 0, "reloads": 0}
+
+    @classmethod
+    def from_settings(cls) -> "ViewSnapshot":
+        """환경변수 설정으로 생성"""
+        return cls(settings.view_snapshot_path, settings.view_snapshot_max_age_seconds)
+
+    def get_session_results(self, learner_id: str, session_id: str) -> Optional[List[Tuple]]:
+        """DatabaseService.get_session_results와 같은 형식의 행"""
+        files = self._get_files()
+        row_range = files.session_range(learner_id, session_id) if files else None
+        if row_range is None:
+            return self._fallback()
+
+        start, end = row_range
+        rows = [
+            (int(files.seq[i]), str(files.items[files.item[i]]), str(files.concepts[files.concept[i]]),
+             _to_correct(files.is_correct[i]), _to_float(files.tag_accuracy[i]), _to_float(files.global_accuracy[i]),
+             _to_float(files.delta[i]))
+            for i in range(start, end)
+        ]
+        return self._hit(rows)
+
+    def get_assessment_item_id(self, learner_id: str, session_id: str, question_number: int) -> Optional[str]:
+        """세션 내 문제 번호의 평가 아이템 ID"""
+        files = self._get_files()
+        row_range = files.session_range(learner_id, session_id) if files else None
+        if row_range is None:
+            return self._fallback()
+
+        start, end = row_range
+        index = start + int(np.searchsorted(files.seq[start:end], question_number))
+        if index < end and files.seq[index] == question_number:
+            return self._hit(str(files.items[files.item[index]]))
+        return self._fallback()
+
+    def get_personal_info(self, learner_id: str, assessment_item_id: str) -> Optional[Tuple[str, float]]:
+        """학습자가 푼 아이템의 개념과 정확도 (가장 최근 세션 기준)"""
+        files = self._get_files()
+        row_range = files.learner_range(learner_id) if files else None
+        item = files.code_of(files.items, assessment_item_id) if row_range else None
+        if item is None:
+            return self._fallback()
+
+        start, end = row_range
+        matches = np.flatnonzero(files.item[start:end] == item)
+        if not len(matches):
+            return self._fallback()
+        index = start + int(matches[-1])
+        return self._hit((str(files.concepts[files.concept[index]]), _to_float(files.tag_accuracy[index])))
+
+    def _get_files(self) -> Optional[_SnapshotFiles]:
+        """현재 스냅샷 (CURRENT가 바뀌었으면 다시 매핑, 오래됐으면 None)"""
+        if not self.root:
+            return None
+
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.check_interval:
+            with self._lock:
+                self._checked_at = now
+                self._reload_if_changed()
+
+        files = self._files
+        if files is None or time.time() - files.exported_at > self.max_age_seconds:
+            return None
+        return files
+
+    def _reload_if_changed(self):
+        """CURRENT 포인터가 가리키는 스냅샷 매핑"""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE), encoding="utf-8") as f:
+                name = f.read().strip()
+            if name != self._current_name:
+                self._files = _SnapshotFiles(os.path.join(self.root, name))
+                self._current_name = name
+                self.stats["reloads"] += 1
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"Could not load view snapshot: {e}")
+
+    def _hit(self, value: Any) -> Any:
+        """스냅샷 조회 성공 기록"""
+        self.stats["hits"] += 1
+        return value
+
+    def _fallback(self) -> None:
+        """SQL 조회로 넘김"""
+        self.stats["fallbacks"] += 1
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """스냅샷 상태"""
+        files = self._files
+        return dict(self.stats,
+                    snapshot=self._current_name,
+                    age_seconds=round(time.time() - files.exported_at, 1) if files else None,
+                    rows=len(files.key) if files else 0)
+
+
+# 프로세스 전역 스냅샷 인스턴스 (첫 조회 시 매핑)
+view_snapshot = ViewSnapshot.from_settings()
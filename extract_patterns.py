@@ -1,130 +1,214 @@
 """
 DB에서 실제 학습 패턴을 추출하여 파인튜닝용 데이터 생성을 위한 스크립트
+
+뷰를 한 번만 스트리밍(fetchmany)하면서 청크마다 (개념, 학습자) 단위로 벡터 집계하고,
+이 집계 테이블 하나에서 개념 통계·수준별 분포·실수 패턴·학습자 분포를 모두 계산합니다.
+session_id는 시간순으로 늘어나지 않고 뷰에 항상 증가하는 변경 컬럼이 없으므로 매번 뷰 전체를 읽습니다
+(미리 계산 작업이 뷰의 행 수·마지막 session_id가 바뀌었을 때만 실행).
+
+실행: python extract_patterns.py [--top 5] [--chunk-size 50000]
 """
-import json
 import logging
-from decimal import Decimal
-from database.db_service import DatabaseService
+import argparse
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# 스트리밍으로 읽는 뷰 컬럼
+PATTERN_COLUMNS = ["concept_name", "learnerID", "is_correct", "tag_accuracy", "global_accuracy"]
+
+# 수준 구간 (tag_accuracy 기준, 기존 SQL CASE와 동일 - NULL은 high)
+LEVEL_BINS = (0.4, 0.7)
+
+# 학습자별 성공률 분포 구간
+LEARNER_BINS = [0.0, 0.2, 0.4, 0.6, 0.8, 1.0]
+LEARNER_BIN_LABELS = ["0-20%", "20-40%", "40-60%", "60-80%", "80-100%"]
+
+# 집계 전 쌓아둘 최대 청크 집계 행 수
+CONSOLIDATE_ROWS = 500_000
+
+
+class PatternAggregator:
+    """(개념, 학습자) 단위 부분 합계를 누적하는 집계기 - 청크 간에 더해서 합칠 수 있음"""
+
+    SUM_COLUMNS = ["attempts", "correct", "tag_sum", "tag_count", "global_sum", "global_count",
+                   "wrong", "wrong_tag_sum", "wrong_tag_count", "low", "medium", "high"]
+
+    def __init__(self, table: Optional[pd.DataFrame] = None):
+        self.table = table if table is not None else self._empty_table()
+        self.rows_seen = 0
+        self._pending: List[pd.DataFrame] = []
+        self._pending_rows = 0
+
+    @staticmethod
+    def _empty_table() -> pd.DataFrame:
+        index = pd.MultiIndex.from_arrays([[], []], names=["concept_name", "learnerID"])
+        return pd.DataFrame({column: pd.Series(dtype="float64") for column in PatternAggregator.SUM_COLUMNS}, index=index)
+
+    def add_rows(self, rows: List[Tuple]):
+        """fetchmany 청크 하나를 벡터 연산으로 집계"""
+        if not rows:
+            return
+        chunk = pd.DataFrame.from_records(rows, columns=PATTERN_COLUMNS)
+        self.rows_seen += len(chunk)
+
+        # pyodbc Decimal/None → float/NaN (astype가 to_numeric보다 훨씬 빠름)
+        is_correct = np.nan_to_num(chunk["is_correct"].astype(np.float64).to_numpy())
+        tag = chunk["tag_accuracy"].astype(np.float64).to_numpy()
+        global_accuracy = chunk["global_accuracy"].astype(np.float64).to_numpy()
+        has_tag = ~np.isnan(tag)
+        has_global = ~np.isnan(global_accuracy)
+        wrong = is_correct == 0
+
+        low = tag < LEVEL_BINS[0]
+        medium = ~low & (tag < LEVEL_BINS[1])
+        frame = pd.DataFrame({
+            "concept_name": chunk["concept_name"].astype(str).to_numpy(),
+            "learnerID": chunk["learnerID"].astype(str).to_numpy(),
+            "attempts": 1.0,
+            "correct": is_correct,
+            "tag_sum": np.where(has_tag, tag, 0.0),
+            "tag_count": has_tag.astype(np.float64),
+            "global_sum": np.where(has_global, global_accuracy, 0.0),
+            "global_count": has_global.astype(np.float64),
+            "wrong": wrong.astype(np.float64),
+            "wrong_tag_sum": np.where(wrong & has_tag, tag, 0.0),
+            "wrong_tag_count": (wrong & has_tag).astype(np.float64),
+            "low": low.astype(np.float64),
+            "medium": medium.astype(np.float64),
+            "high": (~low & ~medium).astype(np.float64)
+        })
+        grouped = frame.groupby(["concept_name", "learnerID"], sort=False).sum()
+        self._pending.append(grouped)
+        self._pending_rows += len(grouped)
+
+        if self._pending_rows >= CONSOLIDATE_ROWS:
+            self._consolidate()
+
+    def _consolidate(self):
+        """쌓인 청크 집계를 전체 테이블에 합침"""
+        if not self._pending:
+            return
+        frames = [self.table] + self._pending if len(self.table) else self._pending
+        self.table = pd.concat(frames).groupby(level=["concept_name", "learnerID"], sort=False).sum()
+        self._pending = []
+        self._pending_rows = 0
+
+    def build_patterns(self, top_n: int = 5) -> Dict[str, Any]:
+        """누적 집계에서 패턴 결과 생성 (모든 개념 대상)"""
+        self._consolidate()
+        table = self.table
+        if table.empty:
+            return {"extraction_summary": {"total_concepts_analyzed": 0, "top_concepts_for_training": 0,
+                                           "total_mistake_patterns": 0, "data_source": "실제 DB 쿼리 결과"},
+                    "concepts": [], "all_concepts": [], "skill_levels": {}, "common_mistakes": [],
+                    "learner_distributions": {}}
+
+        by_concept = table.groupby(level="concept_name").sum()
+        by_concept["unique_students"] = table.groupby(level="concept_name").size()
+        by_concept = by_concept.sort_values("attempts", ascending=False, kind="stable")
+
+        concepts = [
+            {
+                "concept_name": str(name),
+                "attempts": int(row.attempts),
+                "success_rate": round(row.correct / row.attempts, 3),
+                "avg_personal_accuracy": round(row.tag_sum / row.tag_count, 3) if row.tag_count else 0.0,
+                "avg_global_accuracy": round(row.global_sum / row.global_count, 3) if row.global_count else 0.0,
+                "unique_students": int(row.unique_students)
+            }
+            for name, row in by_concept.iterrows()
+        ]
+
+        skill_levels = {
+            str(name): {level: int(row[level]) for level in ("low", "medium", "high") if row[level]}
+            for name, row in by_concept.iterrows()
+        }
 
-def extract_real_patterns():
-    """DB에서 실제 학습 패턴 추출"""
-    db_service = DatabaseService()
+        mistakes = by_concept[by_concept["wrong"] > 0].sort_values("wrong", ascending=False, kind="stable")
+        common_mistakes = [
+            {
+                "concept_name": str(name),
+                "avg_accuracy_when_wrong": round(row.wrong_tag_sum / row.wrong_tag_count, 3) if row.wrong_tag_count else 0.0,
+                "mistake_count": int(row.wrong)
+            }
+            for name, row in mistakes.iterrows()
+        ]
+
+        # 학습자별 성공률을 구간으로 나눠 개념별 분포 계산
+        learner_rates = (table["correct"] / table["attempts"]).clip(0, 1)
+        buckets = pd.cut(learner_rates, LEARNER_BINS, labels=LEARNER_BIN_LABELS, include_lowest=True)
+        distribution = buckets.groupby(level="concept_name", observed=False).value_counts().unstack(fill_value=0)
+        learner_distributions = {
+            str(name): {label: int(distribution.at[name, label]) for label in LEARNER_BIN_LABELS}
+            for name in by_concept.index
+        }
 
-    try:
-        # 1. 개념별 기본 통계 (상위 10개)
-        concept_stats_query = """
-        SELECT TOP 10 concept_name,
-               COUNT(*) as attempts,
-               AVG(CAST(is_correct AS FLOAT)) as success_rate,
-               AVG(tag_accuracy) as avg_personal_accuracy,
-               AVG(global_accuracy) as avg_global_accuracy,
-               COUNT(DISTINCT learnerID) as unique_students
-        FROM gold.vw_personal_item_enriched
-        GROUP BY concept_name
-        ORDER BY attempts DESC;
-        """
-
-        with db_service.get_connection() as cnxn:
-            cursor = cnxn.cursor()
-            cursor.execute(concept_stats_query)
-            concept_rows = cursor.fetchall()
-
-        concepts = []
-        for row in concept_rows:
-            concepts.append({
-                "concept_name": str(row[0]),
-                "attempts": int(row[1]),
-                "success_rate": round(float(row[2]), 3),
-                "avg_personal_accuracy": round(float(row[3]), 3),
-                "avg_global_accuracy": round(float(row[4]), 3) if row[4] else 0.0,
-                "unique_students": int(row[5])
-            })
-
-        # 2. 수준별 분포 (상위 5개 개념만)
-        top_5_concepts = [c["concept_name"] for c in concepts[:5]]
-        concept_list = "'" + "', '".join(top_5_concepts).replace("'", "''") + "'"
-
-        skill_levels_query = f"""
-        SELECT concept_name,
-               CASE WHEN tag_accuracy < 0.4 THEN 'low'
-                    WHEN tag_accuracy < 0.7 THEN 'medium'
-                    ELSE 'high' END as level,
-               COUNT(*) as count
-        FROM gold.vw_personal_item_enriched
-        WHERE concept_name IN ({concept_list})
-        GROUP BY concept_name,
-                 CASE WHEN tag_accuracy < 0.4 THEN 'low'
-                      WHEN tag_accuracy < 0.7 THEN 'medium'
-                      ELSE 'high' END;
-        """
-
-        with db_service.get_connection() as cnxn:
-            cursor = cnxn.cursor()
-            cursor.execute(skill_levels_query)
-            level_rows = cursor.fetchall()
-
-        skill_levels = {}
-        for row in level_rows:
-            concept = str(row[0])
-            if concept not in skill_levels:
-                skill_levels[concept] = {}
-            skill_levels[concept][str(row[1])] = int(row[2])
-
-        # 3. 실수 패턴 (틀린 문제만)
-        mistakes_query = f"""
-        SELECT concept_name,
-               ROUND(AVG(tag_accuracy), 3) as avg_accuracy_when_wrong,
-               COUNT(*) as mistake_count
-        FROM gold.vw_personal_item_enriched
-        WHERE is_correct = 0 AND concept_name IN ({concept_list})
-        GROUP BY concept_name
-        ORDER BY mistake_count DESC;
-        """
-
-        with db_service.get_connection() as cnxn:
-            cursor = cnxn.cursor()
-            cursor.execute(mistakes_query)
-            mistake_rows = cursor.fetchall()
-
-        common_mistakes = []
-        for row in mistake_rows:
-            common_mistakes.append({
-                "concept_name": str(row[0]),
-                "avg_accuracy_when_wrong": round(float(row[1]), 3) if row[1] else 0.0,
-                "mistake_count": int(row[2])
-            })
-
-        # 4. 결과 저장
-        patterns = {
+        return {
             "extraction_summary": {
                 "total_concepts_analyzed": len(concepts),
-                "top_concepts_for_training": len(top_5_concepts),
+                "top_concepts_for_training": min(top_n, len(concepts)),
                 "total_mistake_patterns": len(common_mistakes),
+                "total_rows": int(by_concept["attempts"].sum()),
                 "data_source": "실제 DB 쿼리 결과"
             },
-            "concepts": concepts[:5],  # 상위 5개만 저장
+            "concepts": concepts[:top_n],  # 훈련용 상위 개념
+            "all_concepts": concepts,
             "skill_levels": skill_levels,
-            "common_mistakes": common_mistakes
+            "common_mistakes": common_mistakes,
+            "learner_distributions": learner_distributions
         }
 
-        with open("real_patterns.json", "w", encoding="utf-8") as f:
-            json.dump(patterns, f, ensure_ascii=False, indent=2)
 
-        print("✅ real_patterns.json 생성 완료 (실제 DB 데이터 기반)")
-        print(f"📊 분석된 개념: {len(concepts)}개")
-        print(f"🎯 훈련용 선택된 개념: {len(top_5_concepts)}개")
-        print(f"📈 실수 패턴: {len(common_mistakes)}개")
+def stream_view_rows(db_service, chunk_size: int = 50000) -> Iterable[List[Tuple]]:
+    """뷰 전체 행을 fetchmany 청크로 스트리밍"""
+    query = f"""
+    SELECT {', '.join(PATTERN_COLUMNS)}
+    FROM gold.vw_personal_item_enriched
+    """
+
+    with db_service.get_connection() as cnxn:
+        cursor = cnxn.cursor()
+        cursor.arraysize = chunk_size
+        cursor.execute(query)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield [tuple(row) for row in rows]
+
+
+def extract_real_patterns(top_n: int = 5, chunk_size: int = 50000, output_path: str = "real_patterns.json"):
+    """DB에서 실제 학습 패턴 추출 → output_path (읽는 쪽이 쓰다 만 파일을 보지 않도록 원자적으로 교체)"""
+    from services.concept_explanations import write_store_file
+    from database.db_service import DatabaseService
+    db_service = DatabaseService()
 
-        # 선택된 상위 5개 개념 출력
-        print("\n🔥 실제 DB에서 선택된 상위 5개 개념:")
-        for i, concept in enumerate(concepts[:5], 1):
+    try:
+        aggregator = PatternAggregator()
+        for rows in stream_view_rows(db_service, chunk_size):
+            aggregator.add_rows(rows)
+
+        patterns = aggregator.build_patterns(top_n)
+
+        write_store_file(output_path, patterns)
+
+        summary = patterns["extraction_summary"]
+        print(f"✅ {output_path} 생성 완료 (실제 DB 데이터 {aggregator.rows_seen}행 기반)")
+        print(f"📊 분석된 개념: {summary['total_concepts_analyzed']}개")
+        print(f"🎯 훈련용 선택된 개념: {summary['top_concepts_for_training']}개")
+        print(f"📈 실수 패턴: {summary['total_mistake_patterns']}개")
+
+        # 선택된 상위 개념 출력
+        print(f"\n🔥 실제 DB에서 선택된 상위 {summary['top_concepts_for_training']}개 개념:")
+        for i, concept in enumerate(patterns["concepts"], 1):
             print(f"{i}. {concept['concept_name']} (시도: {concept['attempts']}회, 성공률: {concept['success_rate']*100:.1f}%)")
 
-        # 수준별 분포 출력
+        # 수준별 분포 출력 (훈련용 개념만)
         print("\n📊 수준별 학생 분포:")
-        for concept, levels in skill_levels.items():
-            print(f"  {concept}:")
-            for level, count in levels.items():
+        for concept in patterns["concepts"]:
+            print(f"  {concept['concept_name']}:")
+            for level, count in patterns["skill_levels"].get(concept["concept_name"], {}).items():
                 print(f"    {level}: {count}명")
 
         return patterns
@@ -135,4 +219,10 @@ def extract_real_patterns():
         raise
 
 if __name__ == "__main__":
-    extract_real_patterns()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="실제 학습 패턴 추출")
+    parser.add_argument("--top", type=int, default=5, help="훈련용으로 선택할 상위 개념 수")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="fetchmany 청크 크기")
+    parser.add_argument("--output", default="real_patterns.json", help="패턴 파일 경로")
+    args = parser.parse_args()
+
+    extract_real_patterns(args.top, args.chunk_size, args.output)
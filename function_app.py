@@ -1,73 +1,361 @@
 import azure.functions as func
 import logging
-from handlers.session_handler import SessionHandler
-from handlers.feedback_handler import FeedbackHandler
-from handlers.generated_item_handler import GeneratedItemHandler
+import threading
+from typing import Optional
 from utils.response_builder import ResponseBuilder
+from utils import json_codec
+from utils.json_codec import parse_request_json
+from services.call_policy import request_deadline, DeadlineExceededError, CircuitOpenError
+from services.rate_limiter import RateLimitExceededError
+from services.admission_control import admission_controller, degradation_scope, degraded_templates, OverloadedError
+from services.idempotency import idempotency_cache, make_fingerprint, StoredResponse, IdempotencyKeyError
+from services.job_queue import job_queue, JOB_QUEUE_NAME
+from services.precompute_pipeline import precompute_pipeline
+import precompute_jobs  # noqa: F401 - 미리 계산 작업 등록
+from config.settings import settings
 
 # Function App을 초기화합니다.
 app = func.FunctionApp(http_auth_level=func.AuthLevel.ANONYMOUS)
 
+# 요청 종류별 필수 필드 (learnerID 제외)
+REQUIRED_FIELDS = {
+    "session_summary": ["session_id"],
+    "item_feedback": ["session_id"],
+    "generated_item": ["generated_question_data"],
+    "batch_session_summary": ["session_ids"],
+    "worksheet": ["topic_name"]
+}
+
+# learnerID 없이 처리하는 요청
+ANONYMOUS_REQUEST_TYPES = {"generated_item", "worksheet"}
+
+# 항상 작업 큐로 처리하는 오래 걸리는 요청 (작업 큐가 꺼져 있으면 동기 처리)
+JOB_ONLY_REQUEST_TYPES = {"batch_session_summary", "worksheet"}
+
+
 @app.route(route="tutor_api")
 def tutor_api(req: func.HttpRequest) -> func.HttpResponse:
     """LLM 튜터 API 메인 엔드포인트"""
     logging.info('Python HTTP trigger function processed a request.')
 
+    accept_encoding = req.headers.get("Accept-Encoding")
+    idempotency_key = req.headers.get("Idempotency-Key")
+    if not idempotency_key or not idempotency_cache.enabled:
+        return _handle_tutor_request(req, accept_encoding)
+
+    # 같은 키의 재시도는 첫 응답을 재전송하고, 원 요청이 진행 중이면 그 결과를 기다림 (DB+LLM 파이프라인 1회)
+    try:
+        stored, replayed = idempotency_cache.run(
+            idempotency_key.strip(), make_fingerprint(req.get_body()),
+            lambda: _to_stored_response(_handle_tutor_request(req, None))
+        )
+    except IdempotencyKeyError as e:
+        return ResponseBuilder.build_error_response(str(e), e.status_code)
+    except TimeoutError as e:
+        logging.warning(f"Idempotent request still in flight: {e}")
+        return ResponseBuilder.build_error_response("같은 요청을 처리하고 있습니다. 잠시 후 다시 시도해주세요.", 409)
+
+    headers = dict(stored.headers)
+    if replayed:
+        headers["Idempotent-Replayed"] = "true"
+    return ResponseBuilder.build_bytes_response(stored.body, stored.status_code, headers, accept_encoding)
+
+
+def _handle_tutor_request(req: func.HttpRequest, accept_encoding: Optional[str],
+                          allow_async: bool = True) -> func.HttpResponse:
+    """요청 파싱 → 핸들러 실행 → 응답 생성 (allow_async면 오래 걸리는 요청은 작업 큐로)"""
     try:
         # 요청 데이터 파싱
-        req_body = req.get_json()
+        req_body = parse_request_json(req)
         request_type = req_body.get("request_type")
         learner_id = req_body.get("learnerID")
         student_message = req_body.get("message", "피드백 요청")
         conversation_history = req_body.get("conversation_history", [])
 
-        # 필수 필드 검증 (generated_item은 learnerID 불필요)
+        # 필수 필드 검증 (generated_item, worksheet는 learnerID 불필요)
         if not request_type:
             return ResponseBuilder.build_validation_error_response(["request_type"])
-        
-        if request_type != "generated_item" and not learner_id:
-            return ResponseBuilder.build_validation_error_response(["learnerID"])
 
-        # 요청 타입별 처리
-        if request_type == "session_summary":
-            session_id = req_body.get("session_id")
-            if not session_id:
-                return ResponseBuilder.build_validation_error_response(["session_id"])
-
-            handler = SessionHandler()
-            result = handler.handle(learner_id, session_id, conversation_history)
-
-        elif request_type == "item_feedback":
-            session_id = req_body.get("session_id")
-            if not session_id:
-                return ResponseBuilder.build_validation_error_response(["session_id"])
-
-            handler = FeedbackHandler()
-            result = handler.handle(learner_id, session_id, student_message, conversation_history)
-
-        elif request_type == "generated_item":
-            generated_question_data = req_body.get("generated_question_data")
-            if not generated_question_data:
-                return ResponseBuilder.build_validation_error_response(["generated_question_data"])
-
-            # 개인화 정보 추출 (선택적)
-            original_concept = req_body.get("original_concept")
-
-            handler = GeneratedItemHandler()
-            result = handler.handle(
-                generated_question_data,
-                student_message,
-                conversation_history,
-                learner_id,  # learner_id 전달 (선택적)
-                original_concept  # 원본 개념 전달 (선택적)
-            )
-
-        else:
+        if request_type not in REQUIRED_FIELDS:
             return ResponseBuilder.build_error_response("Invalid request_type.")
 
+        if request_type not in ANONYMOUS_REQUEST_TYPES and not learner_id:
+            return ResponseBuilder.build_validation_error_response(["learnerID"])
+
+        missing_fields = [field for field in REQUIRED_FIELDS[request_type] if not req_body.get(field)]
+        if missing_fields:
+            return ResponseBuilder.build_validation_error_response(missing_fields)
+
+        # 오래 걸리는 요청은 큐에 넣고 작업 ID만 바로 반환 (HTTP 호출을 붙잡지 않음)
+        if allow_async and job_queue.enabled and (request_type in JOB_ONLY_REQUEST_TYPES or _wants_async(req, req_body)):
+            return _submit_job(req_body)
+
+        # 클라이언트 타임아웃 기반 LLM 호출 예산 설정 (LLM 부하 시 로컬 대체 응답을 쓴 템플릿도 기록)
+        budget = _get_request_budget(req, req_body)
+        with request_deadline(budget), degradation_scope():
+            # 핸들러(LLM·DB 클라이언트, numpy 등)는 첫 요청 때 import (콜드 스타트 단축)
+            if request_type == "session_summary":
+                from handlers.session_handler import SessionHandler
+
+                handler = SessionHandler()
+                result = handler.handle(learner_id, req_body["session_id"], conversation_history)
+
+            elif request_type == "item_feedback":
+                from handlers.feedback_handler import FeedbackHandler
+
+                handler = FeedbackHandler()
+                result = handler.handle(learner_id, req_body["session_id"], student_message, conversation_history)
+
+            elif request_type == "generated_item":
+                generated_question_data = req_body["generated_question_data"]
+
+                # 개인화 정보 추출 (선택적)
+                original_concept = req_body.get("original_concept")
+
+                from handlers.generated_item_handler import GeneratedItemHandler
+
+                handler = GeneratedItemHandler()
+                result = handler.handle(
+                    generated_question_data,
+                    student_message,
+                    conversation_history,
+                    learner_id,  # learner_id 전달 (선택적)
+                    original_concept,  # 원본 개념 전달 (선택적)
+                    _get_attempt_count(req_body)  # 시도 횟수 (선택적, 힌트 사다리 단계·정답 공개)
+                )
+
+            elif request_type == "batch_session_summary":
+                result = _summarize_sessions(learner_id, req_body["session_ids"])
+
+            else:  # worksheet
+                result = _generate_worksheet(req_body)
+
+            # 로컬 대체 응답이 섞였으면 표시하고, 클라이언트가 추가 요청을 늦추도록 Retry-After 전달
+            headers = None
+            degraded = degraded_templates()
+            if degraded:
+                result["degraded"] = True
+                result["degraded_templates"] = degraded
+                headers = admission_controller.backpressure_headers()
+                headers["X-Tutor-Degraded"] = ",".join(degraded)
+
         # 성공 응답 반환
-        return ResponseBuilder.build_success_response(result, conversation_history, student_message)
+        return ResponseBuilder.build_success_response(result, conversation_history, student_message, accept_encoding,
+                                                      headers)
+
+    except CircuitOpenError as e:
+        logging.error(f"LLM circuit open: {e}")
+        return ResponseBuilder.build_error_response("AI 서비스가 일시적으로 불안정합니다. 잠시 후 다시 시도해주세요.", 503,
+                                                    admission_controller.backpressure_headers())
+
+    except OverloadedError as e:
+        logging.warning(f"LLM calls shed: {e}")
+        return ResponseBuilder.build_error_response(
+            "요청이 많아 잠시 후 다시 시도해주세요.", 503,
+            {"Retry-After": str(max(1, int(e.retry_after + 0.999))), "X-Tutor-Load": "shedding"}
+        )
+
+    except RateLimitExceededError as e:
+        logging.warning(f"LLM rate limit queue full: {e}")
+        return ResponseBuilder.build_error_response(
+            "요청이 많아 잠시 후 다시 시도해주세요.", 429,
+            {"Retry-After": str(max(1, int(e.retry_after + 0.999)))}
+        )
+
+    except DeadlineExceededError as e:
+        logging.error(f"Request budget exceeded: {e}")
+        return ResponseBuilder.build_error_response("요청 처리 시간이 초과되었습니다.", 504)
 
     except Exception as e:
         logging.error(f"Error: {e}")
         return ResponseBuilder.build_internal_error_response(e)
+
+
+@app.route(route="jobs/{job_id}", methods=["GET"])
+def job_status(req: func.HttpRequest) -> func.HttpResponse:
+    """비동기 작업 상태·결과 조회 (?wait=초 를 주면 끝날 때까지 최대 JobMaxWaitSeconds 동안 롱 폴링)"""
+    job_id = req.route_params.get("job_id")
+    try:
+        wait_seconds = min(float(req.params.get("wait") or 0), settings.job_max_wait_seconds)
+    except ValueError:
+        return ResponseBuilder.build_error_response("wait must be a number of seconds.")
+
+    record = job_queue.wait(job_id, wait_seconds) if wait_seconds > 0 else job_queue.get(job_id)
+    if record is None:
+        return ResponseBuilder.build_error_response("Job not found.", 404)
+
+    # 아직 끝나지 않았으면 다음 조회 시점 안내
+    headers = None if record["status"] in ("succeeded", "failed") else {"Retry-After": "1"}
+    return ResponseBuilder.build_json_response(record, 200, headers, req.headers.get("Accept-Encoding"))
+
+
+@app.queue_trigger(arg_name="msg", queue_name=JOB_QUEUE_NAME, connection="AzureWebJobsStorage")
+def job_worker(msg: func.QueueMessage) -> None:
+    """작업 큐 메시지 실행 (동시 실행 수는 host.json의 queues.batchSize, 429/5xx는 예외로 호스트가 재전달)"""
+    job_queue.process(msg.get_body().decode("utf-8"), msg.dequeue_count or 1, _run_job)
+
+
+@app.route(route="llm_stats", methods=["GET"], auth_level=func.AuthLevel.FUNCTION)
+def llm_stats(req: func.HttpRequest) -> func.HttpResponse:
+    """LLM 호출 계층 운영 통계 (응답 키는 README 참고)"""
+    from services.deployment_router import deployment_router
+    from services.rate_limiter import rate_limiter
+    from services.single_flight import single_flight
+    from services.model_routing import model_router
+    from handlers.speculative_prefetcher import prefetcher
+    from services.semantic_cache import semantic_cache
+    from services.concept_explanations import concept_explanation_store
+    from services.hint_ladder import hint_ladder_stats
+    from services.item_variants import item_variant_stats
+    from services.answer_verifier import answer_verification_stats
+    from services.item_bank import item_bank
+
+    stats = {
+        "deployments": deployment_router.get_stats(),
+        "rate_limiter": rate_limiter.get_stats(),
+        "single_flight": single_flight.get_stats(),
+        "template_routing": model_router.get_report(),
+        "prefetch": prefetcher.get_stats(),
+        "idempotency": idempotency_cache.get_stats(),
+        "semantic_cache": semantic_cache.get_stats(),
+        "concept_explanations": concept_explanation_store.get_stats(),
+        "hint_ladder": hint_ladder_stats.get_stats(),
+        "item_variants": item_variant_stats.get_stats(),
+        "answer_verification": answer_verification_stats.get_stats(),
+        "admission": admission_controller.get_stats(),
+        "item_bank": item_bank.get_stats(),
+        "jobs": job_queue.get_stats(),
+        "precompute": precompute_pipeline.get_stats()
+    }
+    return ResponseBuilder.build_json_response(stats, accept_encoding=req.headers.get("Accept-Encoding"))
+
+
+def _register_precompute_timer(job_name: str, schedule: str):
+    """미리 계산 작업 하나를 자체 일정의 타이머 함수(precompute_<작업 이름>)로 등록"""
+    def precompute_timer(timer: func.TimerRequest) -> None:
+        """작업 실행 (의존 작업은 입력이 바뀐 경우에만 함께 실행, 결과는 PrecomputeStatePath에 기록)"""
+        for name, record in precompute_pipeline.run([job_name]).items():
+            if record["status"] in ("failed", "partial", "skipped"):
+                logging.warning(f"Precompute job {name} {record['status']}: "
+                                f"{record.get('error') or record.get('reason') or record.get('result')}")
+
+    app.function_name(name=f"precompute_{job_name}")(
+        app.timer_trigger(schedule=schedule, arg_name="timer", run_on_startup=False)(precompute_timer)
+    )
+
+
+# 실행 기록을 함께 쓸 경로가 없으면 (패키지 배포 시 앱 루트는 읽기 전용) 타이머를 등록하지 않음
+if settings.precompute_state_path:
+    for _job in precompute_pipeline.jobs():
+        _register_precompute_timer(_job.name, _job.schedule)
+
+
+def _wants_async(req: func.HttpRequest, req_body: dict) -> bool:
+    """클라이언트가 비동기 처리를 요청했는지 ("async": true 또는 Prefer: respond-async)"""
+    return req_body.get("async") is True or "respond-async" in (req.headers.get("Prefer") or "")
+
+
+def _submit_job(req_body: dict) -> func.HttpResponse:
+    """작업 큐에 넣고 202 + 상태 조회 URL 반환"""
+    # 클라이언트 타임아웃은 HTTP 호출에만 해당 - 작업은 LLMRequestTimeout 예산으로 실행
+    payload = {key: value for key, value in req_body.items() if key not in ("async", "timeout_ms")}
+    record = job_queue.submit(payload, _run_job)
+    status_url = f"/api/jobs/{record['job_id']}"
+    return ResponseBuilder.build_json_response(
+        {"job_id": record["job_id"], "status": record["status"], "status_url": status_url}, 202,
+        {"Location": status_url, "Retry-After": "1"}
+    )
+
+
+def _run_job(payload: dict):
+    """작업 큐 메시지 실행 - 동기 요청과 같은 경로로 처리 → (상태 코드, 응답 바디)"""
+    req = func.HttpRequest("POST", "/api/tutor_api", headers={}, body=json_codec.dumps(payload))
+    response = _handle_tutor_request(req, None, allow_async=False)
+    return response.status_code, json_codec.loads(response.get_body())
+
+
+def _summarize_sessions(learner_id: str, session_ids: list) -> dict:
+    """여러 세션 요약을 차례로 생성 (세션별 실패는 결과에 기록하고 계속)"""
+    from handlers.session_handler import SessionHandler
+
+    handler = SessionHandler()
+    summaries = []
+    for session_id in session_ids:
+        try:
+            summaries.append({"session_id": session_id, **handler.handle(learner_id, session_id, [])})
+        except (CircuitOpenError, RateLimitExceededError, OverloadedError):
+            raise
+        except Exception as e:
+            logging.error(f"Session summary failed for {session_id}: {e}")
+            summaries.append({"session_id": session_id, "error": str(e)})
+
+    completed = sum(1 for summary in summaries if "error" not in summary)
+    return {"feedback": f"{len(session_ids)}개 세션 중 {completed}개 요약을 만들었어요.", "summaries": summaries}
+
+
+def _generate_worksheet(req_body: dict) -> dict:
+    """학습지 문제 묶음 생성 (note.py의 동시 묶음 생성 + 중복 제거)"""
+    import note
+
+    questions, stats = note.generate_worksheet_questions(
+        note.get_openai_client(),
+        req_body.get("grade", "중1"),
+        req_body.get("term", 1),
+        req_body["topic_name"],
+        req_body.get("question_type", "단답형"),
+        req_body.get("difficulty", "하"),
+        "\n".join(req_body.get("existing_questions") or []),
+        total_count=int(req_body.get("total_count", 20)),
+        include_svg=bool(req_body.get("include_svg", False))
+    )
+    return {"feedback": f"'{req_body['topic_name']}' 문제 {len(questions)}개를 만들었어요.",
+            "questions": questions, "generation_stats": stats}
+
+
+def _to_stored_response(response: func.HttpResponse) -> StoredResponse:
+    """압축 전 응답을 Idempotency-Key 캐시 항목으로 변환"""
+    return StoredResponse(response.status_code, response.get_body(), dict(response.headers))
+
+
+def _get_attempt_count(req_body: dict) -> Optional[int]:
+    """이 문항에 대한 학생의 시도 횟수 (attempt_count, 없거나 양의 정수가 아니면 None)"""
+    attempt_count = req_body.get("attempt_count")
+    try:
+        attempt_count = int(attempt_count) if attempt_count is not None else None
+    except (TypeError, ValueError):
+        return None
+    return attempt_count if attempt_count and attempt_count > 0 else None
+
+
+def _get_request_budget(req: func.HttpRequest, req_body: dict) -> float:
+    """클라이언트 타임아웃(timeout_ms 또는 X-Client-Timeout-Ms)에서 LLM 호출 예산 계산"""
+    timeout_ms = req_body.get("timeout_ms") or req.headers.get("X-Client-Timeout-Ms")
+    try:
+        client_timeout = float(timeout_ms) / 1000 if timeout_ms else None
+    except (TypeError, ValueError):
+        client_timeout = None
+
+    if not client_timeout or client_timeout <= 0:
+        return settings.llm_request_timeout
+
+    # 응답 직렬화/전송 여유분(10%, 최대 2초)을 제외한 시간만 LLM 호출에 사용
+    return min(client_timeout - min(client_timeout * 0.1, 2.0), settings.llm_request_timeout)
+
+
+def _warm_up():
+    """첫 요청 전에 핸들러 모듈(openai, numpy 등)을 import하고 배포별 LLM 클라이언트 생성 (네트워크 호출 없음)"""
+    try:
+        import handlers.session_handler  # noqa: F401
+        import handlers.feedback_handler  # noqa: F401
+        import handlers.generated_item_handler  # noqa: F401
+        from services.deployment_router import deployment_router
+
+        for deployment in deployment_router.deployments:
+            deployment.get_client()
+    except Exception as e:
+        logging.warning(f"Cold start warm-up failed: {e}")
+
+
+# 함수 앱 로드(호스트 인덱싱)는 가볍게 끝내고, 무거운 import는 백그라운드에서 미리 (첫 요청이 먼저 오면 import 잠금으로 함께 대기)
+if settings.cold_start_warmup:
+    threading.Thread(target=_warm_up, name="cold-start-warmup", daemon=True).start()
@@ -1,134 +1,288 @@
 """
 실제 패턴을 기반으로 파인튜닝용 합성 대화 데이터 생성
-5개 개념 × 3개 수준 × 3개 시나리오 = 45개 대화
+기본: 5개 개념 × 3개 수준 × 3개 시나리오 = 45개 대화 (--variants로 조합당 대화 수 확장)
+
+동시 호출 수를 제한해 병렬로 생성하고, 완료되는 대로 JSONL에 한 줄씩 기록합니다.
+진행 상황은 체크포인트 파일에 남기므로 중간에 실패해도 다시 실행하면 이어서 생성합니다.
+
+실행: python generate_synthetic_data.py [--concurrency 8] [--variants 1] [--restart]
 """
+import os
+import re
 import json
+import time
+import random
+import hashlib
 import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Set, Tuple
 from services.llm_service import LLMService
+from services.rate_limiter import RateLimitExceededError
 
-def generate_synthetic_training_data():
-    """실제 DB 패턴을 기반으로 합성 훈련 데이터 생성"""
-
-    # 실제 패턴 로드
-    with open("real_patterns.json", "r", encoding="utf-8") as f:
-        patterns = json.load(f)
+# 3가지 시나리오 템플릿
+SCENARIOS = [
+    {
+        "type": "hint_request",
+        "student_messages": [
+            "이 문제 어떻게 풀어야 해요?",
+            "힌트 좀 주세요",
+            "모르겠어요 도움이 필요해요",
+            "어디서부터 시작해야 할지 모르겠어요"
+        ]
+    },
+    {
+        "type": "similar_problem",
+        "student_messages": [
+            "비슷한 문제 더 주세요",
+            "연습 문제 있나요?",
+            "이런 유형 더 풀어보고 싶어요",
+            "다른 문제로 연습할래요"
+        ]
+    },
+    {
+        "type": "concept_confusion",
+        "student_messages": [
+            "이 개념이 헷갈려요",
+            "왜 이렇게 되는지 모르겠어요",
+            "공식을 어떻게 적용해야 하나요?",
+            "이해가 안 되는 부분이 있어요"
+        ]
+    }
+]
 
-    print("📊 실제 DB 패턴 정보:")
-    print(f"  데이터 출처: {patterns['extraction_summary']['data_source']}")
-    print(f"  훈련용 개념: {patterns['extraction_summary']['top_concepts_for_training']}개")
+# 레이트 리미터 대기열이 가득 찼을 때 재시도 횟수
+MAX_RATE_LIMIT_RETRIES = 10
 
-    llm_service = LLMService()
-    training_data = []
 
-    # 3가지 시나리오 템플릿
-    scenarios = [
+def build_accuracy_levels(avg_personal_accuracy: float) -> List[Dict[str, Any]]:
+    """실제 데이터 기반 3가지 수준 설정"""
+    return [
         {
-            "type": "hint_request",
-            "student_messages": [
-                "이 문제 어떻게 풀어야 해요?",
-                "힌트 좀 주세요",
-                "모르겠어요 도움이 필요해요",
-                "어디서부터 시작해야 할지 모르겠어요"
-            ]
+            "level": "low",
+            "accuracy": max(0.2, avg_personal_accuracy - 0.3),  # 실제보다 낮음
+            "description": f"어려움을 느끼는 수준 (실제 평균: {avg_personal_accuracy*100:.1f}%)"
         },
         {
-            "type": "similar_problem",
-            "student_messages": [
-                "비슷한 문제 더 주세요",
-                "연습 문제 있나요?",
-                "이런 유형 더 풀어보고 싶어요",
-                "다른 문제로 연습할래요"
-            ]
+            "level": "medium",
+            "accuracy": avg_personal_accuracy,  # 실제 평균 사용
+            "description": f"평균 수준 (실제 데이터)"
         },
         {
-            "type": "concept_confusion",
-            "student_messages": [
-                "이 개념이 헷갈려요",
-                "왜 이렇게 되는지 모르겠어요",
-                "공식을 어떻게 적용해야 하나요?",
-                "이해가 안 되는 부분이 있어요"
-            ]
+            "level": "high",
+            "accuracy": min(0.9, avg_personal_accuracy + 0.2),  # 실제보다 높음
+            "description": f"우수 수준 (실제 평균: {avg_personal_accuracy*100:.1f}%)"
         }
     ]
 
-    print("\n🤖 실제 패턴 기반 합성 대화 데이터 생성 시작...")
 
+def build_generation_jobs(patterns: Dict[str, Any], variants: int = 1) -> List[Dict[str, Any]]:
+    """개념 × 수준 × 시나리오 × 변형 작업 목록 (job_id와 학생 메시지는 재실행해도 동일)"""
+    jobs = []
     for concept in patterns["concepts"]:
-        concept_name = concept["concept_name"]
-        base_success_rate = concept["success_rate"]
-        avg_personal_accuracy = concept["avg_personal_accuracy"]
-        avg_global_accuracy = concept["avg_global_accuracy"]
-
-        print(f"\n📚 {concept_name}")
-        print(f"  실제 성공률: {base_success_rate*100:.1f}%")
-        print(f"  개인 평균 정확도: {avg_personal_accuracy*100:.1f}%")
-        print(f"  전체 평균 정확도: {avg_global_accuracy*100:.1f}%")
-
-        # 실제 데이터 기반 3가지 수준 설정
-        accuracy_levels = [
+        for accuracy_level in build_accuracy_levels(concept["avg_personal_accuracy"]):
+            for scenario in SCENARIOS:
+                for variant in range(variants):
+                    job_id = f"{concept['concept_name']}|{accuracy_level['level']}|{scenario['type']}|{variant}"
+                    jobs.append({
+                        "job_id": job_id,
+                        "concept_name": concept["concept_name"],
+                        "base_success_rate": concept["success_rate"],
+                        "avg_global_accuracy": concept["avg_global_accuracy"],
+                        "accuracy_level": accuracy_level,
+                        "scenario": scenario,
+                        "student_message": random.Random(job_id).choice(scenario["student_messages"])
+                    })
+    return jobs
+
+
+def build_training_example(job: Dict[str, Any], tutor_response: str) -> Dict[str, Any]:
+    """Fine-tuning 형식으로 변환"""
+    accuracy_level = job["accuracy_level"]
+    return {
+        "messages": [
             {
-                "level": "low",
-                "accuracy": max(0.2, avg_personal_accuracy - 0.3),  # 실제보다 낮음
-                "description": f"어려움을 느끼는 수준 (실제 평균: {avg_personal_accuracy*100:.1f}%)"
+                "role": "system",
+                "content": f"너는 '{job['concept_name']}' 개념에 대해 {accuracy_level['accuracy']*100:.1f}% 정답률을 가진 학생에게 개인화된 수학 튜터링을 제공하는 AI야. 실제 데이터: 이 개념의 전체 평균 성공률은 {job['base_success_rate']*100:.1f}%이고, 전체 학생 평균 정확도는 {job['avg_global_accuracy']*100:.1f}%야. 학생의 수준에 맞는 소크라틱 방식으로 응답해야 해."
             },
             {
-                "level": "medium",
-                "accuracy": avg_personal_accuracy,  # 실제 평균 사용
-                "description": f"평균 수준 (실제 데이터)"
+                "role": "user",
+                "content": job["student_message"]
             },
             {
-                "level": "high",
-                "accuracy": min(0.9, avg_personal_accuracy + 0.2),  # 실제보다 높음
-                "description": f"우수 수준 (실제 평균: {avg_personal_accuracy*100:.1f}%)"
+                "role": "assistant",
+                "content": tutor_response
             }
         ]
+    }
+
+
+def content_hash(text: str) -> str:
+    """공백을 정규화한 응답 해시 (중복 응답 판별)"""
+    return hashlib.sha256(re.sub(r"\s+", " ", text).strip().encode("utf-8")).hexdigest()
+
+
+class TrainingDataWriter:
+    """JSONL 스트리밍 기록 + 체크포인트 + 중복 제거
+
+    체크포인트에는 완료된 작업을 한 줄씩 기록합니다 (written=true면 JSONL에 한 줄 기록됨).
+    JSONL을 먼저 쓰고 체크포인트를 쓰므로, 재시작 시 체크포인트에 없는 JSONL 꼬리 줄은 잘라냅니다.
+    """
+
+    def __init__(self, output_path: str, resume: bool = True):
+        self.output_path = output_path
+        self.checkpoint_path = f"{output_path}.checkpoint"
+        self.completed: Set[str] = set()
+        self.hashes: Set[str] = set()
+        self.written = 0
+        self.duplicates = 0
+
+        if resume:
+            self._restore()
+        else:
+            for path in (self.output_path, self.checkpoint_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        self._output = open(self.output_path, "a", encoding="utf-8")
+        self._checkpoint = open(self.checkpoint_path, "a", encoding="utf-8")
+
+    def _restore(self):
+        """체크포인트와 JSONL에서 진행 상황 복원"""
+        written_count = 0
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # 기록 중 끊긴 마지막 줄
+                    self.completed.add(entry["job_id"])
+                    self.hashes.add(entry["hash"])
+                    written_count += 1 if entry["written"] else 0
+
+        if not os.path.exists(self.output_path):
+            return
+
+        # 체크포인트에 기록되지 않은 JSONL 꼬리 줄 제거
+        with open(self.output_path, "rb") as f:
+            lines = f.readlines()
+        if len(lines) != written_count:
+            with open(self.output_path, "wb") as f:
+                f.writelines(line for line in lines[:written_count] if line.endswith(b"\n"))
+        self.written = min(len(lines), written_count)
+
+    def add(self, job: Dict[str, Any], tutor_response: str) -> bool:
+        """예제 기록 (중복 응답이면 건너뜀) - 기록했으면 True"""
+        digest = content_hash(tutor_response)
+        is_new = digest not in self.hashes
+        if is_new:
+            self._output.write(json.dumps(build_training_example(job, tutor_response), ensure_ascii=False) + "\n")
+            self._output.flush()
+            self.hashes.add(digest)
+            self.written += 1
+        else:
+            self.duplicates += 1
 
-        for accuracy_level in accuracy_levels:
-            for scenario in scenarios:
-                # 학생 메시지 선택
-                import random
-                student_message = random.choice(scenario["student_messages"])
-
-                # 실제 데이터를 포함한 맞춤형 튜터 응답 생성
-                tutor_response = generate_tutor_response_with_real_data(
-                    llm_service, concept_name, accuracy_level, scenario, student_message,
-                    base_success_rate, avg_global_accuracy
-                )
-
-                # Fine-tuning 형식으로 변환
-                training_example = {
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": f"너는 '{concept_name}' 개념에 대해 {accuracy_level['accuracy']*100:.1f}% 정답률을 가진 학생에게 개인화된 수학 튜터링을 제공하는 AI야. 실제 데이터: 이 개념의 전체 평균 성공률은 {base_success_rate*100:.1f}%이고, 전체 학생 평균 정확도는 {avg_global_accuracy*100:.1f}%야. 학생의 수준에 맞는 소크라틱 방식으로 응답해야 해."
-                        },
-                        {
-                            "role": "user",
-                            "content": student_message
-                        },
-                        {
-                            "role": "assistant",
-                            "content": tutor_response
-                        }
-                    ]
-                }
-
-                training_data.append(training_example)
-                print(f"  ✅ {len(training_data)}/45 - {accuracy_level['level']} × {scenario['type']}")
-
-    # JSONL 형식으로 저장
-    with open("synthetic_training_data.jsonl", "w", encoding="utf-8") as f:
-        for example in training_data:
-            f.write(json.dumps(example, ensure_ascii=False) + "\n")
-
-    print(f"\n🎉 실제 패턴 기반 합성 훈련 데이터 생성 완료: {len(training_data)}개")
-    print("📁 파일: synthetic_training_data.jsonl")
+        self._checkpoint.write(json.dumps({"job_id": job["job_id"], "hash": digest, "written": is_new},
+                                          ensure_ascii=False) + "\n")
+        self._checkpoint.flush()
+        self.completed.add(job["job_id"])
+        return is_new
+
+    def close(self):
+        """파일 닫기"""
+        self._output.close()
+        self._checkpoint.close()
+
+
+def generate_synthetic_training_data(patterns_path: str = "real_patterns.json",
+                                     output_path: str = "synthetic_training_data.jsonl",
+                                     concurrency: int = 8, variants: int = 1, resume: bool = True,
+                                     max_examples: Optional[int] = None,
+                                     llm_service: Optional[LLMService] = None) -> Dict[str, Any]:
+    """실제 DB 패턴을 기반으로 합성 훈련 데이터 생성 (병렬·스트리밍·이어하기)"""
+
+    # 실제 패턴 로드
+    with open(patterns_path, "r", encoding="utf-8") as f:
+        patterns = json.load(f)
+
+    print("📊 실제 DB 패턴 정보:")
+    print(f"  데이터 출처: {patterns['extraction_summary']['data_source']}")
+    print(f"  훈련용 개념: {patterns['extraction_summary']['top_concepts_for_training']}개")
+
+    llm_service = llm_service or LLMService()
+    writer = TrainingDataWriter(output_path, resume)
+    jobs = build_generation_jobs(patterns, variants)
+    pending = [job for job in jobs if job["job_id"] not in writer.completed]
+    if max_examples is not None:
+        pending = pending[:max_examples]
+
+    print(f"\n🤖 실제 패턴 기반 합성 대화 데이터 생성 시작... (전체 {len(jobs)}개, 완료 {len(writer.completed)}개, "
+          f"이번 실행 {len(pending)}개, 동시 {concurrency}개)")
+
+    stats = {"total": len(jobs), "resumed": len(writer.completed), "attempted": len(pending),
+             "written": 0, "duplicates": 0, "failed": 0}
+    progress_every = max(1, len(pending) // 20)
+    started = time.monotonic()
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {executor.submit(_generate_response, llm_service, job): job for job in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                job = futures[future]
+                try:
+                    if writer.add(job, future.result()):
+                        stats["written"] += 1
+                    else:
+                        stats["duplicates"] += 1
+                except Exception as e:
+                    # 실패한 작업은 체크포인트에 남기지 않음 → 다시 실행하면 재시도
+                    stats["failed"] += 1
+                    logging.error(f"합성 대화 생성 실패 ({job['job_id']}): {e}")
+
+                if done % progress_every == 0 or done == len(pending):
+                    elapsed = time.monotonic() - started
+                    rate = done / elapsed if elapsed else 0.0
+                    eta = (len(pending) - done) / rate if rate else 0.0
+                    print(f"  ⏳ {done}/{len(pending)} ({rate:.1f}개/초, 남은 시간 약 {eta:.0f}초) "
+                          f"- 기록 {stats['written']}, 중복 {stats['duplicates']}, 실패 {stats['failed']}")
+    finally:
+        writer.close()
+
+    elapsed = time.monotonic() - started
+    stats["elapsed_seconds"] = round(elapsed, 2)
+    stats["examples_per_second"] = round(len(pending) / elapsed, 2) if elapsed else 0.0
+    stats["file_examples"] = writer.written
+
+    print(f"\n🎉 실제 패턴 기반 합성 훈련 데이터 생성 완료: 파일에 {writer.written}개 "
+          f"(이번 실행 기록 {stats['written']}, 중복 제거 {stats['duplicates']}, 실패 {stats['failed']})")
+    print(f"📁 파일: {output_path}")
+    if stats["failed"]:
+        print("🔁 실패한 대화는 다시 실행하면 이어서 생성됩니다.")
     print("✨ 특징: 실제 DB 성공률과 정확도 데이터 반영됨")
 
-    return training_data
+    return stats
 
-def generate_tutor_response_with_real_data(llm_service, concept_name, accuracy_level, scenario, student_message, base_success_rate, avg_global_accuracy):
-    """실제 DB 데이터를 포함한 GPT 맞춤형 튜터 응답 생성"""
+
+def _generate_response(llm_service: LLMService, job: Dict[str, Any]) -> str:
+    """작업 하나의 튜터 응답 생성 (레이트 리미터 대기열이 가득 차면 안내된 시간만큼 쉬고 재시도)"""
+    system_prompt, user_prompt = build_tutor_prompts(
+        job["concept_name"], job["accuracy_level"], job["scenario"], job["student_message"],
+        job["base_success_rate"], job["avg_global_accuracy"]
+    )
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        try:
+            return llm_service.call_llm(system_prompt, user_prompt, [], template="synthetic_data")
+        except RateLimitExceededError as e:
+            if attempt == MAX_RATE_LIMIT_RETRIES:
+                raise
+            time.sleep(e.retry_after)
+
+
+def build_tutor_prompts(concept_name, accuracy_level, scenario, student_message, base_success_rate,
+                        avg_global_accuracy) -> Tuple[str, str]:
+    """실제 DB 데이터를 포함한 튜터 응답 생성 프롬프트"""
 
     # 수준별 맞춤 지침
     level_guidance = {
@@ -169,9 +323,16 @@ def generate_tutor_response_with_real_data(llm_service, concept_name, accuracy_l
 반드시 소크라틱 방식으로 학생이 스스로 생각할 수 있도록 질문 형태로 응답하고, 실제 데이터를 반영한 개인화된 피드백을 제공하세요."""
 
     user_prompt = f"학생 메시지: '{student_message}'\n\n위 실제 데이터와 상황에 맞는 개인화된 튜터 응답을 생성해주세요."
+    return system_prompt, user_prompt
+
+def generate_tutor_response_with_real_data(llm_service, concept_name, accuracy_level, scenario, student_message, base_success_rate, avg_global_accuracy):
+    """실제 DB 데이터를 포함한 GPT 맞춤형 튜터 응답 생성"""
+    system_prompt, user_prompt = build_tutor_prompts(
+        concept_name, accuracy_level, scenario, student_message, base_success_rate, avg_global_accuracy
+    )
 
     try:
-        response = llm_service.call_llm(system_prompt, user_prompt, [])
+        response = llm_service.call_llm(system_prompt, user_prompt, [], template="synthetic_data")
         return response
     except Exception as e:
         logging.error(f"실제 데이터 기반 튜터 응답 생성 실패: {e}")
@@ -183,4 +344,14 @@ def generate_tutor_response(llm_service, concept_name, accuracy_level, scenario,
     return generate_tutor_response_with_real_data(llm_service, concept_name, accuracy_level, scenario, student_message, base_success_rate, 0.5)
 
 if __name__ == "__main__":
-    generate_synthetic_training_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="실제 패턴 기반 합성 훈련 데이터 생성")
+    parser.add_argument("--patterns", default="real_patterns.json", help="패턴 파일 (extract_patterns.py 결과)")
+    parser.add_argument("--output", default="synthetic_training_data.jsonl", help="출력 JSONL 파일")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 LLM 호출 수")
+    parser.add_argument("--variants", type=int, default=1, help="개념·수준·시나리오 조합당 대화 수")
+    parser.add_argument("--max-examples", type=int, default=None, help="이번 실행에서 생성할 최대 대화 수")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 지우고 처음부터 생성")
+    args = parser.parse_args()
+
+    generate_synthetic_training_data(args.patterns, args.output, args.concurrency, args.variants,
+                                     not args.restart, args.max_examples)
@@ -1,9 +1,21 @@
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from handlers.session_state_manager import session_manager, LearningSession
 from handlers.feedback_handler import FeedbackHandler
 from handlers.generated_item_handler import GeneratedItemHandler
+from handlers.speculative_prefetcher import prefetcher
 from services.llm_service import LLMService
+from services.call_policy import remaining_budget
+from services.model_routing import model_router
+from services.semantic_cache import semantic_cache
+from services.concept_explanations import concept_explanation_store, build_explanation_prompt
+from services.rate_limiter import DEFAULT_COMPLETION_TOKENS
+from services.item_variants import item_variant_stats, similar_item_feedback
+from services.admission_control import admission_controller
+from config.settings import settings
+
+# LLM 부하 시 의도 분석 대신 쓰는 결과 (신뢰도가 낮아 기존 키워드·숫자 로직으로 처리됨)
+LOCAL_INTENT_RESPONSE = '{"intent": "general_chat", "confidence": 0.0, "reasoning": "LLM 부하로 로컬 처리"}'
 
 
 class ContinuousLearningHandler:
@@ -27,39 +39,46 @@ class ContinuousLearningHandler:
             session_manager.add_conversation(learner_id, session_id, "user", user_input)
 
         try:
-            if action == "continue_learning":
-                return self._handle_continue_learning(session)
-            elif action == "new_problem_same_concept":
-                return self._handle_new_problem_same_concept(session)
-            elif action == "next_concept":
-                return self._handle_next_concept(session)
-            elif action == "harder_problem":
-                return self._handle_harder_problem(session)
-            elif action == "easier_problem":
-                return self._handle_easier_problem(session)
-            elif action == "concept_explanation":
-                return self._handle_concept_explanation(session)
-            elif action == "session_summary":
-                return self._handle_session_summary(session)
-            elif action == "end_session":
-                return self._handle_end_session(session)
-            elif action == "text_input":
-                return self._handle_text_input(session, user_input)
-            elif action == "start_practice":
-                return self._handle_start_practice(session)
-            elif action == "explain_concepts":
-                return self._handle_explain_concepts(session)
-            elif action == "ask_questions":
-                return self._handle_ask_questions(session, user_input)
-            elif action == "new_diagnosis":
-                return self._handle_new_diagnosis(session)
-            else:
-                return {"error": f"알 수 없는 액션: {action}"}
-
+            result = self._dispatch_action(session, action, user_input)
         except Exception as e:
             logging.error(f"Action handling error: {e}")
             return {"error": "처리 중 오류가 발생했습니다. 다시 시도해주세요."}
 
+        # 응답에 포함된 다음 선택지를 미리 생성
+        self.prefetch_next_actions(session, result.get("quick_replies", []))
+        return result
+
+    def _dispatch_action(self, session: LearningSession, action: str, user_input: str) -> Dict[str, Any]:
+        """액션별 처리 함수 호출"""
+        if action == "continue_learning":
+            return self._handle_continue_learning(session)
+        elif action == "new_problem_same_concept":
+            return self._handle_new_problem_same_concept(session)
+        elif action == "next_concept":
+            return self._handle_next_concept(session)
+        elif action == "harder_problem":
+            return self._handle_harder_problem(session)
+        elif action == "easier_problem":
+            return self._handle_easier_problem(session)
+        elif action == "concept_explanation":
+            return self._handle_concept_explanation(session)
+        elif action == "session_summary":
+            return self._handle_session_summary(session)
+        elif action == "end_session":
+            return self._handle_end_session(session)
+        elif action == "text_input":
+            return self._handle_text_input(session, user_input)
+        elif action == "start_practice":
+            return self._handle_start_practice(session)
+        elif action == "explain_concepts":
+            return self._handle_explain_concepts(session)
+        elif action == "ask_questions":
+            return self._handle_ask_questions(session, user_input)
+        elif action == "new_diagnosis":
+            return self._handle_new_diagnosis(session)
+        else:
+            return {"error": f"알 수 없는 액션: {action}"}
+
     def _handle_continue_learning(self, session: LearningSession) -> Dict[str, Any]:
         """학습 계속하기"""
         if session.current_stage == "practice" and session.current_problem:
@@ -78,11 +97,8 @@ class ContinuousLearningHandler:
         if not session.current_concept:
             return self._handle_next_concept(session)
 
-        # 새 문제 생성
-        conversation_history = session.conversation_history[-6:]  # 최근 6개만
-        result = self.feedback_handler._handle_similar_item_request(
-            session.current_concept, 0.5, "비슷한 문제 주세요", conversation_history
-        )
+        # 새 문제 생성 (미리 생성된 문제가 있으면 바로 사용)
+        result = self._get_similar_item(session, session.current_concept, "비슷한 문제 주세요")
 
         # 세션 상태 업데이트
         session_manager.start_new_problem(session.learner_id, session.session_id,
@@ -98,6 +114,48 @@ class ContinuousLearningHandler:
             "quick_replies": self._get_practice_options(session)
         }
 
+    def _handle_easier_problem(self, session: LearningSession) -> Dict[str, Any]:
+        """같은 개념 더 쉬운 문제"""
+        return self._handle_difficulty_change(session, "easier", "더 쉬운 문제 주세요")
+
+    def _handle_harder_problem(self, session: LearningSession) -> Dict[str, Any]:
+        """같은 개념 더 어려운 문제"""
+        return self._handle_difficulty_change(session, "harder", "더 어려운 문제 주세요")
+
+    def _handle_difficulty_change(self, session: LearningSession, difficulty: str,
+                                  student_message: str) -> Dict[str, Any]:
+        """지금 문제와 함께 생성해 둔 난이도 변형이 있으면 바로 사용, 없으면 그 난이도로 즉시 생성"""
+        concept = session.current_concept
+        if not concept:
+            return self._handle_next_concept(session)
+
+        item = session.item_variants.get(concept, {}).pop(difficulty, None)
+        if item is not None:
+            item_variant_stats.record("served_from_stash")
+            result = {
+                "feedback": similar_item_feedback(concept, difficulty, item.get('new_question_text')),
+                "generated_question_data": item,
+                "concept_name": concept
+            }
+        else:
+            item_variant_stats.record("generated_on_demand")
+            result = self.feedback_handler._handle_similar_item_request(
+                concept, 0.5, student_message, session.conversation_history[-6:], difficulty
+            )
+        # 남은 변형은 이전 문제 기준의 난이도라 새 문제에는 맞지 않음
+        self._stash_item_variants(session, concept, result)
+
+        session_manager.start_new_problem(session.learner_id, session.session_id,
+                                        result['generated_question_data'])
+        session_manager.add_conversation(session.learner_id, session.session_id,
+                                       "assistant", result['feedback'])
+
+        return {
+            "feedback": result['feedback'],
+            "generated_question_data": result['generated_question_data'],
+            "quick_replies": self._get_practice_options(session)
+        }
+
     def _handle_next_concept(self, session: LearningSession) -> Dict[str, Any]:
         """다음 개념으로 이동"""
         next_concept = session_manager.get_next_concept(session.learner_id, session.session_id)
@@ -111,9 +169,7 @@ class ContinuousLearningHandler:
         feedback = f"이제 '{next_concept}' 개념을 학습해볼까요? 새로운 문제를 준비할게요!"
 
         # 새 개념 문제 생성
-        result = self.feedback_handler._handle_similar_item_request(
-            next_concept, 0.5, "문제 주세요", session.conversation_history[-6:]
-        )
+        result = self._get_similar_item(session, next_concept, "문제 주세요")
 
         session_manager.start_new_problem(session.learner_id, session.session_id,
                                         result['generated_question_data'])
@@ -129,13 +185,7 @@ class ContinuousLearningHandler:
         if not session.current_concept:
             return {"feedback": "현재 학습 중인 개념이 없습니다."}
 
-        explanation_prompt = f"'{session.current_concept}' 개념을 중학생이 이해하기 쉽게 설명해주세요."
-
-        explanation = self.llm_service.call_llm(
-            "너는 중학생에게 수학 개념을 쉽고 친근하게 설명하는 선생님이야.",
-            explanation_prompt,
-            session.conversation_history[-6:]
-        )
+        explanation = self._get_concept_explanation(session, session.current_concept)
 
         session_manager.add_conversation(session.learner_id, session.session_id,
                                        "assistant", explanation)
@@ -193,6 +243,8 @@ class ContinuousLearningHandler:
 다음에 또 만나요! 🌟"""
 
         session_manager.update_session_stage(session.learner_id, session.session_id, "completed")
+        prefetcher.discard_all(session)
+        self._stash_item_variants(session, None, {})
 
         return {
             "feedback": feedback,
@@ -213,8 +265,13 @@ class ContinuousLearningHandler:
         # LLM 기반 의도 분석
         try:
             prompts = self.llm_service.analyze_user_intent(user_input, context)
-            response = self.llm_service.call_llm(
-                prompts["system"], prompts["user"], session.conversation_history[-4:], "json_object"
+            # LLM 부하 시에는 신뢰도 0의 결과로 아래 기존 로직 사용
+            response = admission_controller.run(
+                "intent",
+                lambda: self.llm_service.call_llm(
+                    prompts["system"], prompts["user"], session.conversation_history[-4:], "json_object", template="intent"
+                ),
+                lambda: LOCAL_INTENT_RESPONSE
             )
 
             import json
@@ -284,10 +341,15 @@ class ContinuousLearningHandler:
 
     def _handle_general_conversation(self, session: LearningSession, user_input: str) -> Dict[str, Any]:
         """일반 대화 처리"""
-        response = self.llm_service.call_llm(
-            "너는 친근한 AI 수학 튜터야. 학생의 질문에 도움이 되도록 답변하고, 적절한 학습 방향을 제시해줘.",
-            user_input,
-            session.conversation_history[-6:]
+        # 같은 개념에서 뜻이 같은 질문은 캐시된 답변 재사용
+        response = semantic_cache.get_or_generate(
+            "general_chat", session.current_concept or "", user_input,
+            lambda: self.llm_service.call_llm(
+                "너는 친근한 AI 수학 튜터야. 학생의 질문에 도움이 되도록 답변하고, 적절한 학습 방향을 제시해줘.",
+                user_input,
+                session.conversation_history[-6:],
+                template="general_chat"
+            )
         )
 
         session_manager.add_conversation(session.learner_id, session.session_id,
@@ -298,6 +360,115 @@ class ContinuousLearningHandler:
             "quick_replies": self._get_general_options(session)
         }
 
+    def prefetch_next_actions(self, session: LearningSession, quick_replies: List[Dict[str, str]]):
+        """선택지 순서대로 다음 액션 응답을 백그라운드에서 미리 생성 (응답당 개수·세션 토큰 예산 내)"""
+        scheduled = 0
+        for reply in quick_replies:
+            if scheduled >= prefetcher.max_per_response:
+                break
+            target = self._get_prefetch_target(session, reply.get("action", ""))
+            if target is None:
+                continue
+
+            template, concept = target
+            history = list(session.conversation_history[-6:])
+            route_template = template
+            if template == "similar_item":
+                with_variants = settings.similar_item_variants
+                generate = lambda c=concept, h=history, v=with_variants: self.feedback_handler._handle_similar_item_request(
+                    c, 0.5, "비슷한 문제 주세요", h, with_variants=v
+                )
+                if with_variants:
+                    route_template = "similar_item_variants"
+            else:
+                level = self._get_explanation_level(session, concept)
+                generate = lambda c=concept, h=history, l=level: self._generate_concept_explanation(c, h, l)
+
+            route = model_router.routes.get(route_template)
+            estimated_tokens = route.max_tokens if route and route.max_tokens else DEFAULT_COMPLETION_TOKENS
+            if prefetcher.schedule(session, f"{template}:{concept}", generate, estimated_tokens):
+                scheduled += 1
+
+    def _get_prefetch_target(self, session: LearningSession, action: str) -> Optional[Tuple[str, str]]:
+        """액션을 선택했을 때 필요한 LLM 생성물 (템플릿, 개념) - LLM 호출이 없는 액션이면 None"""
+        if action in ("start_practice", "continue_learning"):
+            if session.current_stage == "practice" and session.current_problem:
+                return None
+            action = "new_problem_same_concept"
+
+        if action == "new_problem_same_concept" and session.current_concept:
+            return ("similar_item", session.current_concept)
+        if action in ("new_problem_same_concept", "next_concept"):
+            next_concept = session_manager.get_next_concept(session.learner_id, session.session_id)
+            return ("similar_item", next_concept) if next_concept else None
+        # 미리 생성된 설명 저장소에 있는 개념은 LLM 호출이 필요 없음
+        if action == "concept_explanation" and session.current_concept:
+            concept = session.current_concept
+        elif action == "explain_concepts" and session.weakest_concepts:
+            concept = session.weakest_concepts[0]
+        else:
+            return None
+        return None if concept_explanation_store.has(concept) else ("concept_explanation", concept)
+
+    def _get_similar_item(self, session: LearningSession, concept: str, student_message: str) -> Dict[str, Any]:
+        """유사 문항 - 미리 생성된 것이 있으면 사용, 없으면 즉시 생성"""
+        result = prefetcher.take(session, f"similar_item:{concept}", remaining_budget())
+        if result is None:
+            result = self.feedback_handler._handle_similar_item_request(
+                concept, 0.5, student_message, session.conversation_history[-6:],
+                with_variants=settings.similar_item_variants
+            )
+        self._stash_item_variants(session, concept, result)
+        return result
+
+    def _stash_item_variants(self, session: LearningSession, concept: Optional[str], result: Dict[str, Any]):
+        """새 문제의 난이도 변형을 세션에 보관 (이전 문제의 변형은 버림)"""
+        discarded = sum(len(variants) for variants in session.item_variants.values())
+        if discarded:
+            item_variant_stats.record("discarded", discarded)
+        session.item_variants = {}
+
+        variants = result.pop("item_variants", None)
+        if concept and variants:
+            session.item_variants[concept] = variants
+            item_variant_stats.record("variant_calls")
+            item_variant_stats.record("variants_stashed", len(variants))
+
+    def _get_concept_explanation(self, session: LearningSession, concept: str) -> str:
+        """개념 설명 - 미리 생성된 설명 저장소 → 백그라운드 미리 생성(prefetch) → 즉시 생성 순"""
+        level = self._get_explanation_level(session, concept)
+
+        # 이미 보여준 설명이면 ("더 자세한 설명") 더 자세한 레벨의 설명 사용
+        shown = {message.get("content") for message in session.conversation_history
+                 if message.get("role") == "assistant"}
+        explanation = concept_explanation_store.get(concept, level, shown)
+        if explanation is not None:
+            return explanation
+
+        explanation = prefetcher.take(session, f"concept_explanation:{concept}", remaining_budget())
+        if explanation is None:
+            explanation = self._generate_concept_explanation(concept, session.conversation_history[-6:], level)
+        return explanation
+
+    def _get_explanation_level(self, session: LearningSession, concept: str) -> str:
+        """학습자의 개념 정확도로 설명 레벨 결정 (정확도를 모르면 beginner)"""
+        accuracy = self.generated_item_handler._get_concept_accuracy(session.learner_id, concept)
+        if accuracy is None:
+            return "beginner"
+        return self.generated_item_handler._determine_hint_level(accuracy)
+
+    def _generate_concept_explanation(self, concept: str, conversation_history: List[Dict[str, str]],
+                                      level: str = "beginner") -> str:
+        """개념 설명 생성 (저장소에 없는 개념이거나 프롬프트 버전이 바뀐 경우)"""
+        system_prompt, explanation_prompt = build_explanation_prompt(concept, level)
+
+        return self.llm_service.call_llm(
+            system_prompt,
+            explanation_prompt,
+            conversation_history,
+            template="concept_explanation"
+        )
+
     def _get_practice_options(self, session: LearningSession) -> List[Dict[str, str]]:
         """문제 풀이 중 선택지"""
         return [
@@ -365,10 +536,16 @@ class ContinuousLearningHandler:
 
 사용자가 무엇을 궁금해하는지 파악해서 친절하게 설명해주세요."""
 
-        response = self.llm_service.call_llm(
-            "너는 학생의 질문을 이해하고 명확하게 설명해주는 친절한 튜터야.",
-            clarification_prompt,
-            session.conversation_history[-6:]
+        # 같은 문제에 대한 뜻이 같은 질문은 캐시된 답변 재사용
+        problem_text = session.current_problem.get('new_question_text', '') if session.current_problem else ''
+        response = semantic_cache.get_or_generate(
+            "clarification", f"{session.current_concept}|{problem_text}", user_input,
+            lambda: self.llm_service.call_llm(
+                "너는 학생의 질문을 이해하고 명확하게 설명해주는 친절한 튜터야.",
+                clarification_prompt,
+                session.conversation_history[-6:],
+                template="clarification"
+            )
         )
 
         return {
@@ -386,14 +563,7 @@ class ContinuousLearningHandler:
             return {"feedback": "설명할 약한 개념이 없습니다."}
 
         # 첫 번째 약한 개념 설명
-        target_concept = session.weakest_concepts[0]
-        explanation_prompt = f"'{target_concept}' 개념을 중학생이 이해하기 쉽게 설명해주세요."
-
-        explanation = self.llm_service.call_llm(
-            "너는 중학생에게 수학 개념을 쉽고 친근하게 설명하는 선생님이야.",
-            explanation_prompt,
-            session.conversation_history[-6:]
-        )
+        explanation = self._get_concept_explanation(session, session.weakest_concepts[0])
 
         session_manager.add_conversation(session.learner_id, session.session_id,
                                        "assistant", explanation)
@@ -429,10 +599,16 @@ class ContinuousLearningHandler:
 
 이 질문에 대해 친절하게 답변해주세요."""
 
-        response = self.llm_service.call_llm(
-            "너는 진단테스트 결과를 분석하고 학생의 질문에 답하는 친절한 AI 튜터야.",
-            context_prompt,
-            session.conversation_history[-6:]
+        # 진단 결과(약한 개념)가 같은 학생들의 뜻이 같은 질문은 캐시된 답변 재사용
+        diagnosis_scope = f"{getattr(session, 'total_problems_solved', '')}|{','.join(session.weakest_concepts or [])}"
+        response = semantic_cache.get_or_generate(
+            "ask_questions", diagnosis_scope, user_input,
+            lambda: self.llm_service.call_llm(
+                "너는 진단테스트 결과를 분석하고 학생의 질문에 답하는 친절한 AI 튜터야.",
+                context_prompt,
+                session.conversation_history[-6:],
+                template="ask_questions"
+            )
         )
 
         session_manager.add_conversation(session.learner_id, session.session_id,
@@ -1,8 +1,16 @@
 import re
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from database.db_service import DatabaseService
+from database.accuracy_index import accuracy_index
 from services.llm_service import LLMService
+from services.call_policy import remaining_budget
+from services.answer_verifier import answer_verification_stats, MIN_RETRY_BUDGET_SECONDS
+from services.admission_control import admission_controller, is_pressure_error
+from services.local_fallbacks import canned_hint, hint_level_for, feedback_text
+from services.item_bank import item_bank
+from services.item_variants import similar_item_feedback
+from config.settings import settings
 
 
 class FeedbackHandler:
@@ -36,7 +44,7 @@ class FeedbackHandler:
                 raise ValueError(f"Could not find question number {question_number} in session {session_id}")
 
             # 개인 학습 정보 조회
-            personal_info = self.db_service.get_personal_info(learner_id, assessment_item_id)
+            personal_info = self._get_personal_info(learner_id, assessment_item_id)
             if not personal_info:
                 raise ValueError(f"Personal info not found for item {assessment_item_id}")
 
@@ -44,7 +52,7 @@ class FeedbackHandler:
 
             # 의도별 처리
             if intent == "hint_request":
-                return self._handle_hint_request(concept_name, student_message, conversation_history)
+                return self._handle_hint_request(concept_name, student_message, conversation_history, tag_accuracy)
             elif intent == "similar_item_request":
                 return self._handle_similar_item_request(concept_name, tag_accuracy, student_message, conversation_history)
             else:  # feedback_request
@@ -54,13 +62,26 @@ class FeedbackHandler:
             logging.error(f"Feedback handler error: {e}")
             raise
 
+    def _get_personal_info(self, learner_id: str, assessment_item_id: str) -> Optional[Tuple[str, float]]:
+        """개인 학습 정보 조회 (아이템의 개념과 최신 정확도를 메모리 인덱스에서 먼저 찾음)"""
+        concept_name = accuracy_index.get_item_concept(assessment_item_id)
+        if concept_name:
+            accuracy = accuracy_index.get_accuracy(learner_id, concept_name)
+            if accuracy is not None:
+                return concept_name, accuracy
+        return self.db_service.get_personal_info(learner_id, assessment_item_id)
+
     def _extract_question_number(self, message: str) -> Optional[int]:
         """메시지에서 문제 번호 추출"""
         match = re.search(r'\d+', message)
         return int(match.group(0)) if match else None
 
     def _analyze_intent(self, message: str, context: Dict[str, Any] = None) -> str:
-        """학생 메시지 의도 분석 - LLM 기반"""
+        """학생 메시지 의도 분석 - LLM 기반 (LLM 부하 시 키워드 방식)"""
+        if admission_controller.should_degrade("intent"):
+            admission_controller.record_fallback("intent")
+            return self._keyword_intent(message)
+
         try:
             if context is None:
                 context = {"current_stage": "unknown", "has_current_problem": False}
@@ -68,7 +89,7 @@ class FeedbackHandler:
             # LLM 의도 분석 호출
             prompts = self.llm_service.analyze_user_intent(message, context)
             response = self.llm_service.call_llm(
-                prompts["system"], prompts["user"], [], "json_object"
+                prompts["system"], prompts["user"], [], "json_object", template="intent"
             )
 
             import json
@@ -109,41 +130,109 @@ class FeedbackHandler:
 
         except Exception as e:
             logging.error(f"Intent analysis failed: {e}")
+            if is_pressure_error(e):
+                admission_controller.record_fallback("intent")
             # 백업: 기존 키워드 방식
-            if any(keyword in message for keyword in ["비슷한 문제", "연습 문제", "유사 문항", "유사문항"]):
-                return "similar_item_request"
-            elif any(keyword in message for keyword in ["힌트", "모르겠어"]):
-                return "hint_request"
-            else:
-                return "feedback_request"
+            return self._keyword_intent(message)
+
+    @staticmethod
+    def _keyword_intent(message: str) -> str:
+        """키워드 기반 의도 분석 (LLM 의도 분석 실패·부하 시 백업)"""
+        if any(keyword in message for keyword in ["비슷한 문제", "연습 문제", "유사 문항", "유사문항"]):
+            return "similar_item_request"
+        elif any(keyword in message for keyword in ["힌트", "모르겠어"]):
+            return "hint_request"
+        else:
+            return "feedback_request"
 
     def _handle_hint_request(self, concept_name: str, student_message: str,
-                           conversation_history: list) -> Dict[str, Any]:
-        """힌트 요청 처리"""
+                           conversation_history: list, tag_accuracy: Optional[float] = None) -> Dict[str, Any]:
+        """힌트 요청 처리 (LLM 부하 시 개념·레벨별 소크라틱 힌트)"""
         prompts = self.llm_service.generate_hint_prompt(concept_name, student_message)
-        ai_feedback = self.llm_service.call_llm(
-            prompts["system"], prompts["user"], conversation_history
+        ai_feedback = admission_controller.run(
+            "hint",
+            lambda: self.llm_service.call_llm(
+                prompts["system"], prompts["user"], conversation_history, template="hint"
+            ),
+            lambda: canned_hint(concept_name, hint_level_for(tag_accuracy), conversation_history)
         )
         return {"feedback": ai_feedback}
 
     def _handle_similar_item_request(self, concept_name: str, tag_accuracy: float,
-                                   student_message: str, conversation_history: list) -> Dict[str, Any]:
-        """유사 문항 요청 처리"""
-        prompts = self.llm_service.generate_similar_item_prompt(concept_name, tag_accuracy)
-        response_content = self.llm_service.call_llm(
-            prompts["system"], prompts["user"], conversation_history, "json_object"
+                                   student_message: str, conversation_history: list,
+                                   difficulty: str = "same", with_variants: bool = False) -> Dict[str, Any]:
+        """유사 문항 요청 처리 (with_variants면 쉬운/어려운 문항도 item_variants로 함께 반환, LLM 부하 시 문항 은행에서)"""
+        prompts = self.llm_service.generate_similar_item_prompt(concept_name, tag_accuracy, difficulty, with_variants)
+        template = "similar_item_variants" if with_variants else "similar_item"
+
+        def generate() -> Dict[str, Any]:
+            response_content = self.llm_service.call_llm(
+                prompts["system"], prompts["user"], conversation_history, "json_object", template=template
+            )
+            return self.llm_service.parse_similar_item_response(response_content, concept_name, difficulty)
+
+        result = admission_controller.run(
+            template, generate, lambda: self._similar_item_from_bank(concept_name, conversation_history)
         )
-        result = self.llm_service.parse_similar_item_response(response_content, concept_name)
+        if "verification" not in result:
+            result["concept_name"] = concept_name
+            return result
+
+        # 해설 계산이나 정답이 틀린 문항만 정해진 횟수 안에서 다시 생성 (재생성이 실패하면 처음 문항 사용)
+        verification = result.pop("verification")
+        retries = 0
+        while verification.failed and retries < settings.item_verification_max_retries:
+            budget = remaining_budget()
+            if budget is not None and budget < MIN_RETRY_BUDGET_SECONDS:
+                break
+            if admission_controller.should_degrade(template):
+                break
+            retries += 1
+            answer_verification_stats.record("regenerated")
+            # 같은 프롬프트면 single-flight가 방금 받은 틀린 문항을 다시 돌려주므로 실패 이유·시도 번호를 넣음
+            retry_prompts = self.llm_service.regenerate_similar_item_prompt(prompts, verification, retries)
+            try:
+                response_content = self.llm_service.call_llm(
+                    retry_prompts["system"], retry_prompts["user"], conversation_history, "json_object",
+                    template=template
+                )
+                retry_result = self.llm_service.parse_similar_item_response(response_content, concept_name, difficulty)
+            except Exception as e:
+                logging.warning(f"Similar item regeneration failed, keeping first item: {e}")
+                break
+            result, verification = retry_result, retry_result.pop("verification")
+
+        if verification.failed:
+            answer_verification_stats.record("retry_budget_exhausted")
+            if self.llm_service.correct_unverified_item(result["generated_question_data"], verification):
+                answer_verification_stats.record("corrected_after_retries")
+        elif verification.status == "verified":
+            # 계산까지 확인된 문항만 부하 시 대체용으로 보관
+            item_bank.add(concept_name, result["generated_question_data"])
         # 개념명을 추가로 반환 (3단계에서 사용)
         result["concept_name"] = concept_name
         return result
 
+    def _similar_item_from_bank(self, concept_name: str, conversation_history: list) -> Optional[Dict[str, Any]]:
+        """문항 은행에서 이 대화에 아직 나오지 않은 같은 개념 문항 (난이도는 구분하지 않음, 없으면 None - LLM으로 생성)"""
+        item = item_bank.pick(concept_name, conversation_history)
+        if item is None:
+            return None
+        return {
+            "feedback": similar_item_feedback(concept_name, "same", item.get("new_question_text")),
+            "generated_question_data": item
+        }
+
     def _handle_feedback_request(self, concept_name: str, tag_accuracy: float,
                                student_message: str, conversation_history: list) -> Dict[str, Any]:
-        """일반 피드백 요청 처리"""
+        """일반 피드백 요청 처리 (LLM 부하 시 정확도 구간별 격려 문구)"""
         prompts = self.llm_service.generate_feedback_prompt(concept_name, tag_accuracy)
-        ai_feedback = self.llm_service.call_llm(
-            prompts["system"], prompts["user"], conversation_history
+        ai_feedback = admission_controller.run(
+            "feedback",
+            lambda: self.llm_service.call_llm(
+                prompts["system"], prompts["user"], conversation_history, template="feedback"
+            ),
+            lambda: feedback_text(concept_name, tag_accuracy)
         )
         return {"feedback": ai_feedback}
 
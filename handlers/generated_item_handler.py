@@ -1,7 +1,11 @@
 import logging
 from typing import Dict, Any, Optional
 from database.db_service import DatabaseService
+from database.accuracy_index import accuracy_index
 from services.llm_service import LLMService
+from services.hint_ladder import is_ladder_turn, next_hint, hint_ladder_stats
+from services.admission_control import admission_controller
+from services.local_fallbacks import canned_hint, hint_level_for
 
 
 class GeneratedItemHandler:
@@ -41,6 +45,14 @@ class GeneratedItemHandler:
 
             logging.info(f"Personalization data: {personalization_data}")
 
+            # 힌트 요청·짧은 답안 시도는 문항과 함께 생성한 힌트 사다리로 바로 답함 (LLM 호출 없음)
+            ladder_response = self._serve_from_hint_ladder(
+                generated_question_data, student_message, answer_analysis, personalization_data,
+                conversation_history, attempt_count
+            )
+            if ladder_response is not None:
+                return ladder_response
+
             # 부분 정답이나 접근 방법이 맞는 경우 특별 처리
             if answer_analysis["is_partial_correct"] or answer_analysis["has_good_approach"]:
                 return self._handle_partial_answer(answer_analysis, question_text, student_message, personalization_data, conversation_history)
@@ -50,9 +62,13 @@ class GeneratedItemHandler:
                 question_text, student_message, personalization_data
             )
 
-            # LLM 호출
-            ai_feedback = self.llm_service.call_llm(
-                prompts["system"], prompts["user"], conversation_history
+            # LLM 호출 (부하 시 개념·레벨별 소크라틱 힌트)
+            ai_feedback = admission_controller.run(
+                "personalized_hint",
+                lambda: self.llm_service.call_llm(
+                    prompts["system"], prompts["user"], conversation_history, template="personalized_hint"
+                ),
+                lambda: self._canned_hint(personalization_data, conversation_history)
             )
 
             # 힌트 품질 분석
@@ -100,22 +116,15 @@ class GeneratedItemHandler:
         return personalization_data
 
     def _get_concept_accuracy(self, learner_id: str, concept_name: str) -> Optional[float]:
-        """개념별 개인 정확도 조회"""
+        """개념별 개인 정확도 조회 (메모리 인덱스 우선, 없으면 DB)"""
+        accuracy = accuracy_index.get_accuracy(learner_id, concept_name)
+        if accuracy is not None:
+            return accuracy
+
         try:
-            # 해당 개념의 최근 학습 기록에서 정확도 조회
-            # 이는 간단한 구현이며, 실제로는 더 정교한 로직 필요
-            query = """
-            SELECT TOP 1 tag_accuracy
-            FROM gold.vw_personal_item_enriched
-            WHERE learnerID = ? AND concept_name = ?
-            ORDER BY session_id DESC
-            """
-
-            with self.db_service.get_connection() as cnxn:
-                cursor = cnxn.cursor()
-                cursor.execute(query, learner_id, concept_name)
-                row = cursor.fetchone()
-                return row[0] if row else None
+            accuracy = self.db_service.get_concept_accuracy(learner_id, concept_name)
+            accuracy_index.put(learner_id, concept_name, accuracy)
+            return accuracy
 
         except Exception as e:
             logging.warning(f"Error fetching concept accuracy: {e}")
@@ -123,12 +132,13 @@ class GeneratedItemHandler:
 
     def _determine_hint_level(self, accuracy: float) -> str:
         """정확도 기반 힌트 레벨 결정"""
-        if accuracy >= 0.8:
-            return "advanced"  # 고급 - 간단한 힌트
-        elif accuracy >= 0.5:
-            return "intermediate"  # 중급 - 중간 수준 힌트
-        else:
-            return "beginner"  # 초급 - 상세한 힌트
+        return hint_level_for(accuracy)
+
+    @staticmethod
+    def _canned_hint(personalization_data: Dict[str, Any], conversation_history: list) -> str:
+        """LLM 부하 시 보여줄 개념·힌트 레벨별 소크라틱 힌트"""
+        return canned_hint(personalization_data.get("original_concept"),
+                           personalization_data.get("hint_level", "beginner"), conversation_history)
 
     def _analyze_hint_quality(self, hint: str, personalization_data: Dict[str, Any]) -> Dict[str, Any]:
         """힌트 품질 분석"""
@@ -262,20 +272,20 @@ class GeneratedItemHandler:
                              student_message: str, personalization_data: Dict[str, Any],
                              conversation_history: list) -> Dict[str, Any]:
         """부분 정답 또는 좋은 접근 방법 처리"""
-
-        if answer_analysis["is_partial_correct"]:
-            encouragement = "🎯 숫자는 맞았어요! 하지만 단위를 확인해보세요."
-        else:
-            encouragement = "👍 접근 방법이 좋아요! 계속 그 방향으로 생각해보세요."
+        encouragement = self._get_encouragement(answer_analysis)
 
         # 개선된 힌트 프롬프트 생성
         prompts = self.llm_service.generate_guided_hint_prompt(
             question_text, student_message, answer_analysis, personalization_data
         )
 
-        # LLM 호출
-        ai_feedback = self.llm_service.call_llm(
-            prompts["system"], prompts["user"], conversation_history
+        # LLM 호출 (부하 시 개념·레벨별 소크라틱 힌트)
+        ai_feedback = admission_controller.run(
+            "guided_hint",
+            lambda: self.llm_service.call_llm(
+                prompts["system"], prompts["user"], conversation_history, template="guided_hint"
+            ),
+            lambda: self._canned_hint(personalization_data, conversation_history)
         )
 
         # 격려 메시지와 AI 힌트 결합
@@ -288,6 +298,45 @@ class GeneratedItemHandler:
             "hint_analysis": {"is_guided_hint": True, "encouragement_included": True}
         }
 
+    def _serve_from_hint_ladder(self, generated_question_data: Dict[str, Any], student_message: str,
+                                answer_analysis: Dict[str, Any], personalization_data: Dict[str, Any],
+                                conversation_history: list, attempt_count: Optional[int]) -> Optional[Dict[str, Any]]:
+        """이번 차례의 사다리 힌트 응답 - 사다리 밖의 질문이거나 사다리가 없거나 다 썼으면 None (LLM 힌트)"""
+        if not is_ladder_turn(student_message, answer_analysis):
+            hint_ladder_stats.record("off_script")
+            return None
+        if not generated_question_data.get("hint_ladder"):
+            hint_ladder_stats.record("ladder_missing")
+            return None
+
+        hint = next_hint(generated_question_data, conversation_history, attempt_count)
+        if hint is None:
+            hint_ladder_stats.record("ladder_exhausted")
+            return None
+        hint_ladder_stats.record("served_locally")
+
+        feedback = hint
+        if answer_analysis["is_partial_correct"] or answer_analysis["has_good_approach"]:
+            feedback = f"{self._get_encouragement(answer_analysis)}\n\n{hint}"
+
+        hint_analysis = self._analyze_hint_quality(hint, personalization_data)
+        hint_analysis["source"] = "hint_ladder"
+        hint_analysis["ladder_step"] = generated_question_data["hint_ladder"].index(hint) + 1
+
+        return {
+            "feedback": feedback,
+            "personalization_info": personalization_data,
+            "hint_analysis": hint_analysis,
+            "answer_analysis": answer_analysis
+        }
+
+    @staticmethod
+    def _get_encouragement(answer_analysis: Dict[str, Any]) -> str:
+        """부분 정답/좋은 접근 격려 문구"""
+        if answer_analysis["is_partial_correct"]:
+            return "🎯 숫자는 맞았어요! 하지만 단위를 확인해보세요."
+        return "👍 접근 방법이 좋아요! 계속 그 방향으로 생각해보세요."
+
     def _handle_answer_reveal(self, generated_question_data: Dict[str, Any], attempt_count: int) -> Dict[str, Any]:
         """3번 시도 후 정답 공개"""
         correct_answer = generated_question_data.get("correct_answer", "")
@@ -2,6 +2,8 @@ import logging
 from typing import Dict, Any
 from database.db_service import DatabaseService
 from services.llm_service import LLMService
+from services.admission_control import admission_controller
+from services.local_fallbacks import session_summary_text
 
 
 class SessionHandler:
@@ -31,9 +33,13 @@ class SessionHandler:
                 total_questions, correct_count, wrong_question_numbers, weakest_concepts
             )
 
-            # LLM 호출
-            ai_feedback = self.llm_service.call_llm(
-                prompts["system"], prompts["user"], conversation_history
+            # LLM 호출 (부하 시에는 같은 출력 형식을 코드로 채운 요약)
+            ai_feedback = admission_controller.run(
+                "session_summary",
+                lambda: self.llm_service.call_llm(
+                    prompts["system"], prompts["user"], conversation_history, template="session_summary"
+                ),
+                lambda: session_summary_text(total_questions, correct_count, wrong_question_numbers, weakest_concepts)
             )
 
             return {
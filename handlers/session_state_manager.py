@@ -21,6 +21,11 @@ class LearningSession:
     last_activity_time: datetime = field(default_factory=datetime.now)
     total_problems_solved: int = 0
     total_hints_used: int = 0
+    # 미리 생성해 둔 다음 액션 응답 (키 → PrefetchEntry)과 세션별 사용 토큰
+    prefetched: Dict[str, Any] = field(default_factory=dict)
+    prefetch_tokens_used: int = 0
+    # 지금 문제와 함께 생성된 난이도 변형 (개념 → {"easier": 문항, "harder": 문항})
+    item_variants: Dict[str, Dict[str, Any]] = field(default_factory=dict)
 
 
 class SessionStateManager:
@@ -0,0 +1,114 @@
+import time
+import json
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+from config.settings import settings
+from handlers.session_state_manager import LearningSession
+from services.rate_limiter import CHARS_PER_TOKEN
+from services.admission_control import admission_controller
+
+
+@dataclass
+class PrefetchEntry:
+    """세션에 붙어 있는 미리 생성된 응답"""
+    future: Future
+    estimated_tokens: int
+    created_at: float
+
+
+class SpeculativePrefetcher:
+    """학생이 고를 가능성이 높은 다음 액션의 응답을 백그라운드에서 미리 생성"""
+
+    def __init__(self, max_per_response: int = 2, session_token_budget: int = 4000,
+                 ttl_seconds: float = 600, max_workers: int = 4):
+        self.max_per_response = max_per_response
+        self.session_token_budget = session_token_budget
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self.stats = {"scheduled": 0, "hits": 0, "misses": 0, "wasted": 0, "wasted_tokens": 0, "skipped_budget": 0,
+                      "skipped_degraded": 0}
+
+    @classmethod
+    def from_settings(cls) -> "SpeculativePrefetcher":
+        """환경변수 설정으로 생성"""
+        return cls(settings.prefetch_max_per_response, settings.prefetch_session_token_budget,
+                   settings.prefetch_ttl_seconds)
+
+    def schedule(self, session: LearningSession, key: str, generate: Callable[[], Any],
+                 estimated_tokens: int) -> bool:
+        """key에 해당하는 응답을 백그라운드에서 생성 (이미 있거나 예산 초과거나 LLM 부하 중이면 건너뜀)"""
+        self._expire(session)
+
+        if key in session.prefetched:
+            return False
+        if admission_controller.mode() != "normal":
+            with self._lock:
+                self.stats["skipped_degraded"] += 1
+            return False
+        if session.prefetch_tokens_used + estimated_tokens > self.session_token_budget:
+            with self._lock:
+                self.stats["skipped_budget"] += 1
+            return False
+
+        session.prefetch_tokens_used += estimated_tokens
+        session.prefetched[key] = PrefetchEntry(self._executor.submit(generate), estimated_tokens, time.monotonic())
+        with self._lock:
+            self.stats["scheduled"] += 1
+        return True
+
+    def take(self, session: LearningSession, key: str, wait_timeout: Optional[float] = None) -> Optional[Any]:
+        """미리 생성된 응답 꺼내기 - 생성 중이면 wait_timeout까지 기다림, 없거나 실패면 None"""
+        self._expire(session)
+        entry = session.prefetched.pop(key, None)
+
+        result = None
+        if entry is not None:
+            try:
+                result = entry.future.result(timeout=wait_timeout)
+            except FutureTimeoutError:
+                self._record_waste(entry)
+            except Exception as e:
+                logging.warning(f"Prefetch for '{key}' failed: {e}")
+
+        with self._lock:
+            self.stats["hits" if result is not None else "misses"] += 1
+        return result
+
+    def discard_all(self, session: LearningSession):
+        """세션 종료 시 사용되지 않은 응답 폐기"""
+        for entry in session.prefetched.values():
+            self._record_waste(entry)
+        session.prefetched.clear()
+
+    def _expire(self, session: LearningSession):
+        """TTL이 지난 응답 폐기"""
+        now = time.monotonic()
+        for key in [k for k, e in session.prefetched.items() if now - e.created_at > self.ttl_seconds]:
+            self._record_waste(session.prefetched.pop(key))
+
+    def _record_waste(self, entry: PrefetchEntry):
+        """사용되지 않은 생성 결과를 낭비 토큰으로 기록 (완료된 경우 실제 출력 길이로 추정)"""
+        tokens = entry.estimated_tokens
+        if entry.future.done() and entry.future.exception() is None:
+            tokens = len(json.dumps(entry.future.result(), ensure_ascii=False)) // CHARS_PER_TOKEN
+        else:
+            entry.future.cancel()
+        with self._lock:
+            self.stats["wasted"] += 1
+            self.stats["wasted_tokens"] += tokens
+
+    def get_stats(self) -> Dict[str, Any]:
+        """적중률과 낭비 토큰 통계"""
+        with self._lock:
+            stats = dict(self.stats)
+        served = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / served, 3) if served else 0.0
+        return stats
+
+
+# 프로세스 전역 프리페처 인스턴스
+prefetcher = SpeculativePrefetcher.from_settings()
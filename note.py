@@ -1,7 +1,40 @@
 import os
-import json
+import re
+import time
+import math
+import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from openai import AzureOpenAI
+from utils.llm_json import parse_llm_json, LLMJsonError
+from utils.svg_figures import render_figure, FigureSpecError
+ 
+# 문제 1개당 응답 토큰 상한 / 묶음 생성 응답 토큰 상한
+QUESTION_MAX_TOKENS = 1500
+BATCH_MAX_TOKENS = 16000
+ 
+# 한 번의 호출로 생성할 기본 문제 수
+DEFAULT_BATCH_SIZE = 8
+ 
+# 프롬프트에 넣는 "이미 생성된 문제" 최대 개수와 문제당 최대 길이 (프롬프트 크기 고정)
+MAX_AVOID_PROBLEMS = 5
+AVOID_PROBLEM_CHARS = 80
+ 
+# 서버가 utils.svg_figures로 그리는 그림 명세 안내 (SVG 전체를 생성하는 것보다 출력 토큰이 훨씬 적음)
+FIGURE_SPEC_GUIDE = """
+        그림 명세 형식 (figure, JSON):
+        - 삼각형: {"type": "triangle", "labels": ["A", "B", "C"], "sides": {"AB": "5cm"}, "angles": {"A": "60°"}, "right_angle": "C"}
+        - 사각형: {"type": "quadrilateral", "kind": "square|rectangle|parallelogram|rhombus|trapezoid", "labels": ["A", "B", "C", "D"], "sides": {...}, "diagonals": true}
+        - 원: {"type": "circle", "center": "O", "points": {"A": 200, "B": 340, "C": 90}, "chords": [["A", "C"], ["B", "C"]], "angles": {"C": "x"}, "radius_label": "5cm"} (points 값은 원 위 위치 각도(도))
+        - 좌표평면: {"type": "coordinate_plane", "x_range": [-5, 5], "y_range": [-5, 5], "lines": [{"slope": 2, "intercept": 1, "label": "y=2x+1"}], "parabolas": [{"a": 1, "b": 0, "c": -2}], "points": [{"label": "P", "x": 1, "y": 3}]}
+        - 막대그래프: {"type": "bar_chart", "title": "제목", "categories": ["1반", "2반"], "values": [12, 15], "y_label": "(명)"}
+        - 위 형식으로 그릴 수 없는 그림(원그래프, 히스토그램, 입체도형 등)만 figure를 null로 두고 svg_code에 SVG 작성
+          (viewBox="0 0 400 300" width="100%" height="auto", stroke="#000" stroke-width="2", fill="#f0f0f0", font-family="Arial" font-size="16", 각도는 텍스트 라벨로만)
+"""
+ 
+# 유사 중복 판단: 숫자가 모두 같고 문자 n-gram 자카드 유사도가 이 값 이상
+NEAR_DUPLICATE_THRESHOLD = 0.8
+SHINGLE_SIZE = 3
  
  
 def get_openai_client():
@@ -29,9 +62,17 @@ def test_ai_connection():
         return False, str(e)
  
  
-def create_question_prompt(grade, term, topic_name, question_type, difficulty, existing_questions, generated_problems=[], include_svg=False):
-    """문제 생성용 프롬프트 작성"""
-    from .utils import get_grade_description
+def describe_grade(grade):
+    """학년 설명 (상위 패키지의 get_grade_description을 쓸 수 없으면 학년 그대로)"""
+    try:
+        from .utils import get_grade_description
+    except ImportError:
+        return str(grade)
+    return get_grade_description(grade)
+ 
+ 
+def create_question_prompt(grade, term, topic_name, question_type, difficulty, existing_questions, generated_problems=[], include_svg=False, count=1):
+    """문제 생성용 프롬프트 작성 (count > 1이면 JSON 배열로 여러 문제 요청)"""
  
     # 도형/그래프 관련 주제 확인
     requires_svg = any(keyword in topic_name.lower() for keyword in [
@@ -42,73 +83,51 @@ def create_question_prompt(grade, term, topic_name, question_type, difficulty, e
     ])
  
     if requires_svg:
-        svg_instructions = """
+        svg_instructions = f"""
  
-        🔴 **SVG 필수 생성**: 이 주제는 도형/그래프 관련이므로 SVG가 반드시 필요합니다!
+        🔴 **그림 필수**: 이 주제는 도형/그래프 관련이므로 "figure"에 그림 명세를 반드시 넣으세요!
+        SVG는 서버가 명세로 정확하게 그리므로 SVG 코드를 직접 쓰지 마세요.
  
         **문제-그림 완벽 일치 원칙**:
-        1. 문제에서 언급하는 모든 점, 변, 각을 SVG에 정확히 표시
-        2. 문제에서 사용하는 기호/이름을 SVG에 동일하게 라벨링
-        3. 문제에서 주어진 수치나 각도를 SVG에 반드시 표시
-        4. 문제 상황과 100% 일치하는 도형/그래프 그리기
- 
-        **구체적 지침**:
-        - 점: 문제에서 "점 A, B, C"라고 하면 SVG에서 정확히 A, B, C로 라벨링
-        - 각: 문제에서 "∠A, ∠B"라고 하면 SVG에서 해당 각에 각도 표시선과 라벨
-        - 변: 문제에서 "변 AB"라고 하면 SVG에서 AB 변을 명확히 표시
-        - 수치: 문제에서 "5cm, 60°"라고 하면 SVG에서 해당 위치에 수치 표시
-        - 비례: 문제의 수치 비율을 SVG에서 시각적으로 맞추기
- 
-        다음 유형에 맞는 SVG를 생성하세요:
-        - 도형: 삼각형, 사각형, 원 등의 정확한 도형 그리기
-        - 그래프: 좌표평면, 함수 그래프, 직선/곡선
-        - 통계: 막대그래프, 원그래프, 히스토그램
-        - 기하: 각도, 길이, 넓이 표시
- 
-        SVG 사양 (태블릿 화면 최적화):
-        - 뷰박스 사용: viewBox="0 0 400 300" width="100%" height="auto"
-        - 반응형 디자인: 태블릿 화면에 맞게 자동 크기 조절
-        - 스타일: 검은색 선(stroke="#000" stroke-width="2"), 회색 채우기(fill="#f0f0f0")
-        - 텍스트: font-family="Arial" font-size="16" (태블릿용 크기)
-        - 격자, 축, 수치, 라벨 명확히 표시
-        - 터치 친화적 요소 크기 (최소 44px 터치 영역)
- 
-        **각도 표현 중요 규칙**:
-        - 각도를 시각적으로 그리지 마세요 (호나 부채꼴 금지)
-        - 대신 각의 꼭짓점과 두 변만 그리고 알파벳으로 표시
-        - 예: ∠ABC는 점 A, B, C만 표시하고 "∠ABC" 텍스트 라벨 사용
-        - 각도의 크기나 모양을 추측해서 그리지 말고 기하학적 관계만 표현
-        - 정확도를 위해 각도 표시는 텍스트 라벨로만 처리
- 
-        **절대 금지**: svg_code를 null로 설정하지 마세요!
-        **필수**: 문제 내용과 완벽히 일치하는 그림만 생성하세요!
+        1. 문제에서 언급하는 모든 점, 변, 각의 이름을 명세의 labels/sides/angles에 동일하게 사용
+        2. 문제에서 주어진 수치나 각도를 명세에 반드시 포함 (예: "sides": {{"AB": "5cm"}}, "angles": {{"B": "60°"}})
+        3. 각도는 호로 그려지지 않고 텍스트 라벨로만 표시됩니다
+ {FIGURE_SPEC_GUIDE}
+        **필수**: 문제 내용과 완벽히 일치하는 명세만 작성하세요!
         """
     else:
-        svg_instructions = """
- 
-        SVG 생성 판단:
-        - 순수 계산/대수 문제: svg_code를 null로 설정
-        - 시각적 요소가 조금이라도 있으면: SVG 생성
+        svg_instructions = f"""
  
-        SVG 사양 (필요한 경우, 태블릿 최적화):
-        - 뷰박스 사용: viewBox="0 0 300 200" width="100%" height="auto"
-        - 스타일: 검은색 선(stroke="#000" stroke-width="2"), 회색 채우기(fill="#f0f0f0")
-        - 텍스트: font-family="Arial" font-size="14" (태블릿용)
- 
-        **각도 표현**: 시각적 각도 그리기 금지, 알파벳 라벨만 사용
-        """
+        그림 판단:
+        - 순수 계산/대수 문제: figure와 svg_code를 null로 설정
+        - 시각적 요소가 조금이라도 있으면: figure에 그림 명세 작성
+ {FIGURE_SPEC_GUIDE}"""
  
     # 항상 SVG 포함 가능한 응답 형식 사용
-    response_format = f"""
-    응답 형식 (JSON):
-    {{
+    question_format = f"""{{
         "question_text": "문제 내용 (LaTeX 수식 포함)",
         "question_type": "{question_type}",
         "choices": ["① 선택지1", "② 선택지2", "③ 선택지3", "④ 선택지4", "⑤ 선택지5"] (선택형인 경우만),
         "correct_answer": "정답 (①~⑤ 또는 숫자/식)",
         "answer_explanation": "상세한 풀이 과정 (LaTeX 수식 포함)",
-        "svg_code": "<svg>...</svg> 또는 null (문제 풀이에 시각 자료가 필요한 경우만)"
-    }}
+        "figure": {{그림 명세}} 또는 null (문제 풀이에 시각 자료가 필요한 경우만),
+        "svg_code": null (figure로 그릴 수 없는 그림일 때만 "<svg>...</svg>")
+    }}"""
+ 
+    if count > 1:
+        response_format = f"""
+    응답 형식 (JSON 배열, 서로 다른 문제 {count}개):
+    [
+        {question_format},
+        ...
+    ]
+    - 배열 안의 문제끼리도 수치·상황이 겹치지 않게 하세요"""
+    else:
+        response_format = f"""
+    응답 형식 (JSON):
+    {question_format}"""
+ 
+    response_format += """
  
     **중요한 JSON 형식 주의사항:**
     - LaTeX 수식에서 백슬래시(\\)는 JSON에서 이중 백슬래시(\\\\)로 작성하세요
@@ -126,9 +145,11 @@ def create_question_prompt(grade, term, topic_name, question_type, difficulty, e
  
     sentence_req = sentence_requirements.get(difficulty, "적당한 길이의 문제")
  
+    request_line = f"서로 다른 {count}개 " if count > 1 else ""
+ 
     return f"""
-    다음 조건에 맞는 중학교 수학 문제를 생성해주세요:
-    - 학년: {grade} ({get_grade_description(grade)})
+    다음 조건에 맞는 중학교 수학 문제를 {request_line}생성해주세요:
+    - 학년: {grade} ({describe_grade(grade)})
     - 학기: {term}학기
     - 주제: {topic_name}
     - 문제 유형: {question_type}
@@ -153,6 +174,41 @@ def create_question_prompt(grade, term, topic_name, question_type, difficulty, e
     """
  
  
+def parse_question_content(content):
+    """AI 응답을 관대한 파서로 한 번에 파싱 (LaTeX 백슬래시·SVG 따옴표·잘린 출력 복구, 실패 시 None)"""
+    try:
+        result = parse_llm_json(content)
+    except LLMJsonError as e:
+        logging.error(f"JSON parsing error: {e}")
+        logging.error(f"Raw content: {content}")
+        return None
+ 
+    if result.truncated:
+        logging.warning(f"AI response was truncated; recovered partial JSON ({len(result.repairs)} repairs)")
+    elif result.repaired:
+        logging.info(f"Repaired AI JSON: {[issue.to_dict() for issue in result.repairs[:5]]}")
+    return result.value
+ 
+ 
+def is_complete_question(question_data):
+    """문제로 쓸 수 있는 최소 필드가 있는지 (잘린 출력 걸러내기)"""
+    return isinstance(question_data, dict) and bool(question_data.get("question_text")) and bool(question_data.get("correct_answer"))
+ 
+ 
+def normalize_question_data(question_data):
+    """그림 명세를 SVG로 렌더링하고 svg_code를 svg_content로 변환"""
+    svg_code = question_data.pop('svg_code', None)
+    figure = question_data.get('figure')
+    if figure:
+        try:
+            svg_code = render_figure(figure)
+        except FigureSpecError as e:
+            logging.warning(f"Invalid figure spec, using model SVG if any: {e}")
+    if svg_code is not None or 'svg_content' not in question_data:
+        question_data['svg_content'] = svg_code
+    return question_data
+ 
+ 
 def generate_question_with_ai(client, grade, term, topic_name, question_type, difficulty, existing_questions, generated_problems=[], include_svg=False):
     """OpenAI를 사용하여 문제 생성"""
     try:
@@ -165,74 +221,143 @@ def generate_question_with_ai(client, grade, term, topic_name, question_type, di
                 {"role": "user", "content": prompt}
             ],
             temperature=0.7,
-            max_tokens=1500
+            max_tokens=QUESTION_MAX_TOKENS
         )
  
         content = response.choices[0].message.content.strip()
  
-        # JSON 추출
-        if "```json" in content:
-            json_start = content.find("```json") + 7
-            json_end = content.find("```", json_start)
-            json_content = content[json_start:json_end].strip()
-        elif content.startswith("{"):
-            json_content = content
-        else:
-            # JSON이 없으면 전체 응답에서 JSON 부분 찾기
-            start_idx = content.find("{")
-            end_idx = content.rfind("}") + 1
-            if start_idx != -1 and end_idx != 0:
-                json_content = content[start_idx:end_idx]
-            else:
-                logging.error("No valid JSON found in AI response")
-                return None
- 
-        try:
-            # LaTeX 백슬래시 이스케이프 처리 (검증된 정규식 접근법)
-            import re
- 
-            def fix_latex_in_json_string(match):
-                content = match.group(1)
-                # LaTeX 수식 패턴만 안전하게 이스케이프 (JSON에서 valid하지 않은 백슬래시들)
-                content = re.sub(r'(?<!\\)\\(?!["\\/bfnrt])', r'\\\\', content)
-                return f'"{content}"'
- 
-            # JSON 문자열 값들에서만 백슬래시 처리
-            safe_json_content = re.sub(r'"([^"]*\\[^"]*)"', fix_latex_in_json_string, json_content)
+        question_data = parse_question_content(content)
+        if not is_complete_question(question_data):
+            return None
+        return normalize_question_data(question_data)
  
-            question_data = json.loads(safe_json_content)
- 
-            # svg_code를 svg_content로 변환
-            if 'svg_code' in question_data:
-                question_data['svg_content'] = question_data.pop('svg_code')
+    except Exception as e:
+        logging.error(f"AI question generation error: {str(e)}")
+        return None
  
-            return question_data
  
-        except json.JSONDecodeError as je:
-            logging.error(f"JSON parsing error: {str(je)}")
-            logging.error(f"Raw JSON content: {json_content}")
+def normalize_question_text(question_text):
+    """중복 비교용 문제 텍스트 정규화 (LaTeX 구분자·공백·문장부호 제거, 소문자)"""
+    text = re.sub(r'\\[()\[\]]|\$', '', str(question_text or ''))
+    text = re.sub(r'\\(?=[a-zA-Z])', '', text)
+    text = re.sub(r'[\s.,?!~·:;"\'“”‘’]+', '', text)
+    return text.lower()
  
-            # 백업 파싱 시도 - 단순한 백슬래시 두 배 처리
-            try:
-                logging.info("Attempting backup JSON parsing with simple backslash doubling...")
-                backup_content = json_content.replace('\\', '\\\\')
-                # 과도하게 이스케이프된 것들 수정
-                backup_content = backup_content.replace('\\\\\\\\', '\\\\')
-                backup_content = backup_content.replace('\\\\"', '\\"')  # 따옴표는 원래대로
  
-                question_data = json.loads(backup_content)
+class QuestionDeduplicator:
+    """정규화 텍스트 해시(완전 중복)와 n-gram 자카드 유사도(유사 중복)로 생성 문제 중복 제거
  
-                # svg_code를 svg_content로 변환
-                if 'svg_code' in question_data:
-                    question_data['svg_content'] = question_data.pop('svg_code')
+    계수나 상수만 바꾼 문제는 서로 다른 문제로 보고, 숫자가 모두 같으면서 문장만 조금 다른 문제를
+    유사 중복으로 봅니다. 그래서 같은 숫자 조합끼리만 비교합니다.
+    """
  
-                logging.info("Backup JSON parsing successful")
-                return question_data
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD, shingle_size=SHINGLE_SIZE):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.hashes = set()
+        self.shingles_by_numbers = {}
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+ 
+    def add(self, question_text):
+        """새 문제면 기록하고 True, 중복이면 False"""
+        normalized = normalize_question_text(question_text)
+        if not normalized:
+            return False
+ 
+        digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+        if digest in self.hashes:
+            self.exact_duplicates += 1
+            return False
+ 
+        numbers = tuple(re.findall(r'\d+(?:\.\d+)?', normalized))
+        shingles = {normalized[i:i + self.shingle_size] for i in range(max(1, len(normalized) - self.shingle_size + 1))}
+        candidates = self.shingles_by_numbers.setdefault(numbers, [])
+        for other in candidates:
+            if len(shingles & other) / len(shingles | other) >= self.threshold:
+                self.near_duplicates += 1
+                return False
+ 
+        self.hashes.add(digest)
+        candidates.append(shingles)
+        return True
+ 
+ 
+def generate_questions_batch_with_ai(client, grade, term, topic_name, question_type, difficulty, existing_questions, count, avoid_problems=[], include_svg=False, batch_label=None):
+    """한 번의 호출로 문제 여러 개 생성 → (문제 목록, 토큰 사용량)"""
+    usage = {"prompt_tokens": 0, "completion_tokens": 0}
+    try:
+        # 프롬프트 크기를 고정하기 위해 최근 문제 일부만, 앞부분만 넣음
+        recent_problems = [str(p)[:AVOID_PROBLEM_CHARS] for p in avoid_problems[-MAX_AVOID_PROBLEMS:]]
+        prompt = create_question_prompt(grade, term, topic_name, question_type, difficulty, existing_questions, recent_problems, include_svg, count)
+        if batch_label:
+            prompt += f"\n    (묶음 {batch_label}: 다른 묶음과 겹치지 않도록 이 묶음만의 수치와 상황을 사용하세요)\n"
  
-            except json.JSONDecodeError as backup_je:
-                logging.error(f"Backup JSON parsing also failed: {str(backup_je)}")
-                return None
+        response = client.chat.completions.create(
+            model=os.environ["AOAI_DEPLOYMENT"],
+            messages=[
+                {"role": "system", "content": "당신은 한국 중학교 수학 문제 출제 전문가입니다. 교육부 교육과정에 맞는 고품질 문제를 JSON 배열 형식으로 생성해주세요."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.8,
+            max_tokens=min(QUESTION_MAX_TOKENS * count, BATCH_MAX_TOKENS)
+        )
+        if getattr(response, "usage", None):
+            usage["prompt_tokens"] = response.usage.prompt_tokens
+            usage["completion_tokens"] = response.usage.completion_tokens
+ 
+        # 잘린 배열이어도 완성된 문제는 살림 (모자란 만큼은 다음 라운드에서 생성)
+        data = parse_question_content(response.choices[0].message.content)
+        if isinstance(data, dict):
+            data = data.get("questions", [data])
+        if not isinstance(data, list):
+            return [], usage
+        return [normalize_question_data(item) for item in data if is_complete_question(item)], usage
  
     except Exception as e:
-        logging.error(f"AI question generation error: {str(e)}")
-        return None
\ No newline at end of file
+        logging.error(f"AI batch question generation error: {str(e)}")
+        return [], usage
+ 
+ 
+def generate_worksheet_questions(client, grade, term, topic_name, question_type, difficulty, existing_questions, total_count=50, batch_size=DEFAULT_BATCH_SIZE, concurrency=4, include_svg=False, max_rounds=4):
+    """학습지용 문제 total_count개를 묶음 단위로 동시에 생성하고 로컬에서 중복 제거 → (문제 목록, 통계)"""
+    started = time.monotonic()
+    deduplicator = QuestionDeduplicator()
+    questions = []
+    stats = {"calls": 0, "failed_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "generated": 0}
+ 
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        for round_number in range(1, max_rounds + 1):
+            needed = total_count - len(questions)
+            if needed <= 0:
+                break
+ 
+            # 이번 라운드 묶음 크기 (필요한 만큼만 요청)
+            batches = math.ceil(needed / batch_size)
+            sizes = [min(batch_size, needed - i * batch_size) for i in range(batches)]
+            avoid_problems = [q["question_text"] for q in questions]
+            futures = [
+                executor.submit(generate_questions_batch_with_ai, client, grade, term, topic_name, question_type,
+                                difficulty, existing_questions, size, avoid_problems, include_svg,
+                                f"{round_number}-{i + 1}/{batches}")
+                for i, size in enumerate(sizes)
+            ]
+ 
+            for future in futures:
+                batch, usage = future.result()
+                stats["calls"] += 1
+                stats["failed_calls"] += 0 if batch else 1
+                stats["prompt_tokens"] += usage["prompt_tokens"]
+                stats["completion_tokens"] += usage["completion_tokens"]
+                stats["generated"] += len(batch)
+                for question in batch:
+                    if len(questions) < total_count and deduplicator.add(question["question_text"]):
+                        questions.append(question)
+ 
+    stats.update({
+        "questions": len(questions),
+        "exact_duplicates": deduplicator.exact_duplicates,
+        "near_duplicates": deduplicator.near_duplicates,
+        "elapsed_seconds": round(time.monotonic() - started, 2)
+    })
+    return questions, stats
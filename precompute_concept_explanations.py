@@ -0,0 +1,115 @@
+"""
+개념 목록(전체개념명.txt)의 개념 × 힌트 레벨(beginner/intermediate/advanced) 설명을 미리 생성
+튜터 API는 이 저장소의 설명을 LLM 호출 없이 제공합니다.
+
+프롬프트 템플릿이 바뀌면 버전이 달라져 기존 설명은 모두 다시 생성하고,
+같은 버전이면 이미 있는 설명은 건너뛰므로 중간에 실패해도 다시 실행하면 이어서 생성합니다.
+
+실행: python precompute_concept_explanations.py --output <저장소 파일> [--concurrency 8] [--force]
+"""
+import time
+import logging
+import argparse
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+from config.settings import settings
+from services.llm_service import LLMService
+from services.rate_limiter import RateLimitExceededError
+from services.precompute_pipeline import TokenBudget, TokenBudgetExceededError
+from services.concept_explanations import (EXPLANATION_LEVELS, PROMPT_VERSION, build_explanation_prompt,
+                                           load_catalog, read_store_file, write_store_file, resolve_store_path)
+
+# 레이트 리미터 대기열이 가득 찼을 때 재시도 횟수
+MAX_RATE_LIMIT_RETRIES = 10
+
+
+def precompute_concept_explanations(catalog_path: str = "전체개념명.txt", output_path: Optional[str] = None,
+                                    concurrency: int = 8, force: bool = False,
+                                    llm_service: Optional[LLMService] = None,
+                                    budget: Optional[TokenBudget] = None) -> Dict[str, Any]:
+    """개념 × 레벨 설명을 병렬로 생성해 저장소에 기록 (완료될 때마다 원자적으로 저장, 토큰 예산을 넘으면 남은 설명은 다음 실행에)"""
+    output_path = output_path or settings.concept_explanation_store_path
+    if not output_path:
+        raise ValueError("ConceptExplanationStorePath is not set")
+    output_path = resolve_store_path(output_path)
+    concepts = load_catalog(catalog_path)
+
+    store = read_store_file(output_path)
+    if force or store.get("prompt_version") != PROMPT_VERSION:
+        if store.get("explanations"):
+            print(f"♻️ 프롬프트 버전 변경 ({store.get('prompt_version')} → {PROMPT_VERSION}) 또는 --force: 전체 재생성")
+        store = {"prompt_version": PROMPT_VERSION, "explanations": {}}
+    explanations = store["explanations"]
+
+    jobs: List[Tuple[str, str]] = [(concept, level) for concept in concepts for level in EXPLANATION_LEVELS
+                                   if not explanations.get(concept, {}).get(level)]
+    print(f"📚 개념 {len(concepts)}개 × 레벨 {len(EXPLANATION_LEVELS)}개: 이번 실행 {len(jobs)}개 생성 "
+          f"(프롬프트 버전 {PROMPT_VERSION}, 동시 {concurrency}개)")
+
+    llm_service = llm_service or LLMService()
+    budget = budget or TokenBudget()
+    stats = {"total": len(concepts) * len(EXPLANATION_LEVELS), "attempted": len(jobs), "generated": 0, "failed": 0,
+             "over_budget": 0}
+    lock = threading.Lock()
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(_generate_explanation, llm_service, concept, level, budget): (concept, level)
+                   for concept, level in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            concept, level = futures[future]
+            try:
+                explanation = future.result().strip()
+                if not explanation:
+                    raise ValueError("empty explanation")
+            except TokenBudgetExceededError:
+                stats["over_budget"] += 1
+                continue
+            except Exception as e:
+                # 실패한 설명은 저장하지 않음 → 다시 실행하면 재시도
+                stats["failed"] += 1
+                logging.error(f"개념 설명 생성 실패 ({concept}/{level}): {e}")
+                continue
+
+            with lock:
+                explanations.setdefault(concept, {})[level] = explanation
+                store["generated_at"] = datetime.now(timezone.utc).isoformat()
+                store["model"] = settings.openai_model
+                write_store_file(output_path, store)
+            stats["generated"] += 1
+            if done % 10 == 0 or done == len(jobs):
+                print(f"  ⏳ {done}/{len(jobs)} - 생성 {stats['generated']}, 실패 {stats['failed']}")
+
+    stats["elapsed_seconds"] = round(time.monotonic() - started, 2)
+    stats["complete"] = not stats["failed"] and not stats["over_budget"]
+    print(f"\n🎉 개념 설명 저장소 갱신 완료: {output_path} (생성 {stats['generated']}, 실패 {stats['failed']}, "
+          f"예산 초과로 미룸 {stats['over_budget']})")
+    if not stats["complete"]:
+        print("🔁 실패하거나 미룬 설명은 다시 실행하면 이어서 생성됩니다.")
+    return stats
+
+
+def _generate_explanation(llm_service: LLMService, concept: str, level: str, budget: TokenBudget) -> str:
+    """설명 하나 생성 (레이트 리미터 대기열이 가득 차면 안내된 시간만큼 쉬고 재시도)"""
+    system_prompt, user_prompt = build_explanation_prompt(concept, level)
+    budget.reserve(system_prompt, user_prompt, "concept_explanation")
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        try:
+            return llm_service.call_llm(system_prompt, user_prompt, [], template="concept_explanation")
+        except RateLimitExceededError as e:
+            if attempt == MAX_RATE_LIMIT_RETRIES:
+                raise
+            time.sleep(e.retry_after)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="개념 × 힌트 레벨 설명 미리 생성")
+    parser.add_argument("--catalog", default="전체개념명.txt", help="개념 목록 파일 (개념명<TAB>문항 수)")
+    parser.add_argument("--output", default=None, help="저장소 파일 (기본: ConceptExplanationStorePath)")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 LLM 호출 수")
+    parser.add_argument("--force", action="store_true", help="같은 프롬프트 버전이어도 전체 재생성")
+    args = parser.parse_args()
+
+    precompute_concept_explanations(args.catalog, args.output, args.concurrency, args.force)
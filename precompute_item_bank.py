@@ -0,0 +1,162 @@
+"""
+문항 은행 초기 파일(ItemBankPath)에 개념별로 해설 계산 검증을 통과한 유사 문항을 미리 생성
+LLM이 느려지거나 쿼터에 걸리면 튜터 API는 생성 대신 이 문항을 제공합니다 (services/item_bank.py).
+
+real_patterns.json에서 정확도가 낮은 개념부터, 그다음 개념 목록(전체개념명.txt) 순서로
+개념별 문항이 PrecomputeItemsPerConcept개가 될 때까지만 생성하므로 다시 실행하면 모자란 개념만 채웁니다.
+
+실행: python precompute_item_bank.py [--per-concept 5] [--concurrency 4] [--output item_bank.json]
+"""
+import os
+import json
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+from config.settings import settings
+from services.llm_service import LLMService
+from services.rate_limiter import RateLimitExceededError
+from services.precompute_pipeline import TokenBudget, TokenBudgetExceededError
+from services.concept_explanations import load_catalog, write_store_file, resolve_store_path
+
+# 레이트 리미터 대기열이 가득 찼을 때 재시도 횟수
+MAX_RATE_LIMIT_RETRIES = 10
+
+# 개념별로 모자란 문항 수 대비 최대 생성 시도 배수 (검증 실패가 계속되는 개념에서 멈추기 위함)
+MAX_ATTEMPTS_PER_ITEM = 2
+
+# 패턴 데이터에 없는 개념의 프롬프트용 정확도
+DEFAULT_ACCURACY = 0.5
+
+
+def order_concepts(catalog_path: str, patterns_path: str) -> Dict[str, float]:
+    """생성 순서대로 개념 → 정확도 (real_patterns.json의 정확도가 낮은 개념 먼저, 나머지는 목록 순서)"""
+    ordered: Dict[str, float] = {}
+    try:
+        # 패턴 파일을 지정하지 않았으면 (PrecomputePatternsPath 미설정) 목록 순서
+        patterns = {}
+        if patterns_path:
+            with open(resolve_store_path(patterns_path), "r", encoding="utf-8") as f:
+                patterns = json.load(f)
+        for concept in sorted(patterns.get("concepts", []), key=lambda c: c.get("avg_personal_accuracy", 1.0)):
+            ordered[concept["concept_name"]] = concept.get("avg_personal_accuracy", DEFAULT_ACCURACY)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Could not read learning patterns, using catalog order: {e}")
+
+    for concept in load_catalog(catalog_path):
+        ordered.setdefault(concept, DEFAULT_ACCURACY)
+    return ordered
+
+
+def precompute_item_bank(catalog_path: str = "전체개념명.txt", patterns_path: str = "real_patterns.json",
+                         output_path: Optional[str] = None, per_concept: Optional[int] = None,
+                         concurrency: int = 4, llm_service: Optional[LLMService] = None,
+                         budget: Optional[TokenBudget] = None) -> Dict[str, Any]:
+    """개념별로 모자란 만큼 유사 문항을 생성·검증해 문항 은행 파일에 기록 (개념이 끝날 때마다 원자적으로 저장)"""
+    output_path = output_path or settings.item_bank_path
+    if not output_path:
+        raise ValueError("ItemBankPath is not set")
+    output_path = resolve_store_path(output_path)
+    per_concept = per_concept or settings.precompute_items_per_concept
+
+    bank: Dict[str, List[Dict[str, Any]]] = {}
+    if os.path.exists(output_path):
+        with open(output_path, "r", encoding="utf-8") as f:
+            bank = json.load(f)
+
+    concepts = order_concepts(catalog_path, patterns_path)
+    needed = {concept: per_concept - len(bank.get(concept, [])) for concept in concepts
+              if len(bank.get(concept, [])) < per_concept}
+    print(f"🏦 개념 {len(concepts)}개 × {per_concept}문항: 이번 실행 {len(needed)}개 개념, "
+          f"{sum(needed.values())}문항 생성 (동시 {concurrency}개)")
+
+    llm_service = llm_service or LLMService()
+    budget = budget or TokenBudget()
+    stats = {"concepts": len(concepts), "needed": sum(needed.values()), "generated": 0, "rejected": 0,
+             "failed": 0, "over_budget": 0}
+    lock = threading.Lock()
+    started = time.monotonic()
+
+    def fill(concept: str, count: int) -> List[Dict[str, Any]]:
+        """개념 하나의 모자란 문항 생성 (검증을 통과한 문항만, 같은 문제는 한 번만)"""
+        items: List[Dict[str, Any]] = []
+        known = {item.get("new_question_text") for item in bank.get(concept, [])}
+        for _ in range(count * MAX_ATTEMPTS_PER_ITEM):
+            if len(items) >= count:
+                break
+            try:
+                item = _generate_item(llm_service, concept, concepts[concept], budget)
+            except TokenBudgetExceededError:
+                with lock:
+                    stats["over_budget"] += count - len(items)
+                break
+            except Exception as e:
+                logging.error(f"유사 문항 생성 실패 ({concept}): {e}")
+                with lock:
+                    stats["failed"] += 1
+                continue
+
+            if item is None or item["new_question_text"] in known:
+                with lock:
+                    stats["rejected"] += 1
+                continue
+            known.add(item["new_question_text"])
+            items.append(item)
+        return items
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(fill, concept, count): concept for concept, count in needed.items()}
+        for done, future in enumerate(as_completed(futures), 1):
+            concept = futures[future]
+            items = future.result()
+            if items:
+                with lock:
+                    bank.setdefault(concept, []).extend(items)
+                    write_store_file(output_path, bank)
+                    stats["generated"] += len(items)
+            if done % 10 == 0 or done == len(needed):
+                print(f"  ⏳ {done}/{len(needed)} 개념 - 생성 {stats['generated']}, 검증 탈락 {stats['rejected']}, "
+                      f"실패 {stats['failed']}")
+
+    stats["elapsed_seconds"] = round(time.monotonic() - started, 2)
+    stats["complete"] = all(len(bank.get(concept, [])) >= per_concept for concept in concepts)
+    print(f"\n🎉 문항 은행 갱신 완료: {output_path} (생성 {stats['generated']}, 검증 탈락 {stats['rejected']}, "
+          f"실패 {stats['failed']}, 예산 초과로 미룸 {stats['over_budget']})")
+    if not stats["complete"]:
+        print("🔁 모자란 개념은 다시 실행하면 이어서 생성됩니다.")
+    return stats
+
+
+def _generate_item(llm_service: LLMService, concept: str, accuracy: float,
+                   budget: TokenBudget) -> Optional[Dict[str, Any]]:
+    """유사 문항 하나 생성 → 해설 계산까지 확인된 문항만 반환 (레이트 리미터 대기열이 가득 차면 쉬고 재시도)"""
+    prompts = llm_service.generate_similar_item_prompt(concept, accuracy)
+    budget.reserve(prompts["system"], prompts["user"], "similar_item")
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        try:
+            response_content = llm_service.call_llm(prompts["system"], prompts["user"], [], "json_object",
+                                                    template="similar_item")
+            break
+        except RateLimitExceededError as e:
+            if attempt == MAX_RATE_LIMIT_RETRIES:
+                raise
+            time.sleep(e.retry_after)
+
+    result = llm_service.parse_similar_item_response(response_content, concept)
+    if result["verification"].status != "verified":
+        return None
+    return result["generated_question_data"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="문항 은행 초기 파일 미리 생성")
+    parser.add_argument("--catalog", default="전체개념명.txt", help="개념 목록 파일 (개념명<TAB>문항 수)")
+    parser.add_argument("--patterns", default="real_patterns.json", help="개념 우선순위용 학습 패턴 파일")
+    parser.add_argument("--output", default=None, help="문항 은행 파일 (기본: ItemBankPath)")
+    parser.add_argument("--per-concept", type=int, default=None, help="개념별 문항 수 (기본: PrecomputeItemsPerConcept)")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시 LLM 호출 수")
+    args = parser.parse_args()
+
+    precompute_item_bank(args.catalog, args.patterns, args.output, args.per_concept, args.concurrency)
@@ -0,0 +1,155 @@
+"""
+미리 계산 작업 등록 + 로컬 실행 CLI
+function_app은 작업마다 schedule로 타이머 함수(precompute_<작업 이름>)를 만들고, 실행 시 의존 작업을 먼저 확인합니다.
+입력 지문(학습 뷰 변경 표시, 개념 목록, 프롬프트 버전 등)이 마지막 성공과 같고 출력이 있으면 건너뜁니다.
+출력과 실행 기록은 패키지로 배포된 앱 루트가 아니라 워커가 함께 쓰는 경로에 저장하며, 경로를 비운 작업은 꺼집니다.
+
+실행: python precompute_jobs.py --list
+      python precompute_jobs.py [작업 이름 ...] [--force] [--dry-run]
+"""
+import os
+import argparse
+from typing import Any, Dict
+from config.settings import settings
+from services.concept_explanations import PROMPT_VERSION, resolve_store_path
+from services.precompute_pipeline import (precompute_pipeline, PrecomputeJob, TokenBudget, file_fingerprint,
+                                          path_exists)
+
+CATALOG_PATH = "전체개념명.txt"
+
+
+def view_version() -> str:
+    """학습 뷰 변경 표시 (DB 작업의 입력 지문)"""
+    from database.db_service import DatabaseService
+    return DatabaseService().get_view_version()
+
+
+def run_view_snapshot(budget: TokenBudget) -> Dict[str, Any]:
+    """학습 뷰 컬럼 스냅샷 내보내기"""
+    from database.view_snapshot import export_view_snapshot
+    return {"path": export_view_snapshot(settings.view_snapshot_path)}
+
+
+def view_snapshot_exists() -> bool:
+    """현재 스냅샷 포인터가 있는지"""
+    from database.view_snapshot import CURRENT_FILE
+    return os.path.exists(os.path.join(settings.view_snapshot_path, CURRENT_FILE))
+
+
+def run_accuracy_index(budget: TokenBudget) -> Dict[str, Any]:
+    """정확도 인덱스 전체 다시 적재 후 Redis 스냅샷 공유 (워커는 SQL 대신 스냅샷을 적재)"""
+    from database.accuracy_index import accuracy_index
+    accuracy_index.refresh(force=True)
+    stats = accuracy_index.get_stats()
+    return {key: stats[key] for key in ("learners", "concepts", "loaded_at", "rows_applied")}
+
+
+def run_real_patterns(budget: TokenBudget) -> Dict[str, Any]:
+    """학습 패턴 파일 다시 생성 (extract_patterns.py)"""
+    from extract_patterns import extract_real_patterns
+    return extract_real_patterns(output_path=resolve_store_path(settings.precompute_patterns_path))["extraction_summary"]
+
+
+def run_concept_explanations(budget: TokenBudget) -> Dict[str, Any]:
+    """개념 × 힌트 레벨 설명 중 없는 것만 생성 (precompute_concept_explanations.py)"""
+    from precompute_concept_explanations import precompute_concept_explanations
+    return precompute_concept_explanations(CATALOG_PATH, budget=budget)
+
+
+def run_item_bank(budget: TokenBudget) -> Dict[str, Any]:
+    """문항 은행 초기 파일에서 모자란 개념만 채우기 (precompute_item_bank.py)"""
+    from precompute_item_bank import precompute_item_bank
+    return precompute_item_bank(CATALOG_PATH, settings.precompute_patterns_path, budget=budget)
+
+
+precompute_pipeline.register(PrecomputeJob(
+    name="view_snapshot",
+    description="학습 뷰 컬럼 스냅샷 (세션 결과 조회)",
+    run=run_view_snapshot,
+    fingerprint=view_version,
+    schedule=settings.view_snapshot_schedule,
+    output=settings.view_snapshot_path,
+    output_exists=view_snapshot_exists,
+    enabled=lambda: bool(settings.view_snapshot_path),
+    # 읽는 쪽은 ViewSnapshotMaxAgeSeconds가 지난 스냅샷을 버리므로 뷰가 그대로여도 그 전에 다시 내보냄
+    refresh_after_seconds=settings.view_snapshot_max_age_seconds / 2
+))
+
+precompute_pipeline.register(PrecomputeJob(
+    name="accuracy_index",
+    description="학습자×개념 정확도 인덱스 Redis 스냅샷",
+    run=run_accuracy_index,
+    fingerprint=view_version,
+    schedule=settings.precompute_accuracy_index_schedule,
+    output="redis:llm-tutor:accuracy-index",
+    enabled=lambda: settings.accuracy_index_mode == "redis" and settings.accuracy_index_refresh_seconds > 0
+))
+
+precompute_pipeline.register(PrecomputeJob(
+    name="real_patterns",
+    description="실제 학습 패턴 (개념별 시도·성공률, 수준 분포, 실수 패턴)",
+    run=run_real_patterns,
+    fingerprint=view_version,
+    schedule=settings.precompute_patterns_schedule,
+    output=settings.precompute_patterns_path,
+    output_exists=path_exists(settings.precompute_patterns_path),
+    enabled=lambda: bool(settings.precompute_patterns_path)
+))
+
+precompute_pipeline.register(PrecomputeJob(
+    name="concept_explanations",
+    description="개념 × 힌트 레벨 설명",
+    run=run_concept_explanations,
+    fingerprint=lambda: f"{file_fingerprint(CATALOG_PATH)}:{PROMPT_VERSION}:{settings.openai_model}",
+    schedule=settings.precompute_explanations_schedule,
+    output=settings.concept_explanation_store_path,
+    token_budget=settings.precompute_token_budgets.get("concept_explanations", 0),
+    output_exists=path_exists(settings.concept_explanation_store_path),
+    enabled=lambda: bool(settings.concept_explanation_store_path)
+))
+
+precompute_pipeline.register(PrecomputeJob(
+    name="item_bank",
+    description="부하 시 제공할 검증된 유사 문항 (정확도가 낮은 개념 먼저)",
+    run=run_item_bank,
+    fingerprint=lambda: f"{file_fingerprint(CATALOG_PATH)}:{settings.precompute_items_per_concept}",
+    schedule=settings.precompute_item_bank_schedule,
+    output=settings.item_bank_path,
+    depends_on=("real_patterns",),
+    token_budget=settings.precompute_token_budgets.get("item_bank", 0),
+    output_exists=path_exists(settings.item_bank_path),
+    enabled=lambda: bool(settings.item_bank_path)
+))
+
+
+def print_jobs():
+    """등록된 작업과 마지막 실행 상태 출력"""
+    stats = precompute_pipeline.get_stats()
+    for job in precompute_pipeline.jobs():
+        job_stats = stats[job.name]
+        print(f"• {job.name} - {job.description}")
+        print(f"    일정 {job.schedule} | 의존 {', '.join(job.depends_on) or '-'} | "
+              f"토큰 예산 {job.token_budget or '무제한'} | 출력 {job.output or '-'} | "
+              f"{'사용' if job_stats['enabled'] else '꺼짐'}")
+        if job_stats["status"]:
+            print(f"    마지막 {job_stats['status']} | 평균 {job_stats['avg_duration_seconds']}s, "
+                  f"최대 {job_stats['max_duration_seconds']}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="미리 계산 작업 실행 (의존 작업 포함, 입력이 그대로면 건너뜀)")
+    parser.add_argument("jobs", nargs="*", help="실행할 작업 (기본: 전체)")
+    parser.add_argument("--force", action="store_true", help="입력이 그대로여도 지정한 작업 다시 실행")
+    parser.add_argument("--dry-run", action="store_true", help="실행하지 않고 다시 실행할 작업과 이유만 출력")
+    parser.add_argument("--list", action="store_true", help="등록된 작업과 마지막 실행 상태 출력")
+    args = parser.parse_args()
+
+    if args.list:
+        print_jobs()
+    else:
+        records = precompute_pipeline.run(args.jobs or None, args.force, args.dry_run)
+        print("\n📋 미리 계산 결과")
+        for name, record in records.items():
+            detail = record.get("error") or record.get("reason") or ""
+            print(f"  {name:<22} {record['status']:<10} {record.get('duration_seconds', 0):>8.2f}s "
+                  f"토큰 {record.get('tokens_estimated', 0):>8} {detail}")
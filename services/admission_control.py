@@ -0,0 +1,217 @@
+import math
+import time
+import logging
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple, TypeVar
+from config.settings import settings
+from services.call_policy import (call_policy, is_retryable, get_status_code, CircuitOpenError,
+                                  DeadlineExceededError)
+from services.rate_limiter import RateLimitExceededError
+
+T = TypeVar("T")
+
+# 지연 p90을 판단하기 위한 최소 샘플 수 (이보다 적으면 지연 신호는 무시)
+MIN_LATENCY_SAMPLES = 5
+
+# 요청 단위로 로컬 대체 응답을 쓴 템플릿 목록 (응답에 degraded 표시)
+_degraded_templates: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar(
+    "degraded_templates", default=None
+)
+
+
+class OverloadedError(RuntimeError):
+    """진행 중인 LLM 호출이 한도를 넘어 대기열에 넣지 않고 바로 거부한 에러"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_pressure_error(error: Exception) -> bool:
+    """LLM 부하로 인한 실패인지 (쿼터 초과, 서킷 오픈, 예산 초과, 과부하, 타임아웃/5xx)"""
+    if isinstance(error, (CircuitOpenError, RateLimitExceededError, DeadlineExceededError, OverloadedError)):
+        return True
+    return is_retryable(error)
+
+
+@contextmanager
+def degradation_scope():
+    """요청 하나에서 로컬 대체 응답을 쓴 템플릿 기록 시작"""
+    token = _degraded_templates.set([])
+    try:
+        yield
+    finally:
+        _degraded_templates.reset(token)
+
+
+def degraded_templates() -> List[str]:
+    """현재 요청에서 로컬 대체 응답을 쓴 템플릿 목록"""
+    return list(_degraded_templates.get() or [])
+
+
+class AdmissionController:
+    """진행 중인 LLM 호출 수와 최근 지연·부하 신호로 상태 판단 (normal → degraded → shedding)"""
+
+    def __init__(self, templates: Iterable[str] = (), degrade_in_flight: int = 16, shed_in_flight: int = 32,
+                 latency_ratio: float = 0.6, pressure_events: int = 3, window_seconds: float = 30.0,
+                 cooldown_seconds: float = 20.0):
+        self.templates = set(templates)
+        self.degrade_in_flight = degrade_in_flight
+        self.shed_in_flight = shed_in_flight
+        self.latency_ratio = latency_ratio
+        self.pressure_events = pressure_events
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self._in_flight = 0
+        self._latencies: Deque[Tuple[float, float]] = deque(maxlen=200)
+        self._pressure: Deque[float] = deque(maxlen=200)
+        self._degraded_until = 0.0
+        self._reason = ""
+        self._mode = "normal"
+        self._lock = threading.Lock()
+        self.stats = {"degraded_periods": 0, "shed_calls": 0, "pressure_events": 0, "fallback_after_error": 0}
+        self.fallbacks: Dict[str, int] = {}
+
+    @classmethod
+    def from_settings(cls) -> "AdmissionController":
+        """환경변수 설정으로 생성"""
+        return cls(settings.degrade_templates, settings.degrade_max_in_flight, settings.shed_max_in_flight,
+                   settings.degrade_latency_ratio, settings.degrade_pressure_events,
+                   settings.degrade_window_seconds, settings.degrade_cooldown_seconds)
+
+    def mode(self) -> str:
+        """현재 상태 - normal / degraded (로컬 대체 응답) / shedding (새 LLM 호출 거부)"""
+        now = time.monotonic()
+        with self._lock:
+            reason = self._pressure_reason(now)
+            if reason:
+                self._degraded_until = now + self.cooldown_seconds
+                self._reason = reason
+            if self._in_flight >= self.shed_in_flight:
+                mode = "shedding"
+            elif now < self._degraded_until:
+                mode = "degraded"
+            else:
+                mode = "normal"
+
+            if mode != "normal" and self._mode == "normal":
+                self.stats["degraded_periods"] += 1
+                logging.warning(f"LLM admission switched to {mode} mode: {self._reason}")
+            elif mode == "normal" and self._mode != "normal":
+                logging.info("LLM admission back to normal mode")
+            self._mode = mode
+            return mode
+
+    def should_degrade(self, template: Optional[str]) -> bool:
+        """로컬 대체 응답이 있는 템플릿을 지금 로컬로 처리해야 하는지"""
+        return template in self.templates and self.mode() != "normal"
+
+    def run(self, template: str, call: Callable[[], T], fallback: Callable[[], Optional[T]]) -> T:
+        """부하 상태면 로컬 대체 응답, 아니면 LLM 호출 - 부하성 실패도 로컬 대체 응답으로 (대체 응답이 없으면 그대로 호출/에러)"""
+        if self.should_degrade(template):
+            result = fallback()
+            if result is not None:
+                self.record_fallback(template)
+                return result
+
+        try:
+            return call()
+        except Exception as e:
+            if template not in self.templates or not is_pressure_error(e):
+                raise
+            result = fallback()
+            if result is None:
+                raise
+            logging.warning(f"LLM call for '{template}' failed under pressure, serving local fallback: {e}")
+            with self._lock:
+                self.stats["fallback_after_error"] += 1
+            self.record_fallback(template)
+            return result
+
+    def record_fallback(self, template: str):
+        """로컬 대체 응답 사용 기록 (요청의 degraded 표시와 통계)"""
+        served = _degraded_templates.get()
+        if served is not None and template not in served:
+            served.append(template)
+        with self._lock:
+            self.fallbacks[template] = self.fallbacks.get(template, 0) + 1
+
+    @contextmanager
+    def track(self, template: Optional[str]):
+        """LLM 호출 1건의 진행 중 수와 지연 기록 - shedding이면 대기열에 넣지 않고 OverloadedError"""
+        with self._lock:
+            if self._in_flight >= self.shed_in_flight:
+                self.stats["shed_calls"] += 1
+                raise OverloadedError(f"{self._in_flight} LLM calls in flight", self._retry_after_locked())
+            self._in_flight += 1
+
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            if is_pressure_error(e) and not isinstance(e, OverloadedError):
+                self.record_pressure(e)
+            raise
+        else:
+            timeout = call_policy.template_timeouts.get(template or "", call_policy.default_timeout)
+            with self._lock:
+                self._latencies.append((time.monotonic(), (time.monotonic() - start) / max(timeout, 0.001)))
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def record_pressure(self, error: Exception):
+        """429/타임아웃/서킷 오픈 등 부하 신호 기록"""
+        with self._lock:
+            self._pressure.append(time.monotonic())
+            self.stats["pressure_events"] += 1
+        logging.info(f"LLM pressure event (status={get_status_code(error)}): {type(error).__name__}")
+
+    def retry_after(self) -> int:
+        """클라이언트에 알려줄 재시도 대기 시간 (초)"""
+        with self._lock:
+            return self._retry_after_locked()
+
+    def backpressure_headers(self) -> Dict[str, str]:
+        """로컬 대체 응답이나 거부 응답에 붙이는 헤더 (Retry-After + 현재 상태)"""
+        return {"Retry-After": str(self.retry_after()), "X-Tutor-Load": self.mode()}
+
+    def _retry_after_locked(self) -> int:
+        """남은 로컬 대체 시간, 없으면 1초"""
+        return max(1, math.ceil(self._degraded_until - time.monotonic()))
+
+    def _pressure_reason(self, now: float) -> str:
+        """부하 전환 조건 중 걸린 것 (없으면 빈 문자열)"""
+        if self._in_flight >= self.degrade_in_flight:
+            return f"{self._in_flight} LLM calls in flight"
+
+        window_start = now - self.window_seconds
+        while self._pressure and self._pressure[0] < window_start:
+            self._pressure.popleft()
+        if len(self._pressure) >= self.pressure_events:
+            return f"{len(self._pressure)} throttles/timeouts in {self.window_seconds:.0f}s"
+
+        ratios = sorted(ratio for finished_at, ratio in self._latencies if finished_at >= window_start)
+        if len(ratios) >= MIN_LATENCY_SAMPLES:
+            p90 = ratios[min(len(ratios) - 1, int(round(0.9 * (len(ratios) - 1))))]
+            if p90 >= self.latency_ratio:
+                return f"latency p90 at {p90:.0%} of timeout"
+        return ""
+
+    def get_stats(self) -> Dict[str, object]:
+        """현재 상태, 진행 중 호출 수, 템플릿별 로컬 대체 응답 수"""
+        mode = self.mode()
+        with self._lock:
+            stats = dict(self.stats)
+            stats["fallbacks"] = dict(self.fallbacks)
+            stats["in_flight"] = self._in_flight
+            stats["last_reason"] = self._reason
+        stats["mode"] = mode
+        return stats
+
+
+# 프로세스 전역 부하 제어기
+admission_controller = AdmissionController.from_settings()
@@ -0,0 +1,379 @@
+import re
+import math
+import threading
+from fractions import Fraction
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# 교과서 풀이가 흔히 쓰는 π 근삿값 (정확한 π와 둘 중 하나라도 맞으면 같은 값으로 봄)
+TEXTBOOK_PI = 3.14
+
+# 부동소수점 비교 허용 오차 (상대)
+REL_TOLERANCE = 1e-9
+
+# 요청의 남은 예산이 이보다 적으면 검증에 실패한 문항도 다시 생성하지 않음 (초)
+MIN_RETRY_BUDGET_SECONDS = 5
+
+# 수식으로 보지 않는 단위 (숫자, 닫는 괄호, π 바로 뒤에 올 때만 제거)
+_UNIT = re.compile(r'(?:(?<=[\d)}])|(?<=pi))\s*(?:cm|mm|km|kg|mL|m|g|L)(?:\s*\^\s*\{?\s*[23]\s*\}?)?(?![A-Za-z])')
+_THOUSANDS = re.compile(r'(?<=\d),(?=\d{3}(?!\d))')
+_DECIMALS = re.compile(r'\.(\d+)\s*$')
+
+# 정답 문자열에서 값 부분 ("-3", "1,200", "\\frac{5}{6}", "5/6", "12π")
+_ANSWER_VALUE = re.compile(r'-?(?:\\frac\{\d+\}\{\d+\}|\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?(?:/\d+)?)\s*(?:π|\\pi)?')
+
+_SIMPLE_REPLACEMENTS = [
+    ("\\(", " "), ("\\)", " "), ("\\[", " "), ("\\]", " "), ("$", " "),
+    ("\\left", ""), ("\\right", ""), ("\\,", ""), ("\\;", ""), ("\\!", ""), ("\\ ", ""),
+    ("\\times", "*"), ("\\cdot", "*"), ("×", "*"), ("·", "*"), ("∙", "*"),
+    ("\\div", "/"), ("÷", "/"), ("−", "-"), ("–", "-"),
+    ("\\pi", " pi "), ("π", " pi "), ("²", "^2"), ("³", "^3"),
+    ("^\\circ", ""), ("\\circ", ""), ("°", ""), ("%", ""),
+    # 같음이 아닌 관계는 식을 끊음 (근삿값·부등식은 검증하지 않음)
+    ("\\approx", "|"), ("≈", "|"), ("\\neq", "|"), ("\\ne", "|"), ("≠", "|"),
+    ("\\leq", "|"), ("\\geq", "|"), ("\\le", "|"), ("\\ge", "|"), ("≤", "|"), ("≥", "|"),
+    ("<", "|"), (">", "|"), ("\\therefore", "|"), ("∴", "|"),
+]
+
+# 식이 될 수 있는 문자 (그 밖의 문자 - 한글, 쉼표 등 - 에서 식이 끊김)
+_EXPRESSION_SPAN = re.compile(r'[0-9A-Za-z.+\-*/^()=\s√]+')
+_TOKEN = re.compile(r'\s*(?:(\d+(?:\.\d*)?|\.\d+)|([A-Za-z]+)|(\*\*|[+\-*/^()]))')
+
+_FUNCTIONS = {"sqrt": math.sqrt}
+
+
+class ExpressionError(ValueError):
+    """계산할 수 없는 식 (변수, 지원하지 않는 기호, 0으로 나누기 등)"""
+
+
+@dataclass
+class Verification:
+    """문항 하나의 검증 결과 (status: verified / mismatch / step_error / unverifiable)"""
+    status: str
+    answer_value: Optional[float] = None
+    final_value: Optional[float] = None
+    bad_steps: List[str] = field(default_factory=list)
+
+    @property
+    def failed(self) -> bool:
+        """다시 생성해야 하는 결과 (계산할 수 없는 문항은 실패로 보지 않음)"""
+        return self.status in ("mismatch", "step_error")
+
+
+def _replace_braced(text: str, command: str, arity: int, build) -> str:
+    """\\command{A}{B} 형태를 build(A, B)로 (중첩 중괄호 처리)"""
+    while True:
+        start = text.find(command)
+        if start < 0:
+            return text
+        position = start + len(command)
+        index_arg = None
+        if text.startswith("[", position):
+            end = text.find("]", position)
+            if end < 0:
+                raise ExpressionError(f"unclosed [ after {command}")
+            index_arg, position = text[position + 1:end], end + 1
+        args = []
+        for _ in range(arity):
+            while position < len(text) and text[position] == " ":
+                position += 1
+            if position < len(text) and text[position] == "{":
+                depth, end = 0, position
+                while end < len(text):
+                    depth += {"{": 1, "}": -1}.get(text[end], 0)
+                    if depth == 0:
+                        break
+                    end += 1
+                if depth:
+                    raise ExpressionError(f"unbalanced braces after {command}")
+                args.append(text[position + 1:end])
+                position = end + 1
+            elif position < len(text):
+                # \frac12, \sqrt2 처럼 중괄호 없이 한 글자
+                args.append(text[position])
+                position += 1
+            else:
+                raise ExpressionError(f"missing argument for {command}")
+        text = text[:start] + build(*args, index=index_arg) + text[position:]
+
+
+def to_expression_text(text: str) -> str:
+    """LaTeX·기호가 섞인 풀이 문장을 계산 가능한 식 문자열로 (한글 등 식이 아닌 부분은 그대로 남음)"""
+    text = text or ""
+    for source, target in _SIMPLE_REPLACEMENTS:
+        text = text.replace(source, target)
+    text = _THOUSANDS.sub("", text)
+    text = re.sub(r'\\(?:text|mathrm)\{([^{}]*)\}', r'\1', text)
+    text = _UNIT.sub("", text)
+    for command in ("\\dfrac", "\\tfrac", "\\frac"):
+        text = _replace_braced(text, command, 2, lambda a, b, index=None: f"(({a})/({b}))")
+    text = _replace_braced(
+        text, "\\sqrt", 1,
+        lambda a, index=None: f"(({a})^(1/({index})))" if index else f"sqrt({a})"
+    )
+    # √2, √(x+1), √{12}
+    text = re.sub(r'√\s*\{([^{}]*)\}', r'sqrt(\1)', text)
+    text = re.sub(r'√\s*(\d+(?:\.\d+)?|[A-Za-z])', r'sqrt(\1)', text)
+    text = text.replace("√", "sqrt")
+    return text.replace("{", "(").replace("}", ")")
+
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    """(종류, 값) 토큰 목록 - 암시적 곱셈(2pi, 3sqrt(2), 2(3+1))은 * 토큰을 끼워 넣음"""
+    tokens: List[Tuple[str, str]] = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if not match:
+            raise ExpressionError(f"unexpected character {expression[position]!r}")
+        number, name, operator = match.groups()
+        token = ("num", number) if number else ("name", name) if name else ("op", "^" if operator == "**" else operator)
+        if tokens and token[0] in ("num", "name") or tokens and token == ("op", "("):
+            previous = tokens[-1]
+            if previous[0] == "num" or previous == ("op", ")") or (previous[0] == "name" and previous[1] not in _FUNCTIONS):
+                tokens.append(("op", "*"))
+        tokens.append(token)
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """+ - * / ^ 괄호, 숫자, pi, sqrt만 허용하는 재귀 하강 계산기 (eval 사용 안 함)"""
+
+    def __init__(self, tokens: List[Tuple[str, str]], pi: float):
+        self.tokens = tokens
+        self.position = 0
+        self.pi = pi
+
+    def parse(self) -> float:
+        if not self.tokens:
+            raise ExpressionError("empty expression")
+        value = self._sum()
+        if self.position != len(self.tokens):
+            raise ExpressionError(f"unexpected token {self.tokens[self.position][1]!r}")
+        return value
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _take_op(self, *operators: str) -> Optional[str]:
+        token = self._peek()
+        if token and token[0] == "op" and token[1] in operators:
+            self.position += 1
+            return token[1]
+        return None
+
+    def _sum(self) -> float:
+        value = self._product()
+        while True:
+            operator = self._take_op("+", "-")
+            if operator is None:
+                return value
+            right = self._product()
+            value = value + right if operator == "+" else value - right
+
+    def _product(self) -> float:
+        value = self._unary()
+        while True:
+            operator = self._take_op("*", "/")
+            if operator is None:
+                return value
+            right = self._unary()
+            if operator == "/":
+                if right == 0:
+                    raise ExpressionError("division by zero")
+                value /= right
+            else:
+                value *= right
+
+    def _unary(self) -> float:
+        operator = self._take_op("+", "-")
+        if operator is not None:
+            value = self._unary()
+            return -value if operator == "-" else value
+        return self._power()
+
+    def _power(self) -> float:
+        base = self._atom()
+        if self._take_op("^") is None:
+            return base
+        exponent = self._unary()
+        if abs(exponent) > 64 or (base < 0 and exponent != int(exponent)):
+            raise ExpressionError("unsupported power")
+        return base ** exponent
+
+    def _atom(self) -> float:
+        token = self._peek()
+        if token is None:
+            raise ExpressionError("unexpected end of expression")
+        self.position += 1
+        kind, value = token
+        if kind == "num":
+            return float(value)
+        if kind == "name":
+            if value == "pi":
+                return self.pi
+            if value in _FUNCTIONS:
+                if self._take_op("(") is None:
+                    raise ExpressionError(f"{value} needs parentheses")
+                argument = self._sum()
+                if self._take_op(")") is None:
+                    raise ExpressionError("unclosed parenthesis")
+                if argument < 0:
+                    raise ExpressionError("square root of a negative number")
+                return _FUNCTIONS[value](argument)
+            # 변수나 남은 단위 - 계산할 수 없는 식
+            raise ExpressionError(f"unknown name {value!r}")
+        if value == "(":
+            inner = self._sum()
+            if self._take_op(")") is None:
+                raise ExpressionError("unclosed parenthesis")
+            return inner
+        raise ExpressionError(f"unexpected token {value!r}")
+
+
+def evaluate(expression: str) -> Tuple[float, ...]:
+    """계산 가능한 식이면 값 (π가 있으면 (정확한 π 값, 3.14 값)), 아니면 ExpressionError"""
+    tokens = _tokenize(expression)
+    if ("name", "pi") in tokens:
+        return _Parser(tokens, math.pi).parse(), _Parser(tokens, TEXTBOOK_PI).parse()
+    return (_Parser(tokens, math.pi).parse(),)
+
+
+def values_match(left: Tuple[float, ...], right: Tuple[float, ...], right_text: str = "") -> bool:
+    """두 값이 같은지 - π 근삿값과, 오른쪽이 반올림한 소수(예: 3.33)인 경우도 허용"""
+    decimals = _DECIMALS.search(right_text or "")
+    for a in left:
+        for b in right:
+            if abs(a - b) <= REL_TOLERANCE * max(1.0, abs(a), abs(b)):
+                return True
+            if decimals and abs(round(a, len(decimals.group(1))) - b) <= REL_TOLERANCE * max(1.0, abs(b)):
+                return True
+    return False
+
+
+def _spans(text: str) -> List[str]:
+    """식 후보 구간 (한글·쉼표·부등호 등에서 끊음)"""
+    spans = []
+    for chunk in text.split("|"):
+        spans.extend(span.strip() for span in _EXPRESSION_SPAN.findall(chunk) if re.search(r'\d|pi', span))
+    return spans
+
+
+def _try_evaluate(expression: str) -> Optional[Tuple[float, ...]]:
+    try:
+        return evaluate(expression)
+    except (ExpressionError, OverflowError, ValueError):
+        return None
+
+
+def parse_answer(correct_answer: str) -> Optional[Tuple[float, ...]]:
+    """정답 문자열의 값 ("x = 5", "12π cm²", "\\frac{3}{4}", "3√2") - 답이 여러 개이거나 식이 아니면 None"""
+    try:
+        spans = _spans(to_expression_text(correct_answer))
+    except ExpressionError:
+        return None
+    if len(spans) != 1:
+        return None
+    return _try_evaluate(spans[0].split("=")[-1])
+
+
+def verify_item(correct_answer: str, explanation: str) -> Verification:
+    """해설의 계산 단계(A = B = C)가 맞는지, 정답이 해설의 최종 값과 같은지 확인"""
+    answer_value = parse_answer(correct_answer)
+    if answer_value is None:
+        return Verification("unverifiable")
+
+    try:
+        spans = _spans(to_expression_text(explanation))
+    except ExpressionError:
+        return Verification("unverifiable", answer_value[0])
+
+    bad_steps = []
+    finals: List[Tuple[float, ...]] = []
+    last_value = None
+    for span in spans:
+        sides = [side.strip() for side in span.split("=")]
+        values = [_try_evaluate(side) if side else None for side in sides]
+        for index in range(1, len(sides)):
+            left, right = values[index - 1], values[index]
+            if left is not None and right is not None and not values_match(left, right, sides[index]):
+                bad_steps.append(f"{sides[index - 1]} = {sides[index]}")
+            # "x = 5", "S = 112"처럼 변수 하나에 값을 대입한 곳은 최종 값 후보
+            if right is not None and re.fullmatch(r'[A-Za-z]', sides[index - 1]):
+                finals.append(right)
+        evaluated = [value for value in values if value is not None]
+        if evaluated:
+            last_value = evaluated[-1]
+
+    if last_value is None:
+        return Verification("unverifiable", answer_value[0])
+    finals.append(last_value)
+
+    if bad_steps:
+        return Verification("step_error", answer_value[0], last_value[0], bad_steps)
+    if not any(values_match(final, answer_value) or values_match(answer_value, final) for final in finals):
+        return Verification("mismatch", answer_value[0], last_value[0])
+    return Verification("verified", answer_value[0], last_value[0])
+
+
+def _format_value(value: float, answer: str) -> Optional[str]:
+    """값을 원래 정답과 같은 표기로 (천 단위 쉼표, 분수, π 배수) - 간단히 나타낼 수 없으면 None"""
+    pi_symbol = "\\pi" if "\\pi" in answer else "π" if "π" in answer else ""
+    if pi_symbol:
+        value /= math.pi
+    tolerance = REL_TOLERANCE * max(1.0, abs(value))
+    if abs(value - round(value)) <= tolerance:
+        text = f"{int(round(value)):,}" if "," in answer else str(int(round(value)))
+    elif abs(value * 100 - round(value * 100)) <= tolerance * 100:
+        text = f"{value:.2f}".rstrip("0")
+    else:
+        fraction = Fraction(value).limit_denominator(1000)
+        if abs(float(fraction) - value) > tolerance:
+            return None
+        sign = "-" if fraction < 0 else ""
+        numerator, denominator = abs(fraction.numerator), fraction.denominator
+        text = (f"{sign}\\frac{{{numerator}}}{{{denominator}}}" if "\\frac" in answer
+                else f"{sign}{numerator}/{denominator}")
+    if pi_symbol:
+        text = ("" if text == "1" else "-" if text == "-1" else text) + pi_symbol
+    return text
+
+
+def corrected_answer(correct_answer: str, value: float) -> Optional[str]:
+    """정답의 값 부분만 해설의 최종 값으로 바꾼 문자열 (단위·"x =" 유지) - 값이 여러 개거나 간단히 나타낼 수 없으면 None"""
+    matches = list(_ANSWER_VALUE.finditer(correct_answer or ""))
+    if len(matches) != 1:
+        return None
+    formatted = _format_value(value, correct_answer)
+    if formatted is None:
+        return None
+    match = matches[0]
+    return correct_answer[:match.start()] + formatted + correct_answer[match.end():]
+
+
+class AnswerVerificationStats:
+    """생성 문항 검증 결과와 재생성 횟수"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {"verified": 0, "mismatch": 0, "step_error": 0, "unverifiable": 0, "regenerated": 0,
+                      "retry_budget_exhausted": 0, "corrected_after_retries": 0}
+
+    def record(self, name: str):
+        """검증 결과(status) 또는 regenerated / retry_budget_exhausted / corrected_after_retries 기록"""
+        with self._lock:
+            self.stats[name] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """검증한 문항 중 실패 비율 포함 통계"""
+        with self._lock:
+            stats = dict(self.stats)
+        checked = stats["verified"] + stats["mismatch"] + stats["step_error"]
+        stats["failure_rate"] = round((stats["mismatch"] + stats["step_error"]) / checked, 4) if checked else 0.0
+        return stats
+
+
+# 프로세스 전역 문항 검증 통계
+answer_verification_stats = AnswerVerificationStats()
@@ -0,0 +1,312 @@
+import time
+import random
+import logging
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Deque, Dict, Iterable, Optional, TypeVar
+from config.settings import settings
+
+T = TypeVar("T")
+
+# 재시도 대상 HTTP 상태 코드 (쿼터 초과 + 서버 오류)
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# 요청 단위 데드라인 (time.monotonic 기준 절대 시각)
+_request_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("llm_request_deadline", default=None)
+
+# 헤지 요청 실행용 공유 스레드 풀
+_hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+
+
+class DeadlineExceededError(TimeoutError):
+    """요청 예산 초과 에러"""
+
+
+class CircuitOpenError(RuntimeError):
+    """서킷 브레이커가 열려 있어 호출을 즉시 거부한 에러"""
+
+
+@contextmanager
+def request_deadline(timeout_seconds: Optional[float]):
+    """요청 단위 LLM 호출 예산 설정 (클라이언트 타임아웃 기반)"""
+    deadline = time.monotonic() + timeout_seconds if timeout_seconds else None
+    token = _request_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+def remaining_budget() -> Optional[float]:
+    """현재 요청의 남은 예산 (초), 데드라인이 없으면 None"""
+    deadline = _request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def get_status_code(error: Exception) -> Optional[int]:
+    """SDK 예외에서 HTTP 상태 코드 추출"""
+    return getattr(error, "status_code", None)
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """SDK 예외의 Retry-After 헤더 값 추출 (초)"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    try:
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms:
+            return float(retry_after_ms) / 1000
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            return float(retry_after)
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def is_client_error(error: Exception) -> bool:
+    """재시도하지 않는 4xx 응답인지 (서비스는 응답했으므로 서킷 브레이커 실패가 아님)"""
+    status_code = get_status_code(error)
+    return status_code is not None and 400 <= status_code < 500 and status_code not in RETRYABLE_STATUS_CODES
+
+
+def is_retryable(error: Exception) -> bool:
+    """재시도 가능한 에러인지 판단 (429/5xx, 타임아웃, 연결 오류)"""
+    status_code = get_status_code(error)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES
+    return type(error).__name__ in ("APITimeoutError", "APIConnectionError") or isinstance(error, TimeoutError)
+
+
+class LatencyTracker:
+    """템플릿별 최근 응답 지연 시간 기록"""
+
+    def __init__(self, window_size: int = 200):
+        self.window_size = window_size
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, latency: float):
+        """지연 시간 기록"""
+        with self._lock:
+            samples = self._samples.setdefault(key, deque(maxlen=self.window_size))
+            samples.append(latency)
+
+    def sample_count(self, key: str) -> int:
+        """기록된 샘플 수"""
+        with self._lock:
+            return len(self._samples.get(key, ()))
+
+    def percentile(self, key: str, p: float) -> Optional[float]:
+        """지연 시간 백분위수 (샘플이 없으면 None)"""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))
+        return samples[index]
+
+
+class CircuitBreaker:
+    """연속 실패 기반 서킷 브레이커 (closed → open → half_open)"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """호출 허용 여부 (open 상태에서 reset_timeout이 지나면 시험 호출을 한 번에 1개만 허용)"""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        """성공 기록 - 서킷 닫기"""
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._probing = False
+
+    def release_probe(self):
+        """시험 호출이 성공/실패 기록 없이 끝남 (요청 전 거부 등) - 다음 호출이 다시 시험"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        """실패 기록 - 임계치 도달 또는 half_open 실패 시 서킷 열기"""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    logging.warning(f"Circuit opened after {self.consecutive_failures} consecutive failures")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+class CallPolicy:
+    """데드라인 기반 LLM 호출 정책 (타임아웃, 재시도, 헤지 요청, 서킷 브레이커)"""
+
+    def __init__(self, default_timeout: float = 30.0, template_timeouts: Optional[Dict[str, float]] = None,
+                 max_retries: int = 2, base_backoff: float = 0.5, max_backoff: float = 8.0,
+                 hedge_templates: Iterable[str] = (), hedge_percentile: float = 95.0,
+                 hedge_min_samples: int = 20, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.default_timeout = default_timeout
+        self.template_timeouts = template_timeouts or {}
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.hedge_templates = set(hedge_templates)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latency = LatencyTracker()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "CallPolicy":
+        """환경변수 설정으로 정책 생성"""
+        return cls(
+            default_timeout=settings.llm_request_timeout,
+            template_timeouts=settings.llm_template_timeouts,
+            max_retries=settings.llm_max_retries,
+            hedge_templates=settings.llm_hedge_templates,
+            failure_threshold=settings.llm_circuit_failure_threshold,
+            reset_timeout=settings.llm_circuit_reset_seconds
+        )
+
+    def get_breaker(self, key: str) -> CircuitBreaker:
+        """대상(배포)별 서킷 브레이커 조회"""
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[key]
+
+    def attempt_timeout(self, template: Optional[str]) -> float:
+        """1회 시도 타임아웃 = min(템플릿 타임아웃, 남은 요청 예산)"""
+        timeout = self.template_timeouts.get(template or "", self.default_timeout)
+        budget = remaining_budget()
+        if budget is not None:
+            timeout = min(timeout, budget)
+        return timeout
+
+    def backoff_delay(self, attempt: int, error: Exception) -> float:
+        """재시도 대기 시간 (Retry-After 우선, 없으면 full jitter 지수 백오프)"""
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+
+    def execute(self, call: Callable[[float], T], template: Optional[str] = None, target: str = "default",
+                max_retries: Optional[int] = None) -> T:
+        """정책을 적용하여 호출 실행 - call은 1회 시도 타임아웃(초)을 인자로 받음"""
+        breaker = self.get_breaker(target)
+        retry_limit = self.max_retries if max_retries is None else max_retries
+        attempt = 0
+
+        while True:
+            timeout = self.attempt_timeout(template)
+            if timeout <= 0:
+                raise DeadlineExceededError("LLM request budget exhausted")
+
+            if not breaker.allow_request():
+                raise CircuitOpenError(f"LLM circuit is open for '{target}'")
+
+            try:
+                result = self._execute_with_hedge(call, template, timeout)
+                breaker.record_success()
+                return result
+            except Exception as e:
+                if not is_retryable(e):
+                    # 4xx는 배포가 응답한 것이므로 서킷을 닫고, 요청 전 거부(레이트 리미터 등)는 기록하지 않음
+                    if is_client_error(e):
+                        breaker.record_success()
+                    raise
+                breaker.record_failure()
+
+                if attempt >= retry_limit:
+                    raise
+
+                delay = self.backoff_delay(attempt, e)
+                budget = remaining_budget()
+                if budget is not None and delay >= budget:
+                    logging.warning(f"Retry delay {delay:.2f}s exceeds remaining budget {budget:.2f}s")
+                    raise
+
+                logging.warning(f"LLM call failed (status={get_status_code(e)}), retrying in {delay:.2f}s: {e}")
+                time.sleep(delay)
+                attempt += 1
+            finally:
+                # 결과를 기록하지 않고 끝난 시험 호출이 half_open 서킷을 계속 막지 않도록
+                breaker.release_probe()
+
+    def _execute_with_hedge(self, call: Callable[[float], T], template: Optional[str], timeout: float) -> T:
+        """헤지 대상이면 p95 지연 후 중복 요청을 보내고 먼저 끝난 결과 사용"""
+        key = template or "default"
+        hedge_delay = self._hedge_delay(template)
+
+        if hedge_delay is None or hedge_delay >= timeout:
+            start = time.monotonic()
+            result = call(timeout)
+            self.latency.record(key, time.monotonic() - start)
+            return result
+
+        start = time.monotonic()
+        # 풀 스레드에서도 요청 데드라인(contextvars)이 보이도록 호출자 컨텍스트 복사본에서 실행
+        primary = _hedge_executor.submit(contextvars.copy_context().run, call, timeout)
+        done, _ = wait([primary], timeout=hedge_delay)
+        if done:
+            result = primary.result()
+            self.latency.record(key, time.monotonic() - start)
+            return result
+
+        logging.info(f"Hedging '{key}' request after {hedge_delay:.2f}s")
+        hedge = _hedge_executor.submit(contextvars.copy_context().run, call, max(timeout - hedge_delay, 0.1))
+        pending = {primary, hedge}
+        last_error: Optional[BaseException] = None
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # 패배한 요청은 취소 (이미 전송된 경우 결과를 버리고 자체 타임아웃으로 종료)
+                    for loser in pending:
+                        loser.cancel()
+                    self.latency.record(key, time.monotonic() - start)
+                    return future.result()
+                last_error = future.exception()
+
+        raise last_error
+
+    def _hedge_delay(self, template: Optional[str]) -> Optional[float]:
+        """헤지 요청 지연 시간 (샘플이 충분한 헤지 대상 템플릿만)"""
+        if template not in self.hedge_templates:
+            return None
+        if self.latency.sample_count(template) < self.hedge_min_samples:
+            return None
+        return self.latency.percentile(template, self.hedge_percentile)
+
+
+# 프로세스 전역 호출 정책 인스턴스 (서킷/지연 통계 공유)
+call_policy = CallPolicy.from_settings()
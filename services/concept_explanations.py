@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from config.settings import settings
+
+# 힌트 레벨 (GeneratedItemHandler._determine_hint_level과 같은 값) - 간단한 설명부터 자세한 설명 순
+EXPLANATION_LEVELS = ["advanced", "intermediate", "beginner"]
+
+EXPLANATION_SYSTEM_PROMPT = "너는 중학생에게 수학 개념을 쉽고 친근하게 설명하는 선생님이야."
+
+EXPLANATION_USER_PROMPT = "'{concept}' 개념을 중학생이 이해하기 쉽게 설명해주세요.\n{guidance}"
+
+LEVEL_GUIDANCE = {
+    "beginner": "기초부터 차근차근, 쉬운 예시를 들어 단계별로 설명해주세요.",
+    "intermediate": "핵심 정의와 성질을 예시 하나와 함께 설명해주세요.",
+    "advanced": "핵심만 간결하게 정리하고, 자주 하는 실수나 응용 포인트를 짚어주세요."
+}
+
+# 프롬프트 템플릿이 바뀌면 버전이 바뀌어 이전에 생성한 설명은 쓰지 않음
+PROMPT_VERSION = hashlib.sha256(json.dumps(
+    [EXPLANATION_SYSTEM_PROMPT, EXPLANATION_USER_PROMPT, LEVEL_GUIDANCE], ensure_ascii=False, sort_keys=True
+).encode("utf-8")).hexdigest()[:12]
+
+# 저장소 파일 변경 확인 간격 (초)
+CHECK_INTERVAL_SECONDS = 30
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_explanation_prompt(concept: str, level: str) -> Tuple[str, str]:
+    """개념·레벨별 설명 프롬프트 (오프라인 미리 생성과 즉시 생성이 같은 프롬프트 사용)"""
+    guidance = LEVEL_GUIDANCE.get(level, LEVEL_GUIDANCE["beginner"])
+    return EXPLANATION_SYSTEM_PROMPT, EXPLANATION_USER_PROMPT.format(concept=concept, guidance=guidance)
+
+
+def levels_from(level: str) -> List[str]:
+    """level부터 더 자세한 레벨 순서 ("더 자세한 설명" 요청 시 다음 레벨 사용)"""
+    if level not in EXPLANATION_LEVELS:
+        level = "beginner"
+    return EXPLANATION_LEVELS[EXPLANATION_LEVELS.index(level):]
+
+
+def resolve_store_path(path: str) -> str:
+    """상대 경로는 앱 루트 기준"""
+    return path if os.path.isabs(path) else os.path.join(ROOT_DIR, path)
+
+
+def load_catalog(path: str) -> List[str]:
+    """개념 목록 파일 (한 줄에 '개념명<TAB>문항 수') → 개념명 목록"""
+    concepts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            name = line.split("\t")[0].strip()
+            if name and name not in concepts:
+                concepts.append(name)
+    return concepts
+
+
+def read_store_file(path: str) -> Dict[str, Any]:
+    """저장소 파일 읽기 (없으면 빈 저장소)"""
+    if not os.path.exists(path):
+        return {"prompt_version": PROMPT_VERSION, "explanations": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_store_file(path: str, data: Dict[str, Any]) -> None:
+    """저장소 파일 원자적 교체 (읽는 워커가 쓰다 만 파일을 보지 않도록)"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+class ConceptExplanationStore:
+    """개념·힌트 레벨별로 미리 생성한 설명 (LLM 호출 없이 제공, 프롬프트 버전이 다르면 무시)"""
+
+    def __init__(self, path: str = ""):
+        self.path = resolve_store_path(path) if path else ""
+        self._explanations: Dict[str, Dict[str, str]] = {}
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stale_files": 0}
+
+    @classmethod
+    def from_settings(cls) -> "ConceptExplanationStore":
+        """환경변수 설정으로 생성"""
+        return cls(settings.concept_explanation_store_path)
+
+    def get(self, concept: str, level: str, exclude: Optional[set] = None) -> Optional[str]:
+        """level부터 더 자세한 레벨 순으로, exclude(이미 보여준 설명)에 없는 첫 설명"""
+        self._reload_if_changed()
+        levels = self._explanations.get(concept, {})
+        for candidate in levels_from(level):
+            explanation = levels.get(candidate)
+            if explanation and (not exclude or explanation not in exclude):
+                self._count("hits")
+                return explanation
+        self._count("misses")
+        return None
+
+    def has(self, concept: str) -> bool:
+        """개념의 미리 생성된 설명이 있는지 (있으면 prefetch 불필요)"""
+        self._reload_if_changed()
+        return bool(self._explanations.get(concept))
+
+    def _reload_if_changed(self):
+        """파일이 바뀌었으면 다시 읽기 (확인은 CHECK_INTERVAL_SECONDS마다)"""
+        now = time.monotonic()
+        if not self.path or (self._mtime is not None and now - self._checked_at < CHECK_INTERVAL_SECONDS):
+            return
+
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                self._explanations, self._mtime = {}, 0.0
+                return
+            if mtime == self._mtime:
+                return
+
+            self._mtime = mtime
+            try:
+                data = read_store_file(self.path)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Could not load concept explanation store: {e}")
+                self._explanations = {}
+                return
+
+            if data.get("prompt_version") != PROMPT_VERSION:
+                logging.warning(f"Concept explanation store is for prompt version {data.get('prompt_version')}, "
+                                f"current is {PROMPT_VERSION} - generating live until it is rebuilt")
+                self.stats["stale_files"] += 1
+                self._explanations = {}
+                return
+            self._explanations = data.get("explanations", {})
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """적중 수와 적재된 개념 수"""
+        self._reload_if_changed()
+        with self._lock:
+            stats = dict(self.stats)
+            stats["concepts"] = len(self._explanations)
+        stats["prompt_version"] = PROMPT_VERSION
+        return stats
+
+
+# 프로세스 전역 개념 설명 저장소
+concept_explanation_store = ConceptExplanationStore.from_settings()
@@ -0,0 +1,203 @@
+import time
+import random
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional
+from config.settings import settings
+
+if TYPE_CHECKING:
+    from openai import AzureOpenAI
+
+# 남은 쿼터가 이 비율 아래로 떨어지면 점수에 패널티 부여
+LOW_QUOTA_RATIO = 0.1
+
+
+@dataclass
+class Deployment:
+    """Azure OpenAI 배포 정보 및 관측 상태"""
+    name: str
+    endpoint: str
+    api_key: str
+    model: str
+    api_version: str = "2023-05-15"
+    weight: float = 1.0
+    ewma_latency: Optional[float] = None
+    throttled_until: float = 0.0
+    remaining_requests: Optional[int] = None
+    limit_requests: Optional[int] = None
+    remaining_tokens: Optional[int] = None
+    limit_tokens: Optional[int] = None
+    total_calls: int = 0
+    total_throttles: int = 0
+    total_failures: int = 0
+    client: Optional["AzureOpenAI"] = field(default=None, repr=False)
+
+    def get_client(self) -> "AzureOpenAI":
+        """배포별 클라이언트 (커넥션 재사용을 위해 지연 생성 후 캐시, openai 패키지도 첫 호출 때 import)"""
+        if self.client is None:
+            from openai import AzureOpenAI
+
+            self.client = AzureOpenAI(
+                api_key=self.api_key,
+                azure_endpoint=self.endpoint,
+                api_version=self.api_version,
+                max_retries=0  # 재시도는 call_policy에서 처리
+            )
+        return self.client
+
+
+class DeploymentRouter:
+    """EWMA 지연, 최근 429, 남은 쿼터 헤더 기반 배포 선택기"""
+
+    def __init__(self, deployments: List[Deployment], alpha: float = 0.3,
+                 throttle_cooldown: float = 10.0, default_latency: float = 1.0, explore_ratio: float = 0.05):
+        if not deployments:
+            raise ValueError("At least one OpenAI deployment is required")
+        self.deployments = deployments
+        self.alpha = alpha
+        self.throttle_cooldown = throttle_cooldown
+        self.default_latency = default_latency
+        self.explore_ratio = explore_ratio
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "DeploymentRouter":
+        """환경변수 설정으로 라우터 생성"""
+        deployments = [
+            Deployment(
+                name=d["name"],
+                endpoint=d["endpoint"],
+                api_key=d["api_key"],
+                model=d["model"],
+                api_version=d.get("api_version", settings.openai_api_version),
+                weight=float(d.get("weight", 1.0))
+            )
+            for d in settings.openai_deployments
+        ]
+        return cls(deployments)
+
+    def get(self, name: str) -> Optional[Deployment]:
+        """이름으로 배포 조회"""
+        for deployment in self.deployments:
+            if deployment.name == name:
+                return deployment
+        return None
+
+    def ranked(self, model: Optional[str] = None) -> List[Deployment]:
+        """호출 우선순위 순으로 정렬된 배포 목록 (model 지정 시 해당 모델 배포만)"""
+        candidates = [d for d in self.deployments if model is None or d.model == model]
+        if not candidates:
+            candidates = list(self.deployments)
+
+        now = time.monotonic()
+        with self._lock:
+            scored = [(self._score(d, now), random.random(), d) for d in candidates]
+        scored.sort(key=lambda item: (item[0], item[1]))
+        ranked = [d for _, _, d in scored]
+
+        # 일부 요청은 후순위 배포로 보내 오래된 지연 통계를 갱신 (스로틀 중인 배포 제외)
+        if len(ranked) > 1 and random.random() < self.explore_ratio:
+            explorable = [d for d in ranked[1:] if d.throttled_until <= now]
+            if explorable:
+                chosen = random.choice(explorable)
+                ranked.remove(chosen)
+                ranked.insert(0, chosen)
+        return ranked
+
+    def _score(self, deployment: Deployment, now: float) -> float:
+        """낮을수록 우선 - 예상 지연 / 가중치, 스로틀·쿼터 부족 시 패널티"""
+        known = [d.ewma_latency for d in self.deployments if d.ewma_latency is not None]
+        prior = sum(known) / len(known) if known else self.default_latency
+        latency = deployment.ewma_latency if deployment.ewma_latency is not None else prior
+
+        score = latency / max(deployment.weight, 0.01)
+
+        if deployment.throttled_until > now:
+            score *= 100
+        if self._is_quota_low(deployment.remaining_requests, deployment.limit_requests) or \
+                self._is_quota_low(deployment.remaining_tokens, deployment.limit_tokens):
+            score *= 10
+        return score
+
+    @staticmethod
+    def _is_quota_low(remaining: Optional[int], limit: Optional[int]) -> bool:
+        """남은 쿼터가 한도 대비 부족한지 판단"""
+        if remaining is None:
+            return False
+        if limit:
+            return remaining / limit < LOW_QUOTA_RATIO
+        return remaining <= 0
+
+    def record_success(self, deployment: Deployment, latency: float, headers: Optional[Mapping[str, Any]] = None):
+        """성공 응답 기록 - EWMA 지연과 쿼터 헤더 갱신"""
+        with self._lock:
+            deployment.total_calls += 1
+            if deployment.ewma_latency is None:
+                deployment.ewma_latency = latency
+            else:
+                deployment.ewma_latency = self.alpha * latency + (1 - self.alpha) * deployment.ewma_latency
+            if headers:
+                self._update_quota(deployment, headers)
+
+    def record_failure(self, deployment: Deployment, status_code: Optional[int] = None,
+                       retry_after: Optional[float] = None, headers: Optional[Mapping[str, Any]] = None):
+        """실패 기록 - 429면 쿨다운 동안 후순위로 밀기"""
+        with self._lock:
+            deployment.total_calls += 1
+            if status_code == 429:
+                deployment.total_throttles += 1
+                deployment.throttled_until = time.monotonic() + (retry_after or self.throttle_cooldown)
+                logging.warning(f"Deployment '{deployment.name}' throttled for {retry_after or self.throttle_cooldown:.1f}s")
+            else:
+                deployment.total_failures += 1
+            if headers:
+                self._update_quota(deployment, headers)
+
+    @staticmethod
+    def _update_quota(deployment: Deployment, headers: Mapping[str, Any]):
+        """x-ratelimit-* 헤더에서 남은 쿼터 갱신"""
+        def read_int(key: str) -> Optional[int]:
+            value = headers.get(key)
+            try:
+                return int(value) if value is not None else None
+            except (TypeError, ValueError):
+                return None
+
+        remaining_requests = read_int("x-ratelimit-remaining-requests")
+        remaining_tokens = read_int("x-ratelimit-remaining-tokens")
+        limit_requests = read_int("x-ratelimit-limit-requests")
+        limit_tokens = read_int("x-ratelimit-limit-tokens")
+
+        if remaining_requests is not None:
+            deployment.remaining_requests = remaining_requests
+        if remaining_tokens is not None:
+            deployment.remaining_tokens = remaining_tokens
+        if limit_requests is not None:
+            deployment.limit_requests = limit_requests
+        if limit_tokens is not None:
+            deployment.limit_tokens = limit_tokens
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """배포별 관측 상태 (모니터링/디버깅용)"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "name": d.name,
+                    "model": d.model,
+                    "weight": d.weight,
+                    "ewma_latency": round(d.ewma_latency, 3) if d.ewma_latency is not None else None,
+                    "is_throttled": d.throttled_until > now,
+                    "remaining_requests": d.remaining_requests,
+                    "remaining_tokens": d.remaining_tokens,
+                    "total_calls": d.total_calls,
+                    "total_throttles": d.total_throttles,
+                    "total_failures": d.total_failures
+                }
+                for d in self.deployments
+            ]
+
+
+# 프로세스 전역 배포 라우터 인스턴스
+deployment_router = DeploymentRouter.from_settings()
@@ -0,0 +1,101 @@
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+# 유사 문항과 함께 생성하는 힌트 단계 수 (시도 1~3회에 한 단계씩, 그 다음은 정답 공개)
+HINT_LADDER_SIZE = 3
+
+# 단계별 힌트 성격 (유사 문항 프롬프트에 그대로 들어감)
+HINT_LADDER_GUIDE = [
+    "1단계: 문제에서 주어진 것과 구하는 것을 스스로 확인하게 하는 질문",
+    "2단계: 사용할 개념이나 공식을 떠올리게 하는 질문",
+    "3단계: 풀이의 첫 계산 단계를 짚어 주되 최종 답은 말하지 않는 질문"
+]
+
+# 사다리 힌트로 답할 수 있는 짧은 답안 시도 (이보다 길거나 질문이면 LLM이 대화로 답함)
+MAX_ATTEMPT_CHARS = 30
+
+
+def sanitize_hint_ladder(ladder: Any, correct_answer: str) -> List[str]:
+    """LLM이 만든 힌트 사다리 검증 - 문자열 힌트만, 최대 단계 수까지, 정답을 드러내는 단계부터는 버림"""
+    if not isinstance(ladder, list):
+        return []
+
+    answer_numbers = set(re.findall(r'\d+(?:\.\d+)?', correct_answer or ""))
+    answer_text = (correct_answer or "").replace(" ", "")
+    hints = []
+    for hint in ladder[:HINT_LADDER_SIZE]:
+        if not isinstance(hint, str) or not hint.strip():
+            break
+        hint = hint.strip()
+        compact = hint.replace(" ", "")
+        # 정답 문자열이나 "정답은 ..." 형태가 들어 있으면 이 단계부터 사용하지 않음
+        if (answer_text and len(answer_text) >= 2 and answer_text in compact) or "정답은" in compact:
+            break
+        if answer_numbers and re.search(r'(?:=|는|은)\s*(' + "|".join(map(re.escape, answer_numbers)) + r')(?![\d.])', hint):
+            break
+        hints.append(hint)
+    return hints
+
+
+def count_served_hints(ladder: List[str], conversation_history: List[Dict[str, str]]) -> int:
+    """대화 기록에 이미 나간 사다리 힌트 수 (다음에 보여줄 단계)"""
+    served = 0
+    assistant_messages = [message.get("content", "") for message in conversation_history or []
+                          if message.get("role") == "assistant"]
+    for hint in ladder:
+        if any(hint in content for content in assistant_messages):
+            served += 1
+        else:
+            break
+    return served
+
+
+def is_ladder_turn(student_message: str, answer_analysis: Dict[str, Any]) -> bool:
+    """힌트 요청이나 짧은 답안 시도인지 (사다리로 답함) - 그 밖의 질문·대화는 LLM으로"""
+    if answer_analysis.get("feedback_type") == "hint_request":
+        return True
+    message = (student_message or "").strip()
+    if not message or "?" in message or len(message) > MAX_ATTEMPT_CHARS:
+        return False
+    return bool(re.search(r'\d', message)) or answer_analysis.get("has_good_approach", False)
+
+
+def next_hint(generated_question_data: Dict[str, Any], conversation_history: List[Dict[str, str]],
+              attempt_count: Optional[int] = None) -> Optional[str]:
+    """이번 차례의 사다리 힌트 (사다리가 없거나 다 썼으면 None)"""
+    ladder = generated_question_data.get("hint_ladder") or []
+    if not isinstance(ladder, list):
+        return None
+
+    step = count_served_hints(ladder, conversation_history)
+    if attempt_count:
+        step = max(step, attempt_count - 1)
+    return ladder[step] if step < len(ladder) else None
+
+
+class HintLadderStats:
+    """힌트 차례(힌트 요청·짧은 답안 시도) 중 LLM 호출 없이 사다리로 답한 비율"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {"hint_turns": 0, "served_locally": 0, "off_script": 0, "ladder_missing": 0,
+                      "ladder_exhausted": 0}
+
+    def record(self, outcome: str):
+        """served_locally / off_script / ladder_missing / ladder_exhausted 중 하나를 기록 (off_script는 힌트 차례가 아님)"""
+        with self._lock:
+            if outcome != "off_script":
+                self.stats["hint_turns"] += 1
+            self.stats[outcome] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """로컬 처리 비율 포함 통계"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["local_share"] = round(stats["served_locally"] / stats["hint_turns"], 4) if stats["hint_turns"] else 0.0
+        return stats
+
+
+# 프로세스 전역 힌트 사다리 통계
+hint_ladder_stats = HintLadderStats()
@@ -0,0 +1,286 @@
+import time
+import uuid
+import base64
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+from config.settings import settings
+from utils import json_codec
+
+# Idempotency-Key 최대 길이 (UUID/ULID 등 클라이언트 생성 키)
+MAX_KEY_LENGTH = 255
+
+# 워커 내부에 보관할 최대 응답 수 (넘으면 오래된 것부터 제거)
+MAX_LOCAL_ENTRIES = 5000
+
+# 재실행해야 하는 응답 (5xx, 429)을 동시에 기다리던 다른 워커에게만 넘겨주는 시간 (초)
+SHARED_RESULT_TTL_SECONDS = 2
+
+# 다른 워커의 원 요청 결과를 기다릴 때 폴링 간격 (초)
+POLL_INTERVAL_SECONDS = 0.05
+
+# 원 요청이 실행되는 동안 Redis 락 만료를 연장하는 간격 (락 유지 시간 대비 비율)
+LOCK_RENEW_RATIO = 1 / 3
+
+
+class IdempotencyKeyError(ValueError):
+    """잘못된 Idempotency-Key 또는 다른 요청 바디에 같은 키를 재사용"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class StoredResponse:
+    """재전송할 응답 (압축 전 바디 - 압축은 재전송 요청의 Accept-Encoding으로 다시 결정)"""
+    status_code: int
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    fingerprint: str = ""
+    expires_at: float = 0.0
+
+    @property
+    def is_cacheable(self) -> bool:
+        """다시 실행해도 결과가 달라질 수 있는 응답(5xx, 429)은 보관하지 않음"""
+        return self.status_code < 500 and self.status_code != 429
+
+    def to_bytes(self) -> bytes:
+        """Redis 보관용 직렬화"""
+        return json_codec.dumps({
+            "status_code": self.status_code,
+            "body": base64.b64encode(self.body).decode("ascii"),
+            "headers": self.headers,
+            "fingerprint": self.fingerprint
+        })
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "StoredResponse":
+        """Redis 보관 값 복원"""
+        data = json_codec.loads(raw)
+        return cls(data["status_code"], base64.b64decode(data["body"]), data.get("headers") or {},
+                   data.get("fingerprint", ""))
+
+
+def make_fingerprint(body: bytes) -> str:
+    """요청 바디 지문 (같은 키로 다른 요청을 보내는 클라이언트 버그 탐지)"""
+    return hashlib.sha256(body or b"").hexdigest()
+
+
+class _InFlightRequest:
+    """진행 중인 원 요청 (결과가 채워지면 같은 키로 기다리던 재시도가 깨어남)"""
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.response: Optional[StoredResponse] = None
+        self.error: Optional[BaseException] = None
+
+
+class IdempotencyCache:
+    """Idempotency-Key별 첫 응답을 짧게 보관하고, 진행 중인 같은 키 요청은 결과를 기다림 (local + redis)"""
+
+    def __init__(self, ttl_seconds: float = 300, mode: str = "local", redis_url: str = "",
+                 wait_seconds: float = 60, key_prefix: str = "llm-tutor:idempotency"):
+        self.ttl_seconds = ttl_seconds
+        self.mode = mode
+        self.redis_url = redis_url
+        self.wait_seconds = wait_seconds
+        self.key_prefix = key_prefix
+        self._responses: "OrderedDict[str, StoredResponse]" = OrderedDict()
+        self._in_flight: Dict[str, _InFlightRequest] = {}
+        self._redis = None
+        self._lock = threading.Lock()
+        self.stats = {"executed": 0, "replayed_local": 0, "replayed_remote": 0, "coalesced": 0,
+                      "fingerprint_mismatch": 0}
+
+    @classmethod
+    def from_settings(cls) -> "IdempotencyCache":
+        """환경변수 설정으로 생성"""
+        return cls(settings.idempotency_ttl_seconds, settings.idempotency_mode,
+                   settings.redis_connection_string, settings.idempotency_wait_seconds)
+
+    @property
+    def enabled(self) -> bool:
+        """TTL이 0이면 Idempotency-Key를 무시"""
+        return self.ttl_seconds > 0
+
+    def run(self, key: str, fingerprint: str, fn: Callable[[], StoredResponse]) -> Tuple[StoredResponse, bool]:
+        """key의 보관된 응답이 있으면 그대로, 진행 중이면 기다렸다가, 아니면 fn을 실행 → (응답, 재전송 여부)"""
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise IdempotencyKeyError(f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+
+        with self._lock:
+            stored = self._get_local(key)
+            if stored is not None:
+                self._check_fingerprint(stored.fingerprint, fingerprint)
+                self.stats["replayed_local"] += 1
+                return stored, True
+
+            call = self._in_flight.get(key)
+            if call is not None:
+                self._check_fingerprint(call.fingerprint, fingerprint)
+                self.stats["coalesced"] += 1
+                is_leader = False
+            else:
+                call = _InFlightRequest(fingerprint)
+                self._in_flight[key] = call
+                is_leader = True
+
+        if not is_leader:
+            if not call.done.wait(self.wait_seconds):
+                raise TimeoutError(f"Timed out waiting for in-flight request with Idempotency-Key '{key}'")
+            if call.error is not None:
+                raise call.error
+            return call.response, True
+
+        try:
+            call.response, replayed = self._run_leader(key, fingerprint, fn)
+            if call.response.is_cacheable:
+                with self._lock:
+                    self._put_local(key, call.response)
+            return call.response, replayed
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            call.done.set()
+
+    def _run_leader(self, key: str, fingerprint: str, fn: Callable[[], StoredResponse]) -> Tuple[StoredResponse, bool]:
+        """워커 내부 리더 - redis 모드면 다른 워커에 보관/진행 중인 같은 키도 확인"""
+        client = self._get_redis() if self.mode == "redis" else None
+        if client is not None:
+            try:
+                return self._run_shared(client, key, fingerprint, fn)
+            except _RedisUnavailable as e:
+                logging.warning(f"Redis idempotency cache unavailable, using local cache only: {e}")
+
+        return self._execute(fn, fingerprint), False
+
+    def _run_shared(self, client, key: str, fingerprint: str,
+                    fn: Callable[[], StoredResponse]) -> Tuple[StoredResponse, bool]:
+        """Redis 락으로 워커 간 원 요청 선출 - 락을 못 잡으면 결과를 폴링"""
+        hashed = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        lock_key = f"{self.key_prefix}:{hashed}:lock"
+        result_key = f"{self.key_prefix}:{hashed}:response"
+        token = uuid.uuid4().hex
+        lock_ttl_ms = int(self.wait_seconds * 1000)
+        deadline = time.monotonic() + self.wait_seconds
+
+        while True:
+            try:
+                cached = client.get(result_key)
+                if cached is None:
+                    acquired = client.set(lock_key, token, nx=True, px=lock_ttl_ms)
+            except Exception as e:
+                raise _RedisUnavailable(e)
+
+            if cached is not None:
+                stored = StoredResponse.from_bytes(cached)
+                self._check_fingerprint(stored.fingerprint, fingerprint)
+                with self._lock:
+                    self.stats["replayed_remote"] += 1
+                return stored, True
+            if acquired:
+                break
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting for shared in-flight request with Idempotency-Key '{key}'")
+            time.sleep(POLL_INTERVAL_SECONDS)
+
+        # 파이프라인이 락 유지 시간보다 오래 걸려도 다른 워커가 같은 키를 다시 실행하지 않도록 락 연장
+        stop_renewing = threading.Event()
+        threading.Thread(target=self._renew_lock, args=(client, lock_key, token, lock_ttl_ms, stop_renewing),
+                         name="idempotency-lock", daemon=True).start()
+        try:
+            stored = self._execute(fn, fingerprint)
+            ttl = self.ttl_seconds if stored.is_cacheable else SHARED_RESULT_TTL_SECONDS
+            try:
+                client.set(result_key, stored.to_bytes(), px=int(ttl * 1000))
+            except Exception as e:
+                logging.warning(f"Could not store idempotent response: {e}")
+            return stored, False
+        finally:
+            stop_renewing.set()
+            try:
+                # 내 락일 때만 해제 (실패 시 기다리던 워커가 직접 실행하도록)
+                if client.get(lock_key) == token.encode("utf-8"):
+                    client.delete(lock_key)
+            except Exception:
+                pass
+
+    @staticmethod
+    def _renew_lock(client, lock_key: str, token: str, lock_ttl_ms: int, stop: threading.Event) -> None:
+        """원 요청이 끝날 때까지 내 락의 만료 시간을 주기적으로 연장 (다른 워커의 락이면 중단)"""
+        while not stop.wait(lock_ttl_ms / 1000 * LOCK_RENEW_RATIO):
+            try:
+                if client.get(lock_key) != token.encode("utf-8") or not client.pexpire(lock_key, lock_ttl_ms):
+                    return
+            except Exception as e:
+                logging.warning(f"Could not renew idempotency lock: {e}")
+                return
+
+    def _execute(self, fn: Callable[[], StoredResponse], fingerprint: str) -> StoredResponse:
+        """원 요청 파이프라인 실행"""
+        with self._lock:
+            self.stats["executed"] += 1
+        stored = fn()
+        stored.fingerprint = fingerprint
+        return stored
+
+    def _check_fingerprint(self, expected: str, fingerprint: str) -> None:
+        """같은 키에 다른 요청 바디면 422"""
+        if expected and fingerprint and expected != fingerprint:
+            self.stats["fingerprint_mismatch"] += 1
+            raise IdempotencyKeyError("Idempotency-Key was already used with a different request body", 422)
+
+    def _get_local(self, key: str) -> Optional[StoredResponse]:
+        """만료되지 않은 보관 응답 (lock 안에서 호출)"""
+        stored = self._responses.get(key)
+        if stored is not None and stored.expires_at <= time.monotonic():
+            del self._responses[key]
+            return None
+        return stored
+
+    def _put_local(self, key: str, stored: StoredResponse) -> None:
+        """응답 보관 - 만료/초과분 정리 (lock 안에서 호출)"""
+        now = time.monotonic()
+        stored.expires_at = now + self.ttl_seconds
+        self._responses[key] = stored
+        self._responses.move_to_end(key)
+        while self._responses:
+            oldest_key, oldest = next(iter(self._responses.items()))
+            if len(self._responses) <= MAX_LOCAL_ENTRIES and oldest.expires_at > now:
+                break
+            del self._responses[oldest_key]
+
+    def _get_redis(self):
+        """Redis 클라이언트 지연 생성"""
+        if self._redis is None and self.redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(self.redis_url, socket_timeout=1.0)
+            except Exception as e:
+                logging.warning(f"Redis idempotency cache disabled: {e}")
+                self.redis_url = ""
+        return self._redis
+
+    def get_stats(self) -> Dict[str, Any]:
+        """재전송으로 절약한 파이프라인 실행 수 등 통계"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["stored_local"] = len(self._responses)
+        stats["saved_executions"] = stats["replayed_local"] + stats["replayed_remote"] + stats["coalesced"]
+        return stats
+
+
+class _RedisUnavailable(Exception):
+    """Redis 연결 실패 (워커 내부 캐시로 대체)"""
+
+
+# 프로세스 전역 Idempotency-Key 캐시
+idempotency_cache = IdempotencyCache.from_settings()
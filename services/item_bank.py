@@ -0,0 +1,113 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+from config.settings import settings
+from services.answer_verifier import verify_item
+from services.concept_explanations import resolve_store_path, CHECK_INTERVAL_SECONDS
+
+
+def copy_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """세션이 문항을 고쳐도 은행 원본은 그대로 두도록 복사 (힌트 사다리 리스트 포함)"""
+    copied = dict(item)
+    if isinstance(copied.get("hint_ladder"), list):
+        copied["hint_ladder"] = list(copied["hint_ladder"])
+    return copied
+
+
+class ItemBank:
+    """해설 계산 검증을 통과한 유사 문항을 개념별로 보관 (LLM 부하 시 생성 대신 제공)"""
+
+    def __init__(self, path: str = "", per_concept: int = 20):
+        self.path = resolve_store_path(path) if path else ""
+        self.per_concept = per_concept
+        self._items: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._mtime: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.stats = {"added": 0, "served": 0, "misses": 0, "rejected_seed": 0}
+
+    @classmethod
+    def from_settings(cls) -> "ItemBank":
+        """환경변수 설정으로 생성"""
+        return cls(settings.item_bank_path, settings.item_bank_per_concept)
+
+    def add(self, concept: str, item: Dict[str, Any]):
+        """검증된 문항 보관 (같은 문제는 한 번만, 개념별 최대 수를 넘으면 오래된 것부터 버림)"""
+        if not concept or not item.get("new_question_text"):
+            return
+        self._load_seed()
+        with self._lock:
+            self._add_locked(concept, copy_item(item))
+
+    def pick(self, concept: str, conversation_history: List[Dict[str, str]]) -> Optional[Dict[str, Any]]:
+        """대화에 아직 나오지 않은 문항 하나 (돌아가며 제공, 없으면 None)"""
+        self._load_seed()
+        shown = [message.get("content", "") for message in conversation_history or []]
+        with self._lock:
+            items = self._items.get(concept)
+            for _ in range(len(items) if items else 0):
+                item = items[0]
+                items.rotate(-1)
+                if not any(item["new_question_text"] in content for content in shown):
+                    self.stats["served"] += 1
+                    return copy_item(item)
+            self.stats["misses"] += 1
+        return None
+
+    def _add_locked(self, concept: str, item: Dict[str, Any]) -> bool:
+        items = self._items.setdefault(concept, deque(maxlen=self.per_concept))
+        if any(existing["new_question_text"] == item["new_question_text"] for existing in items):
+            return False
+        items.append(item)
+        self.stats["added"] += 1
+        return True
+
+    def _load_seed(self):
+        """초기 문항 파일 ({"개념": [문항, ...]}) 읽기 - 파일이 바뀌면 다시 읽고(확인은 CHECK_INTERVAL_SECONDS마다), 검증에 실패한 문항은 버림"""
+        if not self.path or (self._checked_at is not None
+                             and time.monotonic() - self._checked_at < CHECK_INTERVAL_SECONDS):
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self._checked_at is not None and now - self._checked_at < CHECK_INTERVAL_SECONDS:
+                return
+            self._checked_at = now
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                return
+            if mtime == self._mtime:
+                return
+            self._mtime = mtime
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    seed = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Could not load item bank: {e}")
+                return
+
+            for concept, items in seed.items():
+                for item in items if isinstance(items, list) else []:
+                    if not isinstance(item, dict) or not item.get("new_question_text"):
+                        continue
+                    if verify_item(item.get("correct_answer", ""), item.get("explanation", "")).failed:
+                        self.stats["rejected_seed"] += 1
+                        continue
+                    self._add_locked(concept, copy_item(item))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """보관 문항 수와 부하 시 제공/미스 수"""
+        self._load_seed()
+        with self._lock:
+            stats = dict(self.stats)
+            stats["concepts"] = len(self._items)
+            stats["items"] = sum(len(items) for items in self._items.values())
+        return stats
+
+
+# 프로세스 전역 문항 은행
+item_bank = ItemBank.from_settings()
@@ -0,0 +1,51 @@
+import threading
+from typing import Any, Dict
+
+# 한 번의 호출로 함께 생성하는 난이도 (same은 바로 보여주고 나머지는 세션에 보관)
+VARIANT_DIFFICULTIES = ["easier", "same", "harder"]
+
+# 난이도별 문항 생성 지침 (유사 문항 프롬프트에 그대로 들어감)
+DIFFICULTY_GUIDANCE = {
+    "easier": "학생의 현재 수준보다 한 단계 쉽게 - 숫자를 작게 하고 풀이 단계를 줄여서",
+    "same": "학생의 정확도를 고려하여 너무 어렵지 않게",
+    "harder": "학생의 현재 수준보다 한 단계 어렵게 - 풀이 단계를 하나 더하거나 응용 상황으로"
+}
+
+DIFFICULTY_FEEDBACK = {
+    "easier": "괜찮아! '{concept}' 개념을 조금 더 쉬운 문제로 다시 연습해보자. 아래 문제를 풀어봐.",
+    "same": "좋아! '{concept}' 개념을 더 연습해볼까? 아래 문제를 풀어봐.",
+    "harder": "좋아! 이번엔 '{concept}' 개념의 조금 더 어려운 문제에 도전해볼까? 아래 문제를 풀어봐."
+}
+
+
+def similar_item_feedback(concept_name: str, difficulty: str, question_text: Any) -> str:
+    """난이도별 유사 문항 안내 문구"""
+    intro = DIFFICULTY_FEEDBACK.get(difficulty, DIFFICULTY_FEEDBACK["same"]).format(concept=concept_name)
+    return f"{intro}\n\n{question_text}"
+
+
+class ItemVariantStats:
+    """난이도 변형 동시 생성의 추가 호출 대비 절약한 왕복 수"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {"variant_calls": 0, "variants_stashed": 0, "served_from_stash": 0,
+                      "generated_on_demand": 0, "discarded": 0}
+
+    def record(self, name: str, count: int = 1):
+        """variant_calls / variants_stashed / served_from_stash / generated_on_demand / discarded 중 하나를 기록"""
+        with self._lock:
+            self.stats[name] += count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """보관한 변형 중 실제로 쓰인 비율 포함 통계 (추가 출력 토큰은 template_routing의 similar_item_variants 참고)"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["round_trips_saved"] = stats["served_from_stash"]
+        stats["stash_use_rate"] = (round(stats["served_from_stash"] / stats["variants_stashed"], 4)
+                                   if stats["variants_stashed"] else 0.0)
+        return stats
+
+
+# 프로세스 전역 난이도 변형 통계
+item_variant_stats = ItemVariantStats()
@@ -0,0 +1,237 @@
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from config.settings import settings
+from utils import json_codec
+
+# 큐 트리거 함수와 같은 이름 (function_app.job_worker의 queue_name)
+JOB_QUEUE_NAME = "tutor-jobs"
+
+# 작업 상태·결과 Blob 컨테이너 (jobs/{job_id}.json)
+JOB_CONTAINER_NAME = "tutor-jobs"
+
+# storage 모드 롱 폴링에서 상태를 다시 읽는 간격 (초)
+POLL_INTERVAL_SECONDS = 0.5
+
+# 429/5xx로 끝난 작업을 다시 실행하는 최대 횟수 (storage 모드는 host.json의 maxDequeueCount와 맞춤)
+MAX_ATTEMPTS = 3
+
+FINISHED_STATUSES = ("succeeded", "failed")
+
+# 작업 실행 함수: 요청 바디 → (HTTP 상태 코드, 응답 바디)
+JobExecutor = Callable[[Dict[str, Any]], Tuple[int, Dict[str, Any]]]
+
+
+class RetryableJobError(RuntimeError):
+    """429/5xx로 끝난 작업 - 큐 메시지를 다시 처리해야 함 (storage 모드는 호스트가 재전달)"""
+
+
+class JobQueue:
+    """오래 걸리는 생성 작업을 큐에 넣고 상태·결과 보관 (local: 워커 내부 스레드 풀, storage: Azure Storage Queue + Blob)"""
+
+    def __init__(self, mode: str = "local", connection_string: str = "", max_workers: int = 2,
+                 result_ttl_seconds: float = 3600, max_attempts: int = MAX_ATTEMPTS):
+        self.mode = mode
+        self.connection_string = connection_string
+        self.max_workers = max_workers
+        self.result_ttl_seconds = result_ttl_seconds
+        self.max_attempts = max_attempts
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._finished: Dict[str, threading.Event] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._queue_client = None
+        self._container_client = None
+        self._lock = threading.Lock()
+        self.stats = {"submitted": 0, "succeeded": 0, "failed": 0, "retried": 0, "duplicate_deliveries": 0}
+
+    @classmethod
+    def from_settings(cls) -> "JobQueue":
+        """환경변수 설정으로 생성"""
+        return cls(settings.job_queue_mode, settings.job_storage_connection_string,
+                   settings.job_local_max_workers, settings.job_result_ttl_seconds)
+
+    @property
+    def enabled(self) -> bool:
+        """비동기 작업 제출 가능 여부 (storage 모드는 연결 문자열 필요)"""
+        if self.mode == "storage":
+            return bool(self.connection_string)
+        return self.mode == "local"
+
+    def submit(self, payload: Dict[str, Any], execute: JobExecutor) -> Dict[str, Any]:
+        """작업 등록 후 queued 상태 반환 - local은 execute를 스레드 풀에서, storage는 큐 트리거 함수가 실행"""
+        job_id = uuid.uuid4().hex
+        record = {"job_id": job_id, "status": "queued", "request_type": payload.get("request_type"),
+                  "created_at": time.time(), "updated_at": time.time(), "attempts": 0}
+        self._save(record)
+
+        message = json_codec.dumps({"job_id": job_id, "payload": payload}).decode("utf-8")
+        if self.mode == "storage":
+            self._get_queue_client().send_message(message)
+        else:
+            self._get_executor().submit(self._run_local, message, execute)
+
+        with self._lock:
+            self.stats["submitted"] += 1
+        return record
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업 상태 (없으면 None)"""
+        if self.mode == "storage":
+            return self._read_blob(job_id)
+        self._expire()
+        with self._lock:
+            record = self._jobs.get(job_id)
+            return dict(record) if record else None
+
+    def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """끝날 때까지 최대 timeout초 기다린 뒤 상태 반환 (롱 폴링)"""
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            record = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if record is None or record["status"] in FINISHED_STATUSES or remaining <= 0:
+                return record
+            if self.mode == "storage":
+                time.sleep(min(POLL_INTERVAL_SECONDS, remaining))
+            else:
+                with self._lock:
+                    finished = self._finished.get(job_id)
+                if finished is None:
+                    return record
+                finished.wait(remaining)
+
+    def process(self, message: str, dequeue_count: int, execute: JobExecutor):
+        """큐 메시지 하나 실행 후 결과 저장 - 429/5xx는 MAX_ATTEMPTS 전까지 RetryableJobError로 다시 처리"""
+        data = json_codec.loads(message)
+        job_id = data["job_id"]
+        record = self.get(job_id) or {"job_id": job_id, "request_type": data["payload"].get("request_type"),
+                                      "created_at": time.time()}
+        if record.get("status") in FINISHED_STATUSES:
+            # 메시지 중복 전달 (처리 후 삭제 전에 가시성 시간이 지난 경우)
+            with self._lock:
+                self.stats["duplicate_deliveries"] += 1
+            return
+
+        record.update({"status": "running", "attempts": dequeue_count, "updated_at": time.time()})
+        self._save(record)
+
+        started = time.monotonic()
+        try:
+            status_code, body = execute(data["payload"])
+        except Exception as e:
+            logging.error(f"Job {job_id} failed: {e}")
+            status_code, body = 500, {"error": str(e)}
+
+        retryable = status_code >= 500 or status_code == 429
+        if retryable and dequeue_count < self.max_attempts:
+            record.update({"status": "queued", "updated_at": time.time(), "last_error": body.get("error")})
+            self._save(record)
+            with self._lock:
+                self.stats["retried"] += 1
+            raise RetryableJobError(f"Job {job_id} attempt {dequeue_count} ended with {status_code}")
+
+        status = "failed" if status_code >= 400 else "succeeded"
+        record.update({"status": status, "status_code": status_code, "result": body, "updated_at": time.time(),
+                       "elapsed_seconds": round(time.monotonic() - started, 3)})
+        record.pop("last_error", None)
+        self._save(record)
+        with self._lock:
+            self.stats[status] += 1
+
+    def _run_local(self, message: str, execute: JobExecutor):
+        """local 모드 작업 실행 (429/5xx는 짧게 쉬었다가 재시도)"""
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self.process(message, attempt, execute)
+                return
+            except RetryableJobError as e:
+                logging.warning(f"{e}, retrying")
+                time.sleep(min(2 ** attempt, 10))
+            except Exception as e:
+                logging.error(f"Local job crashed: {e}")
+                return
+
+    def _save(self, record: Dict[str, Any]):
+        """상태 저장 (storage: Blob 덮어쓰기, local: 메모리 + 완료 이벤트)"""
+        if self.mode == "storage":
+            self._get_container_client().upload_blob(f"jobs/{record['job_id']}.json", json_codec.dumps(record),
+                                                      overwrite=True)
+            return
+        with self._lock:
+            self._jobs[record["job_id"]] = dict(record)
+            finished = self._finished.setdefault(record["job_id"], threading.Event())
+        if record["status"] in FINISHED_STATUSES:
+            finished.set()
+
+    def _read_blob(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Blob에서 작업 상태 읽기"""
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            return json_codec.loads(self._get_container_client().download_blob(f"jobs/{job_id}.json").readall())
+        except ResourceNotFoundError:
+            return None
+
+    def _expire(self):
+        """local 모드에서 보관 시간이 지난 완료 작업 정리"""
+        expire_before = time.time() - self.result_ttl_seconds
+        with self._lock:
+            for job_id in [job_id for job_id, record in self._jobs.items()
+                           if record["status"] in FINISHED_STATUSES and record["updated_at"] < expire_before]:
+                self._jobs.pop(job_id)
+                self._finished.pop(job_id, None)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """local 모드 스레드 풀 지연 생성"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+            return self._executor
+
+    def _get_queue_client(self):
+        """Storage Queue 클라이언트 지연 생성 (큐 트리거 기본 인코딩에 맞춰 base64로 전송)"""
+        if self._queue_client is None:
+            from azure.storage.queue import QueueClient, TextBase64EncodePolicy
+            from azure.core.exceptions import ResourceExistsError
+
+            client = QueueClient.from_connection_string(self.connection_string, JOB_QUEUE_NAME,
+                                                        message_encode_policy=TextBase64EncodePolicy())
+            try:
+                client.create_queue()
+            except ResourceExistsError:
+                pass
+            self._queue_client = client
+        return self._queue_client
+
+    def _get_container_client(self):
+        """작업 상태 Blob 컨테이너 클라이언트 지연 생성"""
+        if self._container_client is None:
+            from azure.storage.blob import BlobServiceClient
+            from azure.core.exceptions import ResourceExistsError
+
+            client = BlobServiceClient.from_connection_string(self.connection_string).get_container_client(
+                JOB_CONTAINER_NAME
+            )
+            try:
+                client.create_container()
+            except ResourceExistsError:
+                pass
+            self._container_client = client
+        return self._container_client
+
+    def get_stats(self) -> Dict[str, Any]:
+        """제출/완료/재시도 수 (local 모드는 진행 중 작업 수 포함)"""
+        with self._lock:
+            stats = dict(self.stats)
+            if self.mode != "storage":
+                stats["pending"] = sum(1 for record in self._jobs.values()
+                                       if record["status"] not in FINISHED_STATUSES)
+        stats["mode"] = self.mode
+        return stats
+
+
+# 프로세스 전역 작업 큐
+job_queue = JobQueue.from_settings()
@@ -1,19 +1,25 @@
 import json
+import time
 import logging
-from typing import List, Dict, Any, Optional
-from openai import AzureOpenAI
+from typing import List, Dict, Any, Optional, Tuple
 from config.settings import settings
+from services.call_policy import (call_policy, remaining_budget, is_retryable, get_status_code,
+                                  get_retry_after, CircuitOpenError)
+from services.deployment_router import deployment_router, Deployment
+from services.rate_limiter import rate_limiter, estimate_tokens, RateLimitExceededError
+from services.single_flight import single_flight, make_request_key
+from services.model_routing import model_router, TemplateRoute
+from services.hint_ladder import HINT_LADDER_SIZE, HINT_LADDER_GUIDE, sanitize_hint_ladder
+from services.item_variants import VARIANT_DIFFICULTIES, DIFFICULTY_GUIDANCE, similar_item_feedback
+from services.answer_verifier import Verification, verify_item, corrected_answer, answer_verification_stats
+from services.admission_control import admission_controller
 
 
 class LLMService:
     """OpenAI LLM 서비스 클래스"""
 
     def __init__(self):
-        self.client = AzureOpenAI(
-            api_key=settings.openai_api_key,
-            azure_endpoint=settings.openai_endpoint,
-            api_version=settings.openai_api_version
-        )
+        self.router = deployment_router
 
     def generate_session_summary_prompt(self, total_questions: int, correct_count: int,
                                       wrong_question_numbers: List[str], weakest_concepts: List[str]) -> Dict[str, str]:
@@ -49,24 +55,46 @@ class LLMService:
 
         return {"system": system_prompt, "user": user_prompt}
 
-    def generate_similar_item_prompt(self, concept_name: str, tag_accuracy: float) -> Dict[str, str]:
-        """유사 문항 생성 프롬프트 생성"""
+    def generate_similar_item_prompt(self, concept_name: str, tag_accuracy: float, difficulty: str = "same",
+                                     with_variants: bool = False) -> Dict[str, str]:
+        """유사 문항 생성 프롬프트 생성 (with_variants면 쉬운/같은/어려운 문항을 한 번에)"""
         system_prompt = "너는 학생의 수준에 맞는 새로운 수학 연습 문제를 생성하는 AI야. 반드시 지정된 JSON 형식으로만 답변해야 해."
 
+        # 정확도를 10% 단위로 묶어 같은 개념·수준의 동시 요청이 동일 프롬프트가 되도록 함 (single-flight)
+        tag_accuracy = round(tag_accuracy * 10) / 10
+        ladder_guide = "\n".join(f"- {step}" for step in HINT_LADDER_GUIDE)
+        item_format = '{"new_question_text": "...", "correct_answer": "...", "explanation": "...", "hint_ladder": ["...", "...", "..."]}'
+
+        if with_variants:
+            # 난이도 변경 요청을 추가 호출 없이 처리하도록 세 난이도를 한 번에 생성
+            variant_guide = "\n".join(f"- {name}: {DIFFICULTY_GUIDANCE[name]}" for name in VARIANT_DIFFICULTIES)
+            task = (f"'{concept_name}' 개념에 대한 새로운 유사 문항을 아래 난이도별로 하나씩, 모두 {len(VARIANT_DIFFICULTIES)}개 생성해. "
+                    f"각 문항은 서로 다른 문제여야 하고, 아래 주의사항과 힌트 사다리는 문항마다 따로 지켜야 해.\n{variant_guide}")
+            output_format = '{"variants": {' + ", ".join(f'"{name}": {item_format}' for name in VARIANT_DIFFICULTIES) + '}}'
+        else:
+            guidance = DIFFICULTY_GUIDANCE.get(difficulty, DIFFICULTY_GUIDANCE["same"])
+            task = f"'{concept_name}' 개념에 대한 새로운 유사 문항을 생성해. {guidance} 만들어야 해."
+            output_format = item_format
+
         user_prompt = f"""### 정보
 - 개념: '{concept_name}'
 - 학생의 이 개념 정확도: {tag_accuracy * 100:.1f}%
 
 ### 임무
-'{concept_name}' 개념에 대한 새로운 유사 문항을 생성해. 학생의 정확도를 고려하여 너무 어렵지 않게 만들어야 해.
+{task}
 
 ### 중요한 주의사항
 1. 반드시 해설의 계산 과정을 먼저 완료한 후, 그 결과를 correct_answer에 입력해야 해
 2. correct_answer와 explanation의 최종 답이 일치해야 해
 3. 계산 실수가 없도록 단계별로 검증해줘
 
+### 힌트 사다리
+학생이 틀리거나 힌트를 요청할 때 차례로 보여줄 소크라틱 힌트 {HINT_LADDER_SIZE}개를 hint_ladder에 넣어줘.
+뒤로 갈수록 구체적으로, 어떤 단계에서도 정답을 말하지 말고 질문 형태로 끝내야 해.
+{ladder_guide}
+
 ### 출력 형식 (JSON)
-{{"new_question_text": "...", "correct_answer": "...", "explanation": "..."}}
+{output_format}
 
 ### 예시 검증 과정
 문제를 만든 후 반드시:
@@ -77,6 +105,23 @@ class LLMService:
 
         return {"system": system_prompt, "user": user_prompt}
 
+    @staticmethod
+    def regenerate_similar_item_prompt(prompts: Dict[str, str], verification: Verification,
+                                       attempt: int) -> Dict[str, str]:
+        """검증에 실패한 유사 문항 재생성 프롬프트 (실패 이유와 시도 번호를 넣어 다른 문항을 받고 single-flight 키도 달라짐)"""
+        if verification.status == "step_error":
+            reason = f"해설의 계산 단계가 틀렸어: {', '.join(verification.bad_steps)}"
+        elif verification.answer_value is not None and verification.final_value is not None:
+            reason = f"correct_answer({verification.answer_value:g})가 해설의 최종 값({verification.final_value:g})과 달라"
+        else:
+            reason = "correct_answer가 해설의 최종 값과 달라"
+        user_prompt = f"""{prompts["user"]}
+
+### 재생성 ({attempt}번째)
+직전에 만든 문항은 검증에 실패했어 - {reason}.
+같은 문제를 고치지 말고 새 문항을 만들어서, 계산을 한 단계씩 다시 확인해줘."""
+        return {"system": prompts["system"], "user": user_prompt}
+
     def generate_feedback_prompt(self, concept_name: str, tag_accuracy: float) -> Dict[str, str]:
         """일반 피드백 프롬프트 생성"""
         system_prompt = "너는 학생의 학습 데이터를 분석하고, 개인화된 학습 전략과 격려를 제공하는 전문 AI 학습 코치야."
@@ -224,59 +269,159 @@ class LLMService:
         return {"system": system_prompt, "user": user_prompt}
 
     def call_llm(self, system_prompt: str, user_prompt: str, conversation_history: List[Dict[str, str]],
-                 response_format: str = "text") -> str:
-        """LLM 호출 및 응답 반환"""
+                 response_format: str = "text", template: Optional[str] = None) -> str:
+        """LLM 호출 및 응답 반환 (template별 타임아웃/헤지 정책 적용)"""
         try:
             response_format_config = {"type": response_format}
 
             messages_to_send = [{"role": "system", "content": system_prompt}] + conversation_history
             messages_to_send.append({"role": "user", "content": user_prompt})
 
-            response = self.client.chat.completions.create(
-                model=settings.openai_model,
-                messages=messages_to_send,
-                response_format=response_format_config
-            )
+            # 템플릿별 배포/출력 예산 선택
+            route = model_router.resolve(template)
+
+            def call() -> str:
+                # 진행 중 호출 수·지연을 부하 제어기에 기록 (한도를 넘으면 대기 없이 OverloadedError)
+                with admission_controller.track(template):
+                    response = self._call_with_failover(messages_to_send, response_format_config, template, route)
+                return response.choices[0].message.content
+
+            # 동일 요청이 진행 중이면 그 결과를 공유 (템플릿별 opt-in)
+            if single_flight.is_enabled(template):
+                key = make_request_key(template, messages_to_send, response_format,
+                                       route.model or settings.openai_model)
+                return single_flight.do(key, call, remaining_budget())
 
-            return response.choices[0].message.content
+            return call()
 
         except Exception as e:
             logging.error(f"LLM call failed: {e}")
             raise
 
-    def parse_similar_item_response(self, response_content: str, concept_name: str) -> Dict[str, Any]:
-        """유사 문항 생성 응답 파싱"""
+    def _call_with_failover(self, messages: List[Dict[str, str]], response_format_config: Dict[str, str],
+                            template: Optional[str], route: TemplateRoute):
+        """우선순위 순으로 배포를 시도하고, 429/5xx/서킷 오픈/대기열 초과 시 다음 배포로 페일오버"""
+        candidates = self.router.ranked(route.model)
+        last_error: Optional[Exception] = None
+
+        for index, deployment in enumerate(candidates):
+            is_last = index == len(candidates) - 1
+            try:
+                # 마지막 배포에서만 재시도 - 나머지는 즉시 다음 배포로 넘어감
+                return call_policy.execute(
+                    lambda timeout, d=deployment: self._send(d, messages, response_format_config, timeout,
+                                                             template, route),
+                    template, deployment.name, None if is_last else 0
+                )
+            except (CircuitOpenError, RateLimitExceededError) as e:
+                last_error = e
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                last_error = e
+            logging.warning(f"Failing over from deployment '{deployment.name}': {last_error}")
+
+        raise last_error
+
+    def _send(self, deployment: Deployment, messages: List[Dict[str, str]],
+              response_format_config: Dict[str, str], timeout: float,
+              template: Optional[str] = None, route: Optional[TemplateRoute] = None):
+        """단일 배포에 1회 요청 - 레이트 리미터 예약 후 호출, 지연/쿼터 헤더를 라우터에 기록"""
+        # 예상 응답 시간을 뺀 나머지 안에서만 대기열에서 기다림
+        max_wait = max(0.0, timeout - (deployment.ewma_latency or 0.0))
+        if remaining_budget() is None:
+            max_wait = min(max_wait, settings.llm_rate_limit_max_wait)
+        route = route or TemplateRoute()
+        waited = rate_limiter.acquire(deployment.name, estimate_tokens(messages, route.max_tokens), max_wait)
+
+        start = time.monotonic()
         try:
-            generated_data = json.loads(response_content)
+            raw_response = deployment.get_client().chat.completions.with_raw_response.create(
+                model=deployment.model,
+                messages=messages,
+                response_format=response_format_config,
+                timeout=timeout - waited,
+                **route.to_request_kwargs()
+            )
+        except Exception as e:
+            response = getattr(e, "response", None)
+            retry_after = get_retry_after(e)
+            self.router.record_failure(deployment, get_status_code(e), retry_after,
+                                       getattr(response, "headers", None))
+            if get_status_code(e) == 429:
+                rate_limiter.on_throttled(deployment.name, retry_after)
+            raise
+
+        latency = time.monotonic() - start
+        self.router.record_success(deployment, latency, raw_response.headers)
+
+        response = raw_response.parse()
+        usage = getattr(response, "usage", None)
+        model_router.record(template, route, latency,
+                            getattr(usage, "completion_tokens", None), response.choices[0].finish_reason)
+        return response
 
-            # 답안과 해설 일치성 검증
-            correct_answer = generated_data.get('correct_answer', '')
-            explanation = generated_data.get('explanation', '')
-
-            # 정답에서 숫자 추출
-            import re
-            answer_numbers = re.findall(r'\d+(?:\.\d+)?', correct_answer)
-            explanation_numbers = re.findall(r'\d+(?:\.\d+)?', explanation)
-
-            # 일치성 검증: 정답의 숫자가 해설에 포함되어 있는지 확인
-            if answer_numbers and explanation_numbers:
-                if not any(num in explanation_numbers for num in answer_numbers):
-                    logging.warning(f"Answer-explanation mismatch detected: answer={correct_answer}, explanation numbers={explanation_numbers}")
-                    # 해설에서 가장 큰 숫자를 정답으로 수정 (일반적으로 최종 답)
-                    if explanation_numbers:
-                        largest_num = max(explanation_numbers, key=float)
-                        # 단위 유지하면서 숫자만 교체
-                        original_units = re.findall(r'[a-zA-Z²³°]+', correct_answer)
-                        corrected_answer = largest_num + (original_units[0] if original_units else '')
-                        generated_data['correct_answer'] = corrected_answer
-                        logging.info(f"Corrected answer from {correct_answer} to {corrected_answer}")
-
-            ai_feedback = f"좋아! '{concept_name}' 개념을 더 연습해볼까? 아래 문제를 풀어봐.\n\n{generated_data.get('new_question_text')}"
-
-            return {
-                "feedback": ai_feedback,
-                "generated_question_data": generated_data
-            }
+    def parse_similar_item_response(self, response_content: str, concept_name: str,
+                                    difficulty: str = "same") -> Dict[str, Any]:
+        """유사 문항 생성 응답 파싱 (난이도 변형 응답이면 same을 보여주고 나머지는 item_variants로, 검증 결과는 verification으로 반환)"""
+        try:
+            generated_data = json.loads(response_content)
         except json.JSONDecodeError as e:
             logging.error(f"Failed to parse similar item response: {e}")
-            raise
\ No newline at end of file
+            raise
+
+        item_variants = {}
+        variants = generated_data.get('variants') if isinstance(generated_data, dict) else None
+        if isinstance(variants, dict):
+            checked = {name: self._validate_similar_item(variants[name]) for name in VARIANT_DIFFICULTIES
+                       if isinstance(variants.get(name), dict) and variants[name].get('new_question_text')}
+            if not checked:
+                raise ValueError("Similar item response has no usable variants")
+            # same이 없으면 남은 변형 중 하나를 지금 문제로 사용, 검증에 실패한 나머지 변형은 보관하지 않음
+            difficulty = "same" if "same" in checked else next(iter(checked))
+            generated_data, verification = checked.pop(difficulty)
+            item_variants = {name: item for name, (item, check) in checked.items() if not check.failed}
+        else:
+            generated_data, verification = self._validate_similar_item(generated_data)
+
+        result = {
+            "feedback": similar_item_feedback(concept_name, difficulty, generated_data.get('new_question_text')),
+            "generated_question_data": generated_data,
+            "verification": verification
+        }
+        if item_variants:
+            result["item_variants"] = item_variants
+        return result
+
+    def _validate_similar_item(self, generated_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Verification]:
+        """문항 하나의 해설 계산·정답 검증과 힌트 사다리 검증"""
+        correct_answer = generated_data.get('correct_answer', '')
+        verification = verify_item(correct_answer, generated_data.get('explanation', ''))
+        answer_verification_stats.record(verification.status)
+        if verification.failed:
+            logging.warning(f"Generated item failed verification ({verification.status}): answer={correct_answer}, "
+                            f"explanation final={verification.final_value}, bad steps={verification.bad_steps}")
+
+        self._sanitize_item_hint_ladder(generated_data)
+        return generated_data, verification
+
+    def correct_unverified_item(self, generated_data: Dict[str, Any], verification: Verification) -> bool:
+        """재생성 예산을 다 쓴 문항 - 해설 계산은 맞는데 정답만 다르면 정답을 해설의 최종 값으로 교체"""
+        if verification.status != "mismatch" or verification.final_value is None:
+            return False
+        correct_answer = generated_data.get('correct_answer', '')
+        corrected = corrected_answer(correct_answer, verification.final_value)
+        if corrected is None:
+            return False
+        generated_data['correct_answer'] = corrected
+        logging.info(f"Corrected answer from {correct_answer} to {corrected}")
+        self._sanitize_item_hint_ladder(generated_data)
+        return True
+
+    def _sanitize_item_hint_ladder(self, generated_data: Dict[str, Any]):
+        """힌트 사다리 검증 (정답을 드러내는 단계부터 제거, 비면 힌트는 LLM으로 생성)"""
+        hint_ladder = sanitize_hint_ladder(generated_data.get('hint_ladder'), generated_data.get('correct_answer', ''))
+        if hint_ladder:
+            generated_data['hint_ladder'] = hint_ladder
+        else:
+            generated_data.pop('hint_ladder', None)
\ No newline at end of file
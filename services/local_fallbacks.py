@@ -0,0 +1,103 @@
+from typing import Dict, List, Optional
+
+# 힌트 레벨별 소크라틱 힌트 (hint_ladder.HINT_LADDER_GUIDE와 같은 순서 - 확인 → 개념 → 첫 계산)
+CANNED_HINTS = {
+    "beginner": [
+        "문제에서 주어진 것과 구해야 하는 것을 하나씩 적어 볼까? 무엇을 구해야 하지?",
+        "'{concept}'에서 배운 공식이나 성질 중에 이 문제에 쓸 수 있는 건 무엇일까?",
+        "그 공식에 문제의 숫자를 하나씩 넣으면, 가장 먼저 계산할 식은 어떻게 될까?"
+    ],
+    "intermediate": [
+        "구하는 값과 주어진 조건을 이어 주는 관계는 무엇일까?",
+        "'{concept}'의 핵심 성질을 적용하면 어떤 식을 세울 수 있을까?",
+        "세운 식을 한 단계씩 정리해 보면, 어느 부분부터 계산해야 할까?"
+    ],
+    "advanced": [
+        "'{concept}'의 어떤 성질이 이 문제의 열쇠일까?",
+        "식을 세웠다면 계산을 줄일 수 있는 방법은 없을까?",
+        "구한 값이 문제의 조건을 모두 만족하는지 어떻게 확인할 수 있을까?"
+    ]
+}
+
+# 개념명에 들어 있는 키워드별 힌트 (위에서부터 먼저 맞는 것 하나 - 구체적인 키워드를 앞에)
+CONCEPT_HINTS = [
+    (("농도",), "소금의 양 = 소금물의 양 × (농도 ÷ 100)을 이용하면 어떤 식을 세울 수 있을까?"),
+    (("순환소수",), "순환마디가 몇 자리인지 먼저 확인해 볼까? 그만큼 10을 곱한 수와 원래 수를 빼면 어떻게 될까?"),
+    (("소수",), "분수를 기약분수로 고친 뒤 분모를 소인수분해하면, 2와 5 말고 다른 소인수가 있을까?"),
+    (("근호", "제곱근"), "근호 안의 수를 (제곱수) × (다른 수) 꼴로 나눠 볼 수 있을까?"),
+    (("이차방정식",), "좌변을 (x + p)² 꼴이나 두 일차식의 곱으로 바꿀 수 있는지 먼저 살펴볼까?"),
+    (("인수",), "모든 항에 공통으로 들어 있는 인수가 있는지 먼저 찾아볼까?"),
+    (("이차함수",), "꼭짓점의 좌표와 그래프가 열리는 방향은 식의 어느 부분에서 알 수 있을까?"),
+    (("연립방정식",), "미지수 하나를 없애려면 두 식을 어떻게 더하거나 빼면 좋을까?"),
+    (("일차함수", "직선", "그래프"), "기울기와 y절편이 각각 얼마인지 식이나 그래프에서 찾아볼까?"),
+    (("정비례", "반비례"), "x가 2배, 3배가 될 때 y는 어떻게 변하는지 표로 정리해 볼까?"),
+    (("피타고라스",), "직각삼각형에서 빗변은 어느 변이고, 세 변 사이에는 어떤 관계가 있을까?"),
+    (("겉넓이",), "전개도를 그려 보면 밑면과 옆면은 각각 어떤 도형이고 몇 개일까?"),
+    (("부채꼴",), "부채꼴의 중심각은 원 전체(360°)의 몇 분의 몇일까?"),
+    (("원주각", "중심각", "내접"), "같은 호에 대한 원주각과 중심각 사이에는 어떤 관계가 있을까?"),
+    (("내각", "외각", "각의 크기"), "삼각형의 세 내각의 합을 떠올려 보고, 도형을 삼각형으로 나눠 볼까?"),
+    (("넓이",), "넓이 공식에 필요한 길이(밑변, 높이 등)가 문제에 모두 주어졌는지 확인해 볼까?"),
+    (("닮음", "평행선"), "닮음인 두 삼각형을 찾고, 대응하는 변끼리 짝지어 볼까?"),
+    (("지수", "밑"), "밑이 같은 거듭제곱끼리 곱하거나 나누면 지수는 어떻게 될까?")
+]
+
+
+def hint_level_for(accuracy: Optional[float]) -> str:
+    """정확도 기반 힌트 레벨 (정확도를 모르면 초급)"""
+    if accuracy is None:
+        return "beginner"
+    if accuracy >= 0.8:
+        return "advanced"  # 고급 - 간단한 힌트
+    elif accuracy >= 0.5:
+        return "intermediate"  # 중급 - 중간 수준 힌트
+    else:
+        return "beginner"  # 초급 - 상세한 힌트
+
+
+def canned_hints(concept_name: Optional[str], level: str) -> List[str]:
+    """개념·레벨별 소크라틱 힌트 목록 (개념 키워드 힌트는 두 번째 단계에)"""
+    concept = concept_name or "이 개념"
+    hints = [hint.format(concept=concept) for hint in CANNED_HINTS.get(level, CANNED_HINTS["beginner"])]
+    for keywords, hint in CONCEPT_HINTS:
+        if concept_name and any(keyword in concept_name for keyword in keywords):
+            hints.insert(1, hint)
+            break
+    return hints
+
+
+def canned_hint(concept_name: Optional[str], level: str, conversation_history: List[Dict[str, str]]) -> str:
+    """아직 보여주지 않은 다음 힌트 (모두 보여줬으면 마지막 힌트)"""
+    hints = canned_hints(concept_name, level)
+    assistant_messages = [message.get("content", "") for message in conversation_history or []
+                          if message.get("role") == "assistant"]
+    for hint in hints:
+        if not any(hint in content for content in assistant_messages):
+            return hint
+    return hints[-1]
+
+
+def session_summary_text(total_questions: int, correct_count: int,
+                         wrong_question_numbers: List[str], weakest_concepts: List[str]) -> str:
+    """세션 요약 프롬프트의 [출력 형식]을 그대로 채운 요약"""
+    summary = (f"진단 테스트 푸느라 수고 많았어! 결과를 알려줄게.\n\n"
+               f"전체 {total_questions} 문제 중에서 {correct_count} 문제를 맞혔네. 정말 잘했어! 👍")
+    if not wrong_question_numbers or not weakest_concepts:
+        return summary + "\n\n이번 테스트에서는 틀린 문제가 없어! 다음 단계 개념에 도전해볼까?"
+
+    return (summary +
+            f"\n\n이번 테스트에서는 아쉽게도 {', '.join(wrong_question_numbers)} 번 문제를 틀렸더라. "
+            f"데이터를 분석해보니, 주로 \"{', '.join(weakest_concepts)}\" 개념들이 조금 헷갈리는 것 같아."
+            f"\n\n우리 같이 \"{weakest_concepts[0]}\"에 대한 학습을 시작해볼까?")
+
+
+def feedback_text(concept_name: str, tag_accuracy: float) -> str:
+    """정확도 구간별 격려와 학습 전략"""
+    accuracy = f"{tag_accuracy * 100:.1f}%"
+    if tag_accuracy < 0.5:
+        return (f"'{concept_name}' 개념 정확도가 {accuracy}야. 아직 헷갈리는 부분이 있어 보이니, "
+                f"개념을 다시 정리하고 쉬운 문제부터 차근차근 풀어보자! 💪")
+    if tag_accuracy < 0.8:
+        return (f"'{concept_name}' 개념 정확도가 {accuracy}야. 기본은 잘 잡혀 있어! "
+                f"틀린 문제의 풀이 과정을 다시 확인하고 비슷한 문제를 몇 개 더 풀어보면 금방 익숙해질 거야. 👍")
+    return (f"'{concept_name}' 개념 정확도가 {accuracy}야. 정말 잘하고 있어! "
+            f"이제 응용 문제에 도전해서 실력을 더 단단하게 만들어보자. 🌟")
@@ -0,0 +1,169 @@
+import json
+import math
+import random
+import threading
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Any, Deque, Dict, List, Optional
+from config.settings import settings
+
+# 출력 예산 자동 조정에 필요한 최소 샘플 수
+MIN_TUNING_SAMPLES = 50
+
+# 관측된 p99 출력 길이에 더하는 여유 비율
+TUNING_HEADROOM = 1.25
+
+# 잘림(finish_reason=length) 비율이 이 값을 넘으면 자동 조정을 멈추고 설정값 사용
+MAX_TRUNCATION_RATE = 0.02
+
+
+@dataclass
+class TemplateRoute:
+    """템플릿별 호출 설정 (model이 None이면 기본 배포 사용)"""
+    model: Optional[str] = None
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    stop: Optional[List[str]] = None
+    min_tokens: int = 32
+    is_control: bool = False
+
+    def to_request_kwargs(self) -> Dict[str, Any]:
+        """chat.completions.create에 넘길 추가 인자"""
+        kwargs: Dict[str, Any] = {}
+        if self.max_tokens is not None:
+            kwargs["max_tokens"] = self.max_tokens
+        if self.temperature is not None:
+            kwargs["temperature"] = self.temperature
+        if self.stop:
+            kwargs["stop"] = self.stop
+        return kwargs
+
+
+# 기본 라우팅 테이블 - 짧은 분류/힌트 작업은 출력 길이를 작게 제한
+DEFAULT_ROUTES: Dict[str, TemplateRoute] = {
+    "intent": TemplateRoute(max_tokens=120, temperature=0.0),
+    "hint": TemplateRoute(max_tokens=200),
+    "personalized_hint": TemplateRoute(max_tokens=300),
+    "guided_hint": TemplateRoute(max_tokens=300),
+    "session_summary": TemplateRoute(max_tokens=400, temperature=0.0),
+    "feedback": TemplateRoute(max_tokens=500),
+    "similar_item": TemplateRoute(max_tokens=1000),
+    "similar_item_variants": TemplateRoute(max_tokens=2600),
+    "concept_explanation": TemplateRoute(max_tokens=700),
+    "general_chat": TemplateRoute(max_tokens=500),
+    "clarification": TemplateRoute(max_tokens=500),
+    "ask_questions": TemplateRoute(max_tokens=500),
+}
+
+
+@dataclass
+class _TemplateStats:
+    """템플릿별 관측 통계"""
+    completion_tokens: Deque[int] = field(default_factory=lambda: deque(maxlen=1000))
+    routed_calls: int = 0
+    routed_latency_total: float = 0.0
+    control_calls: int = 0
+    control_latency_total: float = 0.0
+    truncated_calls: int = 0
+
+
+class ModelRouter:
+    """프롬프트 템플릿별 배포/출력 예산 선택기"""
+
+    def __init__(self, routes: Optional[Dict[str, TemplateRoute]] = None, auto_tune: bool = True,
+                 control_ratio: float = 0.0):
+        self.routes = dict(DEFAULT_ROUTES if routes is None else routes)
+        self.auto_tune = auto_tune
+        self.control_ratio = control_ratio
+        self._stats: Dict[str, _TemplateStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "ModelRouter":
+        """기본 테이블에 LLMTemplateRoutes(JSON) 덮어쓰기"""
+        routes = dict(DEFAULT_ROUTES)
+        overrides = json.loads(settings.llm_template_routes or "{}")
+        for template, values in overrides.items():
+            routes[template] = replace(routes.get(template, TemplateRoute()), **values)
+        return cls(routes, settings.llm_auto_tune_output_budgets, settings.llm_routing_control_ratio)
+
+    def resolve(self, template: Optional[str]) -> TemplateRoute:
+        """호출에 사용할 설정 - 대조군이면 기본 모델·무제한 출력"""
+        route = self.routes.get(template or "")
+        if route is None:
+            return TemplateRoute()
+
+        # 일부 호출은 라우팅 없이 보내 절약된 지연 시간을 측정하는 대조군으로 사용
+        if self.control_ratio and random.random() < self.control_ratio:
+            return TemplateRoute(is_control=True)
+
+        tuned = self.tuned_max_tokens(template)
+        if tuned is not None:
+            return replace(route, max_tokens=tuned)
+        return route
+
+    def tuned_max_tokens(self, template: str) -> Optional[int]:
+        """관측된 출력 길이 p99 기반 예산 (설정된 max_tokens를 넘지 않음)"""
+        route = self.routes.get(template)
+        if not self.auto_tune or route is None or route.max_tokens is None:
+            return None
+
+        with self._lock:
+            stats = self._stats.get(template)
+            if stats is None or len(stats.completion_tokens) < MIN_TUNING_SAMPLES:
+                return None
+            if stats.routed_calls and stats.truncated_calls / stats.routed_calls > MAX_TRUNCATION_RATE:
+                return None
+            samples = sorted(stats.completion_tokens)
+
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        return max(route.min_tokens, min(route.max_tokens, math.ceil(p99 * TUNING_HEADROOM)))
+
+    def record(self, template: Optional[str], route: TemplateRoute, latency: float,
+               completion_tokens: Optional[int], finish_reason: Optional[str]):
+        """호출 결과 기록 (출력 길이, 지연, 잘림 여부)"""
+        if not template:
+            return
+        with self._lock:
+            stats = self._stats.setdefault(template, _TemplateStats())
+            if completion_tokens is not None and finish_reason != "length":
+                stats.completion_tokens.append(completion_tokens)
+            if route.is_control:
+                stats.control_calls += 1
+                stats.control_latency_total += latency
+            else:
+                stats.routed_calls += 1
+                stats.routed_latency_total += latency
+                if finish_reason == "length":
+                    stats.truncated_calls += 1
+
+    def get_report(self) -> Dict[str, Dict[str, Any]]:
+        """템플릿별 출력 길이 분포와 대조군 대비 절약된 지연 시간"""
+        report = {}
+        with self._lock:
+            items = list(self._stats.items())
+        for template, stats in items:
+            samples = sorted(stats.completion_tokens)
+            routed_avg = stats.routed_latency_total / stats.routed_calls if stats.routed_calls else None
+            control_avg = stats.control_latency_total / stats.control_calls if stats.control_calls else None
+            saved_per_call = control_avg - routed_avg if routed_avg is not None and control_avg is not None else None
+            route = self.routes.get(template, TemplateRoute())
+            report[template] = {
+                "model": route.model or settings.openai_model,
+                "configured_max_tokens": route.max_tokens,
+                "tuned_max_tokens": self.tuned_max_tokens(template),
+                "completion_tokens_p50": samples[len(samples) // 2] if samples else None,
+                "completion_tokens_p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else None,
+                "routed_calls": stats.routed_calls,
+                "control_calls": stats.control_calls,
+                "truncation_rate": round(stats.truncated_calls / stats.routed_calls, 4) if stats.routed_calls else 0.0,
+                "avg_latency_routed": round(routed_avg, 3) if routed_avg is not None else None,
+                "avg_latency_control": round(control_avg, 3) if control_avg is not None else None,
+                "latency_saved_per_call": round(saved_per_call, 3) if saved_per_call is not None else None,
+                "latency_saved_total": round(saved_per_call * stats.routed_calls, 1) if saved_per_call is not None else None
+            }
+        return report
+
+
+# 프로세스 전역 모델 라우터 인스턴스
+model_router = ModelRouter.from_settings()
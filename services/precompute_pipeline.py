@@ -0,0 +1,254 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from config.settings import settings
+from services.rate_limiter import estimate_tokens
+from services.concept_explanations import read_store_file, write_store_file, resolve_store_path
+
+# 작업별로 남기는 최근 실행 기록 수
+RUN_HISTORY = 20
+
+
+class TokenBudgetExceededError(RuntimeError):
+    """작업 하나의 LLM 토큰 예산을 모두 사용한 에러 (남은 항목은 다음 실행에서 이어서)"""
+
+
+class TokenBudget:
+    """작업 한 번 실행의 LLM 토큰 예산 - 호출 전에 레이트 리미터와 같은 추정치(입력 + 최대 출력)로 차감"""
+
+    def __init__(self, limit: int = 0):
+        self.limit = limit
+        self.used = 0
+        self.exhausted = False
+        self._lock = threading.Lock()
+
+    def reserve(self, system_prompt: str, user_prompt: str, template: Optional[str] = None):
+        """호출 하나의 토큰 차감 (예산을 넘으면 TokenBudgetExceededError)"""
+        from services.model_routing import model_router
+
+        route = model_router.routes.get(template or "")
+        tokens = estimate_tokens([{"content": system_prompt}, {"content": user_prompt}],
+                                 route.max_tokens if route else None)
+        with self._lock:
+            if self.limit and self.used + tokens > self.limit:
+                self.exhausted = True
+                raise TokenBudgetExceededError(f"Token budget {self.limit} exhausted ({self.used} used)")
+            self.used += tokens
+
+
+@dataclass
+class PrecomputeJob:
+    """미리 계산 작업 - run(budget)은 결과 통계를 반환하고, 남은 항목이 있으면 "complete": False"""
+    name: str
+    run: Callable[[TokenBudget], Dict[str, Any]]
+    fingerprint: Callable[[], str]
+    schedule: str
+    output: str
+    depends_on: Tuple[str, ...] = ()
+    token_budget: int = 0
+    output_exists: Optional[Callable[[], bool]] = None
+    enabled: Callable[[], bool] = lambda: True
+    refresh_after_seconds: Optional[float] = None
+    description: str = ""
+    _order: int = field(default=0, repr=False)
+
+
+def file_fingerprint(*paths: str) -> str:
+    """파일 내용 해시 (없는 파일은 'missing')"""
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            with open(resolve_store_path(path), "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(b"missing")
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def path_exists(path: str) -> Callable[[], bool]:
+    """출력 파일이 있는지 확인하는 함수"""
+    return lambda: bool(path) and os.path.exists(resolve_store_path(path))
+
+
+class PrecomputePipeline:
+    """등록된 미리 계산 작업을 의존 순서대로 실행 (입력 지문이 같고 출력이 있으면 건너뛰고, 실행 시간 기록)"""
+
+    def __init__(self, state_path: str = "", history: int = RUN_HISTORY):
+        self.state_path = resolve_store_path(state_path) if state_path else ""
+        self.history = history
+        self._jobs: Dict[str, PrecomputeJob] = {}
+        self._run_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "PrecomputePipeline":
+        """환경변수 설정으로 생성"""
+        return cls(settings.precompute_state_path)
+
+    def register(self, job: PrecomputeJob) -> PrecomputeJob:
+        """작업 등록 (의존 작업은 먼저 등록되어 있어야 함)"""
+        missing = [name for name in job.depends_on if name not in self._jobs]
+        if missing:
+            raise ValueError(f"Precompute job {job.name} depends on unknown jobs: {', '.join(missing)}")
+        job._order = len(self._jobs)
+        self._jobs[job.name] = job
+        return job
+
+    def jobs(self) -> List[PrecomputeJob]:
+        """등록 순서대로 작업 목록"""
+        return list(self._jobs.values())
+
+    def plan(self, names: Optional[Sequence[str]] = None) -> List[PrecomputeJob]:
+        """실행할 작업과 그 의존 작업 (의존 작업이 먼저 오도록 등록 순서로 정렬)"""
+        unknown = [name for name in names or [] if name not in self._jobs]
+        if unknown:
+            raise ValueError(f"Unknown precompute jobs: {', '.join(unknown)}")
+
+        selected = set()
+        pending = list(names) if names else list(self._jobs)
+        while pending:
+            name = pending.pop()
+            if name not in selected:
+                selected.add(name)
+                pending.extend(self._jobs[name].depends_on)
+        return sorted((self._jobs[name] for name in selected), key=lambda job: job._order)
+
+    def run(self, names: Optional[Sequence[str]] = None, force: bool = False,
+            dry_run: bool = False) -> Dict[str, Dict[str, Any]]:
+        """작업 실행 → 작업별 실행 기록 (force면 입력 지문과 상관없이 names의 작업을 다시 실행)"""
+        with self._run_lock:
+            state = self._read_state()
+            records: Dict[str, Dict[str, Any]] = {}
+            for job in self.plan(names):
+                forced = force and (not names or job.name in names)
+                records[job.name] = self._run_job(job, state, records, forced, dry_run)
+                if not dry_run:
+                    self._write_state(state)
+            return records
+
+    def _run_job(self, job: PrecomputeJob, state: Dict[str, Any], records: Dict[str, Dict[str, Any]],
+                 force: bool, dry_run: bool) -> Dict[str, Any]:
+        """작업 하나 실행 (의존 작업이 실패했거나 입력이 그대로면 건너뜀)"""
+        if not job.enabled():
+            return {"status": "disabled"}
+        failed_dependencies = [name for name in job.depends_on
+                               if records.get(name, {}).get("status") == "failed"]
+        if failed_dependencies:
+            return {"status": "skipped", "reason": f"dependency failed: {', '.join(failed_dependencies)}"}
+
+        previous = state.get(job.name, {})
+        try:
+            fingerprint = self._fingerprint(job, state)
+        except Exception as e:
+            logging.error(f"Precompute job {job.name} fingerprint failed: {e}")
+            return self._record(job, state, {"status": "failed", "error": f"fingerprint: {e}"}, 0.0, dry_run)
+
+        reason = self._rerun_reason(job, previous, fingerprint, force)
+        if reason is None:
+            if not dry_run:
+                previous["last_checked_at"] = time.time()
+            return {"status": "unchanged", "fingerprint": fingerprint}
+        if dry_run:
+            return {"status": "pending", "reason": reason, "fingerprint": fingerprint}
+
+        budget = TokenBudget(job.token_budget)
+        started = time.monotonic()
+        try:
+            result = job.run(budget) or {}
+            status = "succeeded" if result.get("complete", True) and not budget.exhausted else "partial"
+            record = {"status": status, "reason": reason, "fingerprint": fingerprint, "result": result}
+        except Exception as e:
+            logging.error(f"Precompute job {job.name} failed: {e}")
+            record = {"status": "failed", "reason": reason, "error": str(e)}
+        record["tokens_estimated"] = budget.used
+        return self._record(job, state, record, time.monotonic() - started, dry_run)
+
+    def _fingerprint(self, job: PrecomputeJob, state: Dict[str, Any]) -> str:
+        """작업 입력 지문 + 의존 작업의 마지막 성공 지문 (의존 작업 출력이 바뀌면 다시 실행)"""
+        parts = [job.fingerprint()] + [state.get(name, {}).get("fingerprint", "") for name in job.depends_on]
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _rerun_reason(job: PrecomputeJob, previous: Dict[str, Any], fingerprint: str,
+                      force: bool) -> Optional[str]:
+        """다시 실행해야 하는 이유 (None이면 건너뜀)"""
+        if force:
+            return "forced"
+        if previous.get("status") != "succeeded":
+            return "first run" if not previous else f"previous run {previous.get('status')}"
+        if previous.get("fingerprint") != fingerprint:
+            return "inputs changed"
+        if job.output_exists is not None and not job.output_exists():
+            return "output missing"
+        succeeded_at = previous.get("succeeded_at", 0)
+        if job.refresh_after_seconds and time.time() - succeeded_at >= job.refresh_after_seconds:
+            return "output too old"
+        return None
+
+    def _record(self, job: PrecomputeJob, state: Dict[str, Any], record: Dict[str, Any],
+                duration: float, dry_run: bool) -> Dict[str, Any]:
+        """실행 기록 저장 (최근 RUN_HISTORY번 실행 시간 유지, 성공 지문은 성공했을 때만 갱신)"""
+        record["duration_seconds"] = round(duration, 2)
+        if dry_run:
+            return record
+
+        entry = state.setdefault(job.name, {})
+        now = time.time()
+        runs = entry.get("runs", [])[-(self.history - 1):] + [{
+            "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "status": record["status"],
+            "duration_seconds": record["duration_seconds"],
+            "tokens_estimated": record.get("tokens_estimated", 0)
+        }]
+        entry.update({"status": record["status"], "last_run_at": now, "runs": runs,
+                      "last_error": record.get("error")})
+        if record["status"] != "failed":
+            entry["fingerprint"] = record["fingerprint"]
+            entry["result"] = record.get("result", {})
+        if record["status"] == "succeeded":
+            entry["succeeded_at"] = now
+        return record
+
+    def _read_state(self) -> Dict[str, Any]:
+        """실행 기록 읽기 (없거나 깨졌으면 처음부터)"""
+        if not self.state_path:
+            return {}
+        try:
+            return read_store_file(self.state_path).get("jobs", {})
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not read precompute state: {e}")
+            return {}
+
+    def _write_state(self, state: Dict[str, Any]):
+        """실행 기록 원자적 저장"""
+        if self.state_path:
+            write_store_file(self.state_path, {"jobs": state})
+
+    def get_stats(self) -> Dict[str, Any]:
+        """작업별 마지막 상태와 실행 시간 (최근 실행 평균·최대)"""
+        state = self._read_state()
+        stats = {}
+        for job in self.jobs():
+            entry = state.get(job.name, {})
+            durations = [run["duration_seconds"] for run in entry.get("runs", [])]
+            stats[job.name] = {
+                "schedule": job.schedule,
+                "enabled": job.enabled(),
+                "status": entry.get("status"),
+                "last_run_at": entry.get("last_run_at"),
+                "last_checked_at": entry.get("last_checked_at"),
+                "last_duration_seconds": durations[-1] if durations else None,
+                "avg_duration_seconds": round(sum(durations) / len(durations), 2) if durations else None,
+                "max_duration_seconds": max(durations) if durations else None,
+                "last_error": entry.get("last_error")
+            }
+        return stats
+
+
+# 프로세스 전역 미리 계산 파이프라인 (작업은 precompute_jobs.py에서 등록)
+precompute_pipeline = PrecomputePipeline.from_settings()
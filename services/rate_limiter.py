@@ -0,0 +1,245 @@
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from config.settings import settings
+
+# 한국어 위주 텍스트 기준 대략적인 글자/토큰 비율
+CHARS_PER_TOKEN = 2
+
+# 응답 토큰 수를 모를 때 예약할 기본 출력 토큰
+DEFAULT_COMPLETION_TOKENS = 300
+
+# RPM/TPM 두 버킷을 원자적으로 예약하는 Redis 스크립트 (모든 워커가 같은 쿼터를 공유)
+# KEYS[1]: 429 일시 중지 키, KEYS[2..]: 버킷 키
+# 반환값: {허용 여부(1/0), 대기 시간(ms)}
+_RESERVE_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local max_wait = tonumber(ARGV[1])
+local paused_until = tonumber(redis.call('GET', KEYS[1])) or 0
+local wait = math.max(0, paused_until - now)
+local states = {}
+
+for i = 2, #KEYS do
+    local base = 1 + (i - 2) * 3
+    local capacity = tonumber(ARGV[base + 1])
+    local rate = tonumber(ARGV[base + 2])
+    local amount = tonumber(ARGV[base + 3])
+    local data = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local tokens = tonumber(data[1]) or capacity
+    local ts = tonumber(data[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local after = tokens - amount
+    if after < 0 then
+        wait = math.max(wait, -after / rate)
+    end
+    states[i] = after
+end
+
+if wait > max_wait then
+    return {0, math.floor(wait)}
+end
+
+for i = 2, #KEYS do
+    redis.call('HSET', KEYS[i], 'tokens', states[i], 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], 120000)
+end
+return {1, math.floor(wait)}
+"""
+
+# 서버 429 응답 후 공유 일시 중지 시각을 늦추는 Redis 스크립트 (이미 더 늦으면 유지)
+# 반환값: 일시 중지가 끝나는 시각(ms)
+_THROTTLE_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local pause = tonumber(ARGV[1])
+local paused_until = now + pause
+local current = tonumber(redis.call('GET', KEYS[1])) or 0
+if paused_until > current then
+    redis.call('SET', KEYS[1], paused_until, 'PX', pause)
+    return paused_until
+end
+return current
+"""
+
+
+class RateLimitExceededError(RuntimeError):
+    """대기 시간이 요청 예산을 넘어 호출을 포기(부하 차단)한 에러"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_completion_tokens: Optional[int] = None) -> int:
+    """요청 토큰 수 추정 (입력 글자 수 기반 + 예상 출력 토큰)"""
+    prompt_chars = sum(len(message.get("content") or "") for message in messages)
+    return prompt_chars // CHARS_PER_TOKEN + (max_completion_tokens or DEFAULT_COMPLETION_TOKENS)
+
+
+class TokenBucket:
+    """예약 방식 토큰 버킷 - 부족분은 음수로 빌려 쓰고 대기 시간을 돌려줌 (FIFO 공정성)"""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        """경과 시간만큼 토큰 충전"""
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+        self.updated_at = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """amount를 예약했을 때 기다려야 하는 시간 (초)"""
+        self._refill(now)
+        shortage = amount - self.tokens
+        return shortage / self.refill_per_second if shortage > 0 else 0.0
+
+    def take(self, amount: float):
+        """토큰 차감 (음수 허용 - 이후 요청은 그만큼 더 대기)"""
+        self.tokens -= amount
+
+    def drain(self, seconds: float, now: float):
+        """서버 429 응답에 맞춰 seconds 동안 토큰이 없도록 비움"""
+        self._refill(now)
+        self.tokens = min(self.tokens, -seconds * self.refill_per_second)
+
+
+class RateLimiter:
+    """배포별 RPM/TPM 클라이언트 레이트 리미터 (local: 워커 내부, redis: 전체 워커 공유)"""
+
+    def __init__(self, mode: str = "local", redis_url: str = "", key_prefix: str = "llm-tutor:ratelimit"):
+        self.mode = mode
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self._limits: Dict[str, Tuple[int, int]] = {}
+        self._buckets: Dict[str, Tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+        self._redis = None
+        self._reserve = None
+        self._throttle = None
+        self._lock = threading.Lock()
+        self.stats = {"granted": 0, "queued": 0, "shed": 0, "total_wait_seconds": 0.0}
+
+    @classmethod
+    def from_settings(cls) -> "RateLimiter":
+        """환경변수 설정으로 레이트 리미터 생성 (배포 목록의 rpm/tpm 등록)"""
+        limiter = cls(settings.llm_rate_limit_mode, settings.redis_connection_string)
+        for deployment in settings.openai_deployments:
+            limiter.configure(deployment["name"], deployment.get("rpm", 0), deployment.get("tpm", 0))
+        return limiter
+
+    def configure(self, name: str, rpm: int, tpm: int):
+        """배포별 한도 등록 (0이면 해당 한도 미적용)"""
+        with self._lock:
+            self._limits[name] = (int(rpm or 0), int(tpm or 0))
+            self._buckets[name] = (
+                TokenBucket(rpm, rpm / 60) if rpm else None,
+                TokenBucket(tpm, tpm / 60) if tpm else None
+            )
+
+    def acquire(self, name: str, tokens: int, max_wait: float) -> float:
+        """요청 1건과 tokens개 토큰 예약 - 대기 시간이 max_wait를 넘으면 RateLimitExceededError"""
+        rpm, tpm = self._limits.get(name, (0, 0))
+        if not rpm and not tpm:
+            return 0.0
+
+        if self.mode == "redis" and self._get_redis() is not None:
+            try:
+                wait = self._reserve_redis(name, rpm, tpm, tokens, max_wait)
+            except RateLimitExceededError:
+                raise
+            except Exception as e:
+                logging.warning(f"Redis rate limiter unavailable, using local buckets: {e}")
+                wait = self._reserve_local(name, tokens, max_wait)
+        else:
+            wait = self._reserve_local(name, tokens, max_wait)
+
+        with self._lock:
+            self.stats["granted"] += 1
+            if wait > 0:
+                self.stats["queued"] += 1
+                self.stats["total_wait_seconds"] += wait
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_throttled(self, name: str, retry_after: Optional[float]):
+        """서버가 429를 돌려주면 버킷을 비워서 다른 요청이 몰리지 않도록 함 (redis 모드면 전체 워커가 함께 대기)"""
+        seconds = retry_after or 1.0
+        now = time.monotonic()
+        with self._lock:
+            for bucket in self._buckets.get(name, ()):
+                if bucket is not None:
+                    bucket.drain(seconds, now)
+
+        if self.mode == "redis" and self._get_redis() is not None:
+            try:
+                self._throttle(keys=[self._pause_key(name)], args=[max(1, int(seconds * 1000))])
+            except Exception as e:
+                logging.warning(f"Redis rate limiter unavailable, throttling local buckets only: {e}")
+
+    def _reserve_local(self, name: str, tokens: int, max_wait: float) -> float:
+        """워커 내부 버킷에서 예약"""
+        now = time.monotonic()
+        with self._lock:
+            buckets = [(bucket, amount) for bucket, amount in zip(self._buckets.get(name, ()), (1, tokens))
+                       if bucket is not None]
+            wait = max(bucket.wait_time(amount, now) for bucket, amount in buckets)
+            if wait > max_wait:
+                self.stats["shed"] += 1
+                raise RateLimitExceededError(
+                    f"Rate limit queue for '{name}' would wait {wait:.2f}s (budget {max_wait:.2f}s)", wait
+                )
+            for bucket, amount in buckets:
+                bucket.take(amount)
+        return wait
+
+    def _reserve_redis(self, name: str, rpm: int, tpm: int, tokens: int, max_wait: float) -> float:
+        """Redis 공유 버킷에서 예약 (모든 워커가 하나의 쿼터를 봄)"""
+        keys: List[str] = [self._pause_key(name)]
+        args: List[Any] = [max_wait * 1000]
+        for suffix, capacity, amount in (("rpm", rpm, 1), ("tpm", tpm, tokens)):
+            if capacity:
+                keys.append(f"{self.key_prefix}:{name}:{suffix}")
+                args.extend([capacity, capacity / 60000, amount])
+
+        granted, wait_ms = self._reserve(keys=keys, args=args)
+        wait = int(wait_ms) / 1000
+        if not int(granted):
+            with self._lock:
+                self.stats["shed"] += 1
+            raise RateLimitExceededError(
+                f"Shared rate limit queue for '{name}' would wait {wait:.2f}s (budget {max_wait:.2f}s)", wait
+            )
+        return wait
+
+    def _pause_key(self, name: str) -> str:
+        """배포별 429 일시 중지 키"""
+        return f"{self.key_prefix}:{name}:paused"
+
+    def _get_redis(self):
+        """Redis 클라이언트 지연 생성 (연결 실패 시 None → 로컬 모드)"""
+        if self._redis is None and self.redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(self.redis_url, socket_timeout=1.0)
+                self._reserve = self._redis.register_script(_RESERVE_SCRIPT)
+                self._throttle = self._redis.register_script(_THROTTLE_SCRIPT)
+            except Exception as e:
+                logging.warning(f"Redis rate limiter disabled: {e}")
+                self.redis_url = ""
+        return self._redis
+
+    def get_stats(self) -> Dict[str, Any]:
+        """리미터 통계"""
+        with self._lock:
+            return dict(self.stats, mode=self.mode)
+
+
+# 프로세스 전역 레이트 리미터 인스턴스
+rate_limiter = RateLimiter.from_settings()
@@ -0,0 +1,325 @@
+import re
+import time
+import uuid
+import random
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from config.settings import settings
+
+# 로컬 해싱 임베딩 차원
+HASHING_DIMENSIONS = 512
+
+# 이보다 짧은 질문(문장부호·공백 제외 글자 수)은 앞 대화에 기대는 말이라 캐시하지 않음 ("네", "왜요?" 등)
+MIN_QUESTION_CHARS = 4
+
+# 말투 표현을 지운 뒤 남아야 하는 최소 글자 수 ("뭐야?"처럼 내용 없는 질문 제외)
+MIN_NORMALIZED_CHARS = 2
+
+# 임계값 바로 아래 유사도 (튜닝용 근접 미스로 집계)
+NEAR_MISS_MARGIN = 0.05
+
+# 오적중 감사용으로 보관할 최근 적중 샘플 수
+AUDIT_LOG_SIZE = 50
+
+# 질문 말투만 다르고 의미는 같은 표현 (정규화 시 제거)
+FILLER_WORDS = {
+    "뭐야", "뭐예요", "뭐에요", "뭔가요", "뭔데", "뭐지", "뭐", "무엇", "무엇인가요", "무엇인지", "뭔지",
+    "알려줘", "알려주세요", "알려줄래", "알려", "설명해줘", "설명해주세요", "설명해줄래", "설명좀", "설명",
+    "뜻", "뜻이", "의미", "의미가", "좀", "이게", "그게", "그거", "이거", "요", "궁금해", "궁금해요", "궁금한데", "말이야",
+    "거야", "건가요", "인가요", "해줘", "해주세요", "주세요", "어떻게", "대해", "대해서", "관해", "관해서", "나"
+}
+
+# 어절 끝 조사 (세 글자 이상 어절에서만 제거 - "넓이", "높이" 같은 두 글자 낱말 보호)
+_JOSA_PATTERN = re.compile(r"(에서|으로|이란|이라는|이라|란|이|가|은|는|을|를|의|에|로|와|과|도|만)$")
+_NON_WORD_PATTERN = re.compile(r"[^0-9a-z가-힣\s]+")
+
+
+def normalize_question(text: str) -> str:
+    """소문자화, 문장부호·이모지·말투 표현·어절 끝 조사 제거"""
+    words = []
+    for word in _NON_WORD_PATTERN.sub(" ", (text or "").lower()).split():
+        if word in FILLER_WORDS:
+            continue
+        if len(word) >= 3:
+            word = _JOSA_PATTERN.sub("", word)
+        if word and word not in FILLER_WORDS:
+            words.append(word)
+    return " ".join(words)
+
+
+class HashingEmbedder:
+    """결정적 로컬 임베딩 (어절별 글자 1~3그램 해싱) - 오프라인 테스트와 임베딩 배포가 없을 때 사용"""
+
+    name = "hashing"
+
+    def __init__(self, dimensions: int = HASHING_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def embed(self, text: str) -> np.ndarray:
+        """정규화된 질문 → L2 정규화 벡터"""
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in text.split():
+            padded = f"<{word}>"
+            grams = [word] + [padded[i:i + n] for n in (1, 2, 3) for i in range(len(padded) - n + 1)]
+            for gram in grams:
+                digest = hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+                vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+
+class AzureOpenAIEmbedder:
+    """Azure OpenAI 임베딩 배포 (첫 번째 채팅 배포의 엔드포인트/키 사용)"""
+
+    name = "azure_openai"
+
+    def __init__(self, deployment_name: str):
+        self.deployment_name = deployment_name
+
+    def embed(self, text: str) -> np.ndarray:
+        """정규화된 질문 → L2 정규화 벡터"""
+        from services.deployment_router import deployment_router
+
+        client = deployment_router.deployments[0].get_client()
+        response = client.embeddings.create(model=self.deployment_name, input=[text],
+                                            timeout=settings.semantic_cache_embedding_timeout)
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+
+@dataclass(eq=False)
+class CacheEntry:
+    """캐시된 질문-답변"""
+    question: str
+    answer: str
+    created_at: float
+    hits: int = 0
+
+
+class NumpyVectorIndex:
+    """네임스페이스(템플릿+맥락)별 정규화 벡터 행렬 브루트포스 코사인 검색 (워커 내부)"""
+
+    name = "numpy"
+
+    def __init__(self, max_entries: int = 5000, ttl_seconds: float = 86400):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._matrices: Dict[str, np.ndarray] = {}
+        self._entries: Dict[str, List[CacheEntry]] = {}
+        self._order: "OrderedDict[CacheEntry, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, namespace: str, vector: np.ndarray, entry: CacheEntry) -> None:
+        """항목 추가 (최대 개수를 넘으면 오래된 것부터 제거)"""
+        with self._lock:
+            matrix = self._matrices.get(namespace)
+            self._matrices[namespace] = vector[None, :] if matrix is None else np.vstack([matrix, vector])
+            self._entries.setdefault(namespace, []).append(entry)
+            self._order[entry] = namespace
+            while len(self._order) > self.max_entries:
+                oldest, oldest_namespace = next(iter(self._order.items()))
+                self._remove(oldest_namespace, oldest)
+
+    def search(self, namespace: str, vector: np.ndarray) -> Optional[Tuple[float, CacheEntry]]:
+        """만료되지 않은 최근접 이웃 → (코사인 유사도, 항목)"""
+        with self._lock:
+            entries = self._entries.get(namespace)
+            if not entries:
+                return None
+            expire_before = time.time() - self.ttl_seconds
+            for entry in [e for e in entries if e.created_at < expire_before]:
+                self._remove(namespace, entry)
+            matrix = self._matrices.get(namespace)
+            if matrix is None:
+                return None
+            scores = matrix @ vector
+            best = int(np.argmax(scores))
+            return float(scores[best]), self._entries[namespace][best]
+
+    def _remove(self, namespace: str, entry: CacheEntry) -> None:
+        """항목 제거 (lock 안에서 호출)"""
+        entries = self._entries[namespace]
+        index = next(i for i, e in enumerate(entries) if e is entry)
+        del entries[index]
+        self._order.pop(entry, None)
+        if entries:
+            self._matrices[namespace] = np.delete(self._matrices[namespace], index, axis=0)
+        else:
+            del self._entries[namespace]
+            del self._matrices[namespace]
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+class AzureSearchVectorIndex:
+    """Azure AI Search 벡터 인덱스 (워커 간 공유)
+
+    인덱스는 미리 만들어 두어야 합니다: id(key), namespace(filterable), question, answer,
+    created_at(Edm.Double, filterable), vector(Collection(Edm.Single), cosine HNSW 프로필).
+    """
+
+    name = "azure_search"
+
+    def __init__(self, endpoint: str, api_key: str, index_name: str, ttl_seconds: float = 86400):
+        from azure.core.credentials import AzureKeyCredential
+        from azure.search.documents import SearchClient
+
+        self.ttl_seconds = ttl_seconds
+        self.client = SearchClient(endpoint, index_name, AzureKeyCredential(api_key))
+
+    def add(self, namespace: str, vector: np.ndarray, entry: CacheEntry) -> None:
+        """문서 업로드"""
+        self.client.upload_documents([{
+            "id": uuid.uuid4().hex,
+            "namespace": namespace,
+            "question": entry.question,
+            "answer": entry.answer,
+            "created_at": entry.created_at,
+            "vector": vector.tolist()
+        }])
+
+    def search(self, namespace: str, vector: np.ndarray) -> Optional[Tuple[float, CacheEntry]]:
+        """네임스페이스 필터 + 만료 필터 안에서 벡터 최근접 이웃 1개"""
+        from azure.search.documents.models import VectorizedQuery
+
+        results = self.client.search(
+            search_text=None,
+            vector_queries=[VectorizedQuery(vector=vector.tolist(), k_nearest_neighbors=1, fields="vector")],
+            filter=f"namespace eq '{namespace}' and created_at ge {time.time() - self.ttl_seconds}",
+            select=["question", "answer", "created_at"],
+            top=1
+        )
+        for result in results:
+            # 코사인 메트릭 점수 = 1 / (1 + (1 - 코사인 유사도))
+            similarity = 2.0 - 1.0 / result["@search.score"]
+            return similarity, CacheEntry(result["question"], result["answer"], result["created_at"])
+        return None
+
+    def __len__(self) -> int:
+        return self.client.get_document_count()
+
+
+class SemanticCache:
+    """정규화한 질문+맥락의 임베딩 최근접 이웃이 임계값 이상이면 캐시된 답변 반환 (템플릿별 opt-in)"""
+
+    def __init__(self, templates: Iterable[str] = (), threshold: float = 0.9, index=None, embedder=None,
+                 audit_ratio: float = 0.05):
+        self.templates = set(templates)
+        self.threshold = threshold
+        self.index = index if index is not None else NumpyVectorIndex()
+        self.embedder = embedder if embedder is not None else HashingEmbedder()
+        self.audit_ratio = audit_ratio
+        self.audit_log = deque(maxlen=AUDIT_LOG_SIZE)
+        self._lock = threading.Lock()
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "near_misses": 0, "skipped": 0, "stored": 0,
+                      "errors": 0}
+
+    @classmethod
+    def from_settings(cls) -> "SemanticCache":
+        """환경변수 설정으로 생성 (Azure AI Search/임베딩 배포가 없거나 실패하면 로컬 백엔드)"""
+        index, embedder = None, None
+        if settings.semantic_cache_backend == "azure_search":
+            try:
+                index = AzureSearchVectorIndex(settings.azure_search_endpoint, settings.azure_search_key,
+                                               settings.semantic_cache_index_name, settings.semantic_cache_ttl_seconds)
+            except Exception as e:
+                logging.warning(f"Azure AI Search semantic cache disabled, using local index: {e}")
+        if index is None:
+            index = NumpyVectorIndex(settings.semantic_cache_max_entries, settings.semantic_cache_ttl_seconds)
+        if settings.semantic_cache_embedding_deployment:
+            embedder = AzureOpenAIEmbedder(settings.semantic_cache_embedding_deployment)
+        return cls(settings.semantic_cache_templates, settings.semantic_cache_threshold, index, embedder,
+                   settings.semantic_cache_audit_ratio)
+
+    def is_enabled(self, template: Optional[str]) -> bool:
+        """템플릿별 opt-in 여부"""
+        return template in self.templates
+
+    def get_or_generate(self, template: str, scope: str, question: str, generate: Callable[[], str]) -> str:
+        """비슷한 질문의 캐시된 답변이 있으면 반환, 없으면 generate() 결과를 저장 후 반환"""
+        if not self.is_enabled(template):
+            return generate()
+
+        normalized = normalize_question(question)
+        if (len(_NON_WORD_PATTERN.sub("", question or "").replace(" ", "")) < MIN_QUESTION_CHARS
+                or len(normalized.replace(" ", "")) < MIN_NORMALIZED_CHARS):
+            self._count("skipped")
+            return generate()
+
+        namespace = self._namespace(template, scope)
+        try:
+            vector = self.embedder.embed(normalized)
+            cached = self._lookup(namespace, vector, question)
+        except Exception as e:
+            logging.warning(f"Semantic cache lookup failed, calling LLM: {e}")
+            self._count("errors")
+            return generate()
+        if cached is not None:
+            return cached
+
+        answer = generate()
+        try:
+            self.index.add(namespace, vector, CacheEntry(question, answer, time.time()))
+            self._count("stored")
+        except Exception as e:
+            logging.warning(f"Could not store semantic cache entry: {e}")
+            self._count("errors")
+        return answer
+
+    def _lookup(self, namespace: str, vector: np.ndarray, question: str) -> Optional[str]:
+        """임계값 이상 최근접 이웃의 답변 (적중의 일부는 감사 로그에 남김)"""
+        match = self.index.search(namespace, vector)
+        similarity = match[0] if match else 0.0
+
+        with self._lock:
+            self.stats["lookups"] += 1
+            if match is None or similarity < self.threshold:
+                self.stats["misses"] += 1
+                if match is not None and similarity >= self.threshold - NEAR_MISS_MARGIN:
+                    self.stats["near_misses"] += 1
+                return None
+
+            entry = match[1]
+            entry.hits += 1
+            self.stats["hits"] += 1
+            if random.random() < self.audit_ratio:
+                self.audit_log.append({
+                    "namespace": namespace,
+                    "question": question,
+                    "matched_question": entry.question,
+                    "similarity": round(similarity, 4),
+                    "at": time.time()
+                })
+        return entry.answer
+
+    @staticmethod
+    def _namespace(template: str, scope: str) -> str:
+        """템플릿+답변 맥락(개념, 현재 문제 등)별 검색 범위"""
+        digest = hashlib.sha256(f"{template}\x00{scope or ''}".encode("utf-8")).hexdigest()[:32]
+        return f"{template}-{digest}"
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """적중률, 근접 미스, 오적중 감사 샘플"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["audit_samples"] = list(self.audit_log)
+        stats["hit_rate"] = round(stats["hits"] / stats["lookups"], 4) if stats["lookups"] else 0.0
+        stats["backend"] = self.index.name
+        stats["embedder"] = self.embedder.name
+        return stats
+
+
+# 프로세스 전역 시맨틱 캐시
+semantic_cache = SemanticCache.from_settings()
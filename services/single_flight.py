@@ -0,0 +1,170 @@
+import json
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from config.settings import settings
+
+# 리더 결과를 다른 워커가 가져갈 수 있도록 Redis에 남겨두는 시간 (초)
+RESULT_TTL_SECONDS = 10
+
+# 다른 워커의 리더 결과를 기다릴 때 폴링 간격 (초)
+POLL_INTERVAL_SECONDS = 0.05
+
+
+def make_request_key(template: str, messages: List[Dict[str, str]], response_format: str, model: str = "") -> str:
+    """동일 요청 판별 키 (템플릿 + 모델 + 프롬프트/히스토리 윈도우 해시)"""
+    payload = json.dumps([template, model, response_format, messages], ensure_ascii=False, sort_keys=True)
+    return f"{template}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class _InFlightCall:
+    """진행 중인 호출 (리더가 결과를 채우면 대기 중인 호출자들이 깨어남)"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """동일한 LLM 요청이 동시에 여러 번 들어오면 첫 호출 결과를 공유 (local: 워커 내부, redis: 워커 간)"""
+
+    def __init__(self, templates: Iterable[str] = (), mode: str = "local", redis_url: str = "",
+                 key_prefix: str = "llm-tutor:singleflight"):
+        self.templates = set(templates)
+        self.mode = mode
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self._calls: Dict[str, _InFlightCall] = {}
+        self._redis = None
+        self._lock = threading.Lock()
+        self.stats = {"leader_calls": 0, "coalesced_local": 0, "coalesced_remote": 0}
+
+    @classmethod
+    def from_settings(cls) -> "SingleFlight":
+        """환경변수 설정으로 생성"""
+        return cls(settings.llm_single_flight_templates, settings.llm_single_flight_mode,
+                   settings.redis_connection_string)
+
+    def is_enabled(self, template: Optional[str]) -> bool:
+        """템플릿별 opt-in 여부"""
+        return template in self.templates
+
+    def do(self, key: str, fn: Callable[[], str], timeout: Optional[float] = None) -> str:
+        """key가 같은 호출이 진행 중이면 그 결과를 기다리고, 아니면 fn을 실행"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.stats["coalesced_local"] += 1
+                is_leader = False
+            else:
+                call = _InFlightCall()
+                self._calls[key] = call
+                is_leader = True
+
+        if not is_leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"Timed out waiting for in-flight LLM call '{key}'")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run_leader(key, fn, timeout)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _run_leader(self, key: str, fn: Callable[[], str], timeout: Optional[float]) -> str:
+        """워커 내부 리더 - redis 모드면 다른 워커의 진행 중 호출도 확인"""
+        client = self._get_redis() if self.mode == "redis" else None
+        if client is None:
+            with self._lock:
+                self.stats["leader_calls"] += 1
+            return fn()
+
+        try:
+            return self._run_shared(client, key, fn, timeout)
+        except _RedisUnavailable as e:
+            logging.warning(f"Redis single-flight unavailable, calling directly: {e}")
+            with self._lock:
+                self.stats["leader_calls"] += 1
+            return fn()
+
+    def _run_shared(self, client, key: str, fn: Callable[[], str], timeout: Optional[float]) -> str:
+        """Redis 락으로 워커 간 리더 선출 - 락을 못 잡으면 리더 결과를 폴링"""
+        lock_key = f"{self.key_prefix}:{key}:lock"
+        result_key = f"{self.key_prefix}:{key}:result"
+        token = uuid.uuid4().hex
+        lock_ttl_ms = int((timeout or settings.llm_request_timeout) * 1000)
+        deadline = time.monotonic() + (timeout or settings.llm_request_timeout)
+
+        while True:
+            try:
+                cached = client.get(result_key)
+                if cached is not None:
+                    with self._lock:
+                        self.stats["coalesced_remote"] += 1
+                    return cached.decode("utf-8")
+                acquired = client.set(lock_key, token, nx=True, px=lock_ttl_ms)
+            except Exception as e:
+                raise _RedisUnavailable(e)
+
+            if acquired:
+                break
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting for shared in-flight LLM call '{key}'")
+            time.sleep(POLL_INTERVAL_SECONDS)
+
+        with self._lock:
+            self.stats["leader_calls"] += 1
+        try:
+            result = fn()
+            try:
+                client.set(result_key, result.encode("utf-8"), ex=RESULT_TTL_SECONDS)
+            except Exception as e:
+                logging.warning(f"Could not publish single-flight result: {e}")
+            return result
+        finally:
+            try:
+                # 내 락일 때만 해제 (실패 시 기다리던 워커가 직접 호출하도록)
+                if client.get(lock_key) == token.encode("utf-8"):
+                    client.delete(lock_key)
+            except Exception:
+                pass
+
+    def _get_redis(self):
+        """Redis 클라이언트 지연 생성"""
+        if self._redis is None and self.redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(self.redis_url, socket_timeout=1.0)
+            except Exception as e:
+                logging.warning(f"Redis single-flight disabled: {e}")
+                self.redis_url = ""
+        return self._redis
+
+    def get_stats(self) -> Dict[str, Any]:
+        """절약한 중복 호출 수 등 통계"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["saved_calls"] = stats["coalesced_local"] + stats["coalesced_remote"]
+        return stats
+
+
+class _RedisUnavailable(Exception):
+    """Redis 연결 실패 (워커 내부 모드로 대체)"""
+
+
+# 프로세스 전역 single-flight 인스턴스
+single_flight = SingleFlight.from_settings()
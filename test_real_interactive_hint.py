@@ -8,6 +8,7 @@ from handlers.session_handler import SessionHandler
 from handlers.feedback_handler import FeedbackHandler
 from handlers.generated_item_handler import GeneratedItemHandler
 from handlers.continuous_learning_handler import ContinuousLearningHandler
+from handlers.speculative_prefetcher import prefetcher
 from handlers.session_state_manager import session_manager
 
 
@@ -56,6 +57,8 @@ def main():
         # 연속 학습 세션 시작
         continuous_handler = ContinuousLearningHandler()
         learning_session = session_manager.create_session(learner_id, session_id, weakest_concepts)
+        # 학생이 선택지를 고르는 동안 다음 응답 미리 생성
+        continuous_handler.prefetch_next_actions(learning_session, result1.get('quick_replies', []))
 
         # 진단테스트 후 선택지 표시
         print(f"\n🎯 진단테스트가 완료되었습니다! 다음 중 하나를 선택해주세요:")
@@ -141,6 +144,7 @@ def main():
                     
                     # 새로운 연속 학습 세션 시작
                     new_learning_session = session_manager.create_session(new_learner_id, new_session_id, new_weakest_concepts)
+                    continuous_handler.prefetch_next_actions(new_learning_session, new_result1.get('quick_replies', []))
                     
                     # 새로운 진단테스트 선택지 표시
                     print(f"\n🎯 새로운 진단테스트가 완료되었습니다! 다음 중 하나를 선택해주세요:")
@@ -176,6 +180,9 @@ def main():
             print(f"💡 사용한 힌트: {summary.get('total_hints_used', 0)}개")
             print(f"⏱️ 학습 시간: {summary.get('session_duration_minutes', 0)}분")
 
+        prefetch_stats = prefetcher.get_stats()
+        print(f"⚡ 미리 생성 적중률: {prefetch_stats['hit_rate']:.0%} (낭비 토큰 약 {prefetch_stats['wasted_tokens']}개)")
+
         print("\n🎓 연속 학습 세션이 완료되었습니다!")
 
     except Exception as e:
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+다중 배포 라우팅/페일오버 테스트 예제
+로컬 가짜 OpenAI 서버 3개(빠름/느림/스로틀)를 띄우고 LLMService의 배포 선택을 확인
+"""
+
+import os
+import sys
+import json
+import logging
+from collections import Counter
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "tests", "api"))
+
+FAKE_DEPLOYMENTS = [
+    {"name": "fast", "port": 8101, "latency": 0.05, "throttle_every": 0, "error_rate": 0.0},
+    {"name": "slow", "port": 8102, "latency": 0.5, "throttle_every": 0, "error_rate": 0.0},
+    {"name": "throttled", "port": 8103, "latency": 0.05, "throttle_every": 2, "error_rate": 0.0},
+]
+
+# 설정 로드 전에 배포 목록 환경변수 지정
+os.environ.setdefault("SqlConnectionString", "fake")
+os.environ.setdefault("OpenApiKey", "fake-key")
+os.environ.setdefault("OpenAIEndpoint", "http://127.0.0.1:8101")
+os.environ["OpenAIDeployments"] = json.dumps([
+    {"name": d["name"], "endpoint": f"http://127.0.0.1:{d['port']}", "model": "gpt-4o-mini"}
+    for d in FAKE_DEPLOYMENTS
+])
+
+from fake_openai_server import serve, FakeOpenAIState  # noqa: E402
+from services.llm_service import LLMService  # noqa: E402
+
+
+def setup_module():
+    """가짜 배포 서버 실행 (pytest 실행 시 자동 호출)"""
+    for d in FAKE_DEPLOYMENTS:
+        state = FakeOpenAIState(d["name"], d["latency"], 0.01, d["error_rate"], d["throttle_every"], 600)
+        serve(d["port"], state)
+
+
+def test_latency_aware_routing():
+    """빠른 배포로 트래픽이 몰리고 스로틀된 배포는 피하는지 확인"""
+    print("🧪 지연 기반 배포 선택 테스트")
+    print("=" * 50)
+
+    llm_service = LLMService()
+    counter = Counter()
+    for _ in range(40):
+        response = llm_service.call_llm("너는 튜터야.", "힌트 주세요", [], template="hint")
+        counter[response.split("]")[0].lstrip("[")] += 1
+
+    print(f"배포별 응답 수: {dict(counter)}")
+    for stats in llm_service.router.get_stats():
+        print(f"  {stats['name']}: ewma={stats['ewma_latency']}s, 429={stats['total_throttles']}, 호출={stats['total_calls']}")
+
+    assert counter["fast"] > counter["slow"], "빠른 배포가 더 많은 요청을 받아야 합니다"
+    print("✅ 통과")
+
+
+def test_failover_when_deployment_down():
+    """우선 배포가 내려가면 다른 배포로 넘어가는지 확인"""
+    print("\n🧪 페일오버 테스트")
+    print("=" * 50)
+
+    llm_service = LLMService()
+    fast = llm_service.router.get("fast")
+    original_endpoint = fast.endpoint
+    fast.client = None
+    fast.endpoint = "http://127.0.0.1:8199"  # 아무 서버도 없는 포트
+
+    try:
+        response = llm_service.call_llm("너는 튜터야.", "힌트 주세요", [], template="hint")
+        print(f"응답: {response}")
+        assert not response.startswith("[fast]"), "내려간 배포에서 응답이 오면 안 됩니다"
+        print("✅ 통과")
+    finally:
+        fast.client = None
+        fast.endpoint = original_endpoint
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.ERROR)
+    setup_module()
+    test_latency_aware_routing()
+    test_failover_when_deployment_down()
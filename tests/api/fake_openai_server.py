@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+로컬 가짜 Azure OpenAI 서버
+여러 배포 라우팅/페일오버, 재시도, 레이트 리밋 동작을 실제 API 없이 테스트하기 위한 도구
+
+사용 예:
+    python tests/api/fake_openai_server.py --port 8001 --latency 0.3
+    python tests/api/fake_openai_server.py --port 8002 --latency 1.2 --throttle-every 5
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROUTE_PATTERN = re.compile(r"^/openai/deployments/([^/]+)/chat/completions")
+BATCH_COUNT_PATTERN = re.compile(r"서로 다른 (\d+)개")
+
+
+def fake_question(duplicate: bool) -> dict:
+    """note.py 응답 형식의 가짜 일차방정식 문제 (duplicate면 항상 같은 문제)"""
+    a, x, b = (2, 3, 5) if duplicate else (random.randint(2, 9), random.randint(1, 12), random.randint(1, 20))
+    return {
+        "question_text": f"일차방정식 \\({a}x + {b} = {a * x + b}\\)의 해를 구하시오.",
+        "question_type": "단답형",
+        "correct_answer": str(x),
+        "answer_explanation": f"양변에서 {b}를 빼면 \\({a}x = {a * x}\\)이고, 양변을 {a}로 나누면 \\(x = {x}\\)입니다.",
+        "svg_code": None
+    }
+
+
+def fake_similar_item() -> dict:
+    """유사 문항 응답 형식(힌트 사다리 포함)의 가짜 일차방정식 문제"""
+    a, x, b = random.randint(2, 9), random.randint(1, 12), random.randint(1, 20)
+    return {
+        "new_question_text": f"일차방정식 \\({a}x + {b} = {a * x + b}\\)의 해를 구하시오.",
+        "correct_answer": str(x),
+        "explanation": f"양변에서 {b}를 빼면 \\({a}x = {a * x}\\)이고, 양변을 {a}로 나누면 \\(x = {x}\\)입니다.",
+        "hint_ladder": ["문제에서 구해야 하는 것은 무엇일까?", "등식의 성질 중 어떤 것을 쓰면 x만 남길 수 있을까?",
+                        f"양변에서 {b}를 빼면 식이 어떻게 바뀔까?"]
+    }
+
+
+class FakeOpenAIState:
+    """서버 동작 설정과 호출 카운터"""
+
+    def __init__(self, name: str, latency: float, jitter: float, error_rate: float,
+                 throttle_every: int, rpm_limit: int, duplicate_rate: float = 0.0, token_latency: float = 0.0):
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_every = throttle_every
+        self.rpm_limit = rpm_limit
+        self.duplicate_rate = duplicate_rate
+        self.token_latency = token_latency
+        self.request_count = 0
+        self.window_start = time.monotonic()
+        self.window_count = 0
+        self.lock = threading.Lock()
+
+    def next_request(self):
+        """요청 카운터 증가 후 (전체 요청 번호, 현재 분 창 안의 남은 요청 수) 반환"""
+        with self.lock:
+            self.request_count += 1
+            now = time.monotonic()
+            if now - self.window_start >= 60:
+                self.window_start = now
+                self.window_count = 0
+            self.window_count += 1
+            return self.request_count, self.rpm_limit - self.window_count
+
+
+def make_handler(state: FakeOpenAIState):
+    """상태를 공유하는 요청 핸들러 클래스 생성"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, body: dict, headers: dict = None):
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, str(value))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            match = ROUTE_PATTERN.match(self.path)
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+
+            if not match:
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+
+            request_number, remaining = state.next_request()
+            quota_headers = {
+                "x-ratelimit-limit-requests": state.rpm_limit,
+                "x-ratelimit-remaining-requests": max(remaining, 0),
+                "x-fake-server": state.name
+            }
+
+            if remaining < 0 or (state.throttle_every and request_number % state.throttle_every == 0):
+                self._send_json(429, {"error": {"code": "429", "message": "Rate limit is exceeded."}},
+                                {**quota_headers, "retry-after-ms": 500, "retry-after": 1})
+                return
+
+            if random.random() < state.error_rate:
+                self._send_json(503, {"error": {"message": "Service unavailable"}}, quota_headers)
+                return
+
+            messages = request.get("messages", [])
+            last_message = messages[-1]["content"] if messages else ""
+            is_json = (request.get("response_format") or {}).get("type") == "json_object"
+            if is_json and "유사 문항" in last_message:
+                # 유사 문항 요청: 출력 형식에 variants가 있으면 난이도별 문항 3개
+                if '{"variants"' in last_message:
+                    content = json.dumps({"variants": {name: fake_similar_item() for name in ("easier", "same", "harder")}},
+                                         ensure_ascii=False)
+                else:
+                    content = json.dumps(fake_similar_item(), ensure_ascii=False)
+            elif is_json:
+                content = json.dumps({"deployment": state.name, "echo": last_message[:50]}, ensure_ascii=False)
+            elif "수학 문제" in last_message:
+                # note.py 문제 생성 요청: "서로 다른 N개"면 JSON 배열, 아니면 객체 하나
+                batch = BATCH_COUNT_PATTERN.search(last_message)
+                questions = [fake_question(random.random() < state.duplicate_rate)
+                             for _ in range(int(batch.group(1)) if batch else 1)]
+                content = json.dumps(questions if batch else questions[0], ensure_ascii=False)
+            elif random.random() < state.duplicate_rate:
+                content = f"[{state.name}] 어떤 부분부터 생각해볼까?"
+            else:
+                content = f"[{state.name}] 어떤 부분부터 생각해볼까? ({request_number})"
+
+            # 응답 길이에 비례한 생성 시간 흉내 (token_latency: 출력 토큰당 초)
+            delay = state.latency + random.uniform(-state.jitter, state.jitter) + len(content) // 2 * state.token_latency
+            time.sleep(max(0.0, delay))
+
+            prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 2
+            completion_tokens = len(content) // 2
+            self._send_json(200, {
+                "id": f"chatcmpl-fake-{request_number}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": match.group(1),
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content}
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
+                }
+            }, quota_headers)
+
+    return Handler
+
+
+def serve(port: int, state: FakeOpenAIState) -> ThreadingHTTPServer:
+    """백그라운드 스레드에서 서버 시작 (테스트 코드에서 재사용)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 Azure OpenAI 서버")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--name", default=None, help="응답에 표시할 서버 이름")
+    parser.add_argument("--latency", type=float, default=0.2, help="응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.05, help="지연 편차 (초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 응답 비율")
+    parser.add_argument("--throttle-every", type=int, default=0, help="N번째 요청마다 429 응답")
+    parser.add_argument("--rpm-limit", type=int, default=600, help="분당 요청 한도")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0, help="항상 같은 내용을 돌려주는 응답 비율")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="출력 토큰당 추가 지연 (초)")
+    args = parser.parse_args()
+
+    state = FakeOpenAIState(args.name or f"fake-{args.port}", args.latency, args.jitter,
+                            args.error_rate, args.throttle_every, args.rpm_limit, args.duplicate_rate,
+                            args.token_latency)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(state))
+    print(f"🤖 가짜 OpenAI 서버 실행: http://127.0.0.1:{args.port} (지연 {args.latency}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 서버 종료")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
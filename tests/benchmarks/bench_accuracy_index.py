@@ -0,0 +1,71 @@
+"""
+학습자×개념 정확도 인덱스 벤치마크 (100k 학습자 × 59 개념)
+
+실행: python tests/benchmarks/bench_accuracy_index.py [--learners 100000] [--concepts 59]
+DB 없이 합성 데이터로 적재 시간, 메모리, 조회 지연(p50/p99)을 측정합니다.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from database.accuracy_index import AccuracyIndex
+
+
+def make_rows(learners: int, concepts: int):
+    """뷰 집계 결과와 같은 모양의 합성 행 생성"""
+    concept_names = [f"개념{i:02d}" for i in range(concepts)]
+    for i in range(learners):
+        learner_id = f"A{i:09d}"
+        for concept_name in concept_names:
+            yield learner_id, concept_name, random.random(), random.randint(1, 20)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--learners", type=int, default=100_000)
+    parser.add_argument("--concepts", type=int, default=59)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"🧪 정확도 인덱스 벤치마크: {args.learners:,} 학습자 × {args.concepts} 개념")
+    print("=" * 60)
+
+    index = AccuracyIndex(refresh_seconds=float("inf"))
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    applied = index.apply_rows(make_rows(args.learners, args.concepts))
+    load_seconds = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = index.get_stats()
+    print(f"📥 적재: {applied:,}행, {load_seconds:.1f}초 ({applied / load_seconds:,.0f}행/초)")
+    print(f"💾 메모리: 행렬 {stats['memory_bytes'] / 2**20:.1f}MB, 전체 {current / 2**20:.1f}MB (최대 {peak / 2**20:.1f}MB)")
+
+    keys = [(f"A{random.randrange(args.learners):09d}", f"개념{random.randrange(args.concepts):02d}")
+            for _ in range(args.lookups)]
+    latencies = []
+    for learner_id, concept_name in keys:
+        t = time.perf_counter_ns()
+        index.get(learner_id, concept_name)
+        latencies.append(time.perf_counter_ns() - t)
+    latencies.sort()
+
+    print(f"🔍 조회 {args.lookups:,}회: p50 {latencies[len(latencies) // 2] / 1000:.2f}µs, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] / 1000:.2f}µs")
+
+    # 다시 적재: 새 행렬을 만드는 동안 조회는 이전 행렬을 씀
+    started = time.perf_counter()
+    index.apply_rows(make_rows(args.learners, args.concepts))
+    print(f"🔄 다시 적재: {(time.perf_counter() - started):.1f}초")
+    print(f"✅ 적중률: {index.get_stats()['hit_rate']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
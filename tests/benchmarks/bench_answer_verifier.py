@@ -0,0 +1,114 @@
+"""
+생성 문항 정답 검증기 벤치마크: 기존 "해설의 가장 큰 숫자" 보정 vs 해설 계산 검증
+
+실행: python tests/benchmarks/bench_answer_verifier.py [--repeat 200]
+tests/benchmarks/data/generated_items_corpus.jsonl의 생성 문항(정답·해설·실제 정답)으로
+1) 검증 결과가 기대(verified/mismatch/step_error/unverifiable)와 같은 비율
+2) 보정 후 학생에게 나가는 정답이 실제 정답과 다른 문항 수 (기존 방식 vs 검증 + 예산 소진 시 보정)
+3) 문항당 검증 시간 (1ms 미만이어야 함)
+을 확인합니다. 기대와 다른 검증 결과가 있거나 1ms를 넘으면 실패로 종료합니다.
+known_miss가 적힌 문항은 기대(올바른 판정)와 다른 결과가 나오는 알려진 한계로, 정확도에는 틀린 것으로 세고 따로 출력합니다.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from services.answer_verifier import verify_item, parse_answer, corrected_answer, values_match  # noqa: E402
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "generated_items_corpus.jsonl")
+MAX_MICROSECONDS = 1000
+
+
+def legacy_fix(correct_answer: str, explanation: str) -> str:
+    """기존 parse_similar_item_response 방식: 정답 숫자가 해설에 없으면 해설의 가장 큰 숫자로 교체"""
+    answer_numbers = re.findall(r'\d+(?:\.\d+)?', correct_answer)
+    explanation_numbers = re.findall(r'\d+(?:\.\d+)?', explanation)
+    if answer_numbers and explanation_numbers and not any(num in explanation_numbers for num in answer_numbers):
+        largest_num = max(explanation_numbers, key=float)
+        original_units = re.findall(r'[a-zA-Z²³°]+', correct_answer)
+        return largest_num + (original_units[0] if original_units else '')
+    return correct_answer
+
+
+def verifier_fix(correct_answer: str, explanation: str) -> str:
+    """재생성 예산을 다 쓴 뒤의 새 방식 (mismatch만 해설 최종 값으로 보정)"""
+    verification = verify_item(correct_answer, explanation)
+    if verification.status == "mismatch" and verification.final_value is not None:
+        return corrected_answer(correct_answer, verification.final_value) or correct_answer
+    return correct_answer
+
+
+def is_wrong(answer: str, true_answer: str) -> bool:
+    """학생에게 나가는 정답이 실제 정답과 다른지 (계산할 수 없는 답은 비교하지 않음)"""
+    expected, actual = parse_answer(true_answer), parse_answer(answer)
+    if expected is None or actual is None:
+        return False
+    return not values_match(actual, expected)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(CORPUS_PATH, "r", encoding="utf-8") as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+
+    print(f"🧪 생성 문항 정답 검증기 벤치마크 (문항 {len(corpus)}개)")
+    print("=" * 84)
+
+    unexpected = []
+    known_misses = []
+    counts = {}
+    legacy_wrong = verifier_wrong = flagged = 0
+    for item in corpus:
+        verification = verify_item(item["correct_answer"], item["explanation"])
+        counts[verification.status] = counts.get(verification.status, 0) + 1
+        if verification.status != item["expect"]:
+            misses = known_misses if item.get("known_miss") else unexpected
+            misses.append((item["name"], item["expect"], verification.status))
+        flagged += verification.failed
+
+        if item.get("true_answer") is not None:
+            legacy_answer = legacy_fix(item["correct_answer"], item["explanation"])
+            new_answer = verifier_fix(item["correct_answer"], item["explanation"])
+            legacy_wrong += is_wrong(legacy_answer, item["true_answer"])
+            verifier_wrong += is_wrong(new_answer, item["true_answer"])
+            if is_wrong(new_answer, item["true_answer"]):
+                print(f"  ⚠️  {item['name']}: 검증 후에도 틀린 정답 {new_answer!r} (실제 {item['true_answer']!r}, {verification.status})")
+
+    print(f"\n  검증 결과: {counts}")
+    print(f"  기대와 같은 결과: {len(corpus) - len(unexpected) - len(known_misses)}/{len(corpus)} "
+          f"(알려진 한계 {len(known_misses)}개는 틀린 것으로 셈)")
+    print(f"  재생성 대상 (mismatch/step_error): {flagged}개")
+    print(f"  틀린 정답이 학생에게 나가는 문항 (재생성 없이 보정만 한 경우): 기존 {legacy_wrong}개 → 검증기 {verifier_wrong}개")
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for item in corpus:
+            verify_item(item["correct_answer"], item["explanation"])
+    per_item_us = (time.perf_counter() - started) / (args.repeat * len(corpus)) * 1e6
+    longest = max(corpus, key=lambda item: len(item["explanation"]))
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        verify_item(longest["correct_answer"], longest["explanation"])
+    longest_us = (time.perf_counter() - started) / args.repeat * 1e6
+    print(f"  문항당 검증 시간: 평균 {per_item_us:.1f}µs, 가장 긴 해설({len(longest['explanation'])}자) {longest_us:.1f}µs")
+
+    for name, expected, actual in known_misses:
+        print(f"  ⚠️  알려진 한계 {name}: 기대 {expected}, 결과 {actual}")
+    for name, expected, actual in unexpected:
+        print(f"  ❌ {name}: 기대 {expected}, 결과 {actual}")
+    if unexpected or longest_us >= MAX_MICROSECONDS:
+        sys.exit(1)
+    print("\n✅ 완료")
+
+
+if __name__ == "__main__":
+    main()
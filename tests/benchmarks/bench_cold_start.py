@@ -0,0 +1,169 @@
+"""
+콜드 스타트 벤치마크 (새 프로세스마다 측정, 로컬 가짜 OpenAI 서버)
+
+실행: python tests/benchmarks/bench_cold_start.py [--repeat 5] [--top 12]
+1) function_app import 시간 (ColdStartWarmup=false, python -X importtime으로 패키지별 import 시간 리포트)
+2) 요청 경로에서 쓰지 않는 무거운 모듈(openai, pyodbc, numpy, pandas, azure-search, azure-storage)이 import 때 로드되지 않는지
+3) 첫 요청(generated_item) 시간 - 워밍업 없이 / 백그라운드 워밍업이 끝난 뒤
+README의 콜드 스타트 예산(IMPORT_BUDGET_MS, FIRST_REQUEST_BUDGET_MS, WARM_FIRST_REQUEST_BUDGET_MS)을 넘거나
+금지 모듈이 로드되면 실패로 종료합니다. 예산은 중앙값 기준입니다.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+FAKE_PORT = 8118
+
+# 콜드 스타트 예산 (ms, README "콜드 스타트 예산"과 같은 값)
+IMPORT_BUDGET_MS = 400
+FIRST_REQUEST_BUDGET_MS = 1500
+WARM_FIRST_REQUEST_BUDGET_MS = 300
+
+# function_app import 때 로드되면 안 되는 모듈 (요청 경로에서 첫 사용 때 import하거나 배치 작업에서만 사용)
+FORBIDDEN_MODULES = ["openai", "pyodbc", "numpy", "pandas", "azure.search", "azure.storage"]
+
+REQUEST_BODY = {
+    "request_type": "generated_item",
+    "message": "힌트 주세요",
+    "generated_question_data": {"new_question_text": "일차방정식 \\(3x + 5 = 20\\)의 해를 구하시오.",
+                                "correct_answer": "5", "explanation": "양변에서 5를 빼고 3으로 나눕니다."},
+    "conversation_history": []
+}
+
+
+def child_env(warmup: bool) -> dict:
+    """자식 프로세스 환경 (가짜 서버, 워밍업 설정)"""
+    env = dict(os.environ)
+    env.update({
+        "SqlConnectionString": env.get("SqlConnectionString", "fake"),
+        "OpenApiKey": env.get("OpenApiKey", "fake-key"),
+        "OpenAIEndpoint": f"http://127.0.0.1:{FAKE_PORT}",
+        "OpenAIDeployments": json.dumps([
+            {"name": "fake", "endpoint": f"http://127.0.0.1:{FAKE_PORT}", "model": "gpt-4o-mini", "rpm": 100000}
+        ]),
+        "LLMSingleFlightTemplates": "",
+        "ColdStartWarmup": "true" if warmup else "false",
+        "PYTHONPATH": os.pathsep.join([ROOT_DIR, os.path.join(ROOT_DIR, "tests", "api")])
+    })
+    return env
+
+
+def child_import():
+    """function_app import 시간과 로드된 금지 모듈"""
+    started = time.perf_counter()
+    import function_app  # noqa: F401
+    elapsed = time.perf_counter() - started
+    loaded = [name for name in FORBIDDEN_MODULES if name in sys.modules]
+    print(json.dumps({"import_ms": elapsed * 1000, "forbidden_loaded": loaded}))
+
+
+def child_request(warmup: bool):
+    """import 후 첫 요청·두 번째 요청 시간 (warmup이면 백그라운드 워밍업이 끝난 뒤 요청)"""
+    import logging
+    import threading
+    from fake_openai_server import serve, FakeOpenAIState
+
+    serve(FAKE_PORT, FakeOpenAIState("fake", 0.0, 0.0, 0.0, 0, 1000000))
+    logging.disable(logging.CRITICAL)
+
+    started = time.perf_counter()
+    import function_app
+    import azure.functions as func
+    import_ms = (time.perf_counter() - started) * 1000
+    if warmup:
+        for thread in threading.enumerate():
+            if thread.name == "cold-start-warmup":
+                thread.join()
+
+    timings = []
+    for _ in range(2):
+        req = func.HttpRequest("POST", "/api/tutor_api", headers={},
+                               body=json.dumps(REQUEST_BODY, ensure_ascii=False).encode("utf-8"))
+        started = time.perf_counter()
+        response = function_app.tutor_api(req)
+        timings.append((time.perf_counter() - started) * 1000)
+    print(json.dumps({"import_ms": import_ms, "first_ms": timings[0], "second_ms": timings[1],
+                      "status": response.status_code}))
+
+
+def run_child(mode: str, warmup: bool = False, importtime: bool = False):
+    """새 프로세스에서 측정 → (결과, -X importtime 출력)"""
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + [__file__, "--child", mode]
+    completed = subprocess.run(command, cwd=ROOT_DIR, env=child_env(warmup), capture_output=True, text=True)
+    if completed.returncode != 0:
+        print(completed.stderr[-2000:])
+        raise RuntimeError(f"child {mode} failed")
+    return json.loads(completed.stdout.strip().splitlines()[-1]), completed.stderr
+
+
+def import_report(importtime_output: str, top: int):
+    """-X importtime 출력 → 최상위 패키지별 import 시간 합계 (self 기준, ms) 상위 top개"""
+    totals = defaultdict(float)
+    counts = defaultdict(int)
+    for line in importtime_output.splitlines():
+        match = re.match(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)", line)
+        if not match:
+            continue
+        root = match.group(3).split(".")[0]
+        totals[root] += int(match.group(1)) / 1000
+        counts[root] += 1
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    return ranked[:top], sum(totals.values()), counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--child", choices=["import", "request", "request-warm"])
+    args = parser.parse_args()
+
+    if args.child == "import":
+        return child_import()
+    if args.child:
+        return child_request(args.child == "request-warm")
+
+    print(f"🧪 콜드 스타트 벤치마크 (새 프로세스 {args.repeat}번씩, 중앙값)")
+    print("=" * 72)
+
+    import_runs = [run_child("import")[0] for _ in range(args.repeat)]
+    import_ms = statistics.median(run["import_ms"] for run in import_runs)
+    forbidden = sorted({name for run in import_runs for name in run["forbidden_loaded"]})
+
+    _, importtime_output = run_child("import", importtime=True)
+    ranked, total_ms, counts = import_report(importtime_output, args.top)
+    print(f"  패키지별 import 시간 (-X importtime self 합계, 전체 {total_ms:.0f}ms, 인터프리터 시작 포함)")
+    for root, ms in ranked:
+        print(f"    {root:<24} {ms:>8.1f}ms  ({counts[root]}개 모듈)")
+
+    cold = [run_child("request")[0] for _ in range(args.repeat)]
+    warm = [run_child("request-warm", warmup=True)[0] for _ in range(args.repeat)]
+    first_ms = statistics.median(run["first_ms"] for run in cold)
+    second_ms = statistics.median(run["second_ms"] for run in cold)
+    warm_first_ms = statistics.median(run["first_ms"] for run in warm)
+    statuses = {run["status"] for run in cold + warm}
+
+    print(f"\n{'측정':<32} {'중앙값 ms':>10} {'예산 ms':>9}")
+    print(f"{'function_app import':<32} {import_ms:>10.1f} {IMPORT_BUDGET_MS:>9}")
+    print(f"{'첫 요청 (워밍업 없음)':<32} {first_ms:>10.1f} {FIRST_REQUEST_BUDGET_MS:>9}")
+    print(f"{'첫 요청 (백그라운드 워밍업 후)':<32} {warm_first_ms:>10.1f} {WARM_FIRST_REQUEST_BUDGET_MS:>9}")
+    print(f"{'두 번째 요청':<32} {second_ms:>10.1f} {'-':>9}")
+    print(f"\n  import 때 로드된 금지 모듈: {', '.join(forbidden) or '없음'} | 응답 상태: {sorted(statuses)}")
+
+    if (import_ms > IMPORT_BUDGET_MS or first_ms > FIRST_REQUEST_BUDGET_MS
+            or warm_first_ms > WARM_FIRST_REQUEST_BUDGET_MS or forbidden or statuses != {200}):
+        print("\n❌ 콜드 스타트 예산을 넘었거나, 무거운 모듈이 import 때 로드되었거나, 요청이 실패했습니다")
+        sys.exit(1)
+    print("\n✅ 완료")
+
+
+if __name__ == "__main__":
+    main()
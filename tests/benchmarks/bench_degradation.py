@@ -0,0 +1,183 @@
+"""
+LLM 지연 급증 시 부하 제어(로컬 대체 응답 + 503/Retry-After) 벤치마크 (로컬 가짜 OpenAI 서버)
+
+실행: python tests/benchmarks/bench_degradation.py [--workers 24] [--slow-latency 6]
+정상(0.3s) → 지연 급증(slow-latency) → 정상 구간 동안 동시 요청을 보내며
+1) 부하 제어 없음 (모든 요청이 LLM을 기다림)
+2) 부하 제어 (세션 요약·힌트는 로컬 대체 응답, 대체 응답이 없는 대화는 한도 초과 시 바로 503)
+두 방식의 구간별 응답 시간, 로컬 대체 비율, 거부·실패 수, 회복 후 정상 응답 비율을 비교합니다.
+지연 급증 구간에서 대체 응답이 있는 요청(세션 요약·힌트)이 더 빨리 응답하지 않거나 회복 후 LLM 응답으로 돌아오지 않으면
+실패로 종료합니다. (지연 급증 직후 감지 전에 보낸 요청은 두 방식 모두 느린 응답을 기다림)
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "tests", "api"))
+
+FAKE_PORT = 8115
+REQUEST_BUDGET = 8.0
+
+os.environ.setdefault("SqlConnectionString", "fake")
+os.environ.setdefault("OpenApiKey", "fake-key")
+os.environ["OpenAIEndpoint"] = f"http://127.0.0.1:{FAKE_PORT}"
+os.environ["OpenAIDeployments"] = json.dumps([
+    {"name": "fake", "endpoint": f"http://127.0.0.1:{FAKE_PORT}", "model": "gpt-4o-mini", "rpm": 100000}
+])
+os.environ["LLMSingleFlightTemplates"] = ""
+os.environ["LLMMaxRetries"] = "0"
+os.environ["LLMTemplateTimeouts"] = f"session_summary={REQUEST_BUDGET},hint={REQUEST_BUDGET},general_chat={REQUEST_BUDGET}"
+
+from fake_openai_server import serve, FakeOpenAIState  # noqa: E402
+from services.llm_service import LLMService  # noqa: E402
+from services.call_policy import request_deadline  # noqa: E402
+from services.admission_control import (admission_controller, degradation_scope, degraded_templates,  # noqa: E402
+                                        OverloadedError)
+from services.local_fallbacks import session_summary_text, canned_hint  # noqa: E402
+
+CONCEPT = "일차방정식의 풀이"
+
+
+def send_request(llm: LLMService, request_type: str) -> str:
+    """function_app 요청 하나와 같은 흐름 - 결과: ok / degraded / shed / failed"""
+    with request_deadline(REQUEST_BUDGET), degradation_scope():
+        try:
+            if request_type == "session_summary":
+                prompts = llm.generate_session_summary_prompt(10, 7, ["3", "5", "8"], [CONCEPT])
+                admission_controller.run(
+                    "session_summary",
+                    lambda: llm.call_llm(prompts["system"], prompts["user"], [], template="session_summary"),
+                    lambda: session_summary_text(10, 7, ["3", "5", "8"], [CONCEPT])
+                )
+            elif request_type == "hint":
+                prompts = llm.generate_hint_prompt(CONCEPT, "힌트 주세요")
+                admission_controller.run(
+                    "hint",
+                    lambda: llm.call_llm(prompts["system"], prompts["user"], [], template="hint"),
+                    lambda: canned_hint(CONCEPT, "beginner", [])
+                )
+            else:
+                llm.call_llm("너는 친절한 수학 튜터야.", "오늘 공부 너무 힘들어요", [], template="general_chat")
+        except OverloadedError:
+            return "shed"
+        except Exception:
+            return "failed"
+        return "degraded" if degraded_templates() else "ok"
+
+
+def run(llm: LLMService, state: FakeOpenAIState, args, phases):
+    """phases 동안 workers개 스레드가 요청을 보내고 (구간, 요청 종류, 결과, 응답 시간) 기록"""
+    records = []
+    lock = threading.Lock()
+    started = time.monotonic()
+    end = started + sum(duration for _, duration, _ in phases)
+
+    def phase_at(elapsed: float):
+        for name, duration, latency in phases:
+            if elapsed < duration:
+                return name, latency
+            elapsed -= duration
+        return phases[-1][0], phases[-1][2]
+
+    def worker(seed: int):
+        rng = random.Random(args.seed * 1000 + seed)
+        time.sleep(rng.uniform(0, 1.5))
+        while time.monotonic() < end:
+            phase, _ = phase_at(time.monotonic() - started)
+            request_type = rng.choice(["session_summary", "hint", "general_chat"])
+            request_started = time.monotonic()
+            outcome = send_request(llm, request_type)
+            with lock:
+                records.append((phase, request_type, outcome, time.monotonic() - request_started))
+            # 학생이 응답을 읽고 다음 메시지를 보내기까지의 시간
+            time.sleep(rng.uniform(0.5, 1.5))
+
+    def driver():
+        while time.monotonic() < end:
+            state.latency = phase_at(time.monotonic() - started)[1]
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(args.workers)]
+    threads.append(threading.Thread(target=driver))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return records
+
+
+def percentile(values, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=24)
+    parser.add_argument("--slow-latency", type=float, default=6.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    # 거부·대체 응답마다 남는 경고 로그는 결과 표만 보이도록 끔
+    logging.disable(logging.CRITICAL)
+
+    state = FakeOpenAIState("fake", 0.3, 0.05, 0.0, 0, 1000000)
+    serve(FAKE_PORT, state)
+    phases = [("정상", 6.0, 0.3), ("지연 급증", 12.0, args.slow_latency), ("회복", 30.0, 0.3)]
+
+    print(f"🧪 부하 제어 벤치마크 (동시 {args.workers}명, 지연 0.3s → {args.slow_latency}s → 0.3s, 요청 예산 {REQUEST_BUDGET}s)")
+    print("=" * 96)
+
+    llm = LLMService()
+    modes = {
+        "부하 제어 없음": dict(templates=(), degrade_in_flight=10 ** 6, shed_in_flight=10 ** 6),
+        "부하 제어": dict(templates=("session_summary", "hint"), degrade_in_flight=12, shed_in_flight=16,
+                       window_seconds=10.0, cooldown_seconds=5.0)
+    }
+    results = {}
+    for label, config in modes.items():
+        admission_controller.__init__(**config)
+        results[label] = run(llm, state, args, phases)
+
+    print(f"{'방식':<12} {'구간':<8} {'요청':>5} {'정상':>5} {'로컬':>5} {'503':>5} {'실패':>5} | {'p50 ms':>8} {'p95 ms':>8}")
+    for label, records in results.items():
+        for phase, _, _ in phases:
+            rows = [record for record in records if record[0] == phase]
+            counts = {outcome: sum(1 for record in rows if record[2] == outcome)
+                      for outcome in ("ok", "degraded", "shed", "failed")}
+            waits = [record[3] * 1000 for record in rows]
+            print(f"{label:<12} {phase:<8} {len(rows):>5} {counts['ok']:>5} {counts['degraded']:>5} "
+                  f"{counts['shed']:>5} {counts['failed']:>5} | {percentile(waits, 50):>8.0f} {percentile(waits, 95):>8.0f}")
+
+    fallback_types = ("session_summary", "hint")
+    slow = {label: [record for record in records if record[0] == "지연 급증"] for label, records in results.items()}
+    waits = {label: [record[3] for record in rows if record[1] in fallback_types] for label, rows in slow.items()}
+    fast_share = {label: sum(1 for wait in rows if wait < 1.0) / max(len(rows), 1) for label, rows in waits.items()}
+    chat_shed = sum(1 for record in slow["부하 제어"] if record[1] == "general_chat" and record[2] == "shed")
+    recovered = [record for record in results["부하 제어"] if record[0] == "회복" and record[1] in fallback_types]
+    recovered_tail = recovered[len(recovered) * 2 // 3:]
+    normal_share = sum(1 for record in recovered_tail if record[2] == "ok") / max(len(recovered_tail), 1)
+    print(f"\n  지연 급증 구간 세션 요약·힌트 p50: {percentile(waits['부하 제어 없음'], 50) * 1000:.0f}ms → "
+          f"{percentile(waits['부하 제어'], 50) * 1000:.0f}ms, 1초 안에 응답: "
+          f"{fast_share['부하 제어 없음']:.0%} → {fast_share['부하 제어']:.0%}")
+    print(f"  지연 급증 구간 처리량: {len(slow['부하 제어 없음'])}건 → {len(slow['부하 제어'])}건 "
+          f"(대체 응답이 없는 대화 {chat_shed}건은 기다리지 않고 503 + Retry-After)")
+    print(f"  회복 구간 마지막 1/3의 세션 요약·힌트 중 LLM 응답 비율: {normal_share:.0%}")
+    print(f"  부하 제어 통계: {admission_controller.get_stats()}")
+
+    if fast_share["부하 제어"] <= fast_share["부하 제어 없음"] or normal_share < 0.9:
+        print("\n❌ 부하 제어가 지연을 줄이지 못했거나 회복 후 정상 모드로 돌아오지 않았습니다")
+        sys.exit(1)
+    print("\n✅ 완료")
+
+
+if __name__ == "__main__":
+    main()
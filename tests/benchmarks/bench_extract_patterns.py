@@ -0,0 +1,67 @@
+"""
+패턴 추출 엔진 벤치마크 (합성 100만 행)
+
+실행: python tests/benchmarks/bench_extract_patterns.py [--rows 1000000] [--chunk-size 50000]
+DB 없이 fetchmany 청크와 같은 모양의 합성 행을 집계기에 넣어 처리량과 메모리를 측정합니다.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import resource
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from extract_patterns import PatternAggregator
+
+
+def make_chunks(rows: int, chunk_size: int, learners: int, concepts: int):
+    """뷰 행과 같은 모양의 합성 청크 생성 (pyodbc처럼 정확도는 Decimal)"""
+    concept_names = [f"개념{i:02d}" for i in range(concepts)]
+    for start in range(0, rows, chunk_size):
+        chunk = []
+        for _ in range(min(chunk_size, rows - start)):
+            learner = random.randrange(learners)
+            accuracy = Decimal(random.randint(0, 1000)) / 1000
+            chunk.append((
+                random.choice(concept_names), f"A{learner:09d}", random.random() < float(accuracy),
+                accuracy, Decimal(random.randint(300, 700)) / 1000
+            ))
+        yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--learners", type=int, default=20_000)
+    parser.add_argument("--concepts", type=int, default=59)
+    args = parser.parse_args()
+
+    print(f"🧪 패턴 추출 벤치마크: {args.rows:,}행, 청크 {args.chunk_size:,}")
+    print("=" * 60)
+
+    chunks = list(make_chunks(args.rows, args.chunk_size, args.learners, args.concepts))
+
+    aggregator = PatternAggregator()
+    started = time.perf_counter()
+    for chunk in chunks:
+        aggregator.add_rows(chunk)
+    aggregate_seconds = time.perf_counter() - started
+    patterns = aggregator.build_patterns()
+    total_seconds = time.perf_counter() - started
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    summary = patterns["extraction_summary"]
+    print(f"⚡ 집계: {aggregate_seconds:.2f}초 ({args.rows / aggregate_seconds:,.0f}행/초), 결과 생성 포함 {total_seconds:.2f}초")
+    print(f"💾 프로세스 최대 RSS: {peak_mb:.0f}MB (합성 입력 포함), (개념, 학습자) 집계 {len(aggregator.table):,}행")
+    print(f"📊 개념 {summary['total_concepts_analyzed']}개, 실수 패턴 {summary['total_mistake_patterns']}개")
+
+    assert summary["total_rows"] == args.rows
+    print("✅ 완료")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+유사 문항 난이도 변형 동시 생성 벤치마크 (로컬 가짜 OpenAI 서버)
+
+실행: python tests/benchmarks/bench_item_variants.py [--sessions 30] [--change-rate 0.3] [--token-latency 0.002]
+학생이 문제를 받은 뒤 change-rate 확률로 "더 쉬운/어려운 문제"를 요청하는 세션을
+1) 문항 하나씩 생성 (난이도 변경마다 새 호출)
+2) 쉬운/같은/어려운 문항을 한 번에 생성 (난이도 변경은 보관한 변형으로 바로 응답)
+두 방식으로 돌려, 추가 출력 토큰과 절약한 왕복·입력 토큰, 사용자가 기다린 시간을 비교합니다.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "tests", "api"))
+
+FAKE_PORT = 8114
+
+os.environ.setdefault("SqlConnectionString", "fake")
+os.environ.setdefault("OpenApiKey", "fake-key")
+os.environ["OpenAIEndpoint"] = f"http://127.0.0.1:{FAKE_PORT}"
+os.environ["OpenAIDeployments"] = json.dumps([
+    {"name": "fake", "endpoint": f"http://127.0.0.1:{FAKE_PORT}", "model": "gpt-4o-mini", "rpm": 6000}
+])
+# 같은 프롬프트 중복 호출 합치기는 이 비교와 무관하므로 끔
+os.environ["LLMSingleFlightTemplates"] = ""
+
+from fake_openai_server import serve, FakeOpenAIState  # noqa: E402
+from services.llm_service import LLMService  # noqa: E402
+
+CONCEPT = "일차방정식의 풀이"
+
+
+class Counter:
+    """호출 수, 입력/출력 토큰 (가짜 서버와 같은 글자 수 / 2 기준)"""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.first_item_waits = []
+        self.change_waits = []
+
+
+def generate(llm: LLMService, counter: Counter, difficulty: str, with_variants: bool):
+    """유사 문항 한 번 생성 (feedback_handler._handle_similar_item_request와 같은 호출)"""
+    prompts = llm.generate_similar_item_prompt(CONCEPT, 0.5, difficulty, with_variants)
+    content = llm.call_llm(prompts["system"], prompts["user"], [], "json_object",
+                           template="similar_item_variants" if with_variants else "similar_item")
+    counter.calls += 1
+    counter.prompt_tokens += (len(prompts["system"]) + len(prompts["user"])) // 2
+    counter.completion_tokens += len(content) // 2
+    return llm.parse_similar_item_response(content, CONCEPT, difficulty)
+
+
+def run_sessions(llm: LLMService, with_variants: bool, changes, counter: Counter):
+    """세션마다 문제 하나 + (change가 있으면) 난이도 변경 한 번"""
+    for change in changes:
+        started = time.perf_counter()
+        result = generate(llm, counter, "same", with_variants)
+        counter.first_item_waits.append(time.perf_counter() - started)
+        if change is None:
+            continue
+
+        started = time.perf_counter()
+        item = result.get("item_variants", {}).get(change)
+        if item is None:
+            item = generate(llm, counter, change, False)["generated_question_data"]
+        assert item.get("new_question_text")
+        counter.change_waits.append(time.perf_counter() - started)
+
+
+def average_ms(values) -> float:
+    return sum(values) / len(values) * 1000 if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=30)
+    parser.add_argument("--change-rate", type=float, default=0.3)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--token-latency", type=float, default=0.002)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    serve(FAKE_PORT, FakeOpenAIState("fake", args.latency, 0.02, 0.0, 0, 100000,
+                                     token_latency=args.token_latency))
+
+    rng = random.Random(args.seed)
+    changes = [rng.choice(["easier", "harder"]) if rng.random() < args.change_rate else None
+               for _ in range(args.sessions)]
+    change_count = sum(1 for change in changes if change)
+
+    print(f"🧪 난이도 변형 동시 생성 벤치마크 (세션 {args.sessions}개, 난이도 변경 {change_count}회, "
+          f"지연 {args.latency}s + 출력 토큰당 {args.token_latency}s)")
+    print("=" * 84)
+
+    llm = LLMService()
+    results = {}
+    for label, with_variants in (("문항 하나씩", False), ("변형 동시 생성", True)):
+        counter = Counter()
+        run_sessions(llm, with_variants, changes, counter)
+        results[label] = counter
+
+    print(f"{'방식':<12} {'호출':>5} {'입력 토큰':>10} {'출력 토큰':>10} | {'첫 문제 ms':>10} {'난이도 변경 ms':>14}")
+    for label, counter in results.items():
+        print(f"{label:<12} {counter.calls:>5} {counter.prompt_tokens:>10,} {counter.completion_tokens:>10,} | "
+              f"{average_ms(counter.first_item_waits):>10.0f} {average_ms(counter.change_waits):>14.0f}")
+
+    single, variants = results["문항 하나씩"], results["변형 동시 생성"]
+    saved_calls = single.calls - variants.calls
+    extra_completion = variants.completion_tokens - single.completion_tokens
+    extra_prompt = variants.prompt_tokens - single.prompt_tokens
+    print(f"\n  절약한 왕복: {saved_calls}회 (난이도 변경 {change_count}회 모두 보관한 변형으로 응답)")
+    print(f"  추가 출력 토큰: {extra_completion:+,} (왕복 1회당 {extra_completion / max(saved_calls, 1):,.0f})")
+    print(f"  입력 토큰 차이: {extra_prompt:+,} (변형 프롬프트가 길어진 만큼 - 줄어든 호출의 프롬프트)")
+    print(f"  난이도 변경 대기: {average_ms(single.change_waits):.0f}ms → {average_ms(variants.change_waits):.1f}ms, "
+          f"첫 문제 대기: {average_ms(single.first_item_waits):.0f}ms → {average_ms(variants.first_item_waits):.0f}ms "
+          f"(연속 학습에서는 선택지 미리 생성으로 대부분 가려짐)")
+
+    if saved_calls != change_count:
+        print("\n❌ 난이도 변경이 추가 호출 없이 처리되지 않았습니다")
+        sys.exit(1)
+    print("\n✅ 완료")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+오래 걸리는 생성 작업: 동기 HTTP 호출 vs 작업 큐(202 + 롱 폴링) 벤치마크 (로컬 가짜 OpenAI 서버)
+
+실행: python tests/benchmarks/bench_job_queue.py [--clients 24] [--latency 6] [--workers 4] [--client-timeout 5]
+      python tests/benchmarks/bench_job_queue.py --connection "UseDevelopmentStorage=true"   # Azurite 필요
+클라이언트 clients명이 동시에 느린 생성(latency초)을 요청할 때
+1) 동기 호출 (생성이 끝날 때까지 HTTP 연결을 붙잡음, 동시 LLM 호출 수 = 클라이언트 수)
+2) 작업 큐 (바로 202 + 작업 ID, 워커 workers개가 차례로 실행, 클라이언트는 ?wait= 롱 폴링)
+두 방식의 HTTP 연결 점유 시간, 클라이언트 타임아웃 초과 수, 동시 LLM 호출 수, 실패·재시도 수를 비교합니다.
+작업 큐에서 클라이언트 타임아웃을 넘긴 HTTP 호출이 있거나, 제출이 100ms 안에 끝나지 않거나, 동시 LLM 호출이 워커 수를 넘거나, 작업이 하나라도 실패하면 실패로 종료합니다.
+
+--connection을 주면 storage 모드(Azure Storage Queue + Blob)로 실행하고, 큐 트리거 대신 이 스크립트가 큐를 직접 비웁니다.
+함수 호스트까지 포함한 e2e는 Azurite를 띄우고 AzureWebJobsStorage=UseDevelopmentStorage=true로
+func start 후 "async": true 요청을 보내 /api/jobs/{job_id}?wait=20 을 확인합니다.
+"""
+import os
+import sys
+import json
+import time
+import base64
+import logging
+import argparse
+import threading
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "tests", "api"))
+
+FAKE_PORT = 8116
+
+os.environ.setdefault("SqlConnectionString", "fake")
+os.environ.setdefault("OpenApiKey", "fake-key")
+os.environ["OpenAIEndpoint"] = f"http://127.0.0.1:{FAKE_PORT}"
+os.environ["OpenAIDeployments"] = json.dumps([
+    {"name": "fake", "endpoint": f"http://127.0.0.1:{FAKE_PORT}", "model": "gpt-4o-mini", "rpm": 100000}
+])
+os.environ["LLMSingleFlightTemplates"] = ""
+os.environ["LLMMaxRetries"] = "0"
+os.environ["LLMTemplateTimeouts"] = "similar_item=60"
+
+from fake_openai_server import serve, FakeOpenAIState  # noqa: E402
+from services.llm_service import LLMService  # noqa: E402
+from services.job_queue import JobQueue, RetryableJobError  # noqa: E402
+
+CONCEPT = "일차방정식의 풀이"
+
+
+class InFlight:
+    """동시에 진행 중인 LLM 호출 수와 최대값"""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.current -= 1
+
+
+def make_executor(llm: LLMService, in_flight: InFlight):
+    """작업 실행 함수 - 유사 문항 생성 한 번 (function_app._run_job과 같은 (상태 코드, 바디) 반환)"""
+    def execute(payload):
+        prompts = llm.generate_similar_item_prompt(payload["concept"], 0.4)
+        with in_flight:
+            try:
+                text = llm.call_llm(prompts["system"], prompts["user"], [], template="similar_item")
+            except Exception as e:
+                return 500, {"error": str(e)}
+        return 200, {"feedback": text}
+    return execute
+
+
+def run_sync(execute, args):
+    """클라이언트마다 생성이 끝날 때까지 HTTP 연결 점유"""
+    held = [0.0] * args.clients
+    outcomes = [None] * args.clients
+
+    def client(index: int):
+        started = time.monotonic()
+        status_code, _ = execute({"concept": CONCEPT})
+        held[index] = time.monotonic() - started
+        outcomes[index] = status_code
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {"held": held, "longest": held, "submit": [], "outcomes": outcomes, "polls": args.clients,
+            "makespan": time.monotonic() - started}
+
+
+def drain_storage_queue(queue: JobQueue, execute, stop: threading.Event, workers: int):
+    """큐 트리거 대신 Storage Queue를 직접 비움 (재시도할 메시지는 지우지 않아 가시성 시간 후 다시 전달)"""
+    from azure.storage.queue import QueueClient
+    from services.job_queue import JOB_QUEUE_NAME
+
+    client = QueueClient.from_connection_string(queue.connection_string, JOB_QUEUE_NAME)
+
+    def worker():
+        while not stop.is_set():
+            messages = list(client.receive_messages(messages_per_page=1, max_messages=1, visibility_timeout=10))
+            if not messages:
+                time.sleep(0.2)
+                continue
+            for message in messages:
+                try:
+                    queue.process(base64.b64decode(message.content).decode("utf-8"), message.dequeue_count, execute)
+                except RetryableJobError:
+                    continue
+                client.delete_message(message)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def run_async(queue: JobQueue, execute, args):
+    """제출 후 202를 바로 받고, ?wait= 롱 폴링으로 결과 확인 (롱 폴링 한 번 = HTTP 연결 하나)"""
+    held = [0.0] * args.clients
+    longest = [0.0] * args.clients
+    submit = [0.0] * args.clients
+    outcomes = [None] * args.clients
+    polls = [0] * args.clients
+
+    def client(index: int):
+        started = time.monotonic()
+        record = queue.submit({"request_type": "generated_item", "concept": CONCEPT}, execute)
+        submit[index] = time.monotonic() - started
+        held[index] += submit[index]
+        longest[index] = submit[index]
+        while record is not None and record["status"] not in ("succeeded", "failed"):
+            poll_started = time.monotonic()
+            record = queue.wait(record["job_id"], min(args.poll_wait, args.client_timeout - 1))
+            held[index] += time.monotonic() - poll_started
+            longest[index] = max(longest[index], time.monotonic() - poll_started)
+            polls[index] += 1
+        outcomes[index] = record.get("status_code") if record else None
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {"held": held, "longest": longest, "submit": submit, "outcomes": outcomes, "polls": sum(polls),
+            "makespan": time.monotonic() - started}
+
+
+def percentile(values, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=24)
+    parser.add_argument("--latency", type=float, default=6.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--client-timeout", type=float, default=5.0)
+    parser.add_argument("--poll-wait", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--connection", default="")
+    args = parser.parse_args()
+    # 재시도 경고 로그는 결과 표만 보이도록 끔
+    logging.disable(logging.CRITICAL)
+
+    state = FakeOpenAIState("fake", args.latency, 0.2, args.error_rate, 0, 1000000)
+    serve(FAKE_PORT, state)
+    llm = LLMService()
+    mode = "storage" if args.connection else "local"
+
+    print(f"🧪 작업 큐 벤치마크 (클라이언트 {args.clients}명, 생성 {args.latency}s, 워커 {args.workers}개, "
+          f"오류율 {args.error_rate:.0%}, 클라이언트 타임아웃 {args.client_timeout}s, {mode} 모드)")
+    print("=" * 100)
+
+    results = {}
+    peaks = {}
+    in_flight = InFlight()
+    results["동기 호출"] = run_sync(make_executor(llm, in_flight), args)
+    peaks["동기 호출"] = in_flight.peak
+
+    in_flight = InFlight()
+    execute = make_executor(llm, in_flight)
+    queue = JobQueue(mode, args.connection, args.workers, 3600)
+    stop = threading.Event()
+    if mode == "storage":
+        drain_storage_queue(queue, execute, stop, args.workers)
+    results["작업 큐"] = run_async(queue, execute, args)
+    stop.set()
+    peaks["작업 큐"] = in_flight.peak
+
+    print(f"{'방식':<10} {'성공':>5} {'실패':>5} {'타임아웃':>8} {'동시 LLM':>8} {'HTTP 호출':>9} | "
+          f"{'제출 p95 ms':>11} {'연결 최장 s':>11} {'전체 s':>7}")
+    for label, result in results.items():
+        succeeded = sum(1 for outcome in result["outcomes"] if outcome == 200)
+        timeouts = sum(1 for longest in result["longest"] if longest > args.client_timeout)
+        longest_call = max(result["longest"])
+        print(f"{label:<10} {succeeded:>5} {len(result['outcomes']) - succeeded:>5} {timeouts:>8} {peaks[label]:>8} "
+              f"{result['polls']:>9} | {percentile(result['submit'], 95) * 1000:>11.1f} {longest_call:>11.1f} "
+              f"{result['makespan']:>7.1f}")
+
+    stats = queue.get_stats()
+    print(f"\n  작업 큐 통계: {stats}")
+    print("  (동기 호출은 클라이언트 수만큼 LLM 호출·HTTP 연결이 동시에 열리고, 작업 큐는 워커 수로 제한된 채 "
+          "429/5xx를 재시도)")
+
+    async_result = results["작업 큐"]
+    failed = sum(1 for outcome in async_result["outcomes"] if outcome != 200)
+    if (max(async_result["longest"]) > args.client_timeout or percentile(async_result["submit"], 95) > 0.1
+            or peaks["작업 큐"] > args.workers or failed):
+        print("\n❌ 작업 큐 호출이 타임아웃을 넘었거나, 제출이 느리거나, 동시 실행이 워커 수를 넘었거나, 실패한 작업이 있습니다")
+        sys.exit(1)
+    print("\n✅ 완료")
+
+
+if __name__ == "__main__":
+    main()
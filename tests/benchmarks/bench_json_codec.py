@@ -0,0 +1,104 @@
+"""
+요청 파싱·응답 생성 JSON 코덱 벤치마크 (10/50/200턴 대화 기록)
+
+실행: python tests/benchmarks/bench_json_codec.py [--repeat 300]
+기존 방식(req.get_json() + data.copy() + json.dumps(ensure_ascii=False))과
+utils.json_codec(빠른 백엔드, 바이트 직렬화, gzip/br 압축)을 같은 페이로드로 비교합니다.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT_DIR)
+
+os.environ.setdefault("SqlConnectionString", "fake")
+os.environ.setdefault("OpenApiKey", "fake-key")
+os.environ.setdefault("OpenAIEndpoint", "http://127.0.0.1")
+
+import azure.functions as func  # noqa: E402
+from utils import json_codec  # noqa: E402
+from utils.response_builder import ResponseBuilder  # noqa: E402
+
+TURN_TEXT = [
+    "이 문제에서 일차방정식 3x + 5 = 20을 풀려면 먼저 어떤 것을 해야 할까? 양변에서 같은 수를 빼 보는 건 어때?",
+    "음... 양변에서 5를 빼면 3x = 15가 되는 것 같아요. 그 다음은 어떻게 해요?",
+]
+
+
+def make_request_body(turns: int) -> bytes:
+    """turns턴 대화 기록이 담긴 요청 바디"""
+    history = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"{TURN_TEXT[i % 2]} ({i})"}
+               for i in range(turns * 2)]
+    return json.dumps({
+        "request_type": "generated_item",
+        "message": "힌트 주세요",
+        "generated_question_data": {"new_question_text": "일차방정식 \\(3x + 5 = 20\\)의 해를 구하시오.",
+                                    "correct_answer": "5", "explanation": "양변에서 5를 빼고 3으로 나눕니다."},
+        "conversation_history": history
+    }, ensure_ascii=False).encode("utf-8")
+
+
+def legacy_roundtrip(req: func.HttpRequest) -> func.HttpResponse:
+    """기존 경로"""
+    body = req.get_json()
+    history = body.get("conversation_history", [])
+    data = {"feedback": "좋아! 양변을 3으로 나누면 어떻게 될까?", "hint_level": 1}
+    history.append({"role": "user", "content": body["message"]})
+    history.append({"role": "assistant", "content": data["feedback"]})
+    final = data.copy()
+    final["conversation_history"] = history
+    return func.HttpResponse(json.dumps(final, ensure_ascii=False), mimetype="application/json", status_code=200)
+
+
+def codec_roundtrip(req: func.HttpRequest, accept_encoding=None) -> func.HttpResponse:
+    """새 경로"""
+    body = json_codec.parse_request_json(req)
+    history = body.get("conversation_history", [])
+    data = {"feedback": "좋아! 양변을 3으로 나누면 어떻게 될까?", "hint_level": 1}
+    return ResponseBuilder.build_success_response(data, history, body["message"], accept_encoding)
+
+
+def measure(function, req, repeat: int):
+    """회당 평균 시간(µs)과 응답 바이트 수"""
+    response = function(req)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function(req)
+    return (time.perf_counter() - started) / repeat * 1e6, len(response.get_body())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"🧪 JSON 코덱 벤치마크 (백엔드: {json_codec.BACKEND}, brotli: {'있음' if json_codec.brotli else '없음'})")
+    print("=" * 72)
+    print(f"{'턴':>5} {'요청 크기':>10} | {'기존 µs':>9} {'코덱 µs':>9} {'배속':>6} | {'기존 B':>8} {'gzip B':>8} {'gzip µs':>9}")
+
+    backend = json_codec.orjson
+    for turns in (10, 50, 200):
+        body = make_request_body(turns)
+        req = func.HttpRequest("POST", "/api/tutor_api", body=body, headers={"Accept-Encoding": "gzip, br"})
+
+        legacy_us, legacy_bytes = measure(legacy_roundtrip, req, args.repeat)
+        codec_us, _ = measure(codec_roundtrip, req, args.repeat)
+        gzip_us, gzip_bytes = measure(lambda r: codec_roundtrip(r, "gzip"), req, args.repeat)
+        print(f"{turns:>5} {len(body):>10,} | {legacy_us:>9.1f} {codec_us:>9.1f} {legacy_us / codec_us:>5.1f}x | "
+              f"{legacy_bytes:>8,} {gzip_bytes:>8,} {gzip_us:>9.1f}")
+
+    # 빠른 백엔드가 없을 때 (표준 json 대체 경로)
+    json_codec.orjson = None
+    body = make_request_body(200)
+    req = func.HttpRequest("POST", "/api/tutor_api", body=body)
+    fallback_us, _ = measure(codec_roundtrip, req, args.repeat)
+    json_codec.orjson = backend
+    print(f"\n  표준 json 대체 경로 (200턴): {fallback_us:.1f}µs")
+    print("\n✅ 완료")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+LLM 문제 출력 JSON 파서 벤치마크: 기존 2단계 백슬래시 보정 vs 한 번 훑기 관대한 파서
+
+실행: python tests/benchmarks/bench_llm_json.py [--repeat 500]
+tests/benchmarks/data/llm_json_corpus.jsonl의 깨진 출력 모음으로
+1) 값이 기대와 같게 나오는 비율 (= 재생성 없이 쓸 수 있는 응답)
+2) 긴 SVG 포함 출력의 파싱 시간
+을 비교합니다. 관대한 파서가 코퍼스 하나라도 틀리면 실패로 종료합니다.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.llm_json import parse_llm_json, LLMJsonError  # noqa: E402
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "llm_json_corpus.jsonl")
+
+
+def legacy_parse(content):
+    """기존 note.py 방식: 코드 블록 찾기 → 문자열 리터럴 정규식 보정 → 실패 시 백슬래시 두 배 재시도"""
+    if "```json" in content:
+        json_start = content.find("```json") + 7
+        json_end = content.find("```", json_start)
+        json_content = content[json_start:json_end].strip()
+    elif content.startswith("{"):
+        json_content = content
+    else:
+        start_idx = content.find("{")
+        end_idx = content.rfind("}") + 1
+        if start_idx == -1 or end_idx == 0:
+            return None
+        json_content = content[start_idx:end_idx]
+
+    def fix_latex_in_json_string(match):
+        value = re.sub(r'(?<!\\)\\(?!["\\/bfnrt])', r'\\\\', match.group(1))
+        return f'"{value}"'
+
+    try:
+        return json.loads(re.sub(r'"([^"]*\\[^"]*)"', fix_latex_in_json_string, json_content))
+    except json.JSONDecodeError:
+        try:
+            backup_content = json_content.replace('\\', '\\\\')
+            backup_content = backup_content.replace('\\\\\\\\', '\\\\')
+            backup_content = backup_content.replace('\\\\"', '\\"')
+            return json.loads(backup_content)
+        except json.JSONDecodeError:
+            return None
+
+
+def tolerant_parse(content):
+    try:
+        return parse_llm_json(content).value
+    except LLMJsonError:
+        return None
+
+
+def matches(case, value):
+    """코퍼스 기대값과 비교"""
+    if case.get("error"):
+        return value is None
+    if value is None:
+        return False
+    if "count" in case:
+        return isinstance(value, list) and len(value) == case["count"]
+    return isinstance(value, dict) and all(value.get(key) == expected for key, expected in case.get("expect", {}).items())
+
+
+def make_long_output(questions: int = 8, escaped: bool = False) -> str:
+    """SVG와 LaTeX가 들어간 긴 묶음 출력 (escaped=False면 이스케이프 안 된 SVG 따옴표·LaTeX 백슬래시)"""
+    items = []
+    for i in range(questions):
+        points = " ".join(f"{20 + j * 7},{200 - (j * 13) % 150}" for j in range(40))
+        svg = (f'<svg viewBox="0 0 400 300" width="100%" height="auto"><polyline points="{points}" stroke="#000" '
+               f'stroke-width="2" fill="none"/>' + "".join(
+                   f'<text x="{10 + k * 30}" y="290" font-family="Arial" font-size="14">{k}</text>' for k in range(12)) + "</svg>")
+        items.append(
+            f'{{"question_text": "그래프에서 \\(y = \\frac{{{i + 1}}}{{2}}x + 3\\)일 때 \\(x = {i}\\)에서의 값은?", '
+            f'"question_type": "단답형", "correct_answer": "{(i + 1) * i / 2 + 3}", '
+            f'"answer_explanation": "\\(\\frac{{{i + 1}}}{{2}} \\times {i} + 3\\)을 계산합니다. " , '
+            f'"svg_code": "{svg}"}}')
+    if escaped:
+        # 같은 내용을 올바르게 이스케이프한 JSON
+        return "```json\n" + json.dumps([parse_llm_json(item).value for item in items], ensure_ascii=False) + "\n```"
+    return "```json\n[\n" + ",\n".join(items) + "\n]\n```"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        corpus = [json.loads(line) for line in f]
+
+    print(f"🧪 LLM JSON 파서 벤치마크: 코퍼스 {len(corpus)}개")
+    print("=" * 60)
+
+    failures = []
+    legacy_ok = tolerant_ok = 0
+    for case in corpus:
+        legacy = matches(case, legacy_parse(case["raw"]))
+        tolerant = matches(case, tolerant_parse(case["raw"]))
+        legacy_ok += legacy
+        tolerant_ok += tolerant
+        if not tolerant:
+            failures.append(case["name"])
+        print(f"  {'✅' if legacy else '❌'} → {'✅' if tolerant else '❌'}  {case['name']}")
+
+    print(f"\n📊 쓸 수 있는 응답: 기존 {legacy_ok}/{len(corpus)}, 관대한 파서 {tolerant_ok}/{len(corpus)}")
+    print(f"   (재생성 왕복 {tolerant_ok - legacy_ok}회 절약)")
+
+    # 위치 정보가 있는 오류 예시
+    for case in corpus:
+        if case.get("error"):
+            try:
+                parse_llm_json(case["raw"])
+            except LLMJsonError as e:
+                print(f"   오류 위치 예시 [{case['name']}]: {e.issue.to_dict()}")
+
+    for label, escaped in [("올바르게 이스케이프된", True), ("따옴표·백슬래시가 깨진", False)]:
+        long_output = make_long_output(escaped=escaped)
+        print(f"\n⏱️ {label} 긴 SVG 묶음 출력 ({len(long_output):,}자) × {args.repeat}회")
+        for name, parse in [("기존", legacy_parse), ("관대한 파서", tolerant_parse)]:
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                value = parse(long_output)
+            elapsed = (time.perf_counter() - started) / args.repeat * 1000
+            usable = isinstance(value, list) and len(value) == 8
+            print(f"  {name:8} {elapsed:7.3f}ms/회, 문제 8개 복구: {'✅' if usable else '❌'}")
+
+    if failures:
+        print(f"\n❌ 실패: {failures}")
+        sys.exit(1)
+    print("\n✅ 통과")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+note.py 문제 생성 벤치마크: 1문제씩 순차 생성 vs 묶음 동시 생성 (로컬 가짜 OpenAI 서버)
+
+실행: python tests/benchmarks/bench_note_batch.py [--count 50] [--batch-size 8] [--concurrency 4]
+같은 학습지(50문제)를 두 방식으로 만들면서 호출 수, 프롬프트/응답 토큰, 소요 시간을 비교합니다.
+가짜 서버는 출력 토큰 수에 비례해 지연되므로 묶음 응답이 길어지는 비용도 반영됩니다.
+"""
+import os
+import sys
+import time
+import argparse
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "tests", "api"))
+
+FAKE_PORT = 8112
+
+os.environ.setdefault("AOAI_KEY", "fake-key")
+os.environ["AOAI_ENDPOINT"] = f"http://127.0.0.1:{FAKE_PORT}"
+os.environ["AOAI_DEPLOYMENT"] = "fake"
+
+from fake_openai_server import serve, FakeOpenAIState  # noqa: E402
+import note  # noqa: E402
+
+QUESTION_ARGS = ("중1", 1, "일차방정식", "단답형", "하", "일차방정식 \\(3x - 4 = 11\\)의 해를 구하시오.")
+
+
+class UsageRecorder:
+    """클라이언트 호출을 감싸 토큰 사용량 누적"""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        response = self.client.chat.completions.create(**kwargs)
+        self.calls += 1
+        self.prompt_tokens += response.usage.prompt_tokens
+        self.completion_tokens += response.usage.completion_tokens
+        return response
+
+
+def run_sequential(count: int) -> dict:
+    """기존 방식: 1문제씩 생성하며 이전 문제 전체를 프롬프트에 붙임"""
+    recorder = UsageRecorder(note.get_openai_client())
+    deduplicator = note.QuestionDeduplicator()
+    generated_problems = []
+    started = time.monotonic()
+    while len(generated_problems) < count and recorder.calls < count * 2:
+        question = note.generate_question_with_ai(recorder, *QUESTION_ARGS, generated_problems)
+        if question and deduplicator.add(question["question_text"]):
+            generated_problems.append(question["question_text"])
+    return {
+        "questions": len(generated_problems),
+        "calls": recorder.calls,
+        "prompt_tokens": recorder.prompt_tokens,
+        "completion_tokens": recorder.completion_tokens,
+        "elapsed_seconds": round(time.monotonic() - started, 2),
+        "last_prompt_chars": len(note.create_question_prompt(*QUESTION_ARGS, generated_problems))
+    }
+
+
+def run_batched(count: int, batch_size: int, concurrency: int) -> dict:
+    """새 방식: 묶음 생성 + 동시 호출 + 로컬 중복 제거"""
+    questions, stats = note.generate_worksheet_questions(note.get_openai_client(), *QUESTION_ARGS,
+                                                         total_count=count, batch_size=batch_size,
+                                                         concurrency=concurrency)
+    recent = [q["question_text"][:note.AVOID_PROBLEM_CHARS] for q in questions[-note.MAX_AVOID_PROBLEMS:]]
+    stats["last_prompt_chars"] = len(note.create_question_prompt(*QUESTION_ARGS, recent, count=batch_size))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=note.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--token-latency", type=float, default=0.004)
+    args = parser.parse_args()
+
+    serve(FAKE_PORT, FakeOpenAIState("fake", args.latency, 0.05, 0.0, 0, 100000,
+                                     duplicate_rate=0.05, token_latency=args.token_latency))
+
+    print(f"🧪 note.py 문제 생성 벤치마크: {args.count}문제 (지연 {args.latency}s + 토큰당 {args.token_latency}s)")
+    print("=" * 60)
+
+    before = run_sequential(args.count)
+    after = run_batched(args.count, args.batch_size, args.concurrency)
+
+    print(f"\n{'':18}{'순차 1문제씩':>14}{'묶음+동시':>14}")
+    for key, label in [("questions", "생성 문제"), ("calls", "API 호출"), ("prompt_tokens", "프롬프트 토큰"),
+                       ("completion_tokens", "응답 토큰"), ("last_prompt_chars", "마지막 프롬프트 글자"),
+                       ("elapsed_seconds", "소요 시간(초)")]:
+        print(f"  {label:16}{before[key]:>14}{after[key]:>14}")
+    print(f"\n  묶음 방식 중복 제거: 완전 {after['exact_duplicates']}개, 유사 {after['near_duplicates']}개")
+
+    ok = after["questions"] == args.count and after["prompt_tokens"] < before["prompt_tokens"]
+    print("\n✅ 통과" if ok else "\n❌ 실패")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
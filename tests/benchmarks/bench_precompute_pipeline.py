@@ -0,0 +1,160 @@
+"""
+미리 계산 파이프라인 증분 실행 벤치마크 (로컬 가짜 OpenAI 서버, 임시 디렉터리)
+
+실행: python tests/benchmarks/bench_precompute_pipeline.py [--concepts 12] [--per-concept 2]
+개념 설명·문항 은행 작업(문항 은행은 학습 패턴 작업에 의존)을 임시 파일로 등록하고
+1) 첫 실행 (개념 설명은 토큰 예산을 넘어 일부만 생성 → partial)
+2) 다시 실행 (남은 설명만 이어서 생성)
+3) 입력 그대로 (모두 unchanged, LLM 호출 0)
+4) 개념 목록에 개념 하나 추가 (새 개념만 생성)
+5) 학습 패턴만 변경 (의존하는 문항 은행만 다시 확인, 이미 채운 개념은 호출 없음)
+단계별 작업 상태, 실행 시간, 추정 토큰, 실제 LLM 호출 수를 출력합니다.
+입력이 그대로인데 LLM을 호출했거나, 추가한 개념보다 많이 생성했거나, 실행 시간이 기록되지 않으면 실패로 종료합니다.
+"""
+import os
+import sys
+import json
+import shutil
+import logging
+import argparse
+import tempfile
+import contextlib
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "tests", "api"))
+
+FAKE_PORT = 8117
+
+os.environ.setdefault("SqlConnectionString", "fake")
+os.environ.setdefault("OpenApiKey", "fake-key")
+os.environ["OpenAIEndpoint"] = f"http://127.0.0.1:{FAKE_PORT}"
+os.environ["OpenAIDeployments"] = json.dumps([
+    {"name": "fake", "endpoint": f"http://127.0.0.1:{FAKE_PORT}", "model": "gpt-4o-mini", "rpm": 100000}
+])
+os.environ["LLMSingleFlightTemplates"] = ""
+
+from fake_openai_server import serve, FakeOpenAIState  # noqa: E402
+from services.llm_service import LLMService  # noqa: E402
+from services.concept_explanations import PROMPT_VERSION, EXPLANATION_LEVELS  # noqa: E402
+from services.precompute_pipeline import PrecomputePipeline, PrecomputeJob, file_fingerprint, path_exists  # noqa: E402
+from precompute_concept_explanations import precompute_concept_explanations  # noqa: E402
+from precompute_item_bank import precompute_item_bank  # noqa: E402
+
+
+def build_pipeline(work_dir: str, args, llm: LLMService) -> PrecomputePipeline:
+    """precompute_jobs.py와 같은 작업 구성을 임시 파일로 등록 (학습 패턴은 DB 대신 원본 파일 복사)"""
+    catalog = os.path.join(work_dir, "catalog.txt")
+    patterns_source = os.path.join(work_dir, "patterns_source.json")
+    patterns = os.path.join(work_dir, "real_patterns.json")
+    explanations = os.path.join(work_dir, "concept_explanations.json")
+    item_bank = os.path.join(work_dir, "item_bank.json")
+    quiet = contextlib.redirect_stdout(open(os.devnull, "w"))
+
+    def run_patterns(budget):
+        shutil.copyfile(patterns_source, patterns)
+        return {"copied": True}
+
+    def run_explanations(budget):
+        with quiet:
+            return precompute_concept_explanations(catalog, explanations, 4, llm_service=llm, budget=budget)
+
+    def run_item_bank(budget):
+        with quiet:
+            return precompute_item_bank(catalog, patterns, item_bank, args.per_concept, 4, llm, budget)
+
+    pipeline = PrecomputePipeline(os.path.join(work_dir, "precompute_state.json"))
+    pipeline.register(PrecomputeJob(
+        name="real_patterns", run=run_patterns, fingerprint=lambda: file_fingerprint(patterns_source),
+        schedule="0 0 18 * * *", output=patterns, output_exists=path_exists(patterns)
+    ))
+    pipeline.register(PrecomputeJob(
+        name="concept_explanations", run=run_explanations,
+        fingerprint=lambda: f"{file_fingerprint(catalog)}:{PROMPT_VERSION}",
+        schedule="0 30 18 * * *", output=explanations, output_exists=path_exists(explanations),
+        token_budget=args.explanation_budget
+    ))
+    pipeline.register(PrecomputeJob(
+        name="item_bank", run=run_item_bank, fingerprint=lambda: f"{file_fingerprint(catalog)}:{args.per_concept}",
+        schedule="0 0 19 * * *", output=item_bank, output_exists=path_exists(item_bank),
+        depends_on=("real_patterns",)
+    ))
+    return pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concepts", type=int, default=12)
+    parser.add_argument("--per-concept", type=int, default=2)
+    parser.add_argument("--explanation-budget", type=int, default=20000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    state = FakeOpenAIState("fake", 0.05, 0.02, 0.0, 0, 1000000)
+    serve(FAKE_PORT, state)
+    llm = LLMService()
+
+    with open(os.path.join(ROOT_DIR, "전체개념명.txt"), encoding="utf-8") as f:
+        catalog_lines = [line for line in f if line.strip()]
+    work_dir = tempfile.mkdtemp(prefix="precompute-bench-")
+    with open(os.path.join(work_dir, "catalog.txt"), "w", encoding="utf-8") as f:
+        f.writelines(catalog_lines[:args.concepts])
+    shutil.copyfile(os.path.join(ROOT_DIR, "real_patterns.json"), os.path.join(work_dir, "patterns_source.json"))
+    pipeline = build_pipeline(work_dir, args, llm)
+
+    def add_concept():
+        with open(os.path.join(work_dir, "catalog.txt"), "a", encoding="utf-8") as f:
+            f.write(catalog_lines[args.concepts])
+
+    def change_patterns():
+        with open(os.path.join(work_dir, "patterns_source.json"), "a", encoding="utf-8") as f:
+            f.write("\n")
+
+    steps = [("첫 실행", None), ("다시 실행", None), ("입력 그대로", None),
+             ("개념 추가", add_concept), ("학습 패턴 변경", change_patterns)]
+
+    print(f"🧪 미리 계산 파이프라인 벤치마크 (개념 {args.concepts}개, 개념별 문항 {args.per_concept}개, "
+          f"개념 설명 토큰 예산 {args.explanation_budget})")
+    print("=" * 92)
+    print(f"{'단계':<12} {'작업':<22} {'상태':<10} {'이유':<18} {'시간 s':>7} {'추정 토큰':>9} {'LLM 호출':>8}")
+    calls = {}
+    results = {}
+    for step, change in steps:
+        if change:
+            change()
+        before = state.request_count
+        records = pipeline.run()
+        calls[step] = state.request_count - before
+        results[step] = records
+        for index, (name, record) in enumerate(records.items()):
+            print(f"{step if index == 0 else '':<12} {name:<22} {record['status']:<10} {record.get('reason', ''):<18} "
+                  f"{record.get('duration_seconds', 0):>7.2f} {record.get('tokens_estimated', 0):>9} "
+                  f"{calls[step] if index == 0 else '':>8}")
+
+    stats = pipeline.get_stats()
+    print("\n  작업별 실행 시간 기록 (PrecomputeStatePath):")
+    for name, job_stats in stats.items():
+        print(f"    {name:<22} 마지막 {job_stats['status']:<10} 평균 {job_stats['avg_duration_seconds']}s, "
+              f"최대 {job_stats['max_duration_seconds']}s")
+
+    levels = len(EXPLANATION_LEVELS)
+    unchanged = all(record["status"] == "unchanged" for record in results["입력 그대로"].values())
+    first_partial = results["첫 실행"]["concept_explanations"]["status"] == "partial"
+    resumed = results["다시 실행"]["concept_explanations"]["status"] == "succeeded"
+    # 새 개념 하나: 설명 레벨 수 + 문항 수 (검증 탈락·중복으로 몇 번 더 호출할 수 있음)
+    added_calls_limit = levels + args.per_concept * 2
+    print(f"\n  예산 초과 후 이어서 생성: {'예' if first_partial and resumed else '아니오'} | "
+          f"입력 그대로일 때 LLM 호출: {calls['입력 그대로']} | 개념 추가 시 LLM 호출: {calls['개념 추가']} "
+          f"(최대 {added_calls_limit}) | 학습 패턴 변경 시 LLM 호출: {calls['학습 패턴 변경']}")
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+    if (not unchanged or calls["입력 그대로"] or not (first_partial and resumed)
+            or not 0 < calls["개념 추가"] <= added_calls_limit or calls["학습 패턴 변경"]
+            or any(job_stats["avg_duration_seconds"] is None for job_stats in stats.values())):
+        print("\n❌ 증분 실행이 기대와 다릅니다")
+        sys.exit(1)
+    print("\n✅ 완료")
+
+
+if __name__ == "__main__":
+    main()
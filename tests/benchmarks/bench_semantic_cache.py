@@ -0,0 +1,118 @@
+"""
+시맨틱 캐시 벤치마크: 적중률 / 오적중 감사 (결정적 로컬 임베딩, 오프라인)
+
+실행: python tests/benchmarks/bench_semantic_cache.py [--entries 5000]
+tests/benchmarks/data/semantic_cache_corpus.jsonl의 같은 뜻 질문 묶음(group)을 섞어서 차례로 넣고
+임계값별로 캐시 적중률과 다른 묶음의 답을 돌려준 오적중 수를 비교합니다.
+기본 임계값에서 오적중이 하나라도 있으면 실패로 종료합니다.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT_DIR)
+
+os.environ.setdefault("SqlConnectionString", "fake")
+os.environ.setdefault("OpenApiKey", "fake-key")
+os.environ.setdefault("OpenAIEndpoint", "http://127.0.0.1")
+
+import numpy as np  # noqa: E402
+from config.settings import settings  # noqa: E402
+from services.semantic_cache import SemanticCache, NumpyVectorIndex, HashingEmbedder, CacheEntry  # noqa: E402
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "semantic_cache_corpus.jsonl")
+
+
+def load_questions():
+    """(템플릿, 맥락, 묶음, 질문) 목록을 고정 시드로 섞어서 반환"""
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    questions = [(row["template"], row["scope"], row["group"], question)
+                 for row in rows for question in row["questions"]]
+    random.Random(7).shuffle(questions)
+    return questions, len(rows)
+
+
+def replay(questions, threshold: float):
+    """질문을 차례로 캐시에 통과시켜 (적중, 오적중, LLM 호출, 캐시) 집계"""
+    templates = {template for template, _, _, _ in questions}
+    cache = SemanticCache(templates, threshold, NumpyVectorIndex(), HashingEmbedder(), audit_ratio=1.0)
+    hits = false_hits = calls = 0
+    false_examples = []
+
+    for template, scope, group, question in questions:
+        generated = []
+
+        def generate():
+            generated.append(True)
+            return f"{group}|{question}"
+
+        answer = cache.get_or_generate(template, scope, question, generate)
+        if generated:
+            calls += 1
+            continue
+        hits += 1
+        answer_group, matched = answer.split("|", 1)
+        if answer_group != group:
+            false_hits += 1
+            false_examples.append((question, matched))
+    return hits, false_hits, calls, false_examples, cache
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=5000)
+    args = parser.parse_args()
+
+    questions, groups = load_questions()
+    ideal = len(questions) - groups
+    print(f"🧪 시맨틱 캐시 벤치마크: 질문 {len(questions)}개 / 같은 뜻 묶음 {groups}개 (최대 적중 {ideal}회)")
+    print("=" * 64)
+    print(f"{'임계값':>6} | {'적중':>4} {'오적중':>6} {'LLM 호출':>8} | {'적중률':>6} {'재현율':>6}")
+
+    default_false_hits = None
+    for threshold in (0.75, 0.8, 0.85, 0.9, 0.95):
+        hits, false_hits, calls, false_examples, cache = replay(questions, threshold)
+        correct = hits - false_hits
+        print(f"{threshold:>6.2f} | {hits:>4} {false_hits:>6} {calls:>8} | "
+              f"{hits / len(questions):>6.1%} {correct / ideal:>6.1%}")
+        for question, matched in false_examples[:2]:
+            print(f"         ⚠️ 오적중: '{question}' → '{matched}'")
+        if threshold == settings.semantic_cache_threshold:
+            default_false_hits = false_hits
+            audit = cache.get_stats()["audit_samples"][:3]
+
+    print(f"\n🔍 감사 샘플 (기본 임계값 {settings.semantic_cache_threshold}):")
+    for sample in audit:
+        print(f"   {sample['similarity']:.3f}  '{sample['question']}' ≈ '{sample['matched_question']}'")
+
+    # 조회 지연: 한 네임스페이스에 entries개가 쌓였을 때
+    embedder = HashingEmbedder()
+    index = NumpyVectorIndex(max_entries=args.entries)
+    cache = SemanticCache({"ask_questions"}, settings.semantic_cache_threshold, index, embedder)
+    namespace = cache._namespace("ask_questions", "원주각")
+    rng = np.random.default_rng(0)
+    now = time.time()
+    for i in range(args.entries):
+        vector = rng.standard_normal(embedder.dimensions).astype(np.float32)
+        index.add(namespace, vector / np.linalg.norm(vector), CacheEntry(f"q{i}", f"a{i}", now))
+
+    repeat = 500
+    started = time.perf_counter()
+    for _ in range(repeat):
+        cache.get_or_generate("ask_questions", "원주각", "원주각이 뭐야?", lambda: "답")
+    elapsed = (time.perf_counter() - started) / repeat * 1000
+    print(f"\n⏱️ 항목 {len(index):,}개 네임스페이스 조회(정규화+임베딩+검색): {elapsed:.3f}ms/회")
+
+    if default_false_hits:
+        print(f"\n❌ 기본 임계값에서 오적중 {default_false_hits}회")
+        sys.exit(1)
+    print("\n✅ 통과")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+합성 훈련 데이터 생성기 벤치마크 (로컬 가짜 OpenAI 서버)
+
+실행: python tests/benchmarks/bench_synthetic_generator.py [--concepts 59] [--variants 2] [--concurrency 16]
+가짜 서버(지연·503·중복 응답)를 상대로 처리량을 재고, 중간에 멈춘 뒤 이어서 생성해도
+작업이 빠지거나 중복되지 않는지 확인합니다.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "tests", "api"))
+
+FAKE_PORT = 8111
+
+# 설정 로드 전에 가짜 배포 지정 (클라이언트 레이트 리미터도 함께 확인)
+os.environ.setdefault("SqlConnectionString", "fake")
+os.environ.setdefault("OpenApiKey", "fake-key")
+os.environ["OpenAIEndpoint"] = f"http://127.0.0.1:{FAKE_PORT}"
+os.environ["OpenAIDeployments"] = json.dumps([
+    {"name": "fake", "endpoint": f"http://127.0.0.1:{FAKE_PORT}", "model": "gpt-4o-mini", "rpm": 6000}
+])
+
+from fake_openai_server import serve, FakeOpenAIState  # noqa: E402
+from generate_synthetic_data import generate_synthetic_training_data, content_hash  # noqa: E402
+
+
+def make_patterns(concepts: int) -> dict:
+    """extract_patterns.py 결과와 같은 모양의 합성 패턴"""
+    return {
+        "extraction_summary": {"data_source": "벤치마크 합성 데이터", "top_concepts_for_training": concepts},
+        "concepts": [
+            {"concept_name": f"개념{i:02d}", "success_rate": 0.5, "avg_personal_accuracy": 0.3 + (i % 5) * 0.1,
+             "avg_global_accuracy": 0.55}
+            for i in range(concepts)
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concepts", type=int, default=59)
+    parser.add_argument("--variants", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    serve(FAKE_PORT, FakeOpenAIState("fake", args.latency, 0.05, 0.02, 0, 100000, duplicate_rate=0.05))
+
+    workdir = tempfile.mkdtemp()
+    patterns_path = os.path.join(workdir, "patterns.json")
+    output_path = os.path.join(workdir, "synthetic.jsonl")
+    with open(patterns_path, "w", encoding="utf-8") as f:
+        json.dump(make_patterns(args.concepts), f, ensure_ascii=False)
+
+    total = args.concepts * 3 * 3 * args.variants
+    print(f"🧪 합성 데이터 생성기 벤치마크: {total}개 대화, 동시 {args.concurrency}개, 지연 {args.latency}s")
+    print("=" * 60)
+
+    # 1차: 절반만 생성하고 멈춤
+    first = generate_synthetic_training_data(patterns_path, output_path, args.concurrency, args.variants,
+                                             resume=True, max_examples=total // 2)
+    # 2차: 이어서 생성
+    second = generate_synthetic_training_data(patterns_path, output_path, args.concurrency, args.variants,
+                                              resume=True)
+
+    with open(output_path, encoding="utf-8") as f:
+        examples = [json.loads(line) for line in f]
+    hashes = [content_hash(example["messages"][-1]["content"]) for example in examples]
+    with open(f"{output_path}.checkpoint", encoding="utf-8") as f:
+        completed = [json.loads(line)["job_id"] for line in f]
+
+    print("\n📊 결과")
+    print(f"  1차 처리량: {first['examples_per_second']}개/초, 2차 처리량: {second['examples_per_second']}개/초")
+    print(f"  이어하기: 2차 시작 시 완료 {second['resumed']}개")
+    print(f"  파일 예제 {len(examples)}개, 중복 제거 {first['duplicates'] + second['duplicates']}개, "
+          f"실패 {first['failed'] + second['failed']}개")
+
+    assert len(hashes) == len(set(hashes)), "중복 응답이 기록되면 안 됩니다"
+    assert len(completed) == len(set(completed)), "같은 작업이 두 번 완료되면 안 됩니다"
+    assert len(completed) + second["failed"] == total
+    print("✅ 완료")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ export interface GeneratedQuestion {
   new_question_text: string;
   correct_answer: string;
   explanation: string;
+  hint_ladder?: string[]; // 단계별 소크라틱 힌트 (그대로 다시 보내면 힌트를 LLM 호출 없이 제공)
 }
 
 // API 요청 타입들
@@ -98,7 +98,8 @@ export class TutorAPIClient {
     for (let attempt = 1; attempt <= this.retryAttempts; attempt++) {
       const result = await this.request<T>(endpoint, options);
 
-      if (result.data || (result.status && result.status < 500)) {
+      // 타임아웃(408)도 재시도 - Idempotency-Key가 같으면 서버가 첫 응답을 재전송
+      if (result.data || (result.status && result.status < 500 && result.status !== 408)) {
         return result;
       }
 
@@ -126,6 +127,16 @@ export class TutorAPIClient {
     return result;
   }
 
+  /**
+   * 논리적 요청 하나당 Idempotency-Key 생성
+   */
+  private createIdempotencyKey(): string {
+    if (typeof crypto !== 'undefined' && typeof crypto.randomUUID === 'function') {
+      return crypto.randomUUID();
+    }
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+  }
+
   /**
    * 지연 함수
    */
@@ -137,9 +148,11 @@ export class TutorAPIClient {
    * 메인 API 호출 메서드
    */
   async sendRequest(request: TutorAPIRequest): Promise<APIResponse<TutorAPIResponse>> {
+    // 재시도 간 같은 키를 보내 서버가 파이프라인을 한 번만 실행하도록 함
     return this.requestWithRetry<TutorAPIResponse>('tutor_api', {
       method: 'POST',
       body: JSON.stringify(request),
+      headers: { 'Idempotency-Key': this.createIdempotencyKey() },
     });
   }
 
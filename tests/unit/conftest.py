@@ -0,0 +1,16 @@
+"""
+단위 테스트 공통 설정 - 실제 DB·OpenAI 없이 설정 싱글톤을 만들 수 있도록 필수 환경변수 기본값 지정
+
+실행: python -m pytest tests/unit -q
+"""
+import os
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT_DIR)
+
+os.environ.setdefault("SqlConnectionString", "fake")
+os.environ.setdefault("OpenApiKey", "fake-key")
+os.environ.setdefault("OpenAIEndpoint", "http://127.0.0.1:9")
+# function_app을 import하는 테스트에서 백그라운드 워밍업 스레드를 띄우지 않음
+os.environ.setdefault("ColdStartWarmup", "false")
@@ -0,0 +1,118 @@
+"""
+AccuracyIndex 갱신 - session_id 순서와 상관없이 새 행 반영 (전체 다시 적재), redis 스냅샷이 주기 안이면 SQL 생략
+"""
+import time
+from database.accuracy_index import AccuracyIndex
+
+
+class FakeView:
+    """gold.vw_personal_item_enriched 행 목록으로 DatabaseService 집계 쿼리를 흉내"""
+
+    def __init__(self):
+        self.rows = []  # (learnerID, concept_name, tag_accuracy, session_id)
+        self.queries = 0
+
+    def add(self, learner_id, concept_name, accuracy, session_id, count=1):
+        self.rows.extend([(learner_id, concept_name, accuracy, session_id)] * count)
+
+    def get_latest_concept_accuracies(self):
+        self.queries += 1
+        groups = {}
+        for learner_id, concept_name, accuracy, session_id in self.rows:
+            groups.setdefault((learner_id, concept_name), []).append((session_id, accuracy))
+        return [(learner_id, concept_name, max(rows)[1], len(rows))
+                for (learner_id, concept_name), rows in groups.items()]
+
+    def get_item_concepts(self):
+        return []
+
+
+def test_refresh_picks_up_sessions_that_sort_below_earlier_ones():
+    view = FakeView()
+    view.add("zz-learner", "분수", 0.5, "rt-20250918:abcdef:zz-learner:1", 3)
+    index = AccuracyIndex(refresh_seconds=3600, db_service=view)
+    index.refresh()
+
+    # 학습자 ID가 앞쪽으로 정렬돼 session_id 문자열이 이전 최대값보다 작은 새 세션
+    view.add("aa-learner", "분수", 0.8, "rt-20250918:123456:aa-learner:1", 2)
+    view.add("zz-learner", "분수", 0.6, "rt-20250918:abcdef:zz-learner:1", 1)
+    index.refresh()
+
+    accuracy, attempts = index.get("aa-learner", "분수")
+    assert abs(accuracy - 0.8) < 1e-6 and attempts == 2
+    assert index.get("zz-learner", "분수")[1] == 4
+
+    # 변경 없이 다시 갱신해도 문항 수를 두 번 세지 않음
+    index.refresh()
+    assert index.get("zz-learner", "분수")[1] == 4
+
+
+def test_reload_drops_values_put_from_direct_queries():
+    view = FakeView()
+    view.add("A1", "분수", 0.5, "S1", 3)
+    index = AccuracyIndex(refresh_seconds=3600, db_service=view)
+    index.refresh()
+    index.put("A1", "방정식", 0.4, 1)
+    index.put("A1", "분수", 0.9, 10)
+
+    index.refresh()
+
+    assert index.get("A1", "분수") == (0.5, 3)
+    assert index.get("A1", "방정식") is None
+
+
+class FakeRedis:
+    """hset/hmget만 있는 가짜 Redis"""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    def hmget(self, key, *fields):
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+
+def redis_index(view, client):
+    index = AccuracyIndex(refresh_seconds=3600, mode="redis", db_service=view)
+    index._redis = client
+    return index
+
+
+def test_fresh_shared_snapshot_skips_sql_and_stale_one_reloads():
+    view = FakeView()
+    view.add("A1", "분수", 0.5, "S1", 3)
+    client = FakeRedis()
+    redis_index(view, client).refresh()
+    assert view.queries == 1
+
+    reader = redis_index(view, client)
+    reader.refresh()
+    assert view.queries == 1
+    assert reader.get("A1", "분수") == (0.5, 3)
+
+    # 스냅샷이 갱신 주기보다 오래되면 뷰를 다시 적재하고 새 스냅샷을 공유
+    view.add("A2", "분수", 0.7, "S2", 1)
+    reader.loaded_at = time.time() - 7200
+    reader._publish_snapshot(client)
+    reader.refresh()
+    assert view.queries == 2
+    assert reader.get("A2", "분수")[1] == 1
+
+    late = redis_index(view, client)
+    late.refresh()
+    assert view.queries == 2
+    assert late.get("A2", "분수")[1] == 1
+
+
+def test_forced_refresh_reloads_even_with_fresh_snapshot():
+    view = FakeView()
+    view.add("A1", "분수", 0.5, "S1", 3)
+    client = FakeRedis()
+    index = redis_index(view, client)
+    index.refresh()
+
+    index.refresh(force=True)
+
+    assert view.queries == 2
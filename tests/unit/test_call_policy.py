@@ -0,0 +1,89 @@
+"""
+CallPolicy - half_open 시험 호출이 어떻게 끝나도 서킷이 멈추지 않는지, 헤지 요청의 요청 예산 전달
+"""
+import time
+import pytest
+from services.call_policy import CallPolicy, CircuitOpenError, request_deadline, remaining_budget
+from services.rate_limiter import RateLimitExceededError
+
+
+class StatusError(Exception):
+    """SDK 예외처럼 status_code를 가진 에러"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def fail_with(error: Exception):
+    def call(timeout):
+        raise error
+    return call
+
+
+def open_policy() -> CallPolicy:
+    """실패 1번에 열리고 바로 half_open 시험을 허용하는 정책 (재시도 없음)"""
+    policy = CallPolicy(max_retries=0, failure_threshold=1, reset_timeout=0.0)
+    with pytest.raises(StatusError):
+        policy.execute(fail_with(StatusError(503)), target="d1")
+    assert policy.get_breaker("d1").state == "open"
+    return policy
+
+
+def test_client_error_on_probe_closes_circuit():
+    policy = open_policy()
+    with pytest.raises(StatusError):
+        policy.execute(fail_with(StatusError(400)), target="d1")
+
+    assert policy.get_breaker("d1").state == "closed"
+    assert policy.execute(lambda timeout: "ok", target="d1") == "ok"
+
+
+def test_rejected_probe_releases_half_open_slot():
+    policy = open_policy()
+    with pytest.raises(RateLimitExceededError):
+        policy.execute(fail_with(RateLimitExceededError("queue full", 1.0)), target="d1")
+
+    breaker = policy.get_breaker("d1")
+    assert breaker.state == "half_open"
+    # 기록 없이 끝난 시험 호출 뒤에도 다음 호출이 다시 시험할 수 있음
+    assert policy.execute(lambda timeout: "ok", target="d1") == "ok"
+    assert breaker.state == "closed"
+
+
+def test_retryable_failure_on_probe_reopens_circuit():
+    policy = open_policy()
+    with pytest.raises(StatusError):
+        policy.execute(fail_with(StatusError(500)), target="d1")
+
+    breaker = policy.get_breaker("d1")
+    breaker.reset_timeout = 60.0
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        policy.execute(lambda timeout: "ok", target="d1")
+
+
+def test_half_open_allows_one_probe_at_a_time():
+    policy = open_policy()
+    breaker = policy.get_breaker("d1")
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.release_probe()
+    assert breaker.allow_request()
+
+
+def test_hedged_attempts_see_request_deadline():
+    policy = CallPolicy(max_retries=0, hedge_templates=["hint"], hedge_min_samples=1)
+    policy.latency.record("hint", 0.01)
+    budgets = []
+
+    def call(timeout):
+        budgets.append(remaining_budget())
+        time.sleep(0.05)
+        return "ok"
+
+    with request_deadline(5.0):
+        assert policy.execute(call, template="hint") == "ok"
+    # 주 요청과 헤지 요청 모두 풀 스레드에서 실행되지만 요청 예산이 보여야 함
+    assert len(budgets) == 2
+    assert all(budget is not None and 0 < budget <= 5.0 for budget in budgets)
@@ -0,0 +1,29 @@
+"""
+개념 설명 저장소 - 경로를 지정하지 않으면 앱 루트 파일을 읽거나 쓰지 않고, 지정한 공유 경로의 설명을 제공
+"""
+import pytest
+from services.concept_explanations import (ConceptExplanationStore, PROMPT_VERSION, write_store_file)
+from precompute_concept_explanations import precompute_concept_explanations
+
+
+def test_store_without_path_always_generates_live(monkeypatch):
+    monkeypatch.delenv("ConceptExplanationStorePath", raising=False)
+    store = ConceptExplanationStore.from_settings()
+
+    assert store.path == ""
+    assert store.get("일차방정식", "beginner") is None
+    with pytest.raises(ValueError):
+        precompute_concept_explanations("전체개념명.txt")
+
+
+def test_store_serves_explanations_from_configured_path(monkeypatch, tmp_path):
+    path = str(tmp_path / "concept_explanations.json")
+    write_store_file(path, {"prompt_version": PROMPT_VERSION,
+                            "explanations": {"일차방정식": {"intermediate": "등식의 성질로 x를 구해요."}}})
+    monkeypatch.setenv("ConceptExplanationStorePath", path)
+
+    store = ConceptExplanationStore.from_settings()
+
+    # advanced에서 시작하면 더 자세한 intermediate 설명을 쓰고, 가장 자세한 beginner에는 없음
+    assert store.get("일차방정식", "advanced") == "등식의 성질로 x를 구해요."
+    assert store.get("일차방정식", "beginner") is None
@@ -0,0 +1,40 @@
+"""
+DatabaseService 스냅샷 우선 조회 - 스냅샷에 있으면 SQL 연결 없이 반환
+"""
+import pytest
+from database import view_snapshot as view_snapshot_module
+from database.db_service import DatabaseService
+
+
+class FakeSnapshot:
+    """스냅샷 조회 결과를 고정한 가짜 스냅샷"""
+
+    def get_session_results(self, learner_id, session_id):
+        return [(1, "ITEM-1", "일차방정식", 1, 0.8, 0.6, 0.2)]
+
+    def get_assessment_item_id(self, learner_id, session_id, question_number):
+        return f"ITEM-{question_number}"
+
+    def get_personal_info(self, learner_id, assessment_item_id):
+        return ("일차방정식", 0.8)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(view_snapshot_module, "view_snapshot", FakeSnapshot())
+    db_service = DatabaseService()
+    # 스냅샷에 있는 값은 SQL로 넘어가면 안 됨
+    monkeypatch.setattr(db_service, "get_connection", lambda: pytest.fail("SQL fallback called"))
+    return db_service
+
+
+def test_get_session_results_uses_snapshot(service):
+    assert service.get_session_results("A001", "S1") == [(1, "ITEM-1", "일차방정식", 1, 0.8, 0.6, 0.2)]
+
+
+def test_get_assessment_item_id_uses_snapshot(service):
+    assert service.get_assessment_item_id("A001", "S1", 3) == "ITEM-3"
+
+
+def test_get_personal_info_uses_snapshot(service):
+    assert service.get_personal_info("A001", "ITEM-3") == ("일차방정식", 0.8)
@@ -0,0 +1,69 @@
+"""
+패턴 추출 - 뷰 전체를 청크로 읽어 집계 (session_id 순서와 상관없이 모든 행 반영)
+"""
+from contextlib import contextmanager
+from extract_patterns import PatternAggregator, stream_view_rows
+
+ROWS = [
+    ("분수", "zz-learner", 1, 0.5, 0.6),
+    ("분수", "zz-learner", 0, 0.5, 0.6),
+    ("분수", "aa-learner", 1, 0.8, 0.6),
+    ("방정식", "aa-learner", 0, None, 0.4),
+]
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.arraysize = 1
+
+    def execute(self, query, *params):
+        self.query, self.params = query, params
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+
+class FakeDatabase:
+    """커서 하나를 돌려주는 가짜 DatabaseService"""
+
+    def __init__(self, rows):
+        self.fake_cursor = FakeCursor(rows)
+
+    @contextmanager
+    def get_connection(self):
+        yield self
+
+    def cursor(self):
+        return self.fake_cursor
+
+
+def aggregate(rows, chunk_size=3):
+    db = FakeDatabase(rows)
+    aggregator = PatternAggregator()
+    for chunk in stream_view_rows(db, chunk_size):
+        aggregator.add_rows(chunk)
+    return db.fake_cursor, aggregator.build_patterns()
+
+
+def test_streams_whole_view_without_watermark():
+    cursor, patterns = aggregate(ROWS)
+
+    assert cursor.params == ()
+    assert "WHERE" not in cursor.query
+    assert patterns["extraction_summary"]["total_rows"] == len(ROWS)
+    assert {c["concept_name"]: (c["attempts"], c["unique_students"]) for c in patterns["all_concepts"]} == {
+        "분수": (3, 2), "방정식": (1, 1)
+    }
+
+
+def test_repeated_runs_do_not_drift():
+    _, first = aggregate(ROWS)
+    _, second = aggregate(ROWS, chunk_size=1)
+
+    assert first == second
+    assert first["common_mistakes"] == [
+        {"concept_name": "분수", "avg_accuracy_when_wrong": 0.5, "mistake_count": 1},
+        {"concept_name": "방정식", "avg_accuracy_when_wrong": 0.0, "mistake_count": 1},
+    ]
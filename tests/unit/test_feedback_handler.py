@@ -0,0 +1,51 @@
+"""
+FeedbackHandler 유사 문항 재생성 - 검증에 실패한 문항은 single-flight 결과를 재사용하지 않고 새로 생성
+"""
+import json
+import pytest
+from handlers.feedback_handler import FeedbackHandler
+
+WRONG_ITEM = {"new_question_text": "2 × 4의 값을 구하시오.", "correct_answer": "10",
+              "explanation": "2 \\times 4 = 8 이므로 답은 8이다."}
+RIGHT_ITEM = {"new_question_text": "3 × 4의 값을 구하시오.", "correct_answer": "12",
+              "explanation": "3 \\times 4 = 12 이므로 답은 12이다."}
+
+
+class SingleFlightLLM:
+    """같은 프롬프트에는 처음 응답을 그대로 돌려주는 가짜 LLM (single-flight 결과 캐시와 같은 동작)"""
+
+    def __init__(self, llm_service, responses):
+        self.llm_service = llm_service
+        self.responses = list(responses)
+        self.cache = {}
+        self.prompts = []
+
+    def call_llm(self, system_prompt, user_prompt, conversation_history, response_format="text", template=None):
+        key = (template, system_prompt, user_prompt)
+        self.prompts.append(user_prompt)
+        if key not in self.cache:
+            self.cache[key] = json.dumps(self.responses.pop(0), ensure_ascii=False)
+        return self.cache[key]
+
+    def __getattr__(self, name):
+        return getattr(self.llm_service, name)
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    monkeypatch.setenv("ItemVerificationMaxRetries", "1")
+    monkeypatch.setattr("handlers.feedback_handler.item_bank.add", lambda concept, item: None)
+    feedback_handler = FeedbackHandler()
+    feedback_handler.llm_service = SingleFlightLLM(feedback_handler.llm_service, [WRONG_ITEM, RIGHT_ITEM])
+    return feedback_handler
+
+
+def test_regeneration_returns_new_item_after_failed_verification(handler):
+    result = handler._handle_similar_item_request("곱셈", 0.4, "비슷한 문제 주세요", [])
+
+    assert result["generated_question_data"]["correct_answer"] == "12"
+    prompts = handler.llm_service.prompts
+    assert len(prompts) == 2
+    # 재생성 프롬프트에는 실패 이유와 시도 번호가 들어가 캐시 키가 달라짐
+    assert prompts[1] != prompts[0]
+    assert "재생성 (1번째)" in prompts[1] and "10" in prompts[1] and "8" in prompts[1]
@@ -0,0 +1,57 @@
+"""
+힌트 사다리 - 시도 횟수에 따른 단계 상승, 사다리 밖 메시지를 뺀 로컬 처리 비율, tutor_api의 attempt_count 전달
+"""
+import json
+import azure.functions as func
+from services.hint_ladder import HintLadderStats, next_hint
+
+LADDER = ["주어진 것은?", "어떤 공식을 쓸까?", "첫 계산은?"]
+
+
+def test_next_hint_escalates_by_attempt_count():
+    question = {"hint_ladder": LADDER}
+    assert next_hint(question, []) == LADDER[0]
+    assert next_hint(question, [], attempt_count=2) == LADDER[1]
+    assert next_hint(question, [], attempt_count=3) == LADDER[2]
+    assert next_hint(question, [], attempt_count=4) is None
+
+
+def test_next_hint_never_goes_back_behind_served_hints():
+    history = [{"role": "assistant", "content": LADDER[0]}, {"role": "assistant", "content": LADDER[1]}]
+    assert next_hint({"hint_ladder": LADDER}, history, attempt_count=1) == LADDER[2]
+
+
+def test_off_script_turns_are_not_hint_turns():
+    stats = HintLadderStats()
+    stats.record("served_locally")
+    stats.record("ladder_exhausted")
+    stats.record("off_script")
+    stats.record("off_script")
+
+    result = stats.get_stats()
+    assert result["hint_turns"] == 2
+    assert result["off_script"] == 2
+    assert result["local_share"] == 0.5
+
+
+def test_tutor_api_passes_attempt_count(monkeypatch):
+    import function_app
+    from handlers.generated_item_handler import GeneratedItemHandler
+
+    calls = []
+
+    def fake_handle(self, *args):
+        calls.append(args)
+        return {"feedback": "ok"}
+
+    monkeypatch.setattr(GeneratedItemHandler, "__init__", lambda self: None)
+    monkeypatch.setattr(GeneratedItemHandler, "handle", fake_handle)
+    for attempt_count, expected in ((2, 2), ("3", 3), (None, None), ("many", None), (0, None)):
+        body = {"request_type": "generated_item", "message": "7",
+                "generated_question_data": {"new_question_text": "3 + 4 = ?", "correct_answer": "7"}}
+        if attempt_count is not None:
+            body["attempt_count"] = attempt_count
+        req = func.HttpRequest("POST", "/api/tutor_api", headers={}, body=json.dumps(body).encode("utf-8"))
+
+        assert function_app.tutor_api(req).status_code == 200
+        assert calls[-1][5] == expected
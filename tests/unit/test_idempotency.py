@@ -0,0 +1,136 @@
+"""
+Idempotency-Key 캐시 - 같은 키 재전송, 다른 바디로 키 재사용(422), 재실행 대상 응답은 보관하지 않음, redis 락 연장
+"""
+import time
+import pytest
+from services.idempotency import IdempotencyCache, IdempotencyKeyError, StoredResponse, make_fingerprint
+
+BODY = '{"request_type": "hint", "message": "힌트 주세요"}'.encode("utf-8")
+
+
+def response(status_code: int = 200, body: bytes = b'{"answer": "1"}'):
+    calls = []
+
+    def execute():
+        calls.append(1)
+        return StoredResponse(status_code, body, {"Content-Type": "application/json"})
+
+    return execute, calls
+
+
+def test_same_key_and_body_replays_stored_response():
+    cache = IdempotencyCache(ttl_seconds=60)
+    execute, calls = response()
+
+    first, replayed_first = cache.run("key-1", make_fingerprint(BODY), execute)
+    second, replayed_second = cache.run("key-1", make_fingerprint(BODY), execute)
+
+    assert (replayed_first, replayed_second) == (False, True)
+    assert second.body == first.body and second.headers == first.headers
+    assert len(calls) == 1
+
+
+def test_same_key_with_different_body_is_rejected():
+    cache = IdempotencyCache(ttl_seconds=60)
+    execute, calls = response()
+    cache.run("key-1", make_fingerprint(BODY), execute)
+
+    with pytest.raises(IdempotencyKeyError) as error:
+        cache.run("key-1", make_fingerprint(b'{"request_type": "hint", "message": "other"}'), execute)
+
+    assert error.value.status_code == 422
+    assert len(calls) == 1
+    assert cache.get_stats()["fingerprint_mismatch"] == 1
+
+
+@pytest.mark.parametrize("status_code", [429, 503])
+def test_retryable_responses_are_executed_again(status_code):
+    cache = IdempotencyCache(ttl_seconds=60)
+    execute, calls = response(status_code)
+
+    cache.run("key-1", make_fingerprint(BODY), execute)
+    _, replayed = cache.run("key-1", make_fingerprint(BODY), execute)
+
+    assert replayed is False
+    assert len(calls) == 2
+
+
+def test_expired_response_is_executed_again():
+    cache = IdempotencyCache(ttl_seconds=60)
+    execute, calls = response()
+
+    cache.run("key-1", make_fingerprint(BODY), execute)
+    cache._responses["key-1"].expires_at = 0
+    cache.run("key-1", make_fingerprint(BODY), execute)
+
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("key", ["", "x" * 256])
+def test_invalid_key_is_rejected(key):
+    execute, calls = response()
+
+    with pytest.raises(IdempotencyKeyError) as error:
+        IdempotencyCache(ttl_seconds=60).run(key, make_fingerprint(BODY), execute)
+
+    assert error.value.status_code == 400
+    assert not calls
+
+
+def test_stored_response_round_trips_for_redis():
+    stored = StoredResponse(201, b"\x00binary", {"Location": "/api/jobs/1"}, "abc")
+
+    restored = StoredResponse.from_bytes(stored.to_bytes())
+
+    assert (restored.status_code, restored.body, restored.headers, restored.fingerprint) == (
+        201, b"\x00binary", {"Location": "/api/jobs/1"}, "abc")
+
+
+class FakeRedis:
+    """만료 시간이 있는 get/set/pexpire/delete만 흉내 내는 가짜 Redis"""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        value, expires_at = self.values.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.values.pop(key)
+            return None
+        return value
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and self.get(key) is not None:
+            return None
+        self.values[key] = (value if isinstance(value, bytes) else value.encode("utf-8"),
+                            time.monotonic() + px / 1000 if px else None)
+        return True
+
+    def pexpire(self, key, px):
+        if self.get(key) is None:
+            return False
+        self.values[key] = (self.values[key][0], time.monotonic() + px / 1000)
+        return True
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+def test_redis_lock_is_renewed_while_pipeline_runs_longer_than_wait():
+    redis = FakeRedis()
+    leader, other = IdempotencyCache(60, "redis", wait_seconds=0.05), IdempotencyCache(60, "redis", wait_seconds=0.05)
+    leader._redis = other._redis = redis
+    lock_held = []
+
+    def slow_pipeline():
+        time.sleep(0.2)
+        # 락 유지 시간(0.05초)이 지나도 다른 워커가 같은 키로 락을 잡지 못함
+        lock_held.append(redis.set(next(key for key in redis.values if key.endswith(":lock")), "other", nx=True))
+        return StoredResponse(200, b'{"answer": "1"}')
+
+    leader.run("key-1", make_fingerprint(BODY), slow_pipeline)
+
+    assert lock_held == [None]
+    assert not [key for key in redis.values if key.endswith(":lock")]
+    _, replayed = other.run("key-1", make_fingerprint(BODY), lambda: pytest.fail("response must be shared"))
+    assert replayed is True
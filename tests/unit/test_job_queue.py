@@ -0,0 +1,28 @@
+"""
+작업 큐 모드 기본값 - Storage 연결 문자열이 있으면 storage (local은 단일 인스턴스 개발용)
+"""
+from services.job_queue import JobQueue
+
+
+def test_defaults_to_storage_when_storage_is_configured(monkeypatch):
+    monkeypatch.delenv("JobQueueMode", raising=False)
+    monkeypatch.setenv("AzureWebJobsStorage", "UseDevelopmentStorage=true")
+
+    queue = JobQueue.from_settings()
+
+    assert queue.mode == "storage"
+    assert queue.enabled
+
+
+def test_defaults_to_local_without_storage(monkeypatch):
+    monkeypatch.delenv("JobQueueMode", raising=False)
+    monkeypatch.delenv("AzureWebJobsStorage", raising=False)
+
+    assert JobQueue.from_settings().mode == "local"
+
+
+def test_explicit_mode_wins(monkeypatch):
+    monkeypatch.setenv("JobQueueMode", "local")
+    monkeypatch.setenv("AzureWebJobsStorage", "UseDevelopmentStorage=true")
+
+    assert JobQueue.from_settings().mode == "local"
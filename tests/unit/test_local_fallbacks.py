@@ -0,0 +1,75 @@
+"""
+LLM 없이 만드는 로컬 응답 - 힌트 레벨 경계, 개념 키워드 힌트, 힌트 순서, 요약·피드백 문구
+"""
+import pytest
+from services.local_fallbacks import (
+    CANNED_HINTS, canned_hint, canned_hints, feedback_text, hint_level_for, session_summary_text
+)
+
+
+@pytest.mark.parametrize("accuracy, level", [
+    (None, "beginner"), (0.0, "beginner"), (0.499, "beginner"),
+    (0.5, "intermediate"), (0.799, "intermediate"), (0.8, "advanced"), (1.0, "advanced")
+])
+def test_hint_level_boundaries(accuracy, level):
+    assert hint_level_for(accuracy) == level
+
+
+def test_unknown_concept_and_level_fall_back_to_beginner():
+    hints = canned_hints(None, "expert")
+
+    assert hints == [hint.format(concept="이 개념") for hint in CANNED_HINTS["beginner"]]
+
+
+def test_most_specific_concept_keyword_wins():
+    # "순환소수"는 "소수"보다 앞에 있어야 순환마디 힌트가 나옴
+    hints = canned_hints("순환소수를 분수로 나타내기", "intermediate")
+
+    assert len(hints) == len(CANNED_HINTS["intermediate"]) + 1
+    assert "순환마디" in hints[1]
+    assert not any("기약분수" in hint for hint in hints)
+
+
+def test_canned_hint_moves_to_next_unseen_hint_and_stops_at_last():
+    hints = canned_hints("연립방정식", "beginner")
+    history = []
+
+    shown = []
+    for _ in range(len(hints) + 1):
+        hint = canned_hint("연립방정식", "beginner", history)
+        shown.append(hint)
+        history += [{"role": "user", "content": "힌트 주세요"}, {"role": "assistant", "content": f"좋아! {hint}"}]
+
+    assert shown == hints + [hints[-1]]
+
+
+def test_canned_hint_ignores_hint_text_in_user_messages():
+    hints = canned_hints("연립방정식", "beginner")
+    history = [{"role": "user", "content": hints[0]}]
+
+    assert canned_hint("연립방정식", "beginner", history) == hints[0]
+    assert canned_hint("연립방정식", "beginner", None) == hints[0]
+
+
+def test_session_summary_without_wrong_answers():
+    text = session_summary_text(5, 5, [], [])
+
+    assert "전체 5 문제 중에서 5 문제를 맞혔네" in text
+    assert "틀린 문제가 없어" in text
+
+
+def test_session_summary_names_wrong_questions_and_first_weak_concept():
+    text = session_summary_text(5, 3, ["2", "4"], ["이차방정식", "인수분해"])
+
+    assert "2, 4 번 문제를 틀렸더라" in text
+    assert text.endswith("\"이차방정식\"에 대한 학습을 시작해볼까?")
+
+
+@pytest.mark.parametrize("accuracy, phrase", [
+    (0.499, "쉬운 문제부터"), (0.5, "기본은 잘 잡혀 있어"), (0.8, "응용 문제에 도전")
+])
+def test_feedback_text_accuracy_bands(accuracy, phrase):
+    text = feedback_text("일차함수", accuracy)
+
+    assert phrase in text
+    assert f"{accuracy * 100:.1f}%" in text
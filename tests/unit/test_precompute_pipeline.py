@@ -0,0 +1,140 @@
+"""
+미리 계산 파이프라인 - 입력 지문이 같으면 건너뛰고, 입력·의존 작업·출력이 바뀌면 다시 실행
+"""
+import os
+import pytest
+from services.precompute_pipeline import PrecomputeJob, PrecomputePipeline
+
+
+class FakeJob:
+    """입력 지문과 실행 결과를 바꿀 수 있는 작업"""
+
+    def __init__(self, name, depends_on=(), fingerprint="v1"):
+        self.name = name
+        self.depends_on = tuple(depends_on)
+        self.input = fingerprint
+        self.output = True
+        self.result = {"items": 1}
+        self.error = None
+        self.calls = 0
+
+    def run(self, budget):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.result
+
+    def register(self, pipeline):
+        pipeline.register(PrecomputeJob(self.name, self.run, lambda: self.input, "0 0 * * * *", f"{self.name}.json",
+                                        self.depends_on, output_exists=lambda: self.output))
+        return self
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return str(tmp_path / "precompute_state.json")
+
+
+def make_pipeline(state_path, *jobs):
+    pipeline = PrecomputePipeline(state_path)
+    for job in jobs:
+        job.register(pipeline)
+    return pipeline
+
+
+def statuses(records):
+    return {name: record["status"] for name, record in records.items()}
+
+
+def test_unchanged_fingerprint_skips_run_across_processes(state_path):
+    job = FakeJob("patterns")
+    assert statuses(make_pipeline(state_path, job).run()) == {"patterns": "succeeded"}
+
+    # 새 프로세스도 기록 파일의 지문을 보고 건너뜀
+    records = make_pipeline(state_path, job).run()
+
+    assert statuses(records) == {"patterns": "unchanged"}
+    assert job.calls == 1
+
+
+def test_changed_inputs_or_missing_output_rerun(state_path):
+    job = FakeJob("patterns")
+    pipeline = make_pipeline(state_path, job)
+    pipeline.run()
+
+    job.input = "v2"
+    assert pipeline.run()["patterns"]["reason"] == "inputs changed"
+    job.output = False
+    assert pipeline.run()["patterns"]["reason"] == "output missing"
+    assert job.calls == 3
+
+
+def test_dependency_output_change_reruns_downstream(state_path):
+    upstream, downstream = FakeJob("patterns"), FakeJob("item_bank", ["patterns"])
+    pipeline = make_pipeline(state_path, upstream, downstream)
+    pipeline.run()
+
+    upstream.input = "v2"
+    records = pipeline.run(["item_bank"])
+
+    assert statuses(records) == {"patterns": "succeeded", "item_bank": "succeeded"}
+    assert records["item_bank"]["reason"] == "inputs changed"
+    assert (upstream.calls, downstream.calls) == (2, 2)
+
+
+def test_failed_dependency_skips_downstream_and_retries_next_run(state_path):
+    upstream, downstream = FakeJob("patterns"), FakeJob("item_bank", ["patterns"])
+    pipeline = make_pipeline(state_path, upstream, downstream)
+    upstream.error = RuntimeError("view unavailable")
+
+    assert statuses(pipeline.run()) == {"patterns": "failed", "item_bank": "skipped"}
+
+    upstream.error = None
+    records = pipeline.run()
+
+    assert records["patterns"]["reason"] == "previous run failed"
+    assert records["item_bank"]["reason"] == "first run"
+    assert downstream.calls == 1
+
+
+def test_partial_run_continues_next_time(state_path):
+    job = FakeJob("item_bank")
+    job.result = {"items": 3, "complete": False}
+    pipeline = make_pipeline(state_path, job)
+
+    assert statuses(pipeline.run()) == {"item_bank": "partial"}
+    job.result = {"items": 2}
+    assert pipeline.run()["item_bank"]["reason"] == "previous run partial"
+    assert statuses(pipeline.run()) == {"item_bank": "unchanged"}
+
+
+def test_dry_run_and_force(state_path):
+    job = FakeJob("patterns")
+    pipeline = make_pipeline(state_path, job)
+
+    record = pipeline.run(dry_run=True)["patterns"]
+
+    assert (record["status"], record["reason"]) == ("pending", "first run")
+    assert job.calls == 0 and not os.path.exists(state_path)
+    pipeline.run()
+    assert pipeline.run(["patterns"], force=True)["patterns"]["reason"] == "forced"
+    assert job.calls == 2
+
+
+def test_register_rejects_unknown_dependency(state_path):
+    with pytest.raises(ValueError):
+        make_pipeline(state_path, FakeJob("item_bank", ["patterns"]))
+
+
+def test_patterns_job_is_off_without_shared_output_path(monkeypatch):
+    import precompute_jobs
+
+    # 경로를 지정하지 않으면 앱 루트에 real_patterns.json을 쓰지 않음
+    monkeypatch.delenv("PrecomputePatternsPath", raising=False)
+    assert precompute_jobs.precompute_pipeline.run(["real_patterns"], dry_run=True) == {
+        "real_patterns": {"status": "disabled"}
+    }
+
+    monkeypatch.setenv("PrecomputePatternsPath", "/mounts/precompute/real_patterns.json")
+    record = precompute_jobs.precompute_pipeline.run(["real_patterns"], dry_run=True)["real_patterns"]
+    assert record["status"] != "disabled"
@@ -0,0 +1,83 @@
+"""
+레이트 리미터 429 처리 - redis 모드에서는 공유 일시 중지 키로 모든 워커가 함께 대기, 느린 배포의 대기 예산은 0 미만으로 내려가지 않음
+"""
+import pytest
+from services import rate_limiter as rate_limiter_module
+from services.rate_limiter import RateLimiter, RateLimitExceededError
+
+
+class FakeRedis:
+    """일시 중지 키만 흉내 내는 가짜 Redis (예약 스크립트는 남은 일시 중지 시간을 대기 시간으로 돌려줌)"""
+
+    def __init__(self):
+        self.now_ms = 0
+        self.paused_until = {}
+
+    def register_script(self, script):
+        if script == rate_limiter_module._THROTTLE_SCRIPT:
+            return self.throttle
+        return self.reserve
+
+    def throttle(self, keys, args):
+        self.paused_until[keys[0]] = max(self.paused_until.get(keys[0], 0), self.now_ms + args[0])
+        return self.paused_until[keys[0]]
+
+    def reserve(self, keys, args):
+        wait = max(0, self.paused_until.get(keys[0], 0) - self.now_ms)
+        return [0 if wait > args[0] else 1, wait]
+
+
+def redis_worker(monkeypatch, redis):
+    """같은 Redis를 보는 워커 하나"""
+    import redis as redis_package
+    monkeypatch.setattr(redis_package.Redis, "from_url", classmethod(lambda cls, url, **kwargs: redis))
+    limiter = RateLimiter("redis", "redis://fake")
+    limiter.configure("gpt", 600, 0)
+    return limiter
+
+
+def test_throttle_in_one_worker_pauses_other_workers(monkeypatch):
+    redis = FakeRedis()
+    first, second = redis_worker(monkeypatch, redis), redis_worker(monkeypatch, redis)
+
+    first.on_throttled("gpt", 3.0)
+
+    assert redis.paused_until == {"llm-tutor:ratelimit:gpt:paused": 3000}
+    # 다른 워커의 로컬 버킷은 그대로지만 공유 일시 중지 때문에 예산 안에서 허용되지 않음
+    with pytest.raises(RateLimitExceededError) as error:
+        second.acquire("gpt", 100, max_wait=1.0)
+    assert error.value.retry_after == 3.0
+
+
+def test_local_mode_drains_local_buckets():
+    limiter = RateLimiter("local")
+    limiter.configure("gpt", 600, 0)
+
+    limiter.on_throttled("gpt", 3.0)
+
+    with pytest.raises(RateLimitExceededError):
+        limiter.acquire("gpt", 100, max_wait=1.0)
+
+
+def test_slow_deployment_is_not_shed_when_bucket_has_room(monkeypatch):
+    from services import llm_service as llm_service_module
+    from services.deployment_router import Deployment
+
+    class FakeClient:
+        """요청이 실제로 전송되면 ConnectionError"""
+
+        def __getattr__(self, name):
+            return self
+
+        def create(self, **kwargs):
+            raise ConnectionError("sent")
+
+    limiter = RateLimiter("local")
+    limiter.configure("slow", 600, 0)
+    monkeypatch.setattr(llm_service_module, "rate_limiter", limiter)
+    deployment = Deployment("slow", "http://x", "key", "gpt", ewma_latency=5.0, client=FakeClient())
+
+    # 평균 지연이 남은 타임아웃보다 길어도 대기 없이 보낼 수 있으면 레이트 리미터가 거절하지 않음
+    with pytest.raises(ConnectionError):
+        llm_service_module.LLMService()._send(deployment, [{"role": "user", "content": "x"}], {}, timeout=2.0)
+    assert limiter.stats["shed"] == 0
@@ -0,0 +1,79 @@
+"""
+시맨틱 캐시 - 로컬 인덱스의 최대 개수 제거와 TTL 만료, 말투만 다른 질문의 적중
+"""
+import time
+import numpy as np
+from services.semantic_cache import CacheEntry, HashingEmbedder, NumpyVectorIndex, SemanticCache
+
+
+def unit_vector(index: int, dimensions: int = 4) -> np.ndarray:
+    vector = np.zeros(dimensions, dtype=np.float32)
+    vector[index] = 1.0
+    return vector
+
+
+def test_index_evicts_oldest_entry_across_namespaces():
+    index = NumpyVectorIndex(max_entries=2)
+    first, second, third = (CacheEntry(f"q{i}", f"a{i}", time.time()) for i in range(3))
+
+    index.add("hint-a", unit_vector(0), first)
+    index.add("hint-b", unit_vector(1), second)
+    index.add("hint-a", unit_vector(2), third)
+
+    assert len(index) == 2
+    # hint-a에서 가장 오래된 항목이 빠져도 남은 행과 항목이 어긋나지 않아야 함
+    assert index.search("hint-a", unit_vector(0)) == (0.0, third)
+    assert index.search("hint-a", unit_vector(2)) == (1.0, third)
+    assert index.search("hint-b", unit_vector(1)) == (1.0, second)
+
+
+def test_index_drops_expired_entries_on_search():
+    index = NumpyVectorIndex(ttl_seconds=60)
+    index.add("hint", unit_vector(0), CacheEntry("old", "오래된 답", time.time() - 120))
+    fresh = CacheEntry("new", "새 답", time.time())
+    index.add("hint", unit_vector(1), fresh)
+
+    assert index.search("hint", unit_vector(0)) == (0.0, fresh)
+    assert len(index) == 1
+
+    index.add("other", unit_vector(0), CacheEntry("old", "오래된 답", time.time() - 120))
+    assert index.search("other", unit_vector(0)) is None
+    assert len(index) == 1
+
+
+def make_cache(ttl_seconds: float = 86400) -> SemanticCache:
+    return SemanticCache(["concept"], 0.9, NumpyVectorIndex(ttl_seconds=ttl_seconds), HashingEmbedder(), 0.0)
+
+
+def test_paraphrased_question_hits_within_same_scope():
+    cache = make_cache()
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return f"답변 {len(calls)}"
+
+    assert cache.get_or_generate("concept", "이차방정식", "이차방정식이 뭐야?", generate) == "답변 1"
+    assert cache.get_or_generate("concept", "이차방정식", "이차방정식 뜻 알려줘!", generate) == "답변 1"
+    # 맥락이 다르면 같은 질문이라도 다시 생성
+    assert cache.get_or_generate("concept", "일차함수", "이차방정식이 뭐야?", generate) == "답변 2"
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["stored"]) == (1, 2, 2)
+
+
+def test_expired_answer_is_regenerated():
+    cache = make_cache(ttl_seconds=0)
+    answers = iter(["첫 답변", "새 답변"])
+
+    assert cache.get_or_generate("concept", "", "피타고라스 정리 설명해줘", lambda: next(answers)) == "첫 답변"
+    time.sleep(0.01)
+    assert cache.get_or_generate("concept", "", "피타고라스 정리 설명해줘", lambda: next(answers)) == "새 답변"
+
+
+def test_short_or_disabled_questions_skip_cache():
+    cache = make_cache()
+
+    assert cache.get_or_generate("concept", "", "왜요?", lambda: "a") == "a"
+    assert cache.get_or_generate("hint", "", "이차방정식이 뭐야?", lambda: "b") == "b"
+    assert cache.get_stats()["skipped"] == 1
+    assert len(cache.index) == 0
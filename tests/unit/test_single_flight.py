@@ -0,0 +1,128 @@
+"""
+single-flight - 같은 키 동시 호출은 한 번만 실행, 리더 실패는 대기 중인 호출자에게 전달
+"""
+import time
+import threading
+import pytest
+from services.single_flight import SingleFlight
+
+
+def start_follower(flight, key, results):
+    """리더가 진행 중일 때 같은 키로 들어온 호출 (대기자로 등록될 때까지 기다림)"""
+    def follow():
+        try:
+            results.append(flight.do(key, lambda: pytest.fail("follower must not call fn"), timeout=5))
+        except Exception as e:
+            results.append(e)
+
+    thread = threading.Thread(target=follow)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while flight._calls[key].waiters < 1:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    return thread
+
+
+def test_followers_share_leader_result():
+    flight = SingleFlight(["hint"])
+    release = threading.Event()
+    results = []
+
+    def leader():
+        release.wait(5)
+        return "힌트"
+
+    leader_thread = threading.Thread(target=lambda: results.append(flight.do("k", leader, timeout=5)))
+    leader_thread.start()
+    while "k" not in flight._calls:
+        time.sleep(0.001)
+    follower = start_follower(flight, "k", results)
+    release.set()
+    leader_thread.join()
+    follower.join()
+
+    assert results == ["힌트", "힌트"]
+    assert flight.get_stats()["leader_calls"] == 1
+    assert flight.get_stats()["saved_calls"] == 1
+
+
+def test_leader_failure_propagates_to_followers_and_is_not_cached():
+    flight = SingleFlight(["hint"])
+    release = threading.Event()
+    error = RuntimeError("upstream 500")
+    results = []
+
+    def failing_leader():
+        release.wait(5)
+        raise error
+
+    def lead():
+        try:
+            flight.do("k", failing_leader, timeout=5)
+        except RuntimeError as e:
+            results.append(e)
+
+    leader_thread = threading.Thread(target=lead)
+    leader_thread.start()
+    while "k" not in flight._calls:
+        time.sleep(0.001)
+    follower = start_follower(flight, "k", results)
+    release.set()
+    leader_thread.join()
+    follower.join()
+
+    assert results == [error, error]
+    # 실패한 호출은 남지 않으므로 다음 호출은 다시 실행
+    assert flight.do("k", lambda: "재시도 성공") == "재시도 성공"
+
+
+def test_follower_times_out_while_leader_is_slow():
+    flight = SingleFlight(["hint"])
+    release = threading.Event()
+    leader_thread = threading.Thread(target=lambda: flight.do("k", lambda: release.wait(5) and "늦은 결과"))
+    leader_thread.start()
+    while "k" not in flight._calls:
+        time.sleep(0.001)
+
+    with pytest.raises(TimeoutError):
+        flight.do("k", lambda: "unused", timeout=0.01)
+    release.set()
+    leader_thread.join()
+
+
+class FakeRedis:
+    """락·결과 키만 쓰는 가짜 Redis"""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, nx=False, px=None, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value if isinstance(value, bytes) else value.encode("utf-8")
+        return True
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+def raise_upstream_error():
+    raise RuntimeError("upstream 500")
+
+
+def test_redis_leader_failure_releases_lock_for_other_workers():
+    redis = FakeRedis()
+    first, second = SingleFlight(["hint"], "redis"), SingleFlight(["hint"], "redis")
+    first._redis = second._redis = redis
+
+    with pytest.raises(RuntimeError):
+        first.do("k", raise_upstream_error, timeout=1)
+
+    # 실패한 리더의 락과 결과가 남아 있지 않아야 다른 워커가 기다리지 않고 직접 호출
+    assert redis.values == {}
+    assert second.do("k", lambda: "직접 호출", timeout=1) == "직접 호출"
+    assert first.do("k", lambda: pytest.fail("result must be shared"), timeout=1) == "직접 호출"
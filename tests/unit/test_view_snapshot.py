@@ -0,0 +1,78 @@
+"""
+뷰 스냅샷 내보내기 - fetchmany 청크마다 컬럼을 쌓고, NULL is_correct는 None으로 되돌림
+"""
+from contextlib import contextmanager
+from database.view_snapshot import ViewSnapshot, export_view_snapshot
+
+ROWS = [
+    ("A002", "S1", 1, "ITEM-9", "이차방정식", 0, 0.25, 0.5, -0.25),
+    ("A001", "S2", 2, "ITEM-3", "일차방정식", None, None, 0.6, None),
+    ("A001", "S1", 2, "ITEM-2", "일차방정식", 1, 0.75, 0.6, 0.15),
+    ("A001", "S2", 1, "ITEM-1", "연립방정식", 1, 0.5, 0.4, 0.1),
+    ("A001", "S1", 1, "ITEM-1", "연립방정식", 0, 0.5, 0.4, 0.1),
+]
+
+
+class FakeCursor:
+    """fetchmany 청크 크기를 기록하는 가짜 커서"""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.arraysize = 1
+        self.batches = []
+
+    def execute(self, query):
+        self.query = query
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        self.batches.append(len(batch))
+        return batch
+
+
+class FakeDatabase:
+    """커서 하나를 돌려주는 가짜 DatabaseService"""
+
+    def __init__(self, rows):
+        self.fake_cursor = FakeCursor(rows)
+
+    @contextmanager
+    def get_connection(self):
+        yield self
+
+    def cursor(self):
+        return self.fake_cursor
+
+
+def export(tmp_path, rows, batch_size=2):
+    db = FakeDatabase(rows)
+    export_view_snapshot(str(tmp_path), db, batch_size=batch_size)
+    return db.fake_cursor, ViewSnapshot(str(tmp_path), check_interval=0)
+
+
+def test_export_reads_in_chunks_and_keeps_session_order(tmp_path):
+    cursor, snapshot = export(tmp_path, ROWS)
+
+    assert cursor.batches == [2, 2, 1, 0]
+    assert snapshot.get_session_results("A001", "S1") == [
+        (1, "ITEM-1", "연립방정식", 0, 0.5, 0.4, 0.1),
+        (2, "ITEM-2", "일차방정식", 1, 0.75, 0.6, 0.15),
+    ]
+    assert snapshot.get_session_results("A002", "S1") == [(1, "ITEM-9", "이차방정식", 0, 0.25, 0.5, -0.25)]
+    assert snapshot.get_assessment_item_id("A001", "S2", 2) == "ITEM-3"
+
+
+def test_null_is_correct_round_trips_as_none(tmp_path):
+    _, snapshot = export(tmp_path, ROWS)
+
+    # NULL 정답 여부가 0(오답)으로 바뀌면 안 됨
+    assert snapshot.get_session_results("A001", "S2") == [
+        (1, "ITEM-1", "연립방정식", 1, 0.5, 0.4, 0.1),
+        (2, "ITEM-3", "일차방정식", None, None, 0.6, None),
+    ]
+
+
+def test_empty_view_exports_empty_snapshot(tmp_path):
+    _, snapshot = export(tmp_path, [])
+
+    assert snapshot.get_session_results("A001", "S1") is None
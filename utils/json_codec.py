@@ -0,0 +1,98 @@
+import gzip
+import json
+import logging
+from decimal import Decimal
+from typing import Any, Optional, Tuple, Union
+
+# 빠른 JSON 백엔드 (설치되어 있으면 사용, 없으면 표준 json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# brotli 압축 (설치되어 있으면 br 협상)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _default(value: Any) -> Any:
+    """표준 타입이 아닌 값 변환 (DB Decimal, numpy 스칼라/배열 등)"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    """UTF-8 JSON 바이트로 직렬화 (한글은 이스케이프하지 않음, 중간 str을 만들지 않음)"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """JSON 바이트/문자열 파싱 (잘못된 JSON은 ValueError)"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}") from e
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def parse_request_json(req) -> Any:
+    """func.HttpRequest 바디를 빠른 백엔드로 파싱 (req.get_json()과 같이 비어 있거나 잘못되면 ValueError)"""
+    body = req.get_body()
+    if not body:
+        raise ValueError("HTTP request does not contain valid JSON data")
+    return loads(body)
+
+
+def _accepted_encodings(accept_encoding: str) -> dict:
+    """Accept-Encoding 헤더 → {인코딩: q값}"""
+    encodings = {}
+    for part in (accept_encoding or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name.strip()] = quality
+    return encodings
+
+
+def compress(body: bytes, accept_encoding: Optional[str], min_bytes: int) -> Tuple[bytes, Optional[str]]:
+    """클라이언트가 받는 인코딩으로 압축 → (바디, Content-Encoding 또는 None)
+
+    작은 응답은 압축 오버헤드가 더 커서 그대로 보냅니다. br을 우선하고, brotli가 없으면 gzip을 씁니다.
+    """
+    if not accept_encoding or min_bytes <= 0 or len(body) < min_bytes:
+        return body, None
+
+    encodings = _accepted_encodings(accept_encoding)
+    wildcard = encodings.get("*", 0.0)
+    try:
+        if brotli is not None and encodings.get("br", wildcard) > 0:
+            return brotli.compress(body, quality=BROTLI_QUALITY), "br"
+        if encodings.get("gzip", wildcard) > 0:
+            return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), "gzip"
+    except Exception as e:
+        logging.warning(f"Response compression failed, sending uncompressed: {e}")
+    return body, None
@@ -0,0 +1,339 @@
+import re
+import json
+import bisect
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# LLM이 JSON 문자열 안에 백슬래시 하나로 쓰는 LaTeX 명령 중 JSON 이스케이프(\b \f \n \r \t)와 겹치는 것
+# (예: "\frac"은 JSON으로는 폼피드 + "rac"이지만 수학 문제 출력에서는 거의 항상 LaTeX)
+LATEX_COMMANDS = frozenset({
+    "frac", "dfrac", "tfrac", "times", "theta", "tan", "tanh", "text", "textbf", "textit", "tau", "top",
+    "therefore", "triangle", "tilde", "to", "beta", "bar", "binom", "boxed", "bot", "bigcirc", "because",
+    "big", "Big", "bigg", "begin", "backslash", "rho", "right", "rightarrow", "Rightarrow", "rangle", "rceil",
+    "rfloor", "neq", "ne", "nu", "nabla", "not", "ni", "notin", "newline", "nearrow", "forall", "frown", "flat",
+    "textrm",
+})
+
+# 문자열 안에서 특수 처리가 필요 없는 문자 묶음 (정규식으로 한 번에 건너뜀)
+_PLAIN_STRING = re.compile(r'[^"\\\x00-\x1f]+')
+_LETTERS = re.compile(r'[A-Za-z]+')
+_NUMBER = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?')
+_WHITESPACE = re.compile(r'\s*')
+_CODE_FENCE = re.compile(r'```(?:json|JSON)?\s*')
+
+# 백슬래시 하나 + b/f/n/r/t + 글자 (\frac 등 LaTeX일 수 있어 표준 디코더에 맡기면 안 되는 경우)
+_AMBIGUOUS_ESCAPE = re.compile(r'(?<!\\)(?:\\\\)*\\[bfnrt][A-Za-z]')
+_DECODER = json.JSONDecoder(strict=False)
+
+_SIMPLE_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+_LITERALS = {"true": True, "false": False, "null": None, "True": True, "False": False, "None": None}
+
+# 닫는 따옴표 뒤에 올 수 있는 문자 (그 외에는 SVG 속성 등의 이스케이프 안 된 따옴표로 봄)
+_AFTER_STRING = frozenset(',:}]')
+
+
+@dataclass
+class JsonIssue:
+    """파싱 중 고친 부분 또는 실패 위치 (position은 원문 기준 문자 오프셋)"""
+    position: int
+    line: int
+    column: int
+    message: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"position": self.position, "line": self.line, "column": self.column, "message": self.message}
+
+
+@dataclass
+class JsonParseResult:
+    """관대한 파싱 결과"""
+    value: Any
+    repairs: List[JsonIssue] = field(default_factory=list)
+    truncated: bool = False
+
+    @property
+    def repaired(self) -> bool:
+        return bool(self.repairs)
+
+
+class LLMJsonError(ValueError):
+    """복구할 수 없는 JSON 오류 (issue에 위치 정보)"""
+
+    def __init__(self, issue: JsonIssue):
+        self.issue = issue
+        super().__init__(f"{issue.message} (line {issue.line}, column {issue.column}, position {issue.position})")
+
+
+class _Truncated(Exception):
+    """입력이 값 중간에서 끝남 (value: 그때까지 만든 바깥 컨테이너)"""
+
+    def __init__(self, value: Any = None):
+        self.value = value
+
+
+class _TolerantParser:
+    """LLM 출력용 한 번 훑기 JSON 파서
+
+    - LaTeX 백슬래시: 유효하지 않은 이스케이프(\\( \\sqrt 등)와 LaTeX 명령으로 보이는 \\frac·\\times 등은 글자 그대로 유지
+    - 이스케이프 안 된 따옴표: 뒤에 , : } ] 가 오지 않으면 문자열의 일부로 봄 (SVG 속성)
+    - 문자열 안 줄바꿈, 끝의 쉼표, Python 리터럴(True/None) 허용
+    - 입력이 중간에 끊기면 열린 문자열·배열·객체를 닫고 끊긴 값은 버림
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.length = len(text)
+        self.repairs: List[JsonIssue] = []
+        self._line_starts: Optional[List[int]] = None
+
+    def issue(self, position: int, message: str) -> JsonIssue:
+        """오프셋 → 줄/열 계산 (오류가 있을 때만 줄 위치 색인)"""
+        if self._line_starts is None:
+            self._line_starts = [0] + [m.end() for m in re.finditer("\n", self.text)]
+        line = bisect.bisect_right(self._line_starts, position)
+        return JsonIssue(position, line, position - self._line_starts[line - 1] + 1, message)
+
+    def repair(self, position: int, message: str):
+        self.repairs.append(self.issue(position, message))
+
+    def fail(self, position: int, message: str):
+        raise LLMJsonError(self.issue(position, message))
+
+    def skip_whitespace(self, index: int) -> int:
+        return _WHITESPACE.match(self.text, index).end()
+
+    def parse(self, start: int) -> Tuple[Any, bool]:
+        """start 위치의 값 하나 파싱 → (값, 잘림 여부)"""
+        try:
+            value, _ = self.parse_value(start)
+            return value, False
+        except _Truncated as e:
+            return e.value, True
+
+    def parse_value(self, index: int) -> Tuple[Any, int]:
+        index = self.skip_whitespace(index)
+        if index >= self.length:
+            raise _Truncated()
+        char = self.text[index]
+        if char == "{":
+            return self.parse_object(index + 1)
+        if char == "[":
+            return self.parse_array(index + 1)
+        if char == '"':
+            return self.parse_string(index + 1)
+
+        match = _NUMBER.match(self.text, index)
+        if match:
+            end = match.end()
+            if end >= self.length:
+                raise _Truncated()
+            number = match.group()
+            return (float(number) if any(c in number for c in ".eE") else int(number)), end
+
+        match = _LETTERS.match(self.text, index)
+        if match and match.group() in _LITERALS:
+            return _LITERALS[match.group()], match.end()
+        if match and any(literal.startswith(match.group()) for literal in _LITERALS) and match.end() >= self.length:
+            raise _Truncated()
+        self.fail(index, f"Unexpected character {char!r}")
+
+    def parse_object(self, index: int) -> Tuple[Dict[str, Any], int]:
+        result: Dict[str, Any] = {}
+        pending_key: Optional[str] = None
+        try:
+            while True:
+                index = self.skip_whitespace(index)
+                if index >= self.length:
+                    raise _Truncated()
+                char = self.text[index]
+                if char == "}":
+                    return result, index + 1
+                if char == ",":
+                    # 끝의 쉼표 / 연속 쉼표
+                    self.repair(index, "Extra comma in object")
+                    index += 1
+                    continue
+                if char != '"':
+                    self.fail(index, f"Expected object key, got {char!r}")
+
+                pending_key, index = self.parse_string(index + 1)
+                index = self.skip_whitespace(index)
+                if index >= self.length:
+                    raise _Truncated()
+                if self.text[index] != ":":
+                    self.fail(index, f"Expected ':' after key {pending_key!r}")
+                value, index = self.parse_value(index + 1)
+                result[pending_key] = value
+                pending_key = None
+
+                index = self.skip_whitespace(index)
+                if index >= self.length:
+                    raise _Truncated()
+                char = self.text[index]
+                if char == ",":
+                    index += 1
+                elif char == '"':
+                    self.repair(index, "Missing comma between object members")
+                elif char != "}":
+                    self.fail(index, f"Expected ',' or '}}', got {char!r}")
+        except _Truncated as e:
+            # 끊긴 멤버 중 객체/배열 값은 살리고, 끊긴 문자열·숫자는 버림 (잘린 정답 방지)
+            if pending_key is not None and e.value:
+                result[pending_key] = e.value
+            raise _Truncated(result)
+
+    def parse_array(self, index: int) -> Tuple[List[Any], int]:
+        result: List[Any] = []
+        try:
+            while True:
+                index = self.skip_whitespace(index)
+                if index >= self.length:
+                    raise _Truncated()
+                char = self.text[index]
+                if char == "]":
+                    return result, index + 1
+                if char == ",":
+                    self.repair(index, "Extra comma in array")
+                    index += 1
+                    continue
+
+                value, index = self.parse_value(index)
+                result.append(value)
+
+                index = self.skip_whitespace(index)
+                if index >= self.length:
+                    raise _Truncated()
+                char = self.text[index]
+                if char == ",":
+                    index += 1
+                elif char in '{["':
+                    self.repair(index, "Missing comma between array items")
+                elif char != "]":
+                    self.fail(index, f"Expected ',' or ']', got {char!r}")
+        except _Truncated as e:
+            if e.value:
+                result.append(e.value)
+            raise _Truncated(result)
+
+    def parse_string(self, index: int) -> Tuple[str, int]:
+        text = self.text
+        parts: List[str] = []
+        unescaped_quote: Optional[int] = None
+        while True:
+            match = _PLAIN_STRING.match(text, index)
+            if match:
+                parts.append(match.group())
+                index = match.end()
+            if index >= self.length:
+                raise _Truncated()
+
+            char = text[index]
+            if char == '"':
+                if self._closes_string(index):
+                    if unescaped_quote is not None:
+                        self.repair(unescaped_quote, "Unescaped quotes inside string")
+                    return "".join(parts), index + 1
+                # 문자열 안의 이스케이프 안 된 따옴표 (예: <svg width="400">)
+                if unescaped_quote is None:
+                    unescaped_quote = index
+                parts.append('"')
+                index += 1
+            elif char == "\\":
+                index = self.parse_escape(index, parts)
+            else:
+                # 문자열 안의 줄바꿈/제어 문자는 그대로 유지
+                parts.append(char)
+                index += 1
+
+    def _closes_string(self, index: int) -> bool:
+        """index의 따옴표가 문자열 끝인지 (뒤에 , : } ] 또는 다음 줄의 새 키/항목이 오면 끝)"""
+        text = self.text
+        following = text[index + 1:index + 2]
+        if not following or following in _AFTER_STRING:
+            return True
+        if not following.isspace():
+            return False
+        after = self.skip_whitespace(index + 1)
+        if after >= self.length or text[after] in _AFTER_STRING:
+            return True
+        # 쉼표가 빠진 채 다음 줄이 새 키/항목으로 시작 (상위에서 기록)
+        return text[after] == '"' and "\n" in text[index + 1:after]
+
+    def parse_escape(self, index: int, parts: List[str]) -> int:
+        """백슬래시 처리 → 다음 위치"""
+        text = self.text
+        if index + 1 >= self.length:
+            raise _Truncated()
+        char = text[index + 1]
+
+        if char in "bfnrt":
+            # \frac, \times처럼 뒤 글자까지 LaTeX 명령이면 백슬래시 유지
+            if _LETTERS.match(text, index + 1).group() in LATEX_COMMANDS:
+                parts.append("\\")
+                return index + 1
+            parts.append(_SIMPLE_ESCAPES[char])
+            return index + 2
+        if char in _SIMPLE_ESCAPES:
+            parts.append(_SIMPLE_ESCAPES[char])
+            return index + 2
+        if char == "u":
+            digits = text[index + 2:index + 6]
+            if index + 6 > self.length:
+                raise _Truncated()
+            try:
+                code = int(digits, 16)
+            except ValueError:
+                parts.append("\\")
+                return index + 1
+            # 서로게이트 쌍 결합
+            if 0xD800 <= code < 0xDC00 and text[index + 6:index + 8] == "\\u":
+                try:
+                    low = int(text[index + 8:index + 12], 16)
+                    if 0xDC00 <= low < 0xE000:
+                        parts.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                        return index + 12
+                except ValueError:
+                    pass
+            parts.append(chr(code))
+            return index + 6
+
+        # JSON에서 유효하지 않은 이스케이프 (\( \sqrt \le \{ ...) → LaTeX로 보고 백슬래시 유지
+        parts.append("\\")
+        return index + 1
+
+
+def find_json_start(text: str) -> int:
+    """코드 블록·설명 문장 뒤의 첫 JSON 시작 위치 ({ 또는 [, 없으면 -1)"""
+    fence = _CODE_FENCE.search(text)
+    offset = fence.end() if fence else 0
+    positions = [p for p in (text.find("{", offset), text.find("[", offset)) if p != -1]
+    if not positions and offset:
+        positions = [p for p in (text.find("{"), text.find("[")) if p != -1]
+    return min(positions) if positions else -1
+
+
+def parse_llm_json(text: str) -> JsonParseResult:
+    """LLM 응답에서 JSON 값 하나를 한 번에 파싱 (고친 부분·잘림 여부 포함, 실패 시 LLMJsonError)"""
+    parser = _TolerantParser(text)
+    start = find_json_start(text)
+    if start == -1:
+        raise LLMJsonError(parser.issue(0, "No JSON object or array found"))
+
+    # 빠른 경로: 모호한 이스케이프가 없는 올바른 JSON은 C 디코더로 (결과는 관대한 파서와 같음)
+    if not _AMBIGUOUS_ESCAPE.search(text, start):
+        try:
+            return JsonParseResult(_DECODER.raw_decode(text, start)[0])
+        except json.JSONDecodeError:
+            pass
+
+    value, truncated = parser.parse(start)
+    if truncated:
+        if value is None:
+            raise LLMJsonError(parser.issue(parser.length, "Output truncated before any value was complete"))
+        parser.repair(parser.length, "Output truncated; closed open containers")
+    return JsonParseResult(value, parser.repairs, truncated)
+
+
+def loads_llm_json(text: str) -> Any:
+    """parse_llm_json의 값만 반환"""
+    return parse_llm_json(text).value
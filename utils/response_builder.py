@@ -1,37 +1,56 @@
-import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import azure.functions as func
+from config.settings import settings
+from utils import json_codec
 
 
 class ResponseBuilder:
     """HTTP 응답 생성 유틸리티"""
 
+    @staticmethod
+    def build_json_response(payload: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None,
+                            accept_encoding: Optional[str] = None) -> func.HttpResponse:
+        """JSON 바이트로 바로 직렬화하고, 클라이언트가 받으면 압축해서 응답"""
+        return ResponseBuilder.build_bytes_response(json_codec.dumps(payload), status_code, headers, accept_encoding)
+
+    @staticmethod
+    def build_bytes_response(body: bytes, status_code: int = 200, headers: Optional[Dict[str, str]] = None,
+                             accept_encoding: Optional[str] = None) -> func.HttpResponse:
+        """이미 직렬화된 JSON 바이트 응답 (Idempotency-Key 재전송 등)"""
+        body, encoding = json_codec.compress(body, accept_encoding, settings.response_compression_min_bytes)
+        headers = dict(headers or {})
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        if accept_encoding is not None:
+            headers["Vary"] = "Accept-Encoding"
+
+        return func.HttpResponse(
+            body,
+            mimetype="application/json",
+            charset="utf-8",
+            status_code=status_code,
+            headers=headers or None
+        )
+
     @staticmethod
     def build_success_response(data: Dict[str, Any], conversation_history: List[Dict[str, str]],
-                             student_message: str) -> func.HttpResponse:
+                             student_message: str, accept_encoding: Optional[str] = None,
+                             headers: Optional[Dict[str, str]] = None) -> func.HttpResponse:
         """성공 응답 생성"""
         # conversation_history 업데이트
         conversation_history.append({"role": "user", "content": student_message})
         conversation_history.append({"role": "assistant", "content": data.get("feedback", "")})
 
-        # 최종 응답 데이터 구성
-        final_response_data = data.copy()
-        final_response_data["conversation_history"] = conversation_history
+        # 핸들러 결과는 요청마다 새로 만들어지므로 복사하지 않고 그대로 채워서 직렬화
+        data["conversation_history"] = conversation_history
 
-        return func.HttpResponse(
-            json.dumps(final_response_data, ensure_ascii=False),
-            mimetype="application/json",
-            status_code=200
-        )
+        return ResponseBuilder.build_json_response(data, 200, headers, accept_encoding)
 
     @staticmethod
-    def build_error_response(message: str, status_code: int = 400) -> func.HttpResponse:
+    def build_error_response(message: str, status_code: int = 400,
+                             headers: Optional[Dict[str, str]] = None) -> func.HttpResponse:
         """에러 응답 생성"""
-        return func.HttpResponse(
-            json.dumps({"error": message}, ensure_ascii=False),
-            mimetype="application/json",
-            status_code=status_code
-        )
+        return ResponseBuilder.build_json_response({"error": message}, status_code, headers)
 
     @staticmethod
     def build_validation_error_response(missing_fields: List[str]) -> func.HttpResponse:
@@ -42,4 +61,4 @@ class ResponseBuilder:
     @staticmethod
     def build_internal_error_response(error: Exception) -> func.HttpResponse:
         """내부 서버 에러 응답 생성"""
-        return ResponseBuilder.build_error_response(str(error), 500)
\ No newline at end of file
+        return ResponseBuilder.build_error_response(str(error), 500)
@@ -0,0 +1,473 @@
+import re
+import math
+from html import escape
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# note.py 태블릿 최적화 SVG 사양
+VIEW_WIDTH = 400
+VIEW_HEIGHT = 300
+PADDING = 40
+STROKE = "#000"
+STROKE_WIDTH = 2
+FILL = "#f0f0f0"
+GRID = "#cccccc"
+FONT_FAMILY = "Arial"
+FONT_SIZE = 16
+
+# 도형 꼭짓점 라벨을 도형 바깥쪽으로 띄우는 거리 / 변 길이 라벨 거리 / 각 라벨 거리 (px)
+VERTEX_LABEL_OFFSET = 16
+SIDE_LABEL_OFFSET = 14
+ANGLE_LABEL_OFFSET = 30
+
+# 좌표평면 곡선 샘플 수
+CURVE_SAMPLES = 120
+
+Point = Tuple[float, float]
+
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+
+
+class FigureSpecError(ValueError):
+    """그림 명세 오류"""
+
+
+def _number(value: Any) -> Optional[float]:
+    """'5cm', '6', 4.5 → 숫자 (없으면 None)"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    match = _NUMBER.search(str(value)) if value is not None else None
+    return float(match.group()) if match else None
+
+
+def _fmt(value: float) -> str:
+    """SVG 좌표 문자열 (소수 첫째 자리, 결정적 출력)"""
+    value = round(value, 1)
+    return f"{value:g}" if value != 0 else "0"
+
+
+def _unit(dx: float, dy: float) -> Point:
+    length = math.hypot(dx, dy)
+    return (dx / length, dy / length) if length else (0.0, -1.0)
+
+
+class _Canvas:
+    """viewBox 좌표계에 요소를 쌓아 SVG 문자열로 만드는 도우미"""
+
+    def __init__(self):
+        self.elements: List[str] = []
+
+    def line(self, p: Point, q: Point, color: str = STROKE, width: float = STROKE_WIDTH, dashed: bool = False):
+        dash = ' stroke-dasharray="6,4"' if dashed else ""
+        self.elements.append(f'<line x1="{_fmt(p[0])}" y1="{_fmt(p[1])}" x2="{_fmt(q[0])}" y2="{_fmt(q[1])}" '
+                             f'stroke="{color}" stroke-width="{width}"{dash}/>')
+
+    def polygon(self, points: Sequence[Point], fill: str = FILL):
+        coords = " ".join(f"{_fmt(x)},{_fmt(y)}" for x, y in points)
+        self.elements.append(f'<polygon points="{coords}" stroke="{STROKE}" stroke-width="{STROKE_WIDTH}" fill="{fill}"/>')
+
+    def polyline(self, points: Sequence[Point]):
+        coords = " ".join(f"{_fmt(x)},{_fmt(y)}" for x, y in points)
+        self.elements.append(f'<polyline points="{coords}" stroke="{STROKE}" stroke-width="{STROKE_WIDTH}" fill="none"/>')
+
+    def circle(self, center: Point, radius: float, fill: str = FILL):
+        self.elements.append(f'<circle cx="{_fmt(center[0])}" cy="{_fmt(center[1])}" r="{_fmt(radius)}" '
+                             f'stroke="{STROKE}" stroke-width="{STROKE_WIDTH}" fill="{fill}"/>')
+
+    def dot(self, center: Point, radius: float = 4):
+        self.elements.append(f'<circle cx="{_fmt(center[0])}" cy="{_fmt(center[1])}" r="{_fmt(radius)}" fill="{STROKE}"/>')
+
+    def rect(self, x: float, y: float, width: float, height: float, fill: str = FILL):
+        self.elements.append(f'<rect x="{_fmt(x)}" y="{_fmt(y)}" width="{_fmt(width)}" height="{_fmt(height)}" '
+                             f'stroke="{STROKE}" stroke-width="{STROKE_WIDTH}" fill="{fill}"/>')
+
+    def text(self, position: Point, label: Any, size: int = FONT_SIZE, anchor: str = "middle"):
+        # 글자 세로 중앙 보정 (dominant-baseline은 일부 태블릿 브라우저에서 무시됨)
+        self.elements.append(f'<text x="{_fmt(position[0])}" y="{_fmt(position[1] + size * 0.35)}" '
+                             f'font-family="{FONT_FAMILY}" font-size="{size}" text-anchor="{anchor}">{escape(str(label))}</text>')
+
+    def to_svg(self) -> str:
+        return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {VIEW_WIDTH} {VIEW_HEIGHT}" width="100%" height="auto">'
+                + "".join(self.elements) + "</svg>")
+
+
+def _fit(points: Sequence[Point], padding: float = PADDING) -> Callable[[Point], Point]:
+    """수학 좌표(y 위쪽)를 같은 배율로 viewBox 가운데에 맞추는 변환"""
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    width = max(xs) - min(xs) or 1.0
+    height = max(ys) - min(ys) or 1.0
+    scale = min((VIEW_WIDTH - 2 * padding) / width, (VIEW_HEIGHT - 2 * padding) / height)
+    offset_x = (VIEW_WIDTH - width * scale) / 2 - min(xs) * scale
+    offset_y = (VIEW_HEIGHT - height * scale) / 2 + max(ys) * scale
+    return lambda p: (offset_x + p[0] * scale, offset_y - p[1] * scale)
+
+
+def _labels(spec: Dict[str, Any], default: str, count: int) -> List[str]:
+    labels = [str(label) for label in spec.get("labels") or list(default[:count])]
+    if len(labels) != count:
+        raise FigureSpecError(f"{spec.get('type')} needs {count} labels, got {len(labels)}")
+    return labels
+
+
+def _vertices_from_spec(spec: Dict[str, Any], labels: List[str]) -> Optional[List[Point]]:
+    """명세에 좌표가 있으면 사용 ({"A": [0, 0], ...})"""
+    vertices = spec.get("vertices")
+    if not vertices:
+        return None
+    try:
+        return [(float(vertices[label][0]), float(vertices[label][1])) for label in labels]
+    except (KeyError, IndexError, TypeError, ValueError):
+        raise FigureSpecError(f"vertices must give [x, y] for every label {labels}")
+
+
+def _split_side(name: str, labels: List[str]) -> Tuple[str, str]:
+    """변 이름("AB", "A'B'")을 두 꼭짓점 라벨로 나눔"""
+    for p in labels:
+        if name.startswith(p) and name[len(p):] in labels and name[len(p):] != p:
+            return p, name[len(p):]
+    raise FigureSpecError(f"Unknown side {name!r}")
+
+
+def _side_length(sides: Dict[str, Any], p: str, q: str) -> Optional[float]:
+    value = sides.get(p + q, sides.get(q + p))
+    return _number(value)
+
+
+def _draw_polygon_figure(canvas: _Canvas, screen: List[Point], labels: List[str], spec: Dict[str, Any]):
+    """다각형 + 꼭짓점/변/각 라벨"""
+    canvas.polygon(screen)
+    cx = sum(p[0] for p in screen) / len(screen)
+    cy = sum(p[1] for p in screen) / len(screen)
+    points = dict(zip(labels, screen))
+
+    for label, (x, y) in points.items():
+        ux, uy = _unit(x - cx, y - cy)
+        canvas.text((x + ux * VERTEX_LABEL_OFFSET, y + uy * VERTEX_LABEL_OFFSET), label)
+
+    for name, text in (spec.get("sides") or {}).items():
+        p, q = _split_side(name, labels)
+        (x1, y1), (x2, y2) = points[p], points[q]
+        mx, my = (x1 + x2) / 2, (y1 + y2) / 2
+        nx, ny = _unit(-(y2 - y1), x2 - x1)
+        if (mx - cx) * nx + (my - cy) * ny < 0:
+            nx, ny = -nx, -ny
+        canvas.text((mx + nx * SIDE_LABEL_OFFSET, my + ny * SIDE_LABEL_OFFSET), text)
+
+    # 각은 호를 그리지 않고 꼭짓점 안쪽에 텍스트 라벨만 표시
+    for vertex, text in (spec.get("angles") or {}).items():
+        if vertex not in points:
+            raise FigureSpecError(f"Unknown angle vertex {vertex!r}")
+        x, y = points[vertex]
+        ux, uy = _unit(cx - x, cy - y)
+        canvas.text((x + ux * ANGLE_LABEL_OFFSET, y + uy * ANGLE_LABEL_OFFSET), text, size=FONT_SIZE - 2)
+
+    right_angle = spec.get("right_angle")
+    if right_angle:
+        if right_angle not in points:
+            raise FigureSpecError(f"Unknown right angle vertex {right_angle!r}")
+        index = labels.index(right_angle)
+        vertex = screen[index]
+        a = _unit(screen[index - 1][0] - vertex[0], screen[index - 1][1] - vertex[1])
+        b = _unit(screen[(index + 1) % len(screen)][0] - vertex[0], screen[(index + 1) % len(screen)][1] - vertex[1])
+        size = 12
+        p1 = (vertex[0] + a[0] * size, vertex[1] + a[1] * size)
+        p2 = (p1[0] + b[0] * size, p1[1] + b[1] * size)
+        p3 = (vertex[0] + b[0] * size, vertex[1] + b[1] * size)
+        canvas.line(p1, p2, width=1.5)
+        canvas.line(p2, p3, width=1.5)
+
+
+def render_triangle(spec: Dict[str, Any]) -> str:
+    """삼각형: labels, sides({"AB": "5cm"}), angles({"A": "60°"}), right_angle, vertices(선택)"""
+    labels = _labels(spec, "ABC", 3)
+    a_label, b_label, c_label = labels
+    sides = spec.get("sides") or {}
+
+    vertices = _vertices_from_spec(spec, labels)
+    if vertices is None:
+        ab = _side_length(sides, a_label, b_label)
+        bc = _side_length(sides, b_label, c_label)
+        ca = _side_length(sides, c_label, a_label)
+        right_angle = spec.get("right_angle")
+
+        if ab and bc and ca:
+            # 세 변이 주어지면 실제 비율로 (A 원점, B x축 위)
+            if ab + bc <= ca or bc + ca <= ab or ca + ab <= bc:
+                raise FigureSpecError(f"Side lengths {ab}, {bc}, {ca} do not form a triangle")
+            cx = (ca ** 2 + ab ** 2 - bc ** 2) / (2 * ab)
+            vertices = [(0.0, 0.0), (ab, 0.0), (cx, math.sqrt(max(ca ** 2 - cx ** 2, 0.0)))]
+        elif right_angle in labels:
+            # 직각 꼭짓점을 왼쪽 아래에 두고 두 변 길이(없으면 4:3) 사용
+            index = labels.index(right_angle)
+            other1, other2 = labels[(index + 1) % 3], labels[(index + 2) % 3]
+            base = _side_length(sides, right_angle, other1) or 4.0
+            height = _side_length(sides, right_angle, other2) or 3.0
+            placed = {right_angle: (0.0, 0.0), other1: (base, 0.0), other2: (0.0, height)}
+            vertices = [placed[label] for label in labels]
+        else:
+            vertices = [(0.0, 0.0), (6.0, 0.0), (2.2, 4.0)]
+
+    transform = _fit(vertices)
+    canvas = _Canvas()
+    _draw_polygon_figure(canvas, [transform(p) for p in vertices], labels, spec)
+    return canvas.to_svg()
+
+
+_QUADRILATERAL_SHAPES = {
+    "square": [(0, 0), (4, 0), (4, 4), (0, 4)],
+    "rectangle": [(0, 0), (6, 0), (6, 4), (0, 4)],
+    "parallelogram": [(0, 0), (5, 0), (6.5, 3), (1.5, 3)],
+    "rhombus": [(0, 0), (4, 0), (6.4, 3.2), (2.4, 3.2)],
+    "trapezoid": [(0, 0), (6, 0), (4.5, 3), (1.5, 3)],
+    "quadrilateral": [(0, 0), (6, 0), (5, 3.5), (1, 3)]
+}
+
+
+def render_quadrilateral(spec: Dict[str, Any]) -> str:
+    """사각형: kind(square/rectangle/parallelogram/rhombus/trapezoid), labels, sides, angles, diagonals"""
+    labels = _labels(spec, "ABCD", 4)
+    kind = spec.get("kind", "quadrilateral")
+    if kind not in _QUADRILATERAL_SHAPES:
+        raise FigureSpecError(f"Unsupported quadrilateral kind {kind!r}")
+
+    vertices = _vertices_from_spec(spec, labels)
+    if vertices is None:
+        vertices = [(float(x), float(y)) for x, y in _QUADRILATERAL_SHAPES[kind]]
+        sides = spec.get("sides") or {}
+        width = _side_length(sides, labels[0], labels[1])
+        height = _side_length(sides, labels[1], labels[2])
+        if kind == "rectangle" and width and height:
+            vertices = [(0.0, 0.0), (width, 0.0), (width, height), (0.0, height)]
+
+    transform = _fit(vertices)
+    screen = [transform(p) for p in vertices]
+    canvas = _Canvas()
+    _draw_polygon_figure(canvas, screen, labels, spec)
+    if spec.get("diagonals"):
+        canvas.line(screen[0], screen[2])
+        canvas.line(screen[1], screen[3])
+    return canvas.to_svg()
+
+
+def render_circle(spec: Dict[str, Any]) -> str:
+    """원: center, points({"A": 각도(도)} 또는 ["A", "B"]), chords([["A", "B"], ["O", "A"]]), radius_label, angles"""
+    center_label = str(spec.get("center", "O"))
+    raw_points = spec.get("points") or {}
+    if isinstance(raw_points, list):
+        raw_points = {str(label): 90 + 360 * i / len(raw_points) for i, label in enumerate(raw_points)}
+
+    radius = 110.0
+    center = (VIEW_WIDTH / 2, VIEW_HEIGHT / 2)
+    points: Dict[str, Point] = {center_label: center}
+    for label, degrees in raw_points.items():
+        angle = math.radians(float(degrees))
+        points[str(label)] = (center[0] + radius * math.cos(angle), center[1] - radius * math.sin(angle))
+
+    canvas = _Canvas()
+    canvas.circle(center, radius)
+    for chord in spec.get("chords") or []:
+        if len(chord) != 2 or chord[0] not in points or chord[1] not in points:
+            raise FigureSpecError(f"Unknown chord {chord!r}")
+        canvas.line(points[chord[0]], points[chord[1]])
+
+    radius_label = spec.get("radius_label")
+    if radius_label:
+        end = points.get(spec.get("radius_to"), (center[0] + radius, center[1]))
+        canvas.line(center, end)
+        mx, my = (center[0] + end[0]) / 2, (center[1] + end[1]) / 2
+        nx, ny = _unit(-(end[1] - center[1]), end[0] - center[0])
+        canvas.text((mx + nx * SIDE_LABEL_OFFSET, my + ny * SIDE_LABEL_OFFSET), radius_label)
+
+    canvas.dot(center, 3)
+    for label, (x, y) in points.items():
+        if label == center_label:
+            canvas.text((x + 14, y + 14), label)
+        else:
+            ux, uy = _unit(x - center[0], y - center[1])
+            canvas.text((x + ux * VERTEX_LABEL_OFFSET, y + uy * VERTEX_LABEL_OFFSET), label)
+
+    for vertex, text in (spec.get("angles") or {}).items():
+        if vertex not in points:
+            raise FigureSpecError(f"Unknown angle vertex {vertex!r}")
+        x, y = points[vertex]
+        ux, uy = _unit(center[0] - x, center[1] - y)
+        canvas.text((x + ux * ANGLE_LABEL_OFFSET, y + uy * ANGLE_LABEL_OFFSET), text, size=FONT_SIZE - 2)
+    return canvas.to_svg()
+
+
+def _tick_step(span: float) -> float:
+    """눈금 간격 (눈금 10개 안팎)"""
+    raw = span / 10
+    magnitude = 10 ** math.floor(math.log10(raw)) if raw > 0 else 1
+    for step in (1, 2, 5, 10):
+        if raw <= step * magnitude:
+            return step * magnitude
+    return 10 * magnitude
+
+
+def render_coordinate_plane(spec: Dict[str, Any]) -> str:
+    """좌표평면: x_range, y_range, lines([{"slope", "intercept"} 또는 {"x": 상수}]), parabolas([{"a", "b", "c"}]), points"""
+    x_min, x_max = (float(v) for v in spec.get("x_range", [-5, 5]))
+    y_min, y_max = (float(v) for v in spec.get("y_range", [-5, 5]))
+    if x_min >= x_max or y_min >= y_max:
+        raise FigureSpecError("x_range/y_range must be [min, max] with min < max")
+
+    transform = _fit([(x_min, y_min), (x_max, y_max)], padding=24)
+    canvas = _Canvas()
+
+    # 격자와 눈금
+    x_step, y_step = _tick_step(x_max - x_min), _tick_step(y_max - y_min)
+    for i in range(math.ceil(x_min / x_step), math.floor(x_max / x_step) + 1):
+        x = i * x_step
+        canvas.line(transform((x, y_min)), transform((x, y_max)), GRID, 1)
+        if i:
+            px, py = transform((x, 0 if y_min <= 0 <= y_max else y_min))
+            canvas.text((px, py + 12), _fmt(x), size=12)
+    for i in range(math.ceil(y_min / y_step), math.floor(y_max / y_step) + 1):
+        y = i * y_step
+        canvas.line(transform((x_min, y)), transform((x_max, y)), GRID, 1)
+        if i:
+            px, py = transform((0 if x_min <= 0 <= x_max else x_min, y))
+            canvas.text((px - 6, py), _fmt(y), size=12, anchor="end")
+
+    # 축
+    if y_min <= 0 <= y_max:
+        canvas.line(transform((x_min, 0)), transform((x_max, 0)))
+        px, py = transform((x_max, 0))
+        canvas.text((px - 6, py - 12), "x", size=14)
+    if x_min <= 0 <= x_max:
+        canvas.line(transform((0, y_min)), transform((0, y_max)))
+        px, py = transform((0, y_max))
+        canvas.text((px + 12, py + 6), "y", size=14)
+        if y_min <= 0 <= y_max:
+            px, py = transform((0, 0))
+            canvas.text((px - 10, py + 12), "O", size=12)
+
+    def plot(function: Callable[[float], float], label: Any):
+        """곡선을 샘플링해 그림 (범위를 벗어난 부분은 끊음)"""
+        segment: List[Point] = []
+        last_visible: Optional[Point] = None
+        for i in range(CURVE_SAMPLES + 1):
+            x = x_min + (x_max - x_min) * i / CURVE_SAMPLES
+            y = function(x)
+            if y_min <= y <= y_max:
+                segment.append(transform((x, y)))
+                last_visible = segment[-1]
+            elif segment:
+                if len(segment) > 1:
+                    canvas.polyline(segment)
+                segment = []
+        if len(segment) > 1:
+            canvas.polyline(segment)
+        if label and last_visible:
+            canvas.text((last_visible[0] - 6, last_visible[1] - 12), label, size=14, anchor="end")
+
+    for line in spec.get("lines") or []:
+        if "x" in line:
+            x = float(line["x"])
+            canvas.line(transform((x, y_min)), transform((x, y_max)))
+            if line.get("label"):
+                px, py = transform((x, y_max))
+                canvas.text((px + 6, py + 10), line["label"], size=14, anchor="start")
+            continue
+        if "through" in line:
+            (x1, y1), (x2, y2) = line["through"]
+            if x1 == x2:
+                raise FigureSpecError("Use {\"x\": c} for vertical lines")
+            slope = (y2 - y1) / (x2 - x1)
+            intercept = y1 - slope * x1
+        else:
+            slope, intercept = float(line.get("slope", 0)), float(line.get("intercept", 0))
+
+        # 직선은 y 범위 안에 들어오는 x 구간을 계산해 선분 하나로 그림
+        start, end = x_min, x_max
+        if slope:
+            bounds = sorted(((y_min - intercept) / slope, (y_max - intercept) / slope))
+            start, end = max(start, bounds[0]), min(end, bounds[1])
+        elif not y_min <= intercept <= y_max:
+            continue
+        if start >= end:
+            continue
+        p, q = transform((start, slope * start + intercept)), transform((end, slope * end + intercept))
+        canvas.line(p, q)
+        if line.get("label"):
+            canvas.text((q[0] - 6, q[1] - 12 if q[1] > 30 else q[1] + 16), line["label"], size=14, anchor="end")
+
+    for parabola in spec.get("parabolas") or []:
+        a, b, c = (float(parabola.get(key, 0)) for key in ("a", "b", "c"))
+        if a == 0:
+            raise FigureSpecError("Parabola needs a != 0")
+        plot(lambda x, a=a, b=b, c=c: a * x * x + b * x + c, parabola.get("label"))
+
+    for point in spec.get("points") or []:
+        x, y = float(point["x"]), float(point["y"])
+        if not (x_min <= x <= x_max and y_min <= y <= y_max):
+            raise FigureSpecError(f"Point {point.get('label')} is outside the plotted range")
+        px, py = transform((x, y))
+        canvas.dot((px, py))
+        if point.get("label"):
+            canvas.text((px + 8, py - 12), point["label"], size=14, anchor="start")
+    return canvas.to_svg()
+
+
+def render_bar_chart(spec: Dict[str, Any]) -> str:
+    """막대그래프: categories, values, title, y_label"""
+    categories = [str(c) for c in spec.get("categories") or []]
+    values = [_number(v) for v in spec.get("values") or []]
+    if not categories or len(categories) != len(values) or any(v is None or v < 0 for v in values):
+        raise FigureSpecError("bar_chart needs categories and the same number of non-negative values")
+
+    step = _tick_step(max(values) or 1)
+    top = max(step, math.ceil(max(values) / step) * step)
+    left, right, bottom, upper = 56, VIEW_WIDTH - 16, VIEW_HEIGHT - 36, 40 if spec.get("title") else 20
+    font = FONT_SIZE - 2 if len(categories) <= 6 else 12
+
+    canvas = _Canvas()
+    if spec.get("title"):
+        canvas.text((VIEW_WIDTH / 2, 16), spec["title"])
+    for i in range(int(top / step) + 1):
+        value = i * step
+        y = bottom - (bottom - upper) * value / top
+        canvas.line((left, y), (right, y), GRID, 1)
+        canvas.text((left - 6, y), _fmt(value), size=12, anchor="end")
+    if spec.get("y_label"):
+        canvas.text((left - 6, upper - 12), spec["y_label"], size=12, anchor="end")
+
+    slot = (right - left) / len(categories)
+    bar_width = slot * 0.6
+    for i, (category, value) in enumerate(zip(categories, values)):
+        x = left + slot * i + (slot - bar_width) / 2
+        height = (bottom - upper) * value / top
+        canvas.rect(x, bottom - height, bar_width, height)
+        canvas.text((x + bar_width / 2, bottom - height - 10), _fmt(value), size=12)
+        canvas.text((x + bar_width / 2, bottom + 14), category, size=font)
+
+    canvas.line((left, bottom), (right, bottom))
+    canvas.line((left, upper), (left, bottom))
+    return canvas.to_svg()
+
+
+_RENDERERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "triangle": render_triangle,
+    "quadrilateral": render_quadrilateral,
+    "circle": render_circle,
+    "coordinate_plane": render_coordinate_plane,
+    "bar_chart": render_bar_chart
+}
+
+FIGURE_TYPES = tuple(_RENDERERS)
+
+
+def render_figure(spec: Dict[str, Any]) -> str:
+    """그림 명세(JSON) → SVG 문자열 (같은 명세는 항상 같은 SVG, 잘못된 명세는 FigureSpecError)"""
+    if not isinstance(spec, dict):
+        raise FigureSpecError("Figure spec must be an object")
+    renderer = _RENDERERS.get(spec.get("type"))
+    if renderer is None:
+        raise FigureSpecError(f"Unsupported figure type {spec.get('type')!r} (supported: {', '.join(FIGURE_TYPES)})")
+    try:
+        return renderer(spec)
+    except FigureSpecError:
+        raise
+    except (TypeError, ValueError, KeyError, IndexError, ZeroDivisionError) as e:
+        raise FigureSpecError(f"Invalid {spec['type']} spec: {e}")
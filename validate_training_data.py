@@ -0,0 +1,332 @@
+"""
+파인튜닝 데이터셋(JSONL) 검증 및 통계 도구
+
+파일을 한 번만 스트리밍하면서 고정 메모리로 다음을 확인합니다.
+- 메시지 스키마와 역할 순서 (system? → user/assistant 번갈아 → assistant로 끝)
+- 예제별/파일 전체 토큰 추정 (tiktoken이 있으면 사용, 없으면 글자 수 기반 추정)
+- 완전 중복(정규화 해시)과 유사 중복(MinHash LSH) - 고정 크기 블룸 필터 사용
+- 길이·개념 분포와 예상 학습 비용
+
+파싱·해시 계산은 여러 프로세스에서 병렬로 처리합니다.
+
+실행: python validate_training_data.py synthetic_training_data.jsonl [--workers 4] [--json report.json]
+"""
+import os
+import re
+import sys
+import json
+import zlib
+import hashlib
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+# 한국어 위주 텍스트 기준 대략적인 글자/토큰 비율 (tiktoken이 없을 때)
+CHARS_PER_TOKEN = 2
+
+# 메시지당 형식 오버헤드 토큰 (chat 형식)
+TOKENS_PER_MESSAGE = 4
+
+# MinHash 설정 (밴드 × 행 = 순열 수, 자카드 유사도 약 0.77 이상이면 후보)
+MINHASH_BANDS = 8
+MINHASH_ROWS = 8
+SHINGLE_SIZE = 5
+
+# 길이 분포 구간 (토큰)
+LENGTH_BUCKETS = [128, 256, 512, 1024, 2048, 4096, 8192]
+
+# 보고서에 남길 문제 줄 번호 최대 개수
+MAX_REPORTED_ISSUES = 20
+
+VALID_ROLES = {"system", "user", "assistant"}
+CONCEPT_PATTERN = re.compile(r"'([^']+)' 개념")
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.RandomState(1)
+# 계수를 61비트 전체 범위에서 뽑아야 순열끼리 상관되지 않음 (곱셈은 2^64에서 순환)
+_PERM_A = _rng.randint(1, (1 << 61) - 1, size=MINHASH_BANDS * MINHASH_ROWS, dtype=np.uint64)
+_PERM_B = _rng.randint(0, (1 << 61) - 1, size=MINHASH_BANDS * MINHASH_ROWS, dtype=np.uint64)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _ENCODING = None
+
+
+class BloomFilter:
+    """고정 크기 블룸 필터 (항목 수와 무관하게 메모리 일정, 드물게 오탐)"""
+
+    def __init__(self, size_bytes: int, hash_count: int = 4):
+        self.bits = bytearray(size_bytes)
+        self.size = size_bytes * 8
+        self.hash_count = hash_count
+
+    def add(self, digest: bytes) -> bool:
+        """추가하고, 이미 있었으면 True"""
+        seen = True
+        for i in range(self.hash_count):
+            position = int.from_bytes(digest[i * 4:(i + 1) * 4], "little") % self.size
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                seen = False
+                self.bits[byte] |= 1 << bit
+        return seen
+
+
+def estimate_tokens(text: str) -> int:
+    """텍스트 토큰 수 추정"""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def validate_messages(example: Any, max_tokens: int) -> Tuple[List[str], int]:
+    """예제 하나의 스키마·역할 순서 검사 → (문제 목록, 추정 토큰 수)"""
+    if not isinstance(example, dict) or not isinstance(example.get("messages"), list):
+        return ["'messages' 리스트가 없음"], 0
+
+    messages = example["messages"]
+    if not messages:
+        return ["메시지가 비어 있음"], 0
+
+    errors = []
+    tokens = 0
+    roles = []
+    for index, message in enumerate(messages):
+        if not isinstance(message, dict):
+            errors.append(f"{index}번 메시지가 객체가 아님")
+            continue
+        role, content = message.get("role"), message.get("content")
+        if role not in VALID_ROLES:
+            errors.append(f"{index}번 메시지 역할 오류: {role!r}")
+        if not isinstance(content, str) or not content.strip():
+            errors.append(f"{index}번 메시지 내용이 비어 있음")
+            content = ""
+        unknown = set(message) - {"role", "content", "name", "weight"}
+        if unknown:
+            errors.append(f"{index}번 메시지에 알 수 없는 키: {sorted(unknown)}")
+        roles.append(role)
+        tokens += estimate_tokens(content) + TOKENS_PER_MESSAGE
+
+    # 역할 순서: system은 맨 앞에만, 이후 user/assistant 번갈아, assistant로 끝
+    conversation = roles[1:] if roles and roles[0] == "system" else roles
+    if "system" in conversation:
+        errors.append("system 메시지는 맨 앞에만 올 수 있음")
+    elif conversation and conversation[0] != "user":
+        errors.append("대화가 user 메시지로 시작하지 않음")
+    elif any(a == b for a, b in zip(conversation, conversation[1:])):
+        errors.append("user/assistant 메시지가 번갈아 나오지 않음")
+    if not roles or roles[-1] != "assistant":
+        errors.append("마지막 메시지가 assistant가 아님")
+
+    if tokens > max_tokens:
+        errors.append(f"토큰 수 초과: {tokens} > {max_tokens}")
+    return errors, tokens
+
+
+def minhash_bands(text: str) -> List[bytes]:
+    """문자 shingle MinHash → LSH 밴드별 해시"""
+    normalized = re.sub(r"\s+", " ", text).strip()
+    if len(normalized) < SHINGLE_SIZE:
+        normalized = normalized.ljust(SHINGLE_SIZE)
+    shingles = {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    signature = (((np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME) & _MAX_HASH).min(axis=0)
+    return [
+        hashlib.blake2b(signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS].tobytes() + bytes([band]),
+                        digest_size=16).digest()
+        for band in range(MINHASH_BANDS)
+    ]
+
+
+def analyze_batch(batch: List[Tuple[int, str]], max_tokens: int) -> List[Dict[str, Any]]:
+    """워커 프로세스: 줄 묶음 파싱·검증·해시 계산 (원문은 돌려보내지 않음)"""
+    results = []
+    for line_number, line in batch:
+        result: Dict[str, Any] = {"line": line_number, "errors": [], "tokens": 0}
+        try:
+            example = json.loads(line)
+        except json.JSONDecodeError as e:
+            result["errors"] = [f"JSON 파싱 오류: {e.msg}"]
+            results.append(result)
+            continue
+
+        result["errors"], result["tokens"] = validate_messages(example, max_tokens)
+        messages = example.get("messages") if isinstance(example, dict) else None
+        if isinstance(messages, list) and not result["errors"]:
+            normalized = json.dumps([[m.get("role"), re.sub(r"\s+", " ", m.get("content", "")).strip()]
+                                     for m in messages], ensure_ascii=False)
+            result["hash"] = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+            result["bands"] = minhash_bands(messages[-1]["content"])
+            system = messages[0]["content"] if messages[0].get("role") == "system" else ""
+            match = CONCEPT_PATTERN.search(system)
+            result["concept"] = match.group(1) if match else None
+        results.append(result)
+    return results
+
+
+def read_batches(path: str, batch_size: int) -> Iterator[List[Tuple[int, str]]]:
+    """파일을 줄 묶음으로 스트리밍 (빈 줄 제외)"""
+    batch = []
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            batch.append((line_number, line))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+class DatasetReport:
+    """검증 결과 누적 (고정 메모리)"""
+
+    def __init__(self, bloom_bytes: int):
+        self.examples = 0
+        self.valid = 0
+        self.total_tokens = 0
+        self.max_example_tokens = 0
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+        self.error_counts: Counter = Counter()
+        self.issues: List[Dict[str, Any]] = []
+        self.length_histogram: Counter = Counter()
+        self.concepts: Counter = Counter()
+        self._exact = BloomFilter(bloom_bytes)
+        self._bands = [BloomFilter(bloom_bytes // MINHASH_BANDS) for _ in range(MINHASH_BANDS)]
+
+    def add(self, result: Dict[str, Any]):
+        """워커 결과 하나 반영"""
+        self.examples += 1
+        if result["errors"]:
+            for error in result["errors"]:
+                self.error_counts[error.split(":")[0]] += 1
+            self._note(result["line"], result["errors"])
+            return
+
+        self.valid += 1
+        tokens = result["tokens"]
+        self.total_tokens += tokens
+        self.max_example_tokens = max(self.max_example_tokens, tokens)
+        bucket = next((f"≤{limit}" for limit in LENGTH_BUCKETS if tokens <= limit), f">{LENGTH_BUCKETS[-1]}")
+        self.length_histogram[bucket] += 1
+        if result.get("concept"):
+            # 개념 수는 수십 개 수준이지만 혹시 모를 폭증에 대비해 상한 유지
+            if result["concept"] in self.concepts or len(self.concepts) < 10000:
+                self.concepts[result["concept"]] += 1
+
+        if self._exact.add(result["hash"]):
+            self.exact_duplicates += 1
+            self._note(result["line"], ["완전 중복"])
+            return
+        # 밴드가 하나라도 겹치면 유사 중복 후보 (모든 밴드는 계속 등록)
+        band_hits = [bloom.add(band) for bloom, band in zip(self._bands, result["bands"])]
+        if any(band_hits):
+            self.near_duplicates += 1
+            self._note(result["line"], ["유사 중복 후보"])
+
+    def _note(self, line: int, problems: List[str]):
+        """문제 줄 기록 (앞쪽 일부만)"""
+        if len(self.issues) < MAX_REPORTED_ISSUES:
+            self.issues.append({"line": line, "problems": problems})
+
+    def to_dict(self, epochs: int, price_per_million: float) -> Dict[str, Any]:
+        """보고서 딕셔너리"""
+        training_tokens = self.total_tokens * epochs
+        return {
+            "examples": self.examples,
+            "valid_examples": self.valid,
+            "invalid_examples": self.examples - self.valid,
+            "error_counts": dict(self.error_counts),
+            "exact_duplicates": self.exact_duplicates,
+            "near_duplicate_candidates": self.near_duplicates,
+            "total_tokens": self.total_tokens,
+            "avg_tokens_per_example": round(self.total_tokens / self.valid, 1) if self.valid else 0,
+            "max_tokens_per_example": self.max_example_tokens,
+            "token_estimator": "tiktoken" if _ENCODING is not None else f"chars/{CHARS_PER_TOKEN}",
+            "length_histogram": {bucket: self.length_histogram[bucket]
+                                 for bucket in [f"≤{limit}" for limit in LENGTH_BUCKETS] + [f">{LENGTH_BUCKETS[-1]}"]
+                                 if self.length_histogram[bucket]},
+            "concepts": dict(self.concepts.most_common()),
+            "estimated_training_tokens": training_tokens,
+            "estimated_training_cost_usd": round(training_tokens / 1_000_000 * price_per_million, 4),
+            "issues": self.issues
+        }
+
+
+def validate_dataset(path: str, workers: int = 0, batch_size: int = 2000, max_tokens: int = 65536,
+                     bloom_mb: int = 64, epochs: int = 3, price_per_million: float = 3.0) -> Dict[str, Any]:
+    """JSONL 데이터셋 검증 - 병렬 워커 수만큼 묶음을 동시에 처리 (진행 중인 묶음 수 제한 → 고정 메모리)"""
+    workers = workers or os.cpu_count() or 1
+    report = DatasetReport(bloom_mb * 1024 * 1024)
+    max_in_flight = workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = []
+        for batch in read_batches(path, batch_size):
+            in_flight.append(executor.submit(analyze_batch, batch, max_tokens))
+            # 순서를 유지하며 오래된 묶음부터 반영
+            while len(in_flight) >= max_in_flight:
+                for result in in_flight.pop(0).result():
+                    report.add(result)
+        for future in in_flight:
+            for result in future.result():
+                report.add(result)
+
+    return report.to_dict(epochs, price_per_million)
+
+
+def print_report(path: str, report: Dict[str, Any]):
+    """보고서 출력"""
+    print(f"🔍 파인튜닝 데이터 검증: {path}")
+    print("=" * 60)
+    print(f"📄 예제: {report['examples']}개 (유효 {report['valid_examples']}, 오류 {report['invalid_examples']})")
+    for error, count in report["error_counts"].items():
+        print(f"  ❌ {error}: {count}개")
+    print(f"♻️ 완전 중복: {report['exact_duplicates']}개, 유사 중복 후보: {report['near_duplicate_candidates']}개")
+    print(f"🔢 토큰({report['token_estimator']}): 전체 {report['total_tokens']:,}, "
+          f"예제 평균 {report['avg_tokens_per_example']}, 최대 {report['max_tokens_per_example']}")
+
+    print("\n📏 길이 분포 (토큰):")
+    for bucket, count in report["length_histogram"].items():
+        print(f"  {bucket:>7}: {count}")
+
+    if report["concepts"]:
+        print(f"\n📚 개념 분포 ({len(report['concepts'])}개):")
+        for concept, count in list(report["concepts"].items())[:15]:
+            print(f"  {concept}: {count}")
+
+    print(f"\n💰 예상 학습 토큰: {report['estimated_training_tokens']:,} → 약 ${report['estimated_training_cost_usd']}")
+
+    if report["issues"]:
+        print("\n⚠️ 문제 줄 (앞쪽 일부):")
+        for issue in report["issues"]:
+            print(f"  {issue['line']}행: {', '.join(issue['problems'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="파인튜닝 JSONL 데이터셋 검증 및 통계")
+    parser.add_argument("path", nargs="?", default="synthetic_training_data.jsonl")
+    parser.add_argument("--workers", type=int, default=0, help="해시 계산 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--batch-size", type=int, default=2000, help="워커에 넘기는 줄 묶음 크기")
+    parser.add_argument("--max-tokens", type=int, default=65536, help="예제당 최대 토큰")
+    parser.add_argument("--bloom-mb", type=int, default=64, help="중복 검사용 블룸 필터 크기 (MB)")
+    parser.add_argument("--epochs", type=int, default=3, help="예상 학습 에폭 수")
+    parser.add_argument("--price-per-million", type=float, default=3.0, help="학습 토큰 100만 개당 가격 (USD)")
+    parser.add_argument("--json", dest="json_path", default=None, help="보고서를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    result = validate_dataset(args.path, args.workers, args.batch_size, args.max_tokens,
+                              args.bloom_mb, args.epochs, args.price_per_million)
+    print_report(args.path, result)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    sys.exit(1 if result["invalid_examples"] else 0)